@@ -0,0 +1,107 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+import torch
+from terminaltables import GithubFlavoredMarkdownTable
+
+from mmdet.models.task_modules.tracking import LinearAssignment
+from mmdet.structures.bbox import bbox_overlaps
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the per-frame latency of the gated and split '
+        'association against solving the dense IoU matrix versus the number '
+        'of detections')
+    parser.add_argument(
+        '--num-dets',
+        type=int,
+        nargs='+',
+        default=[100, 500, 1000, 2000, 5000],
+        help='numbers of tracks and detections to benchmark')
+    parser.add_argument(
+        '--num-frames', type=int, default=20, help='number of timed frames')
+    parser.add_argument(
+        '--solver',
+        default='auto',
+        choices=['auto', 'lap', 'scipy'],
+        help='solver of the components and the dense matrix')
+    parser.add_argument(
+        '--match-iou-thr', type=float, default=0.3, help='IoU threshold')
+    return parser.parse_args()
+
+
+def random_frame(rng, num_dets):
+    """Scatter the boxes of pedestrian sizes on a canvas that grows with the
+    number of boxes, and jitter them as the predicted tracks."""
+    size = 150 * np.sqrt(num_dets)
+    xy = rng.uniform(0, size, (num_dets, 2))
+    wh = rng.uniform((20, 50), (60, 150), (num_dets, 2))
+    det_bboxes = np.concatenate([xy, xy + wh], axis=1)
+    track_bboxes = det_bboxes + rng.normal(0, 5, det_bboxes.shape)
+    return (torch.from_numpy(track_bboxes).float(),
+            torch.from_numpy(det_bboxes).float())
+
+
+def dense_assign(assigner, track_bboxes, det_bboxes, cost_limit):
+    """Compute the dense IoU matrix and solve it as one problem."""
+    dists = (1 - bbox_overlaps(track_bboxes, det_bboxes)).numpy()
+    rows, cols = np.nonzero(dists <= cost_limit)
+    return assigner.assign(
+        len(track_bboxes), len(det_bboxes), rows, cols, dists[rows, cols],
+        cost_limit)
+
+
+def sparse_assign(assigner, track_bboxes, det_bboxes, cost_limit):
+    """Gate the overlapping pairs and solve the components."""
+    return assigner.assign_by_iou(track_bboxes, det_bboxes, cost_limit)
+
+
+def time_frames(func, assigner, num_dets, num_frames, cost_limit):
+    rng = np.random.default_rng(0)
+    elapsed = 0
+    for _ in range(num_frames):
+        track_bboxes, det_bboxes = random_frame(rng, num_dets)
+        start = time.perf_counter()
+        row, _ = func(assigner, track_bboxes, det_bboxes, cost_limit)
+        elapsed += time.perf_counter() - start
+    return elapsed / num_frames, row
+
+
+def main():
+    args = parse_args()
+    cost_limit = 1 - args.match_iou_thr
+
+    table_data = [[
+        'detections', 'gated (ms)', 'dense (ms)', 'speedup', 'gate (ms)',
+        'split (ms)', 'solve (ms)'
+    ]]
+    for num_dets in args.num_dets:
+        assigner = LinearAssignment(solver=args.solver)
+        sparse_time, sparse_row = time_frames(sparse_assign, assigner,
+                                              num_dets, args.num_frames,
+                                              cost_limit)
+        timings = {
+            key: value / args.num_frames * 1000
+            for key, value in assigner.timings.items()
+        }
+        dense_assigner = LinearAssignment(
+            solver=args.solver, split_components=False)
+        dense_time, dense_row = time_frames(dense_assign, dense_assigner,
+                                            num_dets, args.num_frames,
+                                            cost_limit)
+        assert (sparse_row > -1).sum() == (dense_row > -1).sum()
+        table_data.append([
+            str(num_dets), f'{sparse_time * 1000:.2f}',
+            f'{dense_time * 1000:.2f}', f'{dense_time / sparse_time:.2f}x',
+            f'{timings["gate"]:.2f}', f'{timings["split"]:.2f}',
+            f'{timings["solve"]:.2f}'
+        ])
+
+    print(GithubFlavoredMarkdownTable(table_data).table)
+
+
+if __name__ == '__main__':
+    main()
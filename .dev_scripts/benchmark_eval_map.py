@@ -0,0 +1,129 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+from terminaltables import GithubFlavoredMarkdownTable
+
+from mmdet.evaluation.functional import eval_map
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the vectorized eval_map against the '
+        'per-class multiprocessing implementation')
+    parser.add_argument(
+        '--num-imgs',
+        type=int,
+        nargs='+',
+        default=[5000, 50000],
+        help='numbers of synthetic images to evaluate')
+    parser.add_argument(
+        '--num-classes', type=int, default=600, help='number of classes')
+    parser.add_argument(
+        '--dets-per-img',
+        type=int,
+        default=100,
+        help='number of detections of each image')
+    parser.add_argument(
+        '--gts-per-img',
+        type=int,
+        default=10,
+        help='number of gt bboxes of each image')
+    parser.add_argument(
+        '--mode',
+        choices=['voc', 'imagenet', 'openimages'],
+        default='voc',
+        help='which tpfp semantics to benchmark')
+    parser.add_argument(
+        '--nproc',
+        type=int,
+        default=4,
+        help='processes used by the per-class implementation')
+    parser.add_argument(
+        '--skip-legacy',
+        action='store_true',
+        help='only time the vectorized implementation')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    return parser.parse_args()
+
+
+def random_bboxes(rng, num, img_size=1000):
+    xy = rng.uniform(0, img_size * 0.8, (num, 2))
+    wh = rng.uniform(4, img_size * 0.2, (num, 2))
+    return np.hstack([xy, xy + wh]).astype(np.float32)
+
+
+def make_dataset(rng, num_imgs, num_classes, dets_per_img, gts_per_img,
+                 with_group_of):
+    """Generate detections jittered around the gts, split by class in the
+    format of `eval_map()`."""
+    det_results, annotations = [], []
+    for _ in range(num_imgs):
+        gt_bboxes = random_bboxes(rng, gts_per_img)
+        gt_labels = rng.integers(0, num_classes, gts_per_img)
+        src = rng.integers(0, gts_per_img, dets_per_img)
+        det_bboxes = gt_bboxes[src] + rng.normal(0, 8, (dets_per_img, 4))
+        det_bboxes[:, 2:] = np.maximum(det_bboxes[:, 2:],
+                                       det_bboxes[:, :2] + 1)
+        det_labels = np.where(
+            rng.random(dets_per_img) < 0.8, gt_labels[src],
+            rng.integers(0, num_classes, dets_per_img))
+        dets = np.hstack([det_bboxes,
+                          rng.random((dets_per_img, 1))]).astype(np.float32)
+        order = np.argsort(det_labels, kind='stable')
+        splits = np.searchsorted(det_labels[order], np.arange(1, num_classes))
+        det_results.append(np.split(dets[order], splits))
+        ann = dict(
+            bboxes=gt_bboxes,
+            labels=gt_labels,
+            bboxes_ignore=np.zeros((0, 4), dtype=np.float32),
+            labels_ignore=np.zeros((0, ), dtype=np.int64))
+        if with_group_of:
+            ann['gt_is_group_ofs'] = rng.random(gts_per_img) < 0.1
+            ann.pop('bboxes_ignore')
+            ann.pop('labels_ignore')
+        annotations.append(ann)
+    return det_results, annotations
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    eval_kwargs = dict(iou_thr=0.5, logger='silent', nproc=args.nproc)
+    if args.mode == 'imagenet':
+        eval_kwargs['dataset'] = 'det'
+    elif args.mode == 'openimages':
+        eval_kwargs.update(dataset='oid_v6', ioa_thr=0.5, use_group_of=True)
+
+    table_data = [['num_imgs', 'vectorized (s)', 'per-class (s)', 'speedup']]
+    for num_imgs in args.num_imgs:
+        det_results, annotations = make_dataset(rng, num_imgs,
+                                                args.num_classes,
+                                                args.dets_per_img,
+                                                args.gts_per_img,
+                                                args.mode == 'openimages')
+
+        start = time.perf_counter()
+        mean_ap, _ = eval_map(
+            det_results, annotations, use_vectorized=True, **eval_kwargs)
+        vectorized_time = time.perf_counter() - start
+        row = [num_imgs, f'{vectorized_time:.2f}', '-', '-']
+
+        if not args.skip_legacy:
+            start = time.perf_counter()
+            legacy_map, _ = eval_map(
+                det_results, annotations, use_vectorized=False, **eval_kwargs)
+            legacy_time = time.perf_counter() - start
+            assert mean_ap == legacy_map, (mean_ap, legacy_map)
+            row[2:] = [
+                f'{legacy_time:.2f}', f'{legacy_time / vectorized_time:.1f}x'
+            ]
+        table_data.append(row)
+        print(f'{num_imgs} images: mAP={mean_ap:.4f}')
+
+    print(GithubFlavoredMarkdownTable(table_data).table)
+
+
+if __name__ == '__main__':
+    main()
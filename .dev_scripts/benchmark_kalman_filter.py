@@ -0,0 +1,86 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+from terminaltables import GithubFlavoredMarkdownTable
+
+from mmdet.models.task_modules.tracking import KalmanFilter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the per-frame latency of the batched Kalman '
+        'filter against the per-track loops versus the number of tracks')
+    parser.add_argument(
+        '--num-tracks',
+        type=int,
+        nargs='+',
+        default=[10, 50, 100, 200, 500],
+        help='numbers of tracks to benchmark')
+    parser.add_argument(
+        '--num-frames', type=int, default=50, help='number of timed frames')
+    parser.add_argument(
+        '--use-nsa', action='store_true', help='use the NSA Kalman filter')
+    return parser.parse_args()
+
+
+def per_track_frame(kf, means, covariances, measurements, scores):
+    """Predict, gate and update the tracks one by one as before."""
+    new_means, new_covariances = [], []
+    for mean, covariance in zip(means, covariances):
+        mean, covariance = kf.predict(mean, covariance)
+        kf.gating_distance(mean, covariance, measurements, kf.center_only)
+        new_means.append(mean)
+        new_covariances.append(covariance)
+    for i, measurement in enumerate(measurements):
+        new_means[i], new_covariances[i] = kf.update(
+            new_means[i], new_covariances[i], measurement, scores[i])
+    return np.stack(new_means), np.stack(new_covariances)
+
+
+def batch_frame(kf, means, covariances, measurements, scores):
+    """Predict, gate and update all the tracks at once."""
+    means, covariances = kf.batch_predict(means, covariances)
+    kf.batch_gating_distance(means, covariances, measurements,
+                             kf.center_only)
+    return kf.batch_update(means, covariances, measurements, scores)
+
+
+def time_frames(func, kf, num_tracks, num_frames):
+    rng = np.random.default_rng(0)
+    measurements = rng.uniform(10, 500, (num_tracks, 4))
+    measurements[:, 2] = rng.uniform(0.3, 0.8, num_tracks)
+    means, covariances = kf.batch_initiate(measurements)
+    elapsed = 0
+    for _ in range(num_frames):
+        measurements = measurements + rng.normal(0, 1, measurements.shape)
+        scores = rng.uniform(0.5, 1, num_tracks)
+        start = time.perf_counter()
+        means, covariances = func(kf, means, covariances, measurements,
+                                  scores)
+        elapsed += time.perf_counter() - start
+    return elapsed / num_frames, means
+
+
+def main():
+    args = parse_args()
+    kf = KalmanFilter(use_nsa=args.use_nsa)
+
+    table_data = [['tracks', 'batched (ms)', 'per-track (ms)', 'speedup']]
+    for num_tracks in args.num_tracks:
+        batch_time, batch_means = time_frames(batch_frame, kf, num_tracks,
+                                              args.num_frames)
+        loop_time, loop_means = time_frames(per_track_frame, kf, num_tracks,
+                                            args.num_frames)
+        assert np.allclose(batch_means, loop_means)
+        table_data.append([
+            str(num_tracks), f'{batch_time * 1000:.2f}',
+            f'{loop_time * 1000:.2f}', f'{loop_time / batch_time:.2f}x'
+        ])
+
+    print(GithubFlavoredMarkdownTable(table_data).table)
+
+
+if __name__ == '__main__':
+    main()
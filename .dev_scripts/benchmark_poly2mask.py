@@ -0,0 +1,99 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+from terminaltables import GithubFlavoredMarkdownTable
+
+from mmdet.datasets.api_wrappers import COCO
+from mmdet.datasets.transforms import LoadAnnotations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the batched polygon to bitmap conversion of '
+        'LoadAnnotations against the per-instance one on COCO images with '
+        'dense instances')
+    parser.add_argument(
+        '--ann-file',
+        default='data/coco/annotations/instances_val2017.json',
+        help='COCO annotation file')
+    parser.add_argument(
+        '--min-instances',
+        type=int,
+        default=20,
+        help='only use the images with at least this number of instances')
+    parser.add_argument(
+        '--num-imgs', type=int, default=200, help='number of images to use')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='number of timed passes')
+    return parser.parse_args()
+
+
+def load_results(ann_file, min_instances, num_imgs):
+    """Build the results of the densest images in the format consumed by
+    `LoadAnnotations`."""
+    coco = COCO(ann_file)
+    img_ids = [
+        img_id for img_id in coco.get_img_ids()
+        if len(coco.get_ann_ids(img_ids=[img_id])) >= min_instances
+    ][:num_imgs]
+    results_list = []
+    for img_id in img_ids:
+        img_info = coco.load_imgs([img_id])[0]
+        instances = []
+        for ann in coco.load_anns(coco.get_ann_ids(img_ids=[img_id])):
+            x, y, w, h = ann['bbox']
+            instances.append(
+                dict(
+                    bbox=[x, y, x + w, y + h],
+                    bbox_label=ann['category_id'],
+                    ignore_flag=ann.get('iscrowd', 0),
+                    mask=ann['segmentation']))
+        results_list.append(
+            dict(
+                ori_shape=(img_info['height'], img_info['width']),
+                instances=instances))
+    return results_list
+
+
+def time_transform(transform, results_list, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [transform(dict(results)) for results in results_list]
+    return (time.perf_counter() - start) / repeat, outputs
+
+
+def main():
+    args = parse_args()
+    results_list = load_results(args.ann_file, args.min_instances,
+                                args.num_imgs)
+    num_instances = sum(len(results['instances']) for results in results_list)
+    print(f'{len(results_list)} images with {num_instances} instances')
+
+    table_data = [['output', 'batched (s)', 'per-instance (s)', 'speedup']]
+    for rle_mask in (False, True):
+        load_kwargs = dict(
+            with_bbox=False,
+            with_label=False,
+            with_mask=True,
+            poly2mask=True,
+            rle_mask=rle_mask)
+        batched_time, batched_outputs = time_transform(
+            LoadAnnotations(batch_poly2mask=True, **load_kwargs),
+            results_list, args.repeat)
+        legacy_time, legacy_outputs = time_transform(
+            LoadAnnotations(**load_kwargs), results_list, args.repeat)
+        for batched, legacy in zip(batched_outputs, legacy_outputs):
+            assert np.array_equal(batched['gt_masks'].to_ndarray(),
+                                  legacy['gt_masks'].to_ndarray())
+        table_data.append([
+            'RLEMasks' if rle_mask else 'BitmapMasks', f'{batched_time:.3f}',
+            f'{legacy_time:.3f}', f'{legacy_time / batched_time:.2f}x'
+        ])
+
+    print(GithubFlavoredMarkdownTable(table_data).table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+
+import numpy as np
+from terminaltables import GithubFlavoredMarkdownTable
+
+from mmdet.datasets.api_wrappers import COCO
+from mmdet.structures.mask import PolygonMasks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the vectorized areas and bounding boxes of '
+        'PolygonMasks against the per-polygon loops on LVIS annotations')
+    parser.add_argument(
+        '--ann-file',
+        default='data/lvis_v1/annotations/lvis_v1_train.json',
+        help='LVIS or COCO annotation file')
+    parser.add_argument(
+        '--num-imgs', type=int, default=2000, help='number of images to use')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='number of timed passes')
+    return parser.parse_args()
+
+
+def load_masks(ann_file, num_imgs):
+    """Load the polygon masks of the first images with instances."""
+    coco = COCO(ann_file)
+    masks_list = []
+    for img_id in coco.get_img_ids():
+        anns = coco.load_anns(coco.get_ann_ids(img_ids=[img_id]))
+        polys = [[
+            np.array(p, dtype=np.float32) for p in ann['segmentation']
+            if len(p) >= 6
+        ] for ann in anns if isinstance(ann['segmentation'], list)]
+        polys = [poly_per_obj for poly_per_obj in polys if poly_per_obj]
+        if len(polys) == 0:
+            continue
+        img_info = coco.load_imgs([img_id])[0]
+        masks_list.append((polys, img_info['height'], img_info['width']))
+        if len(masks_list) == num_imgs:
+            break
+    return masks_list
+
+
+def legacy_areas(masks):
+    """The areas by the shoelace formula on each polygon."""
+    areas = []
+    for poly_per_obj in masks.masks:
+        area = 0
+        for p in poly_per_obj:
+            x, y = p[0::2], p[1::2]
+            area += 0.5 * np.abs(
+                np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+        areas.append(area)
+    return np.asarray(areas)
+
+
+def legacy_bboxes(masks):
+    """The bounding boxes by the min and max of each polygon."""
+    boxes = np.zeros((len(masks), 4), dtype=np.float32)
+    for idx, poly_per_obj in enumerate(masks.masks):
+        xy_min = np.array([masks.width * 2, masks.height * 2],
+                          dtype=np.float32)
+        xy_max = np.zeros(2, dtype=np.float32)
+        for p in poly_per_obj:
+            xy = p.reshape(-1, 2).astype(np.float32)
+            xy_min = np.minimum(xy_min, xy.min(axis=0))
+            xy_max = np.maximum(xy_max, xy.max(axis=0))
+        boxes[idx, :2] = xy_min
+        boxes[idx, 2:] = xy_max
+    return boxes
+
+
+def time_func(func, masks_list, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # create new masks so that the packing is timed as well
+        outputs = [func(PolygonMasks(*masks)) for masks in masks_list]
+    return (time.perf_counter() - start) / repeat, outputs
+
+
+def main():
+    args = parse_args()
+    masks_list = load_masks(args.ann_file, args.num_imgs)
+    num_instances = sum(len(masks[0]) for masks in masks_list)
+    print(f'{len(masks_list)} images with {num_instances} instances')
+
+    table_data = [['op', 'vectorized (s)', 'per-polygon (s)', 'speedup']]
+    for name, func, legacy_func in [
+        ('areas', lambda masks: masks.areas, legacy_areas),
+        ('get_bboxes', lambda masks: masks.get_bboxes().numpy(),
+         legacy_bboxes),
+    ]:
+        new_time, new_outputs = time_func(func, masks_list, args.repeat)
+        legacy_time, legacy_outputs = time_func(legacy_func, masks_list,
+                                                args.repeat)
+        for new, legacy in zip(new_outputs, legacy_outputs):
+            assert np.allclose(new, legacy, rtol=1e-4, atol=1e-2)
+        table_data.append([
+            name, f'{new_time:.3f}', f'{legacy_time:.3f}',
+            f'{legacy_time / new_time:.2f}x'
+        ])
+
+    print(GithubFlavoredMarkdownTable(table_data).table)
+
+
+if __name__ == '__main__':
+    main()
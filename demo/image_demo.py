@@ -112,6 +112,21 @@ def parse_args():
         '--print-result',
         action='store_true',
         help='Whether to print the results.')
+    parser.add_argument(
+        '--mask-format',
+        default='rle',
+        choices=['rle', 'polygon'],
+        help='Format of the masks in the saved json results')
+    parser.add_argument(
+        '--polygon-tolerance',
+        type=float,
+        default=0.,
+        help='Tolerance in pixels to simplify the polygons of the masks')
+    parser.add_argument(
+        '--polygon-workers',
+        type=int,
+        default=0,
+        help='Number of threads to convert the masks to polygons')
     parser.add_argument(
         '--palette',
         default='none',
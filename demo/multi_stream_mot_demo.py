@@ -0,0 +1,125 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+from argparse import ArgumentParser
+
+import mmcv
+import mmengine
+from mmengine.registry import init_default_scope
+
+from mmdet.apis import MultiStreamTracker, init_track_model
+from mmdet.registry import VISUALIZERS
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument(
+        'inputs', nargs='+', help='Input video files, one per stream.')
+    parser.add_argument('config', help='config file')
+    parser.add_argument('--checkpoint', help='checkpoint file')
+    parser.add_argument('--detector', help='det checkpoint file')
+    parser.add_argument('--reid', help='reid checkpoint file')
+    parser.add_argument(
+        '--device', default='cuda:0', help='device used for inference')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=16,
+        help='The most frames in a forward of the detector.')
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=4,
+        help='The most pending frames of a stream.')
+    parser.add_argument(
+        '--overflow',
+        default='drop_oldest',
+        choices=['drop_oldest', 'drop_newest'],
+        help='The policy when the queue of a stream is full.')
+    parser.add_argument(
+        '--score-thr',
+        type=float,
+        default=0.0,
+        help='The threshold of score to filter bboxes.')
+    parser.add_argument(
+        '--out', help='output folder of the frames, a subfolder per stream')
+    args = parser.parse_args()
+    return args
+
+
+def main(args):
+    init_default_scope('mmdet')
+
+    # build the model from a config file and a checkpoint file
+    model = init_track_model(
+        args.config,
+        args.checkpoint,
+        args.detector,
+        args.reid,
+        device=args.device)
+    runner = MultiStreamTracker(
+        model,
+        max_batch_size=args.batch_size,
+        max_queue_size=args.queue_size,
+        overflow=args.overflow)
+
+    if args.out is not None:
+        visualizer = VISUALIZERS.build(model.cfg.visualizer)
+        visualizer.dataset_meta = model.dataset_meta
+
+    readers = {}
+    for stream_id, video in enumerate(args.inputs):
+        readers[stream_id] = mmcv.VideoReader(video)
+        runner.add_stream(stream_id)
+    # the frames to draw the results on, by (stream_id, frame_id)
+    frames = {}
+    prog_bar = mmengine.ProgressBar(sum(map(len, readers.values())))
+    while readers or runner.num_pending > 0:
+        # read a frame of each stream as the cameras would deliver them
+        for stream_id, reader in list(readers.items()):
+            img = reader.read()
+            if img is None:
+                readers.pop(stream_id)
+                continue
+            frame_id = runner.streams[stream_id].next_frame_id
+            if runner.push(stream_id, img) and args.out is not None:
+                frames[(stream_id, frame_id)] = img
+        for stream_id, frame_id, result in runner.step():
+            prog_bar.update()
+            if args.out is None:
+                continue
+            img = frames.pop((stream_id, frame_id))
+            out_file = osp.join(args.out, str(stream_id),
+                                f'{frame_id:06d}.jpg')
+            os.makedirs(osp.dirname(out_file), exist_ok=True)
+            visualizer.add_datasample(
+                'mot',
+                img[..., ::-1],
+                data_sample=result[0],
+                show=False,
+                draw_gt=False,
+                out_file=out_file,
+                pred_score_thr=args.score_thr)
+        if args.out is not None:
+            # release the frames dropped by the full queues
+            pending = {(stream_id, frame[0])
+                       for stream_id, stream in runner.streams.items()
+                       for frame in stream.queue}
+            for key in list(frames):
+                if key not in pending:
+                    frames.pop(key)
+
+    stats = runner.stats()
+    print(f'\nframes: {stats["num_frames"]}, '
+          f'dropped: {stats["num_dropped"]}, '
+          f'mean batch size: {stats["mean_batch_size"]:.2f}, '
+          f'throughput: {stats["throughput"]:.2f} fps, '
+          f'latency: {stats["mean_latency"] * 1000:.1f} ms '
+          f'(max {stats["max_latency"] * 1000:.1f} ms), '
+          f'detector: {stats["detector_time"] * 1000:.1f} ms/batch, '
+          f'association: {stats["association_time"] * 1000:.1f} ms/frame')
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    main(args)
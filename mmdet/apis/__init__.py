@@ -2,8 +2,10 @@
 from .det_inferencer import DetInferencer
 from .inference import (async_inference_detector, inference_detector,
                         inference_mot, init_detector, init_track_model)
+from .multi_stream import MultiStreamTracker
 
 __all__ = [
     'init_detector', 'async_inference_detector', 'inference_detector',
-    'DetInferencer', 'inference_mot', 'init_track_model'
+    'DetInferencer', 'inference_mot', 'init_track_model',
+    'MultiStreamTracker'
 ]
@@ -22,7 +22,8 @@ from rich.progress import track
 from mmdet.evaluation import INSTANCE_OFFSET
 from mmdet.registry import DATASETS
 from mmdet.structures import DetDataSample
-from mmdet.structures.mask import encode_mask_results, mask2bbox
+from mmdet.structures.mask import (RLEMasks, batch_bitmap_to_polygon,
+                                   encode_mask_results, mask2bbox)
 from mmdet.utils import ConfigType
 from ..evaluation import get_classes
 
@@ -81,6 +82,9 @@ class DetInferencer(BaseInferencer):
         'pred_out_dir',
         'return_datasamples',
         'no_save_pred',
+        'mask_format',
+        'polygon_tolerance',
+        'polygon_workers',
     }
 
     def __init__(self,
@@ -512,6 +516,9 @@ class DetInferencer(BaseInferencer):
         print_result: bool = False,
         no_save_pred: bool = False,
         pred_out_dir: str = '',
+        mask_format: str = 'rle',
+        polygon_tolerance: float = 0.,
+        polygon_workers: int = 0,
         **kwargs,
     ) -> Dict:
         """Process the predictions and visualization results from ``forward``
@@ -535,6 +542,12 @@ class DetInferencer(BaseInferencer):
             pred_out_dir: Dir to save the inference results w/o
                 visualization. If left as empty, no file will be saved.
                 Defaults to ''.
+            mask_format (str): The format of the predicted masks, either
+                'rle' or 'polygon'. See :meth:`pred2dict`. Defaults to 'rle'.
+            polygon_tolerance (float): The tolerance in pixels to simplify
+                the polygons. Defaults to 0.
+            polygon_workers (int): The number of threads to convert the
+                masks to polygons. Defaults to 0.
 
         Returns:
             dict: Inference and visualization results with key ``predictions``
@@ -555,7 +568,12 @@ class DetInferencer(BaseInferencer):
         if not return_datasamples:
             results = []
             for pred in preds:
-                result = self.pred2dict(pred, pred_out_dir)
+                result = self.pred2dict(
+                    pred,
+                    pred_out_dir,
+                    mask_format=mask_format,
+                    polygon_tolerance=polygon_tolerance,
+                    polygon_workers=polygon_workers)
                 results.append(result)
         elif pred_out_dir != '':
             warnings.warn('Currently does not support saving datasample '
@@ -572,7 +590,10 @@ class DetInferencer(BaseInferencer):
     #  Maybe should include model name, timestamp, filename, image info etc.
     def pred2dict(self,
                   data_sample: DetDataSample,
-                  pred_out_dir: str = '') -> Dict:
+                  pred_out_dir: str = '',
+                  mask_format: str = 'rle',
+                  polygon_tolerance: float = 0.,
+                  polygon_workers: int = 0) -> Dict:
         """Extract elements necessary to represent a prediction into a
         dictionary.
 
@@ -584,6 +605,15 @@ class DetInferencer(BaseInferencer):
             pred_out_dir: Dir to save the inference results w/o
                 visualization. If left as empty, no file will be saved.
                 Defaults to ''.
+            mask_format (str): The format of the predicted masks. 'rle' for
+                COCO's compressed RLE, and 'polygon' for the polygons of
+                each mask in COCO's format, i.e. lists of
+                [x0, y0, x1, y1, ...]. Defaults to 'rle'.
+            polygon_tolerance (float): The tolerance in pixels to simplify
+                the polygons, see :func:`batch_bitmap_to_polygon`.
+                Defaults to 0.
+            polygon_workers (int): The number of threads to convert the
+                masks to polygons. Defaults to 0.
 
         Returns:
             dict: Prediction results.
@@ -620,13 +650,29 @@ class DetInferencer(BaseInferencer):
                 if 'bboxes' not in pred_instances or pred_instances.bboxes.sum(
                 ) == 0:
                     # Fake bbox, such as the SOLO.
-                    bboxes = mask2bbox(masks.cpu()).numpy().tolist()
+                    if isinstance(masks, RLEMasks):
+                        bboxes = masks.get_bboxes().tensor.numpy().tolist()
+                    else:
+                        bboxes = mask2bbox(masks.cpu()).numpy().tolist()
                     result['bboxes'] = bboxes
-                encode_masks = encode_mask_results(pred_instances.masks)
-                for encode_mask in encode_masks:
-                    if isinstance(encode_mask['counts'], bytes):
-                        encode_mask['counts'] = encode_mask['counts'].decode()
-                result['masks'] = encode_masks
+                if mask_format == 'polygon':
+                    polygons = batch_bitmap_to_polygon(
+                        pred_instances.masks,
+                        tolerance=polygon_tolerance,
+                        num_workers=polygon_workers)
+                    result['masks'] = [[
+                        contour.reshape(-1).tolist() for contour in contours
+                        if len(contour) >= 3
+                    ] for contours, _ in polygons]
+                else:
+                    assert mask_format == 'rle', \
+                        f'Unsupported mask format {mask_format}'
+                    encode_masks = encode_mask_results(pred_instances.masks)
+                    for encode_mask in encode_masks:
+                        if isinstance(encode_mask['counts'], bytes):
+                            encode_mask['counts'] = encode_mask[
+                                'counts'].decode()
+                    result['masks'] = encode_masks
 
         if 'pred_panoptic_seg' in data_sample:
             if VOID is None:
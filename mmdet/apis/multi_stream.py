@@ -0,0 +1,298 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from mmengine.dataset import pseudo_collate
+
+from ..structures import TrackDataSample
+from .inference import build_test_pipeline
+
+
+class StreamState:
+    """The state of a video stream in :class:`MultiStreamTracker`.
+
+    Args:
+        tracker (object): The tracker of the stream.
+        max_queue_size (int): The most pending frames of the stream.
+    """
+
+    def __init__(self, tracker, max_queue_size: int) -> None:
+        self.tracker = tracker
+        self.max_queue_size = max_queue_size
+        # pending frames of (frame_id, img, push time)
+        self.queue = deque()
+        self.next_frame_id = 0
+        self.num_frames = 0
+        self.num_dropped = 0
+        self.total_latency = 0.
+        self.max_latency = 0.
+
+    def stats(self) -> dict:
+        """The statistics of the stream."""
+        return dict(
+            num_frames=self.num_frames,
+            num_dropped=self.num_dropped,
+            queue_size=len(self.queue),
+            mean_latency=self.total_latency / max(self.num_frames, 1),
+            max_latency=self.max_latency)
+
+
+class MultiStreamTracker:
+    """Track many video streams with one MOT model.
+
+    :func:`inference_mot` runs the detector on one frame of one video at a
+    time. This runner keeps a tracker state per stream, batches the pending
+    frames of many streams into a single forward of the detector, and then
+    runs the association of each frame with the tracker of its stream in the
+    order of the frames.
+
+    The frames are pushed into bounded per-stream queues by :meth:`push`, and
+    processed by :meth:`step`, which takes the frames from the streams in a
+    round-robin manner so that no stream is starved when there are more
+    streams than ``max_batch_size``. When the queue of a stream is full, the
+    oldest pending frame is dropped with ``overflow='drop_oldest'``, which
+    keeps the latency of live streams bounded, or the new frame is rejected
+    with ``overflow='drop_newest'``.
+
+    The supported models are the ones with a ``detector`` and a ``tracker``
+    running on single frames, e.g. ByteTrack, OC-SORT, DeepSORT and
+    StrongSORT. The offline post-processing of StrongSORT (AFLink and the
+    interpolation) is not applied to the streams.
+
+    Args:
+        model (nn.Module): The MOT model built by :func:`init_track_model`.
+        max_batch_size (int): The most frames in a forward of the detector.
+            Defaults to 16.
+        max_queue_size (int): The most pending frames of a stream.
+            Defaults to 4.
+        overflow (str): The policy when the queue of a stream is full.
+            Options are 'drop_oldest' and 'drop_newest'.
+            Defaults to 'drop_oldest'.
+
+    Examples:
+        >>> model = init_track_model(config, checkpoint)
+        >>> runner = MultiStreamTracker(model, max_batch_size=16)
+        >>> for stream_id, reader in readers.items():
+        >>>     runner.push(stream_id, next(reader))
+        >>> for stream_id, frame_id, result in runner.step():
+        >>>     print(stream_id, frame_id, result[0].pred_track_instances)
+    """
+
+    def __init__(self,
+                 model: nn.Module,
+                 max_batch_size: int = 16,
+                 max_queue_size: int = 4,
+                 overflow: str = 'drop_oldest') -> None:
+        assert hasattr(model, 'detector') and hasattr(model, 'tracker'), \
+            'Only the MOT models with a detector and a tracker are supported'
+        assert max_batch_size > 0 and max_queue_size > 0
+        assert overflow in ('drop_oldest', 'drop_newest'), \
+            f'Unsupported overflow policy {overflow}'
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.test_pipeline = build_test_pipeline(model.cfg)
+
+        self.streams: Dict[Hashable, StreamState] = OrderedDict()
+        self._cursor = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset the statistics of the runner and the streams."""
+        self.num_batches = 0
+        self.num_frames = 0
+        self.busy_time = 0.
+        self.detector_time = 0.
+        self.association_time = 0.
+        for stream in self.streams.values():
+            stream.num_frames = 0
+            stream.num_dropped = 0
+            stream.total_latency = 0.
+            stream.max_latency = 0.
+
+    def add_stream(self, stream_id: Hashable) -> StreamState:
+        """Add a stream with a new tracker."""
+        assert stream_id not in self.streams, \
+            f'Stream {stream_id} already exists'
+        stream = StreamState(
+            copy.deepcopy(self.model.tracker), self.max_queue_size)
+        self.streams[stream_id] = stream
+        return stream
+
+    def remove_stream(self, stream_id: Hashable) -> None:
+        """Remove a stream with its pending frames."""
+        self.streams.pop(stream_id)
+
+    def push(self, stream_id: Hashable, img: np.ndarray) -> bool:
+        """Push a frame of a stream, the stream is added if it does not
+        exist.
+
+        Args:
+            stream_id (Hashable): The id of the stream.
+            img (np.ndarray): The frame in BGR order.
+
+        Returns:
+            bool: Whether the frame is queued. It is False if the queue is
+            full and the frame is dropped by ``overflow='drop_newest'``.
+        """
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = self.add_stream(stream_id)
+        if len(stream.queue) >= stream.max_queue_size:
+            stream.num_dropped += 1
+            if self.overflow == 'drop_newest':
+                return False
+            stream.queue.popleft()
+        # the frame ids of the dropped frames are skipped, so that the
+        # trackers see them as missing frames
+        stream.queue.append((stream.next_frame_id, img, time.perf_counter()))
+        stream.next_frame_id += 1
+        return True
+
+    @property
+    def num_pending(self) -> int:
+        """The number of the pending frames of all the streams."""
+        return sum(len(stream.queue) for stream in self.streams.values())
+
+    def _collect_batch(self) -> List[Tuple[Hashable, tuple]]:
+        """Take at most ``max_batch_size`` frames from the streams in a
+        round-robin manner."""
+        stream_ids = list(self.streams)
+        if len(stream_ids) == 0:
+            return []
+        start = self._cursor % len(stream_ids)
+        self._cursor = start + 1
+        stream_ids = stream_ids[start:] + stream_ids[:start]
+
+        batch = []
+        while len(batch) < self.max_batch_size:
+            num_taken = len(batch)
+            for stream_id in stream_ids:
+                queue = self.streams[stream_id].queue
+                if queue and len(batch) < self.max_batch_size:
+                    batch.append((stream_id, queue.popleft()))
+            if len(batch) == num_taken:
+                break
+        return batch
+
+    def step(self) -> List[Tuple[Hashable, int, TrackDataSample]]:
+        """Process a batch of the pending frames.
+
+        Returns:
+            list[tuple]: The ``(stream_id, frame_id, result)`` of the
+            processed frames, where ``result`` is the
+            :obj:`TrackDataSample` of the frame as returned by
+            :func:`inference_mot`.
+        """
+        batch = self._collect_batch()
+        if len(batch) == 0:
+            return []
+        start = time.perf_counter()
+
+        datas = []
+        for _, (frame_id, img, _) in batch:
+            data = dict(
+                img=[img.astype(np.float32)],
+                frame_id=[frame_id],
+                ori_shape=[img.shape[:2]],
+                img_id=[frame_id + 1])
+            datas.append(self.test_pipeline(data))
+
+        with torch.no_grad():
+            data = self.model.data_preprocessor(pseudo_collate(datas), False)
+            # (N, 1, C, H, W) -> (N, C, H, W) for the detector
+            inputs = data['inputs'][:, 0].contiguous()
+            track_data_samples = data['data_samples']
+            det_data_samples = [
+                track_data_sample[0]
+                for track_data_sample in track_data_samples
+            ]
+            det_results = self.model.detector.predict(inputs,
+                                                      det_data_samples)
+            detector_end = time.perf_counter()
+
+            results = []
+            for i, (stream_id, (frame_id, _, push_time)) in enumerate(batch):
+                stream = self.streams[stream_id]
+                if frame_id == 0:
+                    stream.tracker.reset()
+                # the MOT models with ReID (e.g. StrongSORT) need the image,
+                # the others ignore the keyword arguments
+                pred_track_instances = stream.tracker.track(
+                    model=self.model,
+                    img=inputs[i:i + 1],
+                    data_sample=det_results[i],
+                    data_preprocessor=getattr(self.model, 'preprocess_cfg',
+                                              None),
+                    rescale=True)
+                track_data_samples[i][0].pred_track_instances = \
+                    pred_track_instances
+                results.append((stream_id, frame_id, track_data_samples[i]))
+
+                latency = time.perf_counter() - push_time
+                stream.num_frames += 1
+                stream.total_latency += latency
+                stream.max_latency = max(stream.max_latency, latency)
+        end = time.perf_counter()
+
+        self.num_batches += 1
+        self.num_frames += len(batch)
+        self.busy_time += end - start
+        self.detector_time += detector_end - start
+        self.association_time += end - detector_end
+        return results
+
+    def flush(self) -> List[Tuple[Hashable, int, TrackDataSample]]:
+        """Process all the pending frames."""
+        results = []
+        while self.num_pending > 0:
+            results.extend(self.step())
+        return results
+
+    def stats(self) -> dict:
+        """The latency and throughput statistics.
+
+        Returns:
+            dict: The statistics, including:
+
+            - num_frames (int): The processed frames.
+            - num_dropped (int): The frames dropped by full queues.
+            - mean_batch_size (float): The mean frames per forward of the
+              detector.
+            - throughput (float): The processed frames per second of the
+              busy time of :meth:`step`.
+            - detector_time (float): The mean time in seconds of the
+              preprocessing and the forward of the detector per batch.
+            - association_time (float): The mean time in seconds of the
+              association per frame.
+            - mean_latency (float) and max_latency (float): The time in
+              seconds from pushing a frame to its result.
+            - streams (dict): The statistics of each stream.
+        """
+        streams = {
+            stream_id: stream.stats()
+            for stream_id, stream in self.streams.items()
+        }
+        num_frames = max(self.num_frames, 1)
+        num_batches = max(self.num_batches, 1)
+        total_latency = sum(stream.total_latency
+                            for stream in self.streams.values())
+        return dict(
+            num_frames=self.num_frames,
+            num_dropped=sum(stream.num_dropped
+                            for stream in self.streams.values()),
+            mean_batch_size=self.num_frames / num_batches,
+            throughput=self.num_frames / max(self.busy_time, 1e-9),
+            detector_time=self.detector_time / num_batches,
+            association_time=self.association_time / num_frames,
+            mean_latency=total_latency / num_frames,
+            max_latency=max(
+                [stream.max_latency for stream in self.streams.values()],
+                default=0.),
+            streams=streams)
@@ -1,5 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .coco_ann_cache import COCOAnnCache
 from .coco_api import COCO, COCOeval, COCOPanoptic
 from .cocoeval_mp import COCOevalMP
+from .jsonl_index import JsonlIndex
 
-__all__ = ['COCO', 'COCOeval', 'COCOPanoptic', 'COCOevalMP']
+__all__ = [
+    'COCO', 'COCOeval', 'COCOPanoptic', 'COCOevalMP', 'COCOAnnCache',
+    'JsonlIndex'
+]
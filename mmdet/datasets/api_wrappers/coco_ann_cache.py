@@ -0,0 +1,266 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import json
+import os
+import os.path as osp
+import pickle
+import shutil
+import tempfile
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from .coco_api import COCO
+
+
+class COCOAnnCache:
+    """Columnar annotation cache of a COCO style annotation file.
+
+    Parsing a large COCO json (e.g. Objects365 or V3Det) with pycocotools
+    takes minutes and keeps millions of small python objects alive in every
+    dataloader worker. The cache stores the fields used by
+    :class:`CocoDataset` as flat numpy arrays, one ``.npy`` file per field,
+    which are memory-mapped read-only so that all the workers share the same
+    pages. The raw image and annotation dicts of an image are only rebuilt
+    when requested.
+
+    Only the following fields are cached:
+
+        - images: ``id``, ``file_name``, ``width`` and ``height``.
+        - annotations: ``id``, ``image_id``, ``category_id``, ``bbox``,
+          ``area``, ``iscrowd``, ``ignore`` and ``segmentation``. Polygons are
+          stored as flat coordinates with offsets, other segmentations (e.g.
+          RLE) are pickled.
+        - categories: all the fields.
+
+    Args:
+        cache_dir (str): Directory of a cache built by :meth:`build`.
+    """
+
+    VERSION = 1
+    # name of arrays saved in the cache directory
+    ARRAYS = ('img_ids', 'img_sizes', 'file_name_offsets', 'file_names',
+              'ann_offsets', 'ann_ids', 'cat_ids', 'bboxes', 'areas',
+              'iscrowd', 'ignore', 'seg_types', 'ann_poly_offsets',
+              'poly_offsets', 'poly_coords', 'seg_blob_offsets', 'seg_blob')
+    # types of segmentation
+    SEG_NONE = 0
+    SEG_POLYGON = 1
+    SEG_PICKLE = 2
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        with open(osp.join(cache_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        assert meta['version'] == self.VERSION, \
+            f'Unsupported annotation cache version {meta["version"]}'
+        self.categories = meta['categories']
+        for name in self.ARRAYS:
+            setattr(self, name,
+                    np.load(osp.join(cache_dir, f'{name}.npy'), mmap_mode='r'))
+
+    def __len__(self) -> int:
+        """Number of images."""
+        return len(self.img_ids)
+
+    def __getstate__(self) -> dict:
+        # only pickle the path, so that dataloader workers started by
+        # `spawn` re-map the cache rather than copying it
+        return dict(cache_dir=self.cache_dir)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state['cache_dir'])
+
+    @staticmethod
+    def hash_file(filename: str) -> str:
+        """Compute the md5 of a file as the key of its cache."""
+        md5 = hashlib.md5()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 24), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    @classmethod
+    def load_or_build(cls,
+                      ann_file: str,
+                      cache_root: str,
+                      coco_api: type = COCO) -> 'COCOAnnCache':
+        """Load the cache of ``ann_file`` from ``cache_root``, or build it
+        first if it does not exist.
+
+        Args:
+            ann_file (str): Local path of the COCO style annotation file.
+            cache_root (str): The directory to save caches.
+            coco_api (type): The COCO api to parse ``ann_file``.
+                Defaults to :class:`COCO`.
+
+        Returns:
+            :obj:`COCOAnnCache`: The loaded cache.
+        """
+        prefix = osp.splitext(osp.basename(ann_file))[0]
+        cache_dir = osp.join(
+            cache_root, f'{prefix}.{cls.hash_file(ann_file)}.v{cls.VERSION}')
+        if not osp.exists(osp.join(cache_dir, 'meta.json')):
+            cls.build(coco_api(ann_file), cache_dir)
+        return cls(cache_dir)
+
+    @classmethod
+    def build(cls, coco: COCO, cache_dir: str) -> None:
+        """Build the cache of a parsed COCO api.
+
+        The cache is written to a temporary directory and then renamed to
+        ``cache_dir``, so that processes building the same cache at the same
+        time do not see partial files.
+
+        Args:
+            coco (:obj:`COCO`): The parsed COCO api.
+            cache_dir (str): The directory to save the cache.
+        """
+        img_ids = coco.get_img_ids()
+        img_infos = coco.load_imgs(img_ids)
+        file_names = [info['file_name'].encode() for info in img_infos]
+
+        ann_ids, ann_counts = [], []
+        for img_id in img_ids:
+            ids = coco.get_ann_ids(img_ids=[img_id])
+            ann_ids.extend(ids)
+            ann_counts.append(len(ids))
+        anns = coco.load_anns(ann_ids)
+
+        seg_types = np.full(len(anns), cls.SEG_NONE, dtype=np.uint8)
+        ann_num_polys, poly_lens, poly_coords = [], [], []
+        seg_blobs = []
+        for i, ann in enumerate(anns):
+            segm = ann.get('segmentation', None)
+            num_polys = 0
+            blob = b''
+            if isinstance(segm, list):
+                seg_types[i] = cls.SEG_POLYGON
+                num_polys = len(segm)
+                for poly in segm:
+                    poly_lens.append(len(poly))
+                    poly_coords.extend(poly)
+            elif segm is not None:
+                seg_types[i] = cls.SEG_PICKLE
+                blob = pickle.dumps(segm, protocol=4)
+            ann_num_polys.append(num_polys)
+            seg_blobs.append(blob)
+
+        def _offsets(lengths):
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            return offsets
+
+        arrays = dict(
+            img_ids=np.array(img_ids, dtype=np.int64),
+            img_sizes=np.array([[info['height'], info['width']]
+                                for info in img_infos],
+                               dtype=np.int64).reshape(-1, 2),
+            file_name_offsets=_offsets([len(name) for name in file_names]),
+            file_names=np.frombuffer(b''.join(file_names), dtype=np.uint8),
+            ann_offsets=_offsets(ann_counts),
+            ann_ids=np.array(ann_ids, dtype=np.int64),
+            cat_ids=np.array([ann['category_id'] for ann in anns],
+                             dtype=np.int64),
+            bboxes=np.array([ann['bbox'] for ann in anns],
+                            dtype=np.float64).reshape(-1, 4),
+            areas=np.array([ann['area'] for ann in anns], dtype=np.float64),
+            iscrowd=np.array([ann.get('iscrowd', 0) for ann in anns],
+                             dtype=np.uint8),
+            ignore=np.array([ann.get('ignore', False) for ann in anns],
+                            dtype=bool),
+            seg_types=seg_types,
+            ann_poly_offsets=_offsets(ann_num_polys),
+            poly_offsets=_offsets(poly_lens),
+            poly_coords=np.array(poly_coords, dtype=np.float64),
+            seg_blob_offsets=_offsets([len(blob) for blob in seg_blobs]),
+            seg_blob=np.frombuffer(b''.join(seg_blobs), dtype=np.uint8))
+
+        cache_root = osp.dirname(osp.abspath(cache_dir))
+        os.makedirs(cache_root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=cache_root)
+        try:
+            for name, array in arrays.items():
+                np.save(osp.join(tmp_dir, f'{name}.npy'), array)
+            with open(osp.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump(
+                    dict(
+                        version=cls.VERSION,
+                        categories=coco.dataset['categories']), f)
+            os.rename(tmp_dir, cache_dir)
+        except OSError:
+            # the cache has been built by another process
+            if not osp.exists(osp.join(cache_dir, 'meta.json')):
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def get_cat_ids(self, cat_names: List[str] = []) -> List[int]:
+        """Get the ids of categories in ``cat_names``, the same as
+        ``COCO.get_cat_ids(cat_names=cat_names)``."""
+        if len(cat_names) == 0:
+            return [cat['id'] for cat in self.categories]
+        return [
+            cat['id'] for cat in self.categories if cat['name'] in cat_names
+        ]
+
+    def get_cat_img_map(self) -> Dict[int, List[int]]:
+        """Get the ids of images which contain each category, like
+        ``COCO.cat_img_map``."""
+        ann_img_ids = np.repeat(self.img_ids, np.diff(self.ann_offsets))
+        cat_ids, inds = np.unique(self.cat_ids, return_inverse=True)
+        order = np.argsort(inds, kind='stable')
+        splits = np.cumsum(np.bincount(inds, minlength=len(cat_ids)))[:-1]
+        cat_img_map = defaultdict(list)
+        for cat_id, ids in zip(cat_ids.tolist(),
+                               np.split(ann_img_ids[order], splits)):
+            cat_img_map[cat_id] = ids.tolist()
+        return cat_img_map
+
+    def load_img_info(self, idx: int) -> dict:
+        """Rebuild the raw image info of the ``idx``-th image."""
+        start, end = self.file_name_offsets[idx:idx + 2]
+        height, width = self.img_sizes[idx].tolist()
+        return dict(
+            id=int(self.img_ids[idx]),
+            file_name=self.file_names[start:end].tobytes().decode(),
+            height=height,
+            width=width)
+
+    def load_ann_info(self, idx: int) -> List[dict]:
+        """Rebuild the raw annotations of the ``idx``-th image."""
+        start, end = self.ann_offsets[idx:idx + 2].tolist()
+        img_id = int(self.img_ids[idx])
+        anns = []
+        for i, ann_id, cat_id, bbox, area, iscrowd, ignore in zip(
+                range(start, end), self.ann_ids[start:end].tolist(),
+                self.cat_ids[start:end].tolist(),
+                self.bboxes[start:end].tolist(),
+                self.areas[start:end].tolist(),
+                self.iscrowd[start:end].tolist(),
+                self.ignore[start:end].tolist()):
+            ann = dict(
+                id=ann_id,
+                image_id=img_id,
+                category_id=cat_id,
+                bbox=bbox,
+                area=area,
+                iscrowd=iscrowd,
+                ignore=ignore)
+            seg_type = self.seg_types[i]
+            if seg_type == self.SEG_POLYGON:
+                poly_start, poly_end = self.ann_poly_offsets[i:i + 2]
+                offsets = self.poly_offsets[poly_start:poly_end + 1]
+                coords = self.poly_coords[offsets[0]:offsets[-1]].tolist()
+                offsets = (offsets - offsets[0]).tolist()
+                ann['segmentation'] = [
+                    coords[offsets[j]:offsets[j + 1]]
+                    for j in range(len(offsets) - 1)
+                ]
+            elif seg_type == self.SEG_PICKLE:
+                blob_start, blob_end = self.seg_blob_offsets[i:i + 2]
+                ann['segmentation'] = pickle.loads(
+                    self.seg_blob[blob_start:blob_end].tobytes())
+            anns.append(ann)
+        return anns
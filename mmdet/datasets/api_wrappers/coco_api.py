@@ -15,6 +15,10 @@ class COCO(_COCO):
 
     It implements some snake case function aliases. So that the COCO class has
     the same interface as LVIS class.
+
+    Args:
+        annotation_file (str | dict, optional): Path of annotation file, or
+            the annotations already loaded in memory. Defaults to None.
     """
 
     def __init__(self, annotation_file=None):
@@ -22,7 +26,12 @@ class COCO(_COCO):
             warnings.warn(
                 'mmpycocotools is deprecated. Please install official pycocotools by "pip install pycocotools"',  # noqa: E501
                 UserWarning)
-        super().__init__(annotation_file=annotation_file)
+        if isinstance(annotation_file, dict):
+            super().__init__()
+            self.dataset = annotation_file
+            self.createIndex()
+        else:
+            super().__init__(annotation_file=annotation_file)
         self.img_ann_map = self.imgToAnns
         self.cat_img_map = self.catToImgs
 
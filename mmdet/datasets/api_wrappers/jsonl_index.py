@@ -0,0 +1,157 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import json
+import os
+import os.path as osp
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+
+class JsonlIndex:
+    """Random access to the records of a jsonl file by their byte offsets.
+
+    Only the start and end offsets of the non-blank lines are kept in memory
+    (16 bytes per record), and a record is read with ``os.pread`` and parsed
+    when it is accessed, so that files with far more records than the RAM can
+    hold parsed are usable. The file is opened lazily in each process, which
+    makes the index safe to share with forked or spawned dataloader workers.
+
+    Args:
+        filename (str): Path of the jsonl file, which must stay on the local
+            file system while the index is used.
+        spans (np.ndarray): The start and end offsets of each record, in
+            shape (N, 2).
+    """
+
+    # bytes read from each end of the file to compute its key
+    HASH_BYTES = 1 << 24
+    # bytes read each time to find line breaks
+    CHUNK_BYTES = 1 << 26
+    # lookup table of the bytes which are not ascii whitespaces, the lines
+    # without them are skipped like the ones that `str.strip()` empties
+    TEXT_BYTES = np.array([not chr(i).isspace() for i in range(256)])
+
+    def __init__(self, filename: str, spans: np.ndarray) -> None:
+        self.filename = filename
+        self.spans = spans
+        self._fd = None
+        self._pid = None
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __getitem__(self, idx: int) -> dict:
+        return json.loads(self.read(idx))
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # file descriptors are not inherited by spawned workers
+        state['_fd'] = None
+        state['_pid'] = None
+        return state
+
+    def __del__(self) -> None:
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+
+    def read(self, idx: int) -> bytes:
+        """Read the raw bytes of the ``idx``-th record."""
+        if self._pid != os.getpid():
+            # do not share the file descriptor with the parent process
+            self._fd = os.open(self.filename, os.O_RDONLY)
+            self._pid = os.getpid()
+        start, end = self.spans[idx].tolist()
+        return os.pread(self._fd, end - start, start)
+
+    @classmethod
+    def file_key(cls, filename: str) -> str:
+        """Compute the key of a file from its size and both ends.
+
+        Hashing the whole file would take minutes for tens of GBs of jsonl.
+        """
+        md5 = hashlib.md5()
+        size = osp.getsize(filename)
+        md5.update(str(size).encode())
+        with open(filename, 'rb') as f:
+            md5.update(f.read(cls.HASH_BYTES))
+            f.seek(max(size - cls.HASH_BYTES, 0))
+            md5.update(f.read(cls.HASH_BYTES))
+        return md5.hexdigest()
+
+    @classmethod
+    def build(cls, filename: str) -> 'JsonlIndex':
+        """Scan the line breaks of a jsonl file to build its index.
+
+        Args:
+            filename (str): Path of the jsonl file.
+
+        Returns:
+            :obj:`JsonlIndex`: The built index.
+        """
+        breaks = []
+        # whether each line has any text byte
+        has_text = []
+        # whether the line crossing the chunks has any text byte so far
+        carry = False
+        offset = 0
+        with open(filename, 'rb') as f:
+            while True:
+                chunk = f.read(cls.CHUNK_BYTES)
+                if not chunk:
+                    break
+                chunk = np.frombuffer(chunk, dtype=np.uint8)
+                is_text = cls.TEXT_BYTES[chunk]
+                chunk_breaks = np.flatnonzero(chunk == ord('\n'))
+                if len(chunk_breaks) > 0:
+                    # reduce the lines ending in this chunk
+                    line_starts = np.concatenate([[0], chunk_breaks[:-1] + 1])
+                    line_has_text = np.logical_or.reduceat(
+                        is_text[:chunk_breaks[-1] + 1], line_starts)
+                    line_has_text[0] |= carry
+                    has_text.append(line_has_text)
+                    carry = False
+                    is_text = is_text[chunk_breaks[-1] + 1:]
+                carry |= bool(is_text.any())
+                breaks.append(chunk_breaks + offset)
+                offset += len(chunk)
+        breaks = np.concatenate(breaks + [np.zeros(0, dtype=np.int64)])
+        starts = np.concatenate([[0], breaks + 1])
+        # the last line may not end with a line break
+        ends = np.concatenate([breaks, [offset]])
+        # skip blank lines
+        valid = np.concatenate(has_text + [[carry]]).astype(bool)
+        spans = np.stack([starts[valid], ends[valid]], axis=1)
+        return cls(filename, spans.astype(np.int64))
+
+    @classmethod
+    def load_or_build(cls,
+                      filename: str,
+                      cache_dir: Optional[str] = None) -> 'JsonlIndex':
+        """Load the index of a jsonl file from ``cache_dir``, or build it and
+        save it to ``cache_dir``.
+
+        Args:
+            filename (str): Path of the jsonl file.
+            cache_dir (str, optional): The directory to save indexes. The
+                index is not saved if it is None. Defaults to None.
+
+        Returns:
+            :obj:`JsonlIndex`: The loaded index.
+        """
+        if cache_dir is None:
+            return cls.build(filename)
+        prefix = osp.splitext(osp.basename(filename))[0]
+        index_file = osp.join(cache_dir,
+                              f'{prefix}.{cls.file_key(filename)}.index.npy')
+        if osp.exists(index_file):
+            return cls(filename, np.load(index_file))
+        index = cls.build(filename)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir)
+        tmp_file = osp.join(tmp_dir, 'index.npy')
+        np.save(tmp_file, index.spans)
+        os.replace(tmp_file, index_file)
+        os.rmdir(tmp_dir)
+        return index
@@ -1,9 +1,17 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os
 import os.path as osp
+import pickle
+import tempfile
+import uuid
 from typing import List, Optional
 
+import numpy as np
 from mmengine.dataset import BaseDataset
+from mmengine.dist import (barrier, broadcast_object_list, get_local_rank,
+                           get_world_size)
 from mmengine.fileio import load
+from mmengine.logging import print_log
 from mmengine.utils import is_abs
 
 from ..registry import DATASETS
@@ -23,6 +31,13 @@ class BaseDetDataset(BaseDataset):
             for open vocabulary-based algorithms. Defaults to False.
         caption_prompt (dict, optional): Prompt for captioning.
             Defaults to None.
+        shared_memory (bool): Whether to share the serialized data list
+            among the ranks of a node in distributed training. If True, only
+            the local rank 0 of each node loads and serializes the
+            annotations, and writes them to node-local shared memory, which
+            all the local ranks and their dataloader workers map instead of
+            holding their own copies. All the ranks must build the dataset
+            together. Defaults to False.
     """
 
     def __init__(self,
@@ -33,12 +48,14 @@ class BaseDetDataset(BaseDataset):
                  backend_args: dict = None,
                  return_classes: bool = False,
                  caption_prompt: Optional[dict] = None,
+                 shared_memory: bool = False,
                  **kwargs) -> None:
         self.seg_map_suffix = seg_map_suffix
         self.proposal_file = proposal_file
         self.backend_args = backend_args
         self.return_classes = return_classes
         self.caption_prompt = caption_prompt
+        self.shared_memory = shared_memory
         if self.caption_prompt is not None:
             assert self.return_classes, \
                 'return_classes must be True when using caption_prompt'
@@ -69,9 +86,16 @@ class BaseDetDataset(BaseDataset):
             - slice_data: Slice dataset according to ``self._indices``
             - serialize_data: Serialize ``self.data_list`` if
             ``self.serialize_data`` is True.
+
+        If ``self.shared_memory`` is True in distributed training, the above
+        steps are only run by the local rank 0 of each node, see
+        :meth:`_shared_full_init`.
         """
         if self._fully_initialized:
             return
+        if self.shared_memory and get_world_size() > 1:
+            self._shared_full_init()
+            return
         # load data information
         self.data_list = self.load_data_list()
         # get proposals from file
@@ -90,6 +114,74 @@ class BaseDetDataset(BaseDataset):
 
         self._fully_initialized = True
 
+    def _shared_full_init(self) -> None:
+        """Initialize annotations once per node and share them with the
+        other local ranks.
+
+        The local rank 0 runs :meth:`full_init`, then saves the serialized
+        data list to node-local shared memory (``/dev/shm`` if available)
+        and pickles the other attributes set during initialization (e.g.
+        ``cat_ids``). The other local ranks load the attributes and map the
+        serialized data list. The files are unlinked once all the local
+        ranks have mapped them, and the memory is released when the last
+        process exits.
+        """
+        try:
+            local_rank = get_local_rank()
+        except RuntimeError:
+            # the local process group is not created by the launcher
+            local_rank = os.environ.get('LOCAL_RANK')
+        if local_rank is None:
+            print_log(
+                'The local rank is unknown, `shared_memory` is ignored.',
+                logger='current')
+            self.shared_memory = False
+            self.full_init()
+            return
+        local_rank = int(local_rank)
+
+        name = [uuid.uuid4().hex]
+        broadcast_object_list(name)
+        shm_dir = '/dev/shm' if osp.isdir('/dev/shm') else \
+            tempfile.gettempdir()
+        prefix = osp.join(shm_dir, f'mmdet_data_list_{name[0]}')
+        data_keys = ('data_list', 'data_bytes', 'data_address')
+
+        if local_rank == 0:
+            attrs = dict(self.__dict__)
+            self.shared_memory = False
+            self.full_init()
+            self.shared_memory = True
+            # attributes set or replaced during initialization
+            state = {
+                key: value
+                for key, value in self.__dict__.items()
+                if key not in data_keys and (
+                    key not in attrs or attrs[key] is not value)
+            }
+            if self.serialize_data:
+                np.save(f'{prefix}.bytes.npy', self.data_bytes)
+                np.save(f'{prefix}.address.npy', self.data_address)
+            else:
+                state['data_list'] = self.data_list
+            with open(f'{prefix}.pkl', 'wb') as f:
+                pickle.dump(state, f, protocol=4)
+        barrier()
+
+        if local_rank != 0:
+            with open(f'{prefix}.pkl', 'rb') as f:
+                self.__dict__.update(pickle.load(f))
+        if self.serialize_data:
+            # local rank 0 also drops its private copy
+            self.data_bytes = np.load(f'{prefix}.bytes.npy', mmap_mode='r')
+            self.data_address = np.load(f'{prefix}.address.npy')
+        barrier()
+
+        if local_rank == 0:
+            for suffix in ('bytes.npy', 'address.npy', 'pkl'):
+                if osp.exists(f'{prefix}.{suffix}'):
+                    os.remove(f'{prefix}.{suffix}')
+
     def load_proposals(self) -> None:
         """Load proposals from proposals file.
 
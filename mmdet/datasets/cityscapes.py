@@ -18,6 +18,8 @@ class CityscapesDataset(CocoDataset):
         'palette': [(220, 20, 60), (255, 0, 0), (0, 0, 142), (0, 0, 70),
                     (0, 60, 100), (0, 80, 100), (0, 0, 230), (119, 11, 32)]
     }
+    # the annotations are filtered by the parsed data information
+    ANN_CACHE_SUPPORTED = False
 
     def filter_data(self) -> List[dict]:
         """Filter annotations according to filter_cfg.
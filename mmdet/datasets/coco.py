@@ -1,18 +1,34 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import copy
 import os.path as osp
-from typing import List, Union
+from typing import List, Optional, Union
 
+import numpy as np
+from mmengine.dataset import force_full_init
 from mmengine.fileio import get_local_path
 
 from mmdet.registry import DATASETS
-from .api_wrappers import COCO
+from .api_wrappers import COCO, COCOAnnCache
 from .base_det_dataset import BaseDetDataset
 
 
 @DATASETS.register_module()
 class CocoDataset(BaseDetDataset):
-    """Dataset for COCO."""
+    """Dataset for COCO.
+
+    Args:
+        ann_cache_dir (str, optional): The directory to save the columnar
+            annotation cache (see :class:`COCOAnnCache`). If given, the
+            annotation file is parsed once and cached under its md5, then
+            ``data_list`` only holds the indices of images in the
+            memory-mapped cache, which is shared by all the dataloader
+            workers, and the data information of an image is parsed lazily
+            in :meth:`get_data_info`. Data serialization is disabled in
+            this mode since the cache is already shared, and proposal files
+            are not supported. Subclasses which parse the annotations in
+            their own way set ``ANN_CACHE_SUPPORTED`` to False and raise an
+            error if it is given. Defaults to None.
+    """
 
     METAINFO = {
         'classes':
@@ -55,6 +71,18 @@ class CocoDataset(BaseDetDataset):
     COCOAPI = COCO
     # ann_id is unique in coco dataset.
     ANN_ID_UNIQUE = True
+    # whether the annotation cache (``ann_cache_dir``) is supported
+    ANN_CACHE_SUPPORTED = True
+
+    def __init__(self,
+                 *args,
+                 ann_cache_dir: Optional[str] = None,
+                 **kwargs) -> None:
+        assert ann_cache_dir is None or self.ANN_CACHE_SUPPORTED, \
+            f'ann_cache_dir is not supported by {self.__class__.__name__}'
+        self.ann_cache_dir = ann_cache_dir
+        self.ann_cache = None
+        super().__init__(*args, **kwargs)
 
     def load_data_list(self) -> List[dict]:
         """Load annotations from an annotation file named as ``self.ann_file``
@@ -62,6 +90,8 @@ class CocoDataset(BaseDetDataset):
         Returns:
             List[dict]: A list of annotation.
         """  # noqa: E501
+        if self.ann_cache_dir is not None:
+            return self._load_cached_data_list()
         with get_local_path(
                 self.ann_file, backend_args=self.backend_args) as local_path:
             self.coco = self.COCOAPI(local_path)
@@ -99,6 +129,78 @@ class CocoDataset(BaseDetDataset):
 
         return data_list
 
+    def _load_cached_data_list(self) -> np.ndarray:
+        """Load annotations from the columnar cache of ``self.ann_file``.
+
+        Returns:
+            np.ndarray: The indices of images in ``self.ann_cache``.
+        """
+        assert self.proposal_file is None, \
+            'proposal_file is not supported with the annotation cache'
+        self.ann_cache = self._load_ann_cache()
+        # The order of returned `cat_ids` will not
+        # change with the order of the `classes`
+        self.cat_ids = self.ann_cache.get_cat_ids(
+            cat_names=self.metainfo['classes'])
+        self.cat2label = {cat_id: i for i, cat_id in enumerate(self.cat_ids)}
+        self.cat_img_map = self.ann_cache.get_cat_img_map()
+        if self.ANN_ID_UNIQUE:
+            assert len(np.unique(self.ann_cache.ann_ids)) == len(
+                self.ann_cache.ann_ids
+            ), f"Annotation ids in '{self.ann_file}' are not unique!"
+        # the cache is shared by workers, there is no need to serialize
+        self.serialize_data = False
+        return np.arange(len(self.ann_cache))
+
+    def _load_ann_cache(self) -> COCOAnnCache:
+        """Load the annotation cache of ``self.ann_file``, which is built
+        first if it does not exist in ``self.ann_cache_dir``.
+
+        Returns:
+            :obj:`COCOAnnCache`: The loaded cache.
+        """
+        with get_local_path(
+                self.ann_file, backend_args=self.backend_args) as local_path:
+            return COCOAnnCache.load_or_build(
+                local_path, self.ann_cache_dir, coco_api=self.COCOAPI)
+
+    def _load_cached_img_info(self, cache_idx: int) -> dict:
+        """Load the raw image info of an image in ``self.ann_cache``.
+
+        Args:
+            cache_idx (int): The index of the image in the cache.
+
+        Returns:
+            dict: The raw image info, the same as the one parsed in
+            :meth:`load_data_list`.
+        """
+        raw_img_info = self.ann_cache.load_img_info(cache_idx)
+        raw_img_info['img_id'] = raw_img_info['id']
+        return raw_img_info
+
+    @force_full_init
+    def get_data_info(self, idx: int) -> dict:
+        """Get annotation by index. The data information is parsed from the
+        annotation cache if it is used.
+
+        Args:
+            idx (int): The index of data.
+
+        Returns:
+            dict: The idx-th annotation of the dataset.
+        """
+        if self.ann_cache is None:
+            return super().get_data_info(idx)
+        cache_idx = int(self.data_list[idx])
+        data_info = self.parse_data_info({
+            'raw_ann_info':
+            self.ann_cache.load_ann_info(cache_idx),
+            'raw_img_info':
+            self._load_cached_img_info(cache_idx)
+        })
+        data_info['sample_idx'] = idx if idx >= 0 else len(self) + idx
+        return data_info
+
     def parse_data_info(self, raw_data_info: dict) -> Union[dict, List[dict]]:
         """Parse raw annotation to target format.
 
@@ -178,6 +280,18 @@ class CocoDataset(BaseDetDataset):
         filter_empty_gt = self.filter_cfg.get('filter_empty_gt', False)
         min_size = self.filter_cfg.get('min_size', 0)
 
+        if self.ann_cache is not None:
+            # filter the image indices with the cached arrays
+            img_ids = self.ann_cache.img_ids[self.data_list]
+            img_sizes = self.ann_cache.img_sizes[self.data_list]
+            valid = img_sizes.min(axis=1) >= min_size
+            if filter_empty_gt:
+                ids_in_cat = set()
+                for class_id in self.cat_ids:
+                    ids_in_cat |= set(self.cat_img_map[class_id])
+                valid &= np.isin(img_ids, list(ids_in_cat))
+            return self.data_list[valid]
+
         # obtain images that contain annotation
         ids_with_ann = set(data_info['img_id'] for data_info in self.data_list)
         # obtain images that contain annotations of the required categories
@@ -156,6 +156,8 @@ class CocoPanopticDataset(CocoDataset):
     COCOAPI = COCOPanoptic
     # ann_id is not unique in coco panoptic dataset.
     ANN_ID_UNIQUE = False
+    # the segments info of panoptic annotations is not cached
+    ANN_CACHE_SUPPORTED = False
 
     def __init__(self,
                  ann_file: str = '',
@@ -269,6 +269,8 @@ class LVISV05Dataset(CocoDataset):
         'palette':
         None
     }
+    # the annotations are parsed by the lvis api
+    ANN_CACHE_SUPPORTED = False
 
     def load_data_list(self) -> List[dict]:
         """Load annotations from an annotation file named as ``self.ann_file``
@@ -3,10 +3,11 @@ import copy
 import os.path as osp
 from typing import List
 
+import numpy as np
 from mmengine.fileio import get_local_path
 
 from mmdet.registry import DATASETS
-from .api_wrappers import COCO
+from .api_wrappers import COCO, COCOAnnCache
 from .coco import CocoDataset
 
 # images exist in annotations but not in image folder.
@@ -104,6 +105,8 @@ class Objects365V1Dataset(CocoDataset):
         Returns:
             List[dict]: A list of annotation.
         """  # noqa: E501
+        if self.ann_cache_dir is not None:
+            return self._load_cached_data_list()
         with get_local_path(
                 self.ann_file, backend_args=self.backend_args) as local_path:
             self.coco = self.COCOAPI(local_path)
@@ -150,6 +153,14 @@ class Objects365V1Dataset(CocoDataset):
 
         return data_list
 
+    def _load_ann_cache(self) -> COCOAnnCache:
+        """Load the annotation cache of ``self.ann_file`` with the
+        categories sorted as in :meth:`load_data_list`."""
+        ann_cache = super()._load_ann_cache()
+        ann_cache.categories = sorted(
+            ann_cache.categories, key=lambda i: i['id'])
+        return ann_cache
+
 
 @DATASETS.register_module()
 class Objects365V2Dataset(CocoDataset):
@@ -237,6 +248,8 @@ class Objects365V2Dataset(CocoDataset):
         Returns:
             List[dict]: A list of annotation.
         """  # noqa: E501
+        if self.ann_cache_dir is not None:
+            return self._load_cached_data_list()
         with get_local_path(
                 self.ann_file, backend_args=self.backend_args) as local_path:
             self.coco = self.COCOAPI(local_path)
@@ -258,15 +271,11 @@ class Objects365V2Dataset(CocoDataset):
             raw_ann_info = self.coco.load_anns(ann_ids)
             total_ann_ids.extend(ann_ids)
 
-            # file_name should be `patchX/xxx.jpg`
-            file_name = osp.join(
-                osp.split(osp.split(raw_img_info['file_name'])[0])[-1],
-                osp.split(raw_img_info['file_name'])[-1])
-
-            if file_name in objv2_ignore_list:
+            raw_img_info['file_name'] = self._convert_file_name(
+                raw_img_info['file_name'])
+            if raw_img_info['file_name'] in objv2_ignore_list:
                 continue
 
-            raw_img_info['file_name'] = file_name
             parsed_data_info = self.parse_data_info({
                 'raw_ann_info':
                 raw_ann_info,
@@ -282,3 +291,32 @@ class Objects365V2Dataset(CocoDataset):
         del self.coco
 
         return data_list
+
+    @staticmethod
+    def _convert_file_name(file_name: str) -> str:
+        """Convert the file name of an image to `patchX/xxx.jpg`."""
+        return osp.join(
+            osp.split(osp.split(file_name)[0])[-1],
+            osp.split(file_name)[-1])
+
+    def _load_cached_data_list(self) -> np.ndarray:
+        """Load annotations from the columnar cache of ``self.ann_file``,
+        skipping the images in ``objv2_ignore_list``.
+
+        Returns:
+            np.ndarray: The indices of images in ``self.ann_cache``.
+        """
+        data_list = super()._load_cached_data_list()
+        valid = [
+            self._load_cached_img_info(i)['file_name'] not in
+            objv2_ignore_list for i in data_list
+        ]
+        return data_list[np.array(valid, dtype=bool)]
+
+    def _load_cached_img_info(self, cache_idx: int) -> dict:
+        """Load the raw image info of an image in ``self.ann_cache``, whose
+        file name is converted as in :meth:`load_data_list`."""
+        raw_img_info = super()._load_cached_img_info(cache_idx)
+        raw_img_info['file_name'] = self._convert_file_name(
+            raw_img_info['file_name'])
+        return raw_img_info
@@ -1,26 +1,180 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
 import json
+import os
 import os.path as osp
-from typing import List, Optional
+import pickle
+import tempfile
+from multiprocessing import Pool
+from typing import List, Optional, Tuple
 
+import numpy as np
+from mmengine.dataset import force_full_init
+from mmengine.dist import get_world_size
 from mmengine.fileio import get_local_path
 
 from mmdet.registry import DATASETS
+from .api_wrappers import JsonlIndex
 from .base_det_dataset import BaseDetDataset
 
 
+def parse_odvg_record(data: dict,
+                      img_prefix: str,
+                      dataset_mode: str,
+                      label_map: Optional[dict] = None) -> dict:
+    """Parse a record of the ODVG jsonl file to the data information.
+
+    Args:
+        data (dict): The json record of an image.
+        img_prefix (str): Prefix of the image path.
+        dataset_mode (str): 'OD' for object detection or 'VG' for visual
+            grounding.
+        label_map (dict, optional): The label map used as the text of
+            detection records. Defaults to None.
+
+    Returns:
+        dict: The parsed data information.
+    """
+    data_info = {}
+    img_path = osp.join(img_prefix, data['filename'])
+    data_info['img_path'] = img_path
+    data_info['height'] = data['height']
+    data_info['width'] = data['width']
+    if dataset_mode == 'OD':
+        if label_map is not None:
+            data_info['text'] = label_map
+        anno = data.get('detection', {})
+        instances = [obj for obj in anno.get('instances', [])]
+        bboxes = [obj['bbox'] for obj in instances]
+        bbox_labels = [str(obj['label']) for obj in instances]
+
+        instances = []
+        for bbox, label in zip(bboxes, bbox_labels):
+            instance = {}
+            x1, y1, x2, y2 = bbox
+            inter_w = max(0, min(x2, data['width']) - max(x1, 0))
+            inter_h = max(0, min(y2, data['height']) - max(y1, 0))
+            if inter_w * inter_h == 0:
+                continue
+            if (x2 - x1) < 1 or (y2 - y1) < 1:
+                continue
+            instance['ignore_flag'] = 0
+            instance['bbox'] = bbox
+            instance['bbox_label'] = int(label)
+            instances.append(instance)
+        data_info['instances'] = instances
+        data_info['dataset_mode'] = dataset_mode
+    else:
+        anno = data['grounding']
+        data_info['text'] = anno['caption']
+        regions = anno['regions']
+
+        instances = []
+        phrases = {}
+        for i, region in enumerate(regions):
+            bbox = region['bbox']
+            phrase = region['phrase']
+            tokens_positive = region['tokens_positive']
+            if not isinstance(bbox[0], list):
+                bbox = [bbox]
+            for box in bbox:
+                instance = {}
+                x1, y1, x2, y2 = box
+                inter_w = max(0, min(x2, data['width']) - max(x1, 0))
+                inter_h = max(0, min(y2, data['height']) - max(y1, 0))
+                if inter_w * inter_h == 0:
+                    continue
+                if (x2 - x1) < 1 or (y2 - y1) < 1:
+                    continue
+                instance['ignore_flag'] = 0
+                instance['bbox'] = box
+                instance['bbox_label'] = i
+                phrases[i] = {
+                    'phrase': phrase,
+                    'tokens_positive': tokens_positive
+                }
+                instances.append(instance)
+        data_info['instances'] = instances
+        data_info['phrases'] = phrases
+        data_info['dataset_mode'] = dataset_mode
+    return data_info
+
+
+def _parse_odvg_shard(args: tuple) -> Tuple[bytes, np.ndarray]:
+    """Parse the lines starting in the byte range ``[start, end)`` of an ODVG
+    jsonl file, and serialize each data information with pickle.
+
+    Returns:
+        tuple[bytes, np.ndarray]: The concatenated serialized data
+        information and the length of each of them.
+    """
+    filename, start, end, parse_args = args
+    buffers = []
+    with open(filename, 'rb') as f:
+        if start > 0:
+            # the line crossing `start` belongs to the previous shard
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            data_info = parse_odvg_record(json.loads(line), *parse_args)
+            buffers.append(pickle.dumps(data_info, protocol=4))
+    lengths = np.array([len(buffer) for buffer in buffers], dtype=np.int64)
+    return b''.join(buffers), lengths
+
+
 @DATASETS.register_module()
 class ODVGDataset(BaseDetDataset):
-    """object detection and visual grounding dataset."""
+    """object detection and visual grounding dataset.
+
+    Args:
+        data_root (str): The root directory for ``data_prefix`` and
+            ``ann_file``. Defaults to ''.
+        label_map_file (str, optional): The label map file of the object
+            detection dataset. If None, the dataset is a visual grounding
+            dataset. Defaults to None.
+        need_text (bool): Whether to use the label map as the text of
+            object detection records. Defaults to True.
+        num_parse_workers (int): The number of processes to parse the jsonl
+            file. The file is split into shards by byte ranges, each of which
+            is parsed and serialized by a process. Parse in the main process
+            if it is not larger than 1. Defaults to 0.
+        ann_cache_dir (str, optional): The directory to save the binary
+            sidecar of the parsed and serialized data list. If given, the
+            sidecar is written on the first run and memory-mapped on the
+            following runs, which skips parsing entirely. In ``lazy_load``
+            mode, the byte-offset index is saved here instead.
+            Defaults to None.
+        lazy_load (bool): Whether to only index the byte offsets of the
+            records at startup, and read and parse each record from the
+            annotation file in :meth:`get_data_info`. This keeps 16 bytes
+            per record in memory rather than the parsed data list, for
+            corpora whose data list does not fit in the RAM. The annotation
+            file must be on the local file system. Defaults to False.
+    """
+
+    # number of shards assigned to each parsing process
+    SHARDS_PER_WORKER = 4
 
     def __init__(self,
                  *args,
                  data_root: str = '',
                  label_map_file: Optional[str] = None,
                  need_text: bool = True,
+                 num_parse_workers: int = 0,
+                 ann_cache_dir: Optional[str] = None,
+                 lazy_load: bool = False,
                  **kwargs) -> None:
         self.dataset_mode = 'VG'
         self.need_text = need_text
+        self.num_parse_workers = num_parse_workers
+        self.ann_cache_dir = ann_cache_dir
+        self.lazy_load = lazy_load
+        self.jsonl_index = None
         if label_map_file:
             label_map_file = osp.join(data_root, label_map_file)
             with open(label_map_file, 'r') as file:
@@ -29,78 +183,158 @@ class ODVGDataset(BaseDetDataset):
         super().__init__(*args, data_root=data_root, **kwargs)
         assert self.return_classes is True
 
+    def full_init(self) -> None:
+        """Load annotation file and set ``BaseDataset._fully_initialized`` to
+        True.
+
+        When ``self.serialize_data`` is True, the serialized data list is
+        produced by the parsing processes or loaded from the sidecar
+        directly, without building the data list in the main process.
+        """
+        if self._fully_initialized:
+            return
+        if self.lazy_load or not self.serialize_data or (self.shared_memory and
+                                                         get_world_size() > 1):
+            super().full_init()
+            return
+        self.data_bytes, self.data_address = self._load_serialized_data()
+        # Get subset data according to indices.
+        if self._indices is not None:
+            self.data_bytes, self.data_address = \
+                self._get_serialized_subset(self._indices)
+        self._fully_initialized = True
+
     def load_data_list(self) -> List[dict]:
+        if self.lazy_load:
+            return self._load_jsonl_index()
+
+        if self.num_parse_workers <= 1 and self.ann_cache_dir is None:
+            parse_args = self._parse_args()
+            with get_local_path(
+                    self.ann_file,
+                    backend_args=self.backend_args) as local_path:
+                with open(local_path, 'r') as f:
+                    return [
+                        parse_odvg_record(json.loads(line), *parse_args)
+                        for line in f if line.strip()
+                    ]
+
+        data_bytes, data_address = self._load_serialized_data()
+        data_list = []
+        for start, end in zip(
+                np.concatenate([[0], data_address[:-1]]).tolist(),
+                data_address.tolist()):
+            data_list.append(pickle.loads(memoryview(data_bytes[start:end])))
+        return data_list
+
+    def _load_jsonl_index(self) -> np.ndarray:
+        """Load the byte-offset index of the annotation file for
+        ``lazy_load`` mode.
+
+        Returns:
+            np.ndarray: The index of each record in :attr:`jsonl_index`,
+            used as the data list.
+        """
+        assert osp.isfile(self.ann_file), \
+            'lazy_load only supports annotation files on the local file ' \
+            f'system, but got {self.ann_file}'
+        self.jsonl_index = JsonlIndex.load_or_build(self.ann_file,
+                                                    self.ann_cache_dir)
+        # Records are read from the file on demand, there is nothing to
+        # serialize.
+        self.serialize_data = False
+        return np.arange(len(self.jsonl_index))
+
+    @force_full_init
+    def get_data_info(self, idx: int) -> dict:
+        """Get annotation by index, parsing the record from the annotation
+        file in ``lazy_load`` mode.
+
+        Args:
+            idx (int): The index of data.
+
+        Returns:
+            dict: The idx-th annotation of the dataset.
+        """
+        if self.jsonl_index is None:
+            return super().get_data_info(idx)
+        record_idx = int(self.data_list[idx])
+        data_info = parse_odvg_record(self.jsonl_index[record_idx],
+                                      *self._parse_args())
+        data_info['sample_idx'] = idx if idx >= 0 else len(self) + idx
+        return data_info
+
+    def _parse_args(self) -> tuple:
+        """Arguments of :func:`parse_odvg_record` besides the record."""
+        label_map = None
+        if self.dataset_mode == 'OD' and self.need_text:
+            label_map = self.label_map
+        return self.data_prefix['img'], self.dataset_mode, label_map
+
+    def _load_serialized_data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Parse the annotation file, or load its sidecar if exists.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Serialized data list and the end
+            address of each data information, in the same format as
+            ``BaseDataset._serialize_data``.
+        """
         with get_local_path(
                 self.ann_file, backend_args=self.backend_args) as local_path:
-            with open(local_path, 'r') as f:
-                data_list = [json.loads(line) for line in f]
-
-        out_data_list = []
-        for data in data_list:
-            data_info = {}
-            img_path = osp.join(self.data_prefix['img'], data['filename'])
-            data_info['img_path'] = img_path
-            data_info['height'] = data['height']
-            data_info['width'] = data['width']
-            if self.dataset_mode == 'OD':
-                if self.need_text:
-                    data_info['text'] = self.label_map
-                anno = data.get('detection', {})
-                instances = [obj for obj in anno.get('instances', [])]
-                bboxes = [obj['bbox'] for obj in instances]
-                bbox_labels = [str(obj['label']) for obj in instances]
-
-                instances = []
-                for bbox, label in zip(bboxes, bbox_labels):
-                    instance = {}
-                    x1, y1, x2, y2 = bbox
-                    inter_w = max(0, min(x2, data['width']) - max(x1, 0))
-                    inter_h = max(0, min(y2, data['height']) - max(y1, 0))
-                    if inter_w * inter_h == 0:
-                        continue
-                    if (x2 - x1) < 1 or (y2 - y1) < 1:
-                        continue
-                    instance['ignore_flag'] = 0
-                    instance['bbox'] = bbox
-                    instance['bbox_label'] = int(label)
-                    instances.append(instance)
-                data_info['instances'] = instances
-                data_info['dataset_mode'] = self.dataset_mode
-                out_data_list.append(data_info)
-            else:
-                anno = data['grounding']
-                data_info['text'] = anno['caption']
-                regions = anno['regions']
-
-                instances = []
-                phrases = {}
-                for i, region in enumerate(regions):
-                    bbox = region['bbox']
-                    phrase = region['phrase']
-                    tokens_positive = region['tokens_positive']
-                    if not isinstance(bbox[0], list):
-                        bbox = [bbox]
-                    for box in bbox:
-                        instance = {}
-                        x1, y1, x2, y2 = box
-                        inter_w = max(0, min(x2, data['width']) - max(x1, 0))
-                        inter_h = max(0, min(y2, data['height']) - max(y1, 0))
-                        if inter_w * inter_h == 0:
-                            continue
-                        if (x2 - x1) < 1 or (y2 - y1) < 1:
-                            continue
-                        instance['ignore_flag'] = 0
-                        instance['bbox'] = box
-                        instance['bbox_label'] = i
-                        phrases[i] = {
-                            'phrase': phrase,
-                            'tokens_positive': tokens_positive
-                        }
-                        instances.append(instance)
-                data_info['instances'] = instances
-                data_info['phrases'] = phrases
-                data_info['dataset_mode'] = self.dataset_mode
-                out_data_list.append(data_info)
-
-        del data_list
-        return out_data_list
+            if self.ann_cache_dir is None:
+                return self._parse_ann_file(local_path)
+
+            prefix = osp.splitext(osp.basename(local_path))[0]
+            sidecar = osp.join(self.ann_cache_dir,
+                               f'{prefix}.{self._sidecar_key(local_path)}')
+            if not osp.exists(f'{sidecar}.address.npy'):
+                data_bytes, data_address = self._parse_ann_file(local_path)
+                os.makedirs(self.ann_cache_dir, exist_ok=True)
+                tmp_dir = tempfile.mkdtemp(dir=self.ann_cache_dir)
+                for name, array in [('bytes', data_bytes),
+                                    ('address', data_address)]:
+                    tmp_file = osp.join(tmp_dir, f'{name}.npy')
+                    np.save(tmp_file, array)
+                    # the address is written last, as the flag of a
+                    # complete sidecar
+                    os.replace(tmp_file, f'{sidecar}.{name}.npy')
+                os.rmdir(tmp_dir)
+        return (np.load(f'{sidecar}.bytes.npy',
+                        mmap_mode='r'), np.load(f'{sidecar}.address.npy'))
+
+    def _sidecar_key(self, filename: str) -> str:
+        """Compute the key of the sidecar from the key of the annotation
+        file, and the arguments to parse it."""
+        md5 = hashlib.md5(JsonlIndex.file_key(filename).encode())
+        md5.update(pickle.dumps(self._parse_args(), protocol=4))
+        return md5.hexdigest()
+
+    def _parse_ann_file(self, filename: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Parse and serialize the jsonl annotation file shard by shard.
+
+        Args:
+            filename (str): Local path of the annotation file.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Serialized data list and the end
+            address of each data information.
+        """
+        size = osp.getsize(filename)
+        parse_args = self._parse_args()
+        if self.num_parse_workers > 1:
+            num_shards = self.num_parse_workers * self.SHARDS_PER_WORKER
+            bounds = np.linspace(0, size, num_shards + 1).astype(np.int64)
+            shards = [(filename, start, end, parse_args) for start, end in zip(
+                bounds[:-1].tolist(), bounds[1:].tolist())]
+            with Pool(self.num_parse_workers) as pool:
+                results = pool.map(_parse_odvg_shard, shards)
+        else:
+            results = [_parse_odvg_shard((filename, 0, size, parse_args))]
+
+        data_bytes = np.concatenate(
+            [np.frombuffer(buffer, dtype=np.uint8)
+             for buffer, _ in results] + [np.zeros(0, dtype=np.uint8)])
+        data_address = np.cumsum(
+            np.concatenate([lengths for _, lengths in results] +
+                           [np.zeros(0, dtype=np.int64)]))
+        return data_bytes, data_address
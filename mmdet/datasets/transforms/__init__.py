@@ -9,10 +9,12 @@ from .frame_sampling import BaseFrameSample, UniformRefFrameSample
 from .geometric import (GeomTransform, Rotate, ShearX, ShearY, TranslateX,
                         TranslateY)
 from .instaboost import InstaBoost
-from .loading import (FilterAnnotations, InferencerLoader, LoadAnnotations,
-                      LoadEmptyAnnotations, LoadImageFromNDArray,
-                      LoadMultiChannelImageFromFiles, LoadPanopticAnnotations,
-                      LoadProposals, LoadTrackAnnotations)
+from .loading import (CachedLoadImageFromFile, FilterAnnotations,
+                      InferencerLoader, LoadAnnotations, LoadEmptyAnnotations,
+                      LoadImageFromNDArray, LoadMultiChannelImageFromFiles,
+                      LoadPanopticAnnotations, LoadProposals,
+                      LoadTrackAnnotations)
+from .memory import LimitSampleMemory, sample_nbytes
 from .text_transformers import LoadTextAnnotations, RandomSamplingNegPos
 from .transformers_glip import GTBoxSubOne_GLIP, RandomFlip_GLIP
 from .transforms import (Albu, CachedMixUp, CachedMosaic, CopyPaste, CutOut,
@@ -41,5 +43,6 @@ __all__ = [
     'LoadTrackAnnotations', 'BaseFrameSample', 'UniformRefFrameSample',
     'PackTrackInputs', 'PackReIDInputs', 'FixScaleResize',
     'ResizeShortestEdge', 'GTBoxSubOne_GLIP', 'RandomFlip_GLIP',
-    'RandomSamplingNegPos', 'LoadTextAnnotations'
+    'RandomSamplingNegPos', 'LoadTextAnnotations', 'CachedLoadImageFromFile',
+    'LimitSampleMemory', 'sample_nbytes'
 ]
@@ -9,6 +9,8 @@ from mmengine.structures import InstanceData, PixelData
 from mmdet.registry import TRANSFORMS
 from mmdet.structures import DetDataSample, ReIDDataSample, TrackDataSample
 from mmdet.structures.bbox import BaseBoxes
+from mmdet.structures.mask import BitmapMasks
+from .memory import sample_nbytes
 
 
 @TRANSFORMS.register_module()
@@ -40,6 +42,16 @@ class PackDetInputs(BaseTransform):
             ``mmcv.DataContainer`` and collected in ``data[img_metas]``.
             Default: ``('img_id', 'img_path', 'ori_shape', 'img_shape',
             'scale_factor', 'flip', 'flip_direction')``
+        rasterize_masks (bool): Whether to convert the polygon or RLE
+            ``gt_masks`` to :obj:`BitmapMasks` when packing. Loading the
+            masks with ``LoadAnnotations(poly2mask=False)`` and setting this
+            to True keeps the masks symbolic through the geometric
+            transforms and rasterizes them only once, at the final padded
+            shape. Defaults to False.
+        record_nbytes (bool): Whether to record the bytes of the image,
+            the instance masks and the segmentation map of the sample before
+            packing, see :func:`sample_nbytes`, as ``nbytes`` in the meta
+            information. Defaults to False.
     """
     mapping_table = {
         'gt_bboxes': 'bboxes',
@@ -49,8 +61,12 @@ class PackDetInputs(BaseTransform):
 
     def __init__(self,
                  meta_keys=('img_id', 'img_path', 'ori_shape', 'img_shape',
-                            'scale_factor', 'flip', 'flip_direction')):
+                            'scale_factor', 'flip', 'flip_direction'),
+                 rasterize_masks: bool = False,
+                 record_nbytes: bool = False):
         self.meta_keys = meta_keys
+        self.rasterize_masks = rasterize_masks
+        self.record_nbytes = record_nbytes
 
     def transform(self, results: dict) -> dict:
         """Method to pack the input data.
@@ -65,6 +81,8 @@ class PackDetInputs(BaseTransform):
             - 'data_sample' (obj:`DetDataSample`): The annotation info of the
                 sample.
         """
+        if self.record_nbytes:
+            nbytes = sample_nbytes(results)
         packed_results = dict()
         if 'img' in results:
             img = results['img']
@@ -113,6 +131,12 @@ class PackDetInputs(BaseTransform):
                 else:
                     instance_data[self.mapping_table[key]] = to_tensor(
                         results[key])
+        if self.rasterize_masks:
+            # rasterize the masks after selecting the valid ones
+            for instances in (instance_data, ignore_instance_data):
+                if 'masks' in instances and not isinstance(
+                        instances.masks, BitmapMasks):
+                    instances.masks = instances.masks.to_bitmap()
         data_sample.gt_instances = instance_data
         data_sample.ignored_instances = ignore_instance_data
 
@@ -135,6 +159,8 @@ class PackDetInputs(BaseTransform):
         for key in self.meta_keys:
             if key in results:
                 img_meta[key] = results[key]
+        if self.record_nbytes:
+            img_meta['nbytes'] = nbytes
         data_sample.set_metainfo(img_meta)
         packed_results['data_samples'] = data_sample
 
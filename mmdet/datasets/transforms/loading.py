@@ -1,5 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import Optional, Tuple, Union
+import atexit
+import hashlib
+import os
+import os.path as osp
+import shutil
+import tempfile
+import warnings
+from contextlib import contextmanager
+from typing import List, Optional, Tuple, Union
 
 import mmcv
 import numpy as np
@@ -14,7 +22,12 @@ from mmengine.structures import BaseDataElement
 from mmdet.registry import TRANSFORMS
 from mmdet.structures.bbox import get_box_type
 from mmdet.structures.bbox.box_type import autocast_box_type
-from mmdet.structures.mask import BitmapMasks, PolygonMasks
+from mmdet.structures.mask import BitmapMasks, PolygonMasks, RLEMasks
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 @TRANSFORMS.register_module()
@@ -64,6 +77,207 @@ class LoadImageFromNDArray(LoadImageFromFile):
         return results
 
 
+def _remove_cache_dir(cache_dir: str, pid: int) -> None:
+    """Remove a temporary image cache in the process that created it."""
+    if os.getpid() == pid:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+@TRANSFORMS.register_module()
+class CachedLoadImageFromFile(LoadImageFromFile):
+    """Load an image from file and cache the decoded image.
+
+    A drop-in replacement of :obj:`LoadImageFromFile` for multi-epoch
+    training. The decoded images are saved as ``.npy`` files in
+    ``cache_dir`` and later loaded as copy-on-write memory maps, so that the
+    images are only read and decoded once, and all the dataloader workers
+    (and all the ranks, if ``cache_dir`` is shared) use the same cache. The
+    least recently used images are removed when the cache exceeds
+    ``max_bytes``.
+
+    Required Keys:
+
+    - img_path
+
+    Modified Keys:
+
+    - img
+    - img_shape
+    - ori_shape
+
+    Args:
+        cache_dir (str, optional): The directory of the cache. It can be on
+            a local disk, e.g. to keep the cache across runs, or in shared
+            memory. If None, a temporary directory in ``/dev/shm`` (if
+            available) is created, and removed when the process exits.
+            Defaults to None.
+        max_bytes (int): The maximum size in bytes of the cached images.
+            Defaults to 4 GB.
+        **kwargs: Other arguments of :obj:`LoadImageFromFile`, e.g.
+            ``to_float32``, ``color_type``, ``imdecode_backend`` and
+            ``backend_args``.
+    """
+
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_bytes: int = 4 * 1024**3,
+                 **kwargs) -> None:
+        super().__init__(**kwargs)
+        assert max_bytes > 0
+        if cache_dir is None:
+            shm_dir = '/dev/shm' if osp.isdir('/dev/shm') else None
+            cache_dir = tempfile.mkdtemp(
+                prefix='mmdet_img_cache_', dir=shm_dir)
+            atexit.register(_remove_cache_dir, cache_dir, os.getpid())
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._warned = False
+        with self._lock() as fd:
+            os.pwrite(fd, np.int64(self._cache_usage()).tobytes(), 0)
+
+    @contextmanager
+    def _lock(self):
+        """Lock the usage file of the cache against the other processes.
+
+        Yields:
+            int: The file descriptor of the usage file, which holds the
+            total size of the cached images.
+        """
+        fd = os.open(
+            osp.join(self.cache_dir, '.usage'), os.O_RDWR | os.O_CREAT)
+        try:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            yield fd
+        finally:
+            # closing the file also releases the lock
+            os.close(fd)
+
+    def _cache_files(self) -> List[os.DirEntry]:
+        return [
+            entry for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith('.npy')
+        ]
+
+    def _cache_usage(self) -> int:
+        usage = 0
+        for entry in self._cache_files():
+            try:
+                usage += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return usage
+
+    def _cache_path(self, filename: str) -> str:
+        key = repr((filename, self.color_type, self.imdecode_backend))
+        return osp.join(self.cache_dir,
+                        hashlib.sha1(key.encode()).hexdigest() + '.npy')
+
+    def _load_cached(self, path: str) -> Optional[np.ndarray]:
+        try:
+            img = np.load(path, mmap_mode='c')
+            # mark the image as recently used
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            # removed or being written by another process
+            return None
+        return img
+
+    def _save_cached(self, path: str, img: np.ndarray) -> None:
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            # save by a file object, as np.save appends '.npy' to the name
+            with open(tmp_path, 'wb') as f:
+                np.save(f, img)
+            nbytes = osp.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+            if not self._warned:
+                warnings.warn(f'Failed to cache the image to {path}: {e}')
+                self._warned = True
+            return
+
+        with self._lock() as fd:
+            usage = np.frombuffer(os.pread(fd, 8, 0), dtype=np.int64)
+            usage = int(usage[0]) + nbytes if len(usage) else nbytes
+            if usage > self.max_bytes:
+                usage = self._evict()
+            os.pwrite(fd, np.int64(usage).tobytes(), 0)
+
+    def _evict(self) -> int:
+        """Remove the least recently used images until the cache is at most
+        90% full.
+
+        Returns:
+            int: The total size of the remaining images.
+        """
+        entries = []
+        for entry in self._cache_files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        usage = sum(entry[1] for entry in entries)
+        for _, size, path in entries:
+            if usage <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            usage -= size
+        return usage
+
+    def transform(self, results: dict) -> Optional[dict]:
+        """Functions to load image from the cache, or from file on a cache
+        miss.
+
+        Args:
+            results (dict): Result dict from
+                :class:`mmengine.dataset.BaseDataset`.
+
+        Returns:
+            dict: The dict contains loaded image and meta information.
+        """
+        path = self._cache_path(results['img_path'])
+        img = self._load_cached(path)
+        if img is None:
+            # cache the decoded image rather than the converted one
+            to_float32, self.to_float32 = self.to_float32, False
+            try:
+                results = super().transform(results)
+            finally:
+                self.to_float32 = to_float32
+            if results is None:
+                return None
+            img = results['img']
+            self._save_cached(path, img)
+
+        if self.to_float32:
+            img = img.astype(np.float32)
+        results['img'] = img
+        results['img_shape'] = img.shape[:2]
+        results['ori_shape'] = img.shape[:2]
+        return results
+
+    def __repr__(self):
+        repr_str = (f'{self.__class__.__name__}('
+                    f"cache_dir='{self.cache_dir}', "
+                    f'max_bytes={self.max_bytes}, '
+                    f'ignore_empty={self.ignore_empty}, '
+                    f'to_float32={self.to_float32}, '
+                    f"color_type='{self.color_type}', "
+                    f"imdecode_backend='{self.imdecode_backend}', "
+                    f'backend_args={self.backend_args})')
+        return repr_str
+
+
 @TRANSFORMS.register_module()
 class LoadMultiChannelImageFromFiles(BaseTransform):
     """Load multi-channel images from a list of separate channel files.
@@ -200,7 +414,8 @@ class LoadAnnotations(MMCV_LoadAnnotations):
              # In int type.
             'gt_bboxes_labels': np.ndarray(N, )
              # In built-in class
-            'gt_masks': PolygonMasks (H, W) or BitmapMasks (H, W)
+            'gt_masks': PolygonMasks (H, W) or BitmapMasks (H, W) or
+                RLEMasks (H, W)
              # In uint8 type.
             'gt_seg_map': np.ndarray (H, W)
              # in (x, y, v) order, float type.
@@ -223,7 +438,7 @@ class LoadAnnotations(MMCV_LoadAnnotations):
 
     - gt_bboxes (BaseBoxes[torch.float32])
     - gt_bboxes_labels (np.int64)
-    - gt_masks (BitmapMasks | PolygonMasks)
+    - gt_masks (BitmapMasks | PolygonMasks | RLEMasks)
     - gt_seg_map (np.uint8)
     - gt_ignore_flags (bool)
 
@@ -237,6 +452,16 @@ class LoadAnnotations(MMCV_LoadAnnotations):
         with_seg (bool): Whether to parse and load the semantic segmentation
             annotation. Defaults to False.
         poly2mask (bool): Whether to convert mask to bitmap. Default: True.
+        rle_mask (bool): Whether to keep the converted bitmap masks in
+            run-length encoding as :obj:`RLEMasks` instead of decoding them
+            to :obj:`BitmapMasks`, which saves memory for images with many
+            instances. Only used when ``poly2mask`` is True.
+            Defaults to False.
+        batch_poly2mask (bool): Whether to convert the masks of all the
+            instances of an image at once when ``poly2mask`` is True, which
+            converts all the polygons to RLE by one call and decodes all the
+            masks into one buffer, rather than decoding each instance into
+            its own array. The results are the same. Defaults to False.
         box_type (str): The box type used to wrap the bboxes. If ``box_type``
             is None, gt_bboxes will keep being np.ndarray. Defaults to 'hbox'.
         reduce_zero_label (bool): Whether reduce all label value
@@ -260,10 +485,14 @@ class LoadAnnotations(MMCV_LoadAnnotations):
             # use for semseg
             reduce_zero_label: bool = False,
             ignore_index: int = 255,
+            rle_mask: bool = False,
+            batch_poly2mask: bool = False,
             **kwargs) -> None:
         super(LoadAnnotations, self).__init__(**kwargs)
         self.with_mask = with_mask
         self.poly2mask = poly2mask
+        self.rle_mask = rle_mask
+        self.batch_poly2mask = batch_poly2mask
         self.box_type = box_type
         self.reduce_zero_label = reduce_zero_label
         self.ignore_index = ignore_index
@@ -318,7 +547,21 @@ class LoadAnnotations(MMCV_LoadAnnotations):
         Returns:
             np.ndarray: The decode bitmap mask of shape (img_h, img_w).
         """
+        return maskUtils.decode(self._poly2rle(mask_ann, img_h, img_w))
+
+    def _poly2rle(self, mask_ann: Union[list, dict], img_h: int,
+                  img_w: int) -> dict:
+        """Private function to convert masks represented with polygon to
+        compressed RLE.
 
+        Args:
+            mask_ann (list | dict): Polygon mask annotation input.
+            img_h (int): The height of output mask.
+            img_w (int): The width of output mask.
+
+        Returns:
+            dict: The compressed RLE of the mask.
+        """
         if isinstance(mask_ann, list):
             # polygon -- a single object might consist of multiple parts
             # we merge all parts into one mask rle code
@@ -330,8 +573,61 @@ class LoadAnnotations(MMCV_LoadAnnotations):
         else:
             # rle
             rle = mask_ann
-        mask = maskUtils.decode(rle)
-        return mask
+        return rle
+
+    def _batch_poly2rle(self, mask_anns: List[Union[list, dict]], img_h: int,
+                        img_w: int) -> List[dict]:
+        """Private function to convert the masks of all the instances
+        represented with polygon to compressed RLE at once.
+
+        Args:
+            mask_anns (list[list | dict]): Polygon mask annotation of each
+                instance.
+            img_h (int): The height of output mask.
+            img_w (int): The width of output mask.
+
+        Returns:
+            list[dict]: The compressed RLE of each mask.
+        """
+        # convert the polygons of all the instances by one call
+        polygons = [
+            polygon for mask_ann in mask_anns if isinstance(mask_ann, list)
+            for polygon in mask_ann
+        ]
+        poly_rles = maskUtils.frPyObjects(polygons, img_h,
+                                          img_w) if polygons else []
+        rles = []
+        start = 0
+        for mask_ann in mask_anns:
+            if isinstance(mask_ann, list):
+                # merge all parts of an object into one mask rle code
+                end = start + len(mask_ann)
+                rles.append(maskUtils.merge(poly_rles[start:end]))
+                start = end
+            else:
+                rles.append(self._poly2rle(mask_ann, img_h, img_w))
+        return rles
+
+    def _batch_poly2mask(self, mask_anns: List[Union[list, dict]],
+                         img_h: int, img_w: int) -> np.ndarray:
+        """Private function to convert the masks of all the instances
+        represented with polygon to bitmaps at once.
+
+        Args:
+            mask_anns (list[list | dict]): Polygon mask annotation of each
+                instance.
+            img_h (int): The height of output mask.
+            img_w (int): The width of output mask.
+
+        Returns:
+            np.ndarray: The decode bitmap masks of shape (N, img_h, img_w).
+        """
+        if len(mask_anns) == 0:
+            return np.zeros((0, img_h, img_w), dtype=np.uint8)
+        rles = self._batch_poly2rle(mask_anns, img_h, img_w)
+        # decode all the masks into one (img_h, img_w, N) buffer, which is
+        # copied to be C-contiguous as the masks decoded one by one
+        return np.ascontiguousarray(maskUtils.decode(rles).transpose(2, 0, 1))
 
     def _process_masks(self, results: dict) -> list:
         """Process gt_masks and filter invalid polygons.
@@ -384,7 +680,17 @@ class LoadAnnotations(MMCV_LoadAnnotations):
         """
         h, w = results['ori_shape']
         gt_masks = self._process_masks(results)
-        if self.poly2mask:
+        if self.poly2mask and self.batch_poly2mask:
+            if self.rle_mask:
+                gt_masks = RLEMasks(
+                    self._batch_poly2rle(gt_masks, h, w), h, w)
+            else:
+                gt_masks = BitmapMasks(
+                    self._batch_poly2mask(gt_masks, h, w), h, w)
+        elif self.poly2mask and self.rle_mask:
+            gt_masks = RLEMasks(
+                [self._poly2rle(mask, h, w) for mask in gt_masks], h, w)
+        elif self.poly2mask:
             gt_masks = BitmapMasks(
                 [self._poly2mask(mask, h, w) for mask in gt_masks], h, w)
         else:
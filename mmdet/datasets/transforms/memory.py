@@ -0,0 +1,208 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+from collections import defaultdict
+from typing import Dict, List, Union
+
+import numpy as np
+from mmcv.transforms import BaseTransform
+from mmengine.logging import print_log
+
+from mmdet.registry import TRANSFORMS
+from mmdet.structures.mask import BaseInstanceMasks, BitmapMasks, RLEMasks
+from .transforms import Resize
+
+
+def sample_nbytes(results: dict) -> Dict[str, int]:
+    """Count the memory in bytes of the image, the instance masks and the
+    segmentation map of a sample.
+
+    Args:
+        results (dict): Result dict.
+
+    Returns:
+        dict[str, int]: The bytes of ``img``, ``masks`` (all the instance
+        masks, e.g. ``gt_masks``), ``seg_map`` and their ``total``.
+    """
+    nbytes = dict(img=0, masks=0, seg_map=0)
+    for key, value in results.items():
+        if isinstance(value, BaseInstanceMasks):
+            nbytes['masks'] += value.nbytes
+        elif key == 'img' and isinstance(value, np.ndarray):
+            nbytes['img'] += value.nbytes
+        elif key == 'gt_seg_map' and isinstance(value, np.ndarray):
+            nbytes['seg_map'] += value.nbytes
+    nbytes['total'] = sum(nbytes.values())
+    return nbytes
+
+
+@TRANSFORMS.register_module()
+class LimitSampleMemory(BaseTransform):
+    """Limit the memory taken by a sample.
+
+    Dense instance masks take ``N * H * W`` bytes, which may exhaust the
+    memory of the dataloader workers on images with hundreds of instances.
+    This transform counts the bytes of the image, the instance masks and the
+    segmentation map of each sample (see :func:`sample_nbytes`), and applies
+    the ``policies`` in order to the samples over ``max_bytes`` until they
+    fit into the budget:
+
+    - ``'compact'``: Convert the :obj:`BitmapMasks` to :obj:`RLEMasks`.
+    - ``'downsample'``: Resize the sample by the scale that fits it into the
+      budget, which is no less than ``min_scale_factor``. It is skipped for
+      the samples without an image.
+    - ``'drop'``: Drop the instances with the smallest areas, so that the
+      masks of the kept ones fit into the budget.
+
+    The transform also counts the samples over the budget, the applied
+    policies and the peak bytes in each worker, and logs them every
+    ``log_interval`` samples, which helps size the memory of the workers.
+
+    Required Keys:
+
+    - img (optional)
+    - gt_bboxes (BaseBoxes[torch.float32]) (optional)
+    - gt_bboxes_labels (np.int64) (optional)
+    - gt_masks (BitmapMasks | PolygonMasks | RLEMasks) (optional)
+    - gt_ignore_flags (bool) (optional)
+    - gt_seg_map (np.uint8) (optional)
+
+    Modified Keys:
+
+    - img (optional)
+    - img_shape (optional)
+    - scale_factor (optional)
+    - gt_bboxes (optional)
+    - gt_bboxes_labels (optional)
+    - gt_masks (optional)
+    - gt_ignore_flags (optional)
+    - gt_seg_map (optional)
+
+    Added Keys:
+
+    - nbytes (dict): The bytes of the sample by :func:`sample_nbytes`, after
+      applying the policies.
+
+    Args:
+        max_bytes (int): The memory budget in bytes of a sample.
+        policies (str | list[str]): The policies to apply in order to the
+            samples over the budget, see above. Defaults to 'compact'.
+        min_scale_factor (float): The minimum scale factor of the
+            ``'downsample'`` policy. Defaults to 0.5.
+        log_interval (int): The interval in samples to log the counters.
+            0 means no logging. Defaults to 1000.
+    """
+    instance_keys = ('gt_bboxes', 'gt_bboxes_labels', 'gt_masks',
+                     'gt_ignore_flags', 'gt_instances_ids')
+
+    def __init__(self,
+                 max_bytes: int,
+                 policies: Union[str, List[str]] = 'compact',
+                 min_scale_factor: float = 0.5,
+                 log_interval: int = 1000) -> None:
+        if isinstance(policies, str):
+            policies = [policies]
+        for policy in policies:
+            assert policy in ('compact', 'downsample', 'drop'), \
+                f'Unsupported policy {policy}'
+        assert max_bytes > 0 and 0 < min_scale_factor <= 1
+        self.max_bytes = max_bytes
+        self.policies = policies
+        self.min_scale_factor = min_scale_factor
+        self.log_interval = log_interval
+
+        self.num_samples = 0
+        self.num_exceeded = 0
+        self.num_applied = defaultdict(int)
+        self.max_sample_nbytes = 0
+
+    def _compact(self, results: dict) -> dict:
+        for key, value in results.items():
+            if isinstance(value, BitmapMasks):
+                results[key] = RLEMasks.from_ndarray(value.masks)
+        return results
+
+    def _downsample(self, results: dict, nbytes: Dict[str, int]) -> dict:
+        # the bytes of the bitmaps decrease with the square of the scale
+        scale_factor = max(
+            math.sqrt(self.max_bytes / nbytes['total']),
+            self.min_scale_factor)
+        ori_scale_factor = results.get('scale_factor')
+        results = Resize(scale_factor=scale_factor, keep_ratio=True)(results)
+        if ori_scale_factor is not None:
+            results['scale_factor'] = tuple(
+                s * ori_s for s, ori_s in zip(results['scale_factor'],
+                                              ori_scale_factor))
+        return results
+
+    def _drop(self, results: dict, nbytes: Dict[str, int]) -> dict:
+        gt_masks = results.get('gt_masks')
+        if gt_masks is None or gt_masks.nbytes == 0:
+            return results
+        # count the bytes before the areas, which may pack the RLE masks
+        masks_nbytes = gt_masks.nbytes
+        other_nbytes = nbytes['total'] - masks_nbytes
+        mask_budget = max(self.max_bytes - other_nbytes, 0)
+        order = np.argsort(-gt_masks.areas, kind='stable')
+        keep = np.ones(len(gt_masks), dtype=bool)
+        num_keep = len(gt_masks)
+        # the bytes of compressed masks are not proportional to their number,
+        # so estimate the number to keep until the kept masks fit
+        while num_keep > 0 and masks_nbytes > mask_budget:
+            num_keep = min(
+                int(num_keep * mask_budget / masks_nbytes), num_keep - 1)
+            keep[order[num_keep:]] = False
+            masks_nbytes = gt_masks[keep].nbytes
+        for key in self.instance_keys:
+            if key in results:
+                results[key] = results[key][keep]
+        return results
+
+    def transform(self, results: dict) -> dict:
+        """Transform function to limit the memory of the sample.
+
+        Args:
+            results (dict): Result dict.
+
+        Returns:
+            dict: Updated result dict.
+        """
+        nbytes = sample_nbytes(results)
+        self.num_samples += 1
+        self.max_sample_nbytes = max(self.max_sample_nbytes, nbytes['total'])
+        if nbytes['total'] > self.max_bytes:
+            self.num_exceeded += 1
+            for policy in self.policies:
+                if policy == 'downsample' and results.get('img') is None:
+                    # the scale of the resizing is relative to the image
+                    continue
+                if policy == 'compact':
+                    results = self._compact(results)
+                elif policy == 'downsample':
+                    results = self._downsample(results, nbytes)
+                else:
+                    results = self._drop(results, nbytes)
+                self.num_applied[policy] += 1
+                nbytes = sample_nbytes(results)
+                if nbytes['total'] <= self.max_bytes:
+                    break
+        results['nbytes'] = nbytes
+
+        if self.log_interval > 0 and \
+                self.num_samples % self.log_interval == 0:
+            applied = ', '.join(f'{policy}: {self.num_applied[policy]}'
+                                for policy in self.policies)
+            print_log(
+                f'{self.__class__.__name__}: {self.num_exceeded} of '
+                f'{self.num_samples} samples over {self.max_bytes} bytes, '
+                f'applied policies ({applied}), peak sample bytes '
+                f'{self.max_sample_nbytes}',
+                logger='current')
+        return results
+
+    def __repr__(self) -> str:
+        repr_str = self.__class__.__name__
+        repr_str += f'(max_bytes={self.max_bytes}, '
+        repr_str += f'policies={self.policies}, '
+        repr_str += f'min_scale_factor={self.min_scale_factor}, '
+        repr_str += f'log_interval={self.log_interval})'
+        return repr_str
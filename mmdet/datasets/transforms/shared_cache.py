@@ -0,0 +1,135 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmap
+import os
+import os.path as osp
+import pickle
+import tempfile
+import uuid
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+from numpy import random
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SharedResultsCache:
+    """A ring buffer of results in shared memory.
+
+    The results are pickled into ``num_slots`` slots of ``slot_size`` bytes
+    in a file in node-local shared memory (``/dev/shm`` if available). The
+    file is unlinked right after being mapped, so the buffer is shared by the
+    process that creates it and all the dataloader workers forked from it,
+    and the memory is released when the last of them exits. Slots are
+    guarded by POSIX record locks, so workers can read and write the buffer
+    concurrently.
+
+    The cache behaves like a read-only sequence of the cached results: its
+    length is the number of filled slots, and indexing it returns a new copy
+    of the result in that slot. Results are added with :meth:`append`, which
+    fills the empty slots first and then evicts one result per call.
+
+    Note:
+        The buffer cannot be pickled, so it requires the ``fork`` start
+        method for the dataloader workers, and it is not shared between the
+        ranks in distributed training.
+
+    Args:
+        num_slots (int): The maximum number of cached results.
+        slot_size (int): The maximum size in bytes of a pickled result.
+            Larger results are not cached. Defaults to 8 MB.
+        random_pop (bool): Whether to evict a random result when the cache
+            is full. If set to False, evict the oldest one. Defaults to True.
+    """
+
+    def __init__(self,
+                 num_slots: int,
+                 slot_size: int = 8 * 1024**2,
+                 random_pop: bool = True) -> None:
+        if fcntl is None:
+            raise RuntimeError(
+                'SharedResultsCache is only supported on POSIX systems.')
+        assert num_slots > 0 and slot_size > 0
+        self.num_slots = num_slots
+        self.slot_size = slot_size
+        self.random_pop = random_pop
+        self._warned = False
+
+        # the number of appended results followed by the slot lengths
+        self._header_size = 8 * (1 + num_slots)
+        shm_dir = '/dev/shm' if osp.isdir('/dev/shm') else \
+            tempfile.gettempdir()
+        path = osp.join(shm_dir, f'mmdet_results_cache_{uuid.uuid4().hex}')
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.ftruncate(self._fd, self._header_size + num_slots * slot_size)
+            self._buffer = mmap.mmap(self._fd, 0)
+        finally:
+            os.remove(path)
+        self._header = np.frombuffer(
+            self._buffer, dtype=np.int64, count=1 + num_slots)
+
+    def __reduce__(self):
+        raise TypeError(
+            'SharedResultsCache cannot be pickled, please use the `fork` '
+            'start method for the dataloader workers.')
+
+    @contextmanager
+    def _lock(self, start: int, length: int, exclusive: bool = True):
+        """Lock a byte range of the buffer against the other processes."""
+        fcntl.lockf(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH,
+                    length, start)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+    def _slot_offset(self, index: int) -> int:
+        return self._header_size + index * self.slot_size
+
+    def __len__(self) -> int:
+        return min(int(self._header[0]), self.num_slots)
+
+    def __getitem__(self, index: int) -> dict:
+        if not 0 <= index < len(self):
+            raise IndexError(f'Index {index} out of range of the cache with '
+                             f'{len(self)} results.')
+        offset = self._slot_offset(index)
+        with self._lock(offset, self.slot_size, exclusive=False):
+            length = int(self._header[1 + index])
+            data = self._buffer[offset:offset + length]
+        return pickle.loads(data)
+
+    def append(self, results: dict) -> None:
+        """Add a result to the cache, evicting one if the cache is full.
+
+        Args:
+            results (dict): Result dict.
+        """
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.slot_size:
+            if not self._warned:
+                warnings.warn(
+                    f'A result of {len(data)} bytes exceeds the slot size '
+                    f'{self.slot_size} of the shared cache and is not '
+                    'cached, please increase the slot size.')
+                self._warned = True
+            return
+
+        with self._lock(0, 8):
+            count = int(self._header[0])
+            if count < self.num_slots:
+                index = count
+            elif self.random_pop:
+                index = random.randint(0, self.num_slots)
+            else:
+                index = count % self.num_slots
+            offset = self._slot_offset(index)
+            with self._lock(offset, self.slot_size):
+                self._buffer[offset:offset + len(data)] = data
+                self._header[1 + index] = len(data)
+            self._header[0] = count + 1
@@ -24,6 +24,8 @@ from mmdet.structures.bbox import HorizontalBoxes, autocast_box_type
 from mmdet.structures.mask import BitmapMasks, PolygonMasks
 from mmdet.utils import log_img_scale
 
+from .shared_cache import SharedResultsCache
+
 try:
     from imagecorruptions import corrupt
 except ImportError:
@@ -3304,6 +3306,9 @@ class RandomErasing(BaseTransform):
 
     def _transform_masks(self, results: dict, patches: List[list]) -> None:
         """Random erasing the masks."""
+        if not isinstance(results['gt_masks'], BitmapMasks):
+            # erasing cannot be applied to polygons or RLE in place
+            results['gt_masks'] = results['gt_masks'].to_bitmap()
         for patch in patches:
             px1, py1, px2, py2 = patch
             results['gt_masks'].masks[:, py1:py2,
@@ -3409,19 +3414,34 @@ class CachedMosaic(Mosaic):
         random_pop (bool): Whether to randomly pop a result from the cache
             when the cache is full. If set to False, use FIFO popping method.
             Defaults to True.
+        shared_cache (bool): Whether to keep the cache in shared memory, so
+            that all the dataloader workers of a rank add to and sample from
+            one cache instead of each keeping its own. It requires the
+            ``fork`` start method. See :class:`SharedResultsCache`.
+            Defaults to False.
+        cache_slot_size (int): The maximum size in bytes of a pickled result
+            in the shared cache. Larger results are not cached. Only used
+            when ``shared_cache`` is True. Defaults to 8 MB.
     """
 
     def __init__(self,
                  *args,
                  max_cached_images: int = 40,
                  random_pop: bool = True,
+                 shared_cache: bool = False,
+                 cache_slot_size: int = 8 * 1024**2,
                  **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self.results_cache = []
         self.random_pop = random_pop
         assert max_cached_images >= 4, 'The length of cache must >= 4, ' \
                                        f'but got {max_cached_images}.'
         self.max_cached_images = max_cached_images
+        self.shared_cache = shared_cache
+        if shared_cache:
+            self.results_cache = SharedResultsCache(
+                max_cached_images, cache_slot_size, random_pop=random_pop)
+        else:
+            self.results_cache = []
 
     @cache_randomness
     def get_indexes(self, cache: list) -> list:
@@ -3448,13 +3468,17 @@ class CachedMosaic(Mosaic):
             dict: Updated result dict.
         """
         # cache and pop images
-        self.results_cache.append(copy.deepcopy(results))
-        if len(self.results_cache) > self.max_cached_images:
-            if self.random_pop:
-                index = random.randint(0, len(self.results_cache) - 1)
-            else:
-                index = 0
-            self.results_cache.pop(index)
+        if self.shared_cache:
+            # the shared cache pickles the results and pops by itself
+            self.results_cache.append(results)
+        else:
+            self.results_cache.append(copy.deepcopy(results))
+            if len(self.results_cache) > self.max_cached_images:
+                if self.random_pop:
+                    index = random.randint(0, len(self.results_cache) - 1)
+                else:
+                    index = 0
+                self.results_cache.pop(index)
 
         if len(self.results_cache) <= 4:
             return results
@@ -3571,7 +3595,8 @@ class CachedMosaic(Mosaic):
         repr_str += f'pad_val={self.pad_val}, '
         repr_str += f'prob={self.prob}, '
         repr_str += f'max_cached_images={self.max_cached_images}, '
-        repr_str += f'random_pop={self.random_pop})'
+        repr_str += f'random_pop={self.random_pop}, '
+        repr_str += f'shared_cache={self.shared_cache})'
         return repr_str
 
 
@@ -3643,6 +3668,14 @@ class CachedMixUp(BaseTransform):
         random_pop (bool): Whether to randomly pop a result from the cache
             when the cache is full. If set to False, use FIFO popping method.
             Defaults to True.
+        shared_cache (bool): Whether to keep the cache in shared memory, so
+            that all the dataloader workers of a rank add to and sample from
+            one cache instead of each keeping its own. It requires the
+            ``fork`` start method. See :class:`SharedResultsCache`.
+            Defaults to False.
+        cache_slot_size (int): The maximum size in bytes of a pickled result
+            in the shared cache. Larger results are not cached. Only used
+            when ``shared_cache`` is True. Defaults to 8 MB.
         prob (float): Probability of applying this transformation.
             Defaults to 1.0.
     """
@@ -3656,7 +3689,9 @@ class CachedMixUp(BaseTransform):
                  bbox_clip_border: bool = True,
                  max_cached_images: int = 20,
                  random_pop: bool = True,
-                 prob: float = 1.0) -> None:
+                 prob: float = 1.0,
+                 shared_cache: bool = False,
+                 cache_slot_size: int = 8 * 1024**2) -> None:
         assert isinstance(img_scale, tuple)
         assert max_cached_images >= 2, 'The length of cache must >= 2, ' \
                                        f'but got {max_cached_images}.'
@@ -3668,11 +3703,16 @@ class CachedMixUp(BaseTransform):
         self.pad_val = pad_val
         self.max_iters = max_iters
         self.bbox_clip_border = bbox_clip_border
-        self.results_cache = []
 
         self.max_cached_images = max_cached_images
         self.random_pop = random_pop
         self.prob = prob
+        self.shared_cache = shared_cache
+        if shared_cache:
+            self.results_cache = SharedResultsCache(
+                max_cached_images, cache_slot_size, random_pop=random_pop)
+        else:
+            self.results_cache = []
 
     @cache_randomness
     def get_indexes(self, cache: list) -> int:
@@ -3703,13 +3743,17 @@ class CachedMixUp(BaseTransform):
             dict: Updated result dict.
         """
         # cache and pop images
-        self.results_cache.append(copy.deepcopy(results))
-        if len(self.results_cache) > self.max_cached_images:
-            if self.random_pop:
-                index = random.randint(0, len(self.results_cache) - 1)
-            else:
-                index = 0
-            self.results_cache.pop(index)
+        if self.shared_cache:
+            # the shared cache pickles the results and pops by itself
+            self.results_cache.append(results)
+        else:
+            self.results_cache.append(copy.deepcopy(results))
+            if len(self.results_cache) > self.max_cached_images:
+                if self.random_pop:
+                    index = random.randint(0, len(self.results_cache) - 1)
+                else:
+                    index = 0
+                self.results_cache.pop(index)
 
         if len(self.results_cache) <= 1:
             return results
@@ -3852,5 +3896,6 @@ class CachedMixUp(BaseTransform):
         repr_str += f'bbox_clip_border={self.bbox_clip_border}, '
         repr_str += f'max_cached_images={self.max_cached_images}, '
         repr_str += f'random_pop={self.random_pop}, '
-        repr_str += f'prob={self.prob})'
+        repr_str += f'prob={self.prob}, '
+        repr_str += f'shared_cache={self.shared_cache})'
         return repr_str
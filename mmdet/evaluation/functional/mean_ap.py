@@ -522,81 +522,560 @@ def get_cls_group_ofs(annotations, class_id):
     return gt_group_ofs
 
 
-def eval_map(det_results,
-             annotations,
-             scale_ranges=None,
-             iou_thr=0.5,
-             ioa_thr=None,
-             dataset=None,
-             logger=None,
-             tpfp_fn=None,
-             nproc=4,
-             use_legacy_coordinate=False,
-             use_group_of=False,
-             eval_mode='area'):
-    """Evaluate mAP of a dataset.
+def _as_scalar_comparison(values, number):
+    """Cast ``values`` and ``number`` so that an elementwise comparison
+    promotes exactly like the numpy-scalar comparisons in the ``tpfp_*``
+    loops."""
+    dtype = np.result_type(values.dtype.type(0), number)
+    return values.astype(dtype, copy=False), dtype.type(number)
+
+
+def _segment_max_first(values, segments):
+    """Segment-wise maximum and the position of its first occurrence.
 
     Args:
-        det_results (list[list]): [[cls1_det, cls2_det, ...], ...].
-            The outer list indicates images, and the inner list indicates
-            per-class detected bboxes.
-        annotations (list[dict]): Ground truth annotations where each item of
-            the list indicates an image. Keys of annotations are:
+        values (ndarray): Values of shape (n, ), grouped by ``segments``.
+        segments (ndarray): Non-decreasing segment ids of shape (n, ).
 
-            - `bboxes`: numpy array of shape (n, 4)
-            - `labels`: numpy array of shape (n, )
-            - `bboxes_ignore` (optional): numpy array of shape (k, 4)
-            - `labels_ignore` (optional): numpy array of shape (k, )
-        scale_ranges (list[tuple] | None): Range of scales to be evaluated,
-            in the format [(min1, max1), (min2, max2), ...]. A range of
-            (32, 64) means the area range between (32**2, 64**2).
-            Defaults to None.
+    Returns:
+        tuple[np.ndarray]: Ids of the non-empty segments, their maximum
+        values and the index (into ``values``) of the first maximum.
+    """
+    if values.size == 0:
+        return (segments[:0], values[:0], np.zeros(0, dtype=np.int64))
+    starts = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+    seg_ids = segments[starts]
+    seg_max = np.maximum.reduceat(values, starts)
+    seg_lens = np.diff(np.r_[starts, values.size])
+    hits = np.flatnonzero(values == np.repeat(seg_max, seg_lens))
+    _, first = np.unique(segments[hits], return_index=True)
+    return seg_ids, seg_max, hits[first]
+
+
+def _pair_overlaps(bboxes1, bboxes2, mode='iou', extra_length=0., eps=1e-6):
+    """Row-wise counterpart of :func:`bbox_overlaps`, which computes the
+    overlap between ``bboxes1[i]`` and ``bboxes2[i]`` with the same float32
+    arithmetic."""
+    bboxes1 = bboxes1[:, :4].astype(np.float32)
+    bboxes2 = bboxes2[:, :4].astype(np.float32)
+    area1 = (bboxes1[:, 2] - bboxes1[:, 0] + extra_length) * (
+        bboxes1[:, 3] - bboxes1[:, 1] + extra_length)
+    x_start = np.maximum(bboxes1[:, 0], bboxes2[:, 0])
+    y_start = np.maximum(bboxes1[:, 1], bboxes2[:, 1])
+    x_end = np.minimum(bboxes1[:, 2], bboxes2[:, 2])
+    y_end = np.minimum(bboxes1[:, 3], bboxes2[:, 3])
+    overlap = np.maximum(x_end - x_start + extra_length, 0) * np.maximum(
+        y_end - y_start + extra_length, 0)
+    if mode == 'iou':
+        area2 = (bboxes2[:, 2] - bboxes2[:, 0] + extra_length) * (
+            bboxes2[:, 3] - bboxes2[:, 1] + extra_length)
+        union = area1 + area2 - overlap
+    else:
+        union = area1
+    union = np.maximum(union, eps)
+    return overlap / union
+
+
+def _concat_rows(arrays, num_cols, dtype=np.float32):
+    """Concatenate 2D arrays, promoting only over the non-empty ones."""
+    arrays = [array for array in arrays if array.shape[0] > 0]
+    if not arrays:
+        return np.zeros((0, num_cols), dtype=dtype)
+    return np.concatenate(arrays)
+
+
+def _flatten_det_results(det_results, num_classes):
+    """Flatten ``det_results`` into image-major, class-minor arrays.
+
+    Returns:
+        tuple: dets (N, 5), image index (N, ), class index (N, ) and the
+        dtype ``np.vstack`` gives the detections of each class.
+    """
+    num_imgs = len(det_results)
+    flat_dets = [cls_det for img_res in det_results for cls_det in img_res]
+    det_counts = np.array([cls_det.shape[0] for cls_det in flat_dets],
+                          dtype=np.int64).reshape(num_imgs, num_classes)
+    dtypes = {cls_det.dtype for cls_det in flat_dets}
+    if len(dtypes) == 1:
+        cls_dtypes = list(dtypes) * num_classes
+    else:
+        cls_dtypes = [
+            np.result_type(*[img_res[j].dtype for img_res in det_results])
+            for j in range(num_classes)
+        ]
+    num_cols = max([d.shape[1] for d in flat_dets if d.ndim == 2] + [5])
+    dets = _concat_rows(flat_dets, num_cols)
+    det_imgs = np.repeat(np.arange(num_imgs), det_counts.sum(axis=1))
+    det_labels = np.repeat(
+        np.tile(np.arange(num_classes), num_imgs), det_counts.ravel())
+    return dets, det_imgs, det_labels, cls_dtypes
+
+
+def _flatten_annotations(annotations, num_classes, use_group_of=False):
+    """Flatten ``annotations`` into arrays sorted by (image, class).
+
+    Within an (image, class) group, gts keep their order and precede the
+    ignored gts, which is the order ``tpfp_*`` stack them in.
+
+    Returns:
+        tuple: gt bboxes (M, 4), image index (M, ), class index (M, ),
+        ignore flags (M, ), group-of flags (M, ) or None and, when group-of
+        flags are used, whether each image provides them.
+    """
+    bboxes, imgs, labels, ignores, group_ofs = [], [], [], [], []
+    has_group_of = np.ones(len(annotations), dtype=bool)
+    for i, ann in enumerate(annotations):
+        bboxes.append(ann['bboxes'])
+        labels.append(ann['labels'])
+        imgs.append(np.full(ann['labels'].shape[0], i, dtype=np.int64))
+        ignores.append(np.zeros(ann['labels'].shape[0], dtype=bool))
+        if use_group_of:
+            if ann.get('gt_is_group_ofs', None) is not None:
+                group_ofs.append(ann['gt_is_group_ofs'].astype(bool))
+            else:
+                has_group_of[i] = False
+                group_ofs.append(np.zeros(ann['labels'].shape[0], dtype=bool))
+        if ann.get('labels_ignore', None) is not None:
+            bboxes.append(ann['bboxes_ignore'])
+            labels.append(ann['labels_ignore'])
+            imgs.append(
+                np.full(ann['labels_ignore'].shape[0], i, dtype=np.int64))
+            ignores.append(np.ones(ann['labels_ignore'].shape[0], dtype=bool))
+            if use_group_of:
+                group_ofs.append(
+                    np.zeros(ann['labels_ignore'].shape[0], dtype=bool))
+    gt_bboxes = _concat_rows(bboxes, 4)
+    gt_imgs = np.concatenate(imgs) if imgs else np.zeros(0, dtype=np.int64)
+    gt_labels = np.concatenate(labels).astype(np.int64) if labels else \
+        np.zeros(0, dtype=np.int64)
+    gt_ignore = np.concatenate(ignores) if ignores else np.zeros(0, bool)
+    gt_group_of = None
+    if use_group_of:
+        gt_group_of = np.concatenate(group_ofs) if group_ofs else \
+            np.zeros(0, dtype=bool)
+    valid = (gt_labels >= 0) & (gt_labels < num_classes)
+    order = np.flatnonzero(valid)
+    order = order[np.lexsort((gt_labels[order], gt_imgs[order]))]
+    gt_bboxes, gt_imgs, gt_labels, gt_ignore = (gt_bboxes[order],
+                                                gt_imgs[order],
+                                                gt_labels[order],
+                                                gt_ignore[order])
+    if gt_group_of is not None:
+        gt_group_of = gt_group_of[order]
+    return gt_bboxes, gt_imgs, gt_labels, gt_ignore, gt_group_of, has_group_of
+
+
+def _in_area_range(areas, min_area, max_area, as_scalar):
+    """Whether ``areas`` lie in [min_area, max_area), promoted either like
+    the scalar checks inside the ``tpfp_*`` loops or like their array
+    checks for images without gts."""
+    if as_scalar.all():
+        lo_areas, lo = _as_scalar_comparison(areas, min_area)
+        hi_areas, hi = _as_scalar_comparison(areas, max_area)
+        return (lo_areas >= lo) & (hi_areas < hi)
+    in_range = (areas >= min_area) & (areas < max_area)
+    if as_scalar.any():
+        in_range[as_scalar] = _in_area_range(areas[as_scalar], min_area,
+                                             max_area, as_scalar[as_scalar])
+    return in_range
+
+
+def _tpfp_chunk(dets,
+                det_groups,
+                gt_bboxes,
+                gt_groups,
+                gt_ignore,
+                gt_group_of,
+                mode,
+                iou_thr,
+                area_ranges,
+                extra_length,
+                ioa_thr=None):
+    """Compute tp and fp of every detection of a chunk of images at once.
+
+    Detections and gts are grouped by (image, class) with non-decreasing
+    group ids. The function follows :func:`tpfp_default`,
+    :func:`tpfp_imagenet` or :func:`tpfp_openimages` (depending on ``mode``)
+    inside every group.
+
+    Returns:
+        tuple: (tp, fp) of shape (num_scales, num_dets). For the
+        ``'openimages'`` mode, the mask of detections matched to group-of
+        gts, the indices of group-of gts and their tp and bboxes are
+        appended.
+    """
+    num_dets = dets.shape[0]
+    num_scales = len(area_ranges)
+    tp = np.zeros((num_scales, num_dets), dtype=np.float32)
+    fp = np.zeros((num_scales, num_dets), dtype=np.float32)
+
+    num_groups = max(det_groups.max(initial=-1), gt_groups.max(initial=-1)) + 1
+    gt_counts = np.bincount(gt_groups, minlength=num_groups)
+    gt_starts = np.cumsum(gt_counts) - gt_counts
+    det_counts = np.bincount(det_groups, minlength=num_groups)
+    det_starts = np.cumsum(det_counts) - det_counts
+
+    # reproduce `np.argsort(-det_bboxes[:, -1])` of every group, the stable
+    # lexsort only differs from it when scores tie inside a group
+    neg_scores = -dets[:, -1]
+    sort_inds = np.lexsort((neg_scores, det_groups))
+    ties = (det_groups[sort_inds][1:] == det_groups[sort_inds][:-1]) & (
+        neg_scores[sort_inds][1:] == neg_scores[sort_inds][:-1])
+    for group in np.unique(det_groups[sort_inds][1:][ties]):
+        start, end = det_starts[group], det_starts[group] + det_counts[group]
+        sort_inds[start:end] = start + np.argsort(neg_scores[start:end])
+    ranks = np.empty(num_dets, dtype=np.int64)
+    ranks[sort_inds] = np.arange(num_dets)
+
+    # all (det, gt) pairs inside the same group, ordered by det then gt
+    pair_counts = gt_counts[det_groups]
+    pair_dets = np.repeat(np.arange(num_dets), pair_counts)
+    pair_local = np.arange(pair_dets.size) - np.repeat(
+        np.cumsum(pair_counts) - pair_counts, pair_counts)
+    pair_gts = gt_starts[det_groups][pair_dets] + pair_local
+
+    det_areas = (dets[:, 2] - dets[:, 0] + extra_length) * (
+        dets[:, 3] - dets[:, 1] + extra_length)
+    gt_areas = (gt_bboxes[:, 2] - gt_bboxes[:, 0] + extra_length) * (
+        gt_bboxes[:, 3] - gt_bboxes[:, 1] + extra_length)
+
+    if mode == 'imagenet':
+        gt_w = gt_bboxes[:, 2] - gt_bboxes[:, 0] + extra_length
+        gt_h = gt_bboxes[:, 3] - gt_bboxes[:, 1] + extra_length
+        iou_thrs = np.minimum((gt_w * gt_h) / ((gt_w + 10.0) * (gt_h + 10.0)),
+                              iou_thr)
+        gt_areas = gt_w * gt_h
+        ious = _pair_overlaps(dets[pair_dets], (gt_bboxes - 1)[pair_gts],
+                              'iou', extra_length)
+        # greedy matching to the best uncovered gt, processing the r-th
+        # ranked detection of every group in the same round
+        local_ranks = ranks - det_starts[det_groups]
+        pair_ranks = local_ranks[pair_dets]
+        pair_order = np.argsort(pair_ranks, kind='stable')
+        bounds = np.searchsorted(pair_ranks[pair_order],
+                                 np.arange(pair_ranks.max(initial=-1) + 2))
+        gt_covered = np.zeros(gt_bboxes.shape[0], dtype=bool)
+        matched_gts = np.full(num_dets, -1, dtype=np.int64)
+        for r in range(bounds.size - 1):
+            inds = pair_order[bounds[r]:bounds[r + 1]]
+            inds_gts = pair_gts[inds]
+            valid = (ious[inds] >= iou_thrs[inds_gts]) & ~gt_covered[inds_gts]
+            seg_ids, seg_max, first = _segment_max_first(
+                np.where(valid, ious[inds], -1), pair_dets[inds])
+            matched = seg_max > -1
+            matched_gts[seg_ids[matched]] = inds_gts[first[matched]]
+            gt_covered[inds_gts[first[matched]]] = True
+        has_match = matched_gts >= 0
+        has_gts = gt_counts[det_groups] > 0
+        for k, (min_area, max_area) in enumerate(area_ranges):
+            if min_area is None:
+                gt_area_ignore = np.zeros_like(gt_ignore)
+            else:
+                gt_area_ignore = (gt_areas < min_area) | (gt_areas >= max_area)
+            tp[k, has_match] = ~(gt_ignore
+                                 | gt_area_ignore)[matched_gts[has_match]]
+            if min_area is None:
+                fp[k] = ~has_match
+            else:
+                fp[k] = ~has_match & _in_area_range(det_areas, min_area,
+                                                    max_area, has_gts)
+        return tp, fp
+
+    if mode == 'openimages':
+        # matches against non-group-of gts use their index among the
+        # non-group-of gts to look up the ignore flags, as tpfp_openimages
+        non_group = ~gt_group_of
+        prefix = np.cumsum(non_group) - non_group
+        non_group_local = prefix - prefix[gt_starts[gt_groups]]
+        keep = non_group[pair_gts]
+        match_dets, match_gts = pair_dets[keep], pair_gts[keep]
+        ious = _pair_overlaps(dets[match_dets], gt_bboxes[match_gts], 'iou')
+        match_keys = gt_starts[det_groups][match_dets] + \
+            non_group_local[match_gts]
+        has_gts = np.bincount(
+            gt_groups[non_group], minlength=num_groups)[det_groups] > 0
+    else:
+        match_dets, match_gts, match_keys = pair_dets, pair_gts, pair_gts
+        ious = _pair_overlaps(dets[pair_dets], gt_bboxes[pair_gts], 'iou',
+                              extra_length)
+        has_gts = gt_counts[det_groups] > 0
+
+    # dets without any gt to match keep an IoU of -inf
+    seg_ids, seg_max, first = _segment_max_first(ious, match_dets)
+    ious_max = np.full(num_dets, -np.inf, dtype=np.float32)
+    ious_max[seg_ids] = seg_max
+    ious_max, thr = _as_scalar_comparison(ious_max, iou_thr)
+    has_match = ious_max >= thr
+    matched = seg_ids[has_match[seg_ids]]
+    matched_keys = match_keys[first[has_match[seg_ids]]]
+    for k, (min_area, max_area) in enumerate(area_ranges):
+        if min_area is None:
+            gt_area_ignore = np.zeros_like(gt_ignore)
+        else:
+            gt_area_ignore = (gt_areas < min_area) | (gt_areas >= max_area)
+        # otherwise ignore this detected bbox, tp = 0, fp = 0
+        valid = ~(gt_ignore | gt_area_ignore)[matched_keys]
+        inds, keys = matched[valid], matched_keys[valid]
+        # the first detection of a gt in score order is tp, the others fp
+        order = np.lexsort((ranks[inds], keys))
+        inds, keys = inds[order], keys[order]
+        is_first = np.r_[True, keys[1:] != keys[:-1]][:inds.size]
+        tp[k, inds[is_first]] = 1
+        fp[k, inds[~is_first]] = 1
+        if min_area is None:
+            fp[k, ~has_match] = 1
+        else:
+            fp[k, ~has_match
+               & _in_area_range(det_areas, min_area, max_area, has_gts)] = 1
+    if mode != 'openimages':
+        return tp, fp
+
+    # detections left as fp are matched against group-of gts, each of
+    # which collects the top-scored detection matched to it
+    group_of = gt_group_of
+    prefix = np.cumsum(group_of) - group_of
+    group_local = prefix - prefix[gt_starts[gt_groups]]
+    keep = group_of[pair_gts]
+    match_dets, match_gts = pair_dets[keep], pair_gts[keep]
+    ioas = _pair_overlaps(dets[match_dets], gt_bboxes[match_gts], 'iof')
+    seg_ids, seg_max, first = _segment_max_first(ioas, match_dets)
+    ioas_max, thr = _as_scalar_comparison(seg_max, ioa_thr)
+    matched_gts = match_gts[first]
+    # the ignore flags are looked up by the index among group-of gts, as
+    # tpfp_openimages does
+    matched_keys = gt_starts[det_groups[seg_ids]] + group_local[matched_gts]
+    min_area, max_area = area_ranges[0]
+    if min_area is None:
+        gt_area_ignore = np.zeros_like(gt_ignore)
+    else:
+        group_gt_areas = (gt_bboxes[:, 2] - gt_bboxes[:, 0]) * (
+            gt_bboxes[:, 3] - gt_bboxes[:, 1])
+        gt_area_ignore = (group_gt_areas < min_area) | (
+            group_gt_areas >= max_area)
+    valid = (tp[0, seg_ids] == 0) & (
+        ioas_max >= thr) & ~(gt_ignore | gt_area_ignore)[matched_keys]
+    inds, matched_gts = seg_ids[valid], matched_gts[valid]
+    match_group_of = np.zeros(num_dets, dtype=bool)
+    match_group_of[inds] = True
+
+    tp_group = np.zeros(gt_bboxes.shape[0], dtype=np.float32)
+    tp_group[matched_gts] = 1
+    det_bboxes_group = np.zeros((gt_bboxes.shape[0], dets.shape[1]),
+                                dtype=float)
+    order = np.lexsort((ranks[inds], matched_gts))
+    inds, matched_gts = inds[order], matched_gts[order]
+    is_first = np.r_[True, matched_gts[1:] != matched_gts[:-1]][:inds.size]
+    inds, matched_gts = inds[is_first], matched_gts[is_first]
+    # the zero-initialized bbox is only replaced by a higher score
+    positive = dets[inds, -1] > 0
+    det_bboxes_group[matched_gts[positive]] = dets[inds[positive]]
+    group_gt_inds = np.flatnonzero(group_of)
+    return (tp, fp, match_group_of, group_gt_inds, tp_group[group_gt_inds],
+            det_bboxes_group[group_gt_inds])
+
+
+def _vectorized_cls_tpfp(det_results,
+                         annotations,
+                         mode,
+                         iou_thr,
+                         area_ranges,
+                         use_legacy_coordinate=False,
+                         ioa_thr=None,
+                         img_chunk_size=512):
+    """Compute the tp, fp and detections of all classes in a single pass.
+
+    Instead of calling ``tpfp_fn`` for every (class, image) pair, all
+    detections are flattened, sorted once and matched to the gts of their
+    (image, class) group with batched numpy operations. Images are handled
+    in chunks of ``img_chunk_size`` to bound the memory of the pairwise
+    overlaps. The results are identical to those of :func:`tpfp_default`,
+    :func:`tpfp_imagenet` and :func:`tpfp_openimages` (with group-of and a
+    single scale range), including the order of tied detections.
+
+    Args:
+        det_results (list[list]): Same as `eval_map()`.
+        annotations (list[dict]): Same as `eval_map()`.
+        mode (str): 'default', 'imagenet' or 'openimages'.
         iou_thr (float): IoU threshold to be considered as matched.
-            Defaults to 0.5.
-        ioa_thr (float | None): IoA threshold to be considered as matched,
-            which only used in OpenImages evaluation. Defaults to None.
-        dataset (list[str] | str | None): Dataset name or dataset classes,
-            there are minor differences in metrics for different datasets, e.g.
-            "voc", "imagenet_det", etc. Defaults to None.
-        logger (logging.Logger | str | None): The way to print the mAP
-            summary. See `mmengine.logging.print_log()` for details.
-            Defaults to None.
-        tpfp_fn (callable | None): The function used to determine true/
-            false positives. If None, :func:`tpfp_default` is used as default
-            unless dataset is 'det' or 'vid' (:func:`tpfp_imagenet` in this
-            case). If it is given as a function, then this function is used
-            to evaluate tp & fp. Default None.
-        nproc (int): Processes used for computing TP and FP.
-            Defaults to 4.
+        area_ranges (list[tuple] | None): Range of bbox areas to be
+            evaluated.
         use_legacy_coordinate (bool): Whether to use coordinate system in
-            mmdet v1.x. which means width, height should be
-            calculated as 'x2 - x1 + 1` and 'y2 - y1 + 1' respectively.
-            Defaults to False.
-        use_group_of (bool): Whether to use group of when calculate TP and FP,
-            which only used in OpenImages evaluation. Defaults to False.
-        eval_mode (str): 'area' or '11points', 'area' means calculating the
-            area under precision-recall curve, '11points' means calculating
-            the average precision of recalls at [0, 0.1, ..., 1],
-            PASCAL VOC2007 uses `11points` as default evaluate mode, while
-            others are 'area'. Defaults to 'area'.
+            mmdet v1.x. Defaults to False.
+        ioa_thr (float | None): IoA threshold used by the 'openimages'
+            mode. Defaults to None.
+        img_chunk_size (int): Number of images processed at once.
+            Defaults to 512.
 
     Returns:
-        tuple: (mAP, [dict, dict, ...])
+        list[tuple]: (tp, fp, cls_dets, num_gts) of each class, where tp and
+        fp are concatenated over images like in `eval_map()`.
+    """
+    assert mode in ['default', 'imagenet', 'openimages']
+    extra_length = 1. if use_legacy_coordinate else 0.
+    num_imgs = len(det_results)
+    num_classes = len(det_results[0])
+    if area_ranges is None:
+        area_ranges = [(None, None)]
+    num_scales = len(area_ranges)
+    use_group_of = mode == 'openimages'
+    assert not use_group_of or num_scales == 1
+
+    dets, det_imgs, det_labels, cls_dtypes = _flatten_det_results(
+        det_results, num_classes)
+    (gt_bboxes, gt_imgs, gt_labels, gt_ignore, gt_group_of,
+     has_group_of) = _flatten_annotations(annotations, num_classes,
+                                          use_group_of)
+    if use_group_of:
+        # tpfp_openimages asserts that every gt has a group-of flag
+        gt_groups = gt_imgs * num_classes + gt_labels
+        with_gts = np.unique(gt_groups)
+        ignored = np.unique(gt_groups[gt_ignore])
+        assert has_group_of[with_gts // num_classes].all() and \
+            ignored.size == 0
+
+    det_img_bounds = np.searchsorted(det_imgs, np.arange(num_imgs + 1))
+    gt_img_bounds = np.searchsorted(gt_imgs, np.arange(num_imgs + 1))
+    chunk_results = []
+    for start in range(0, num_imgs, img_chunk_size):
+        end = min(start + img_chunk_size, num_imgs)
+        ds, de = det_img_bounds[start], det_img_bounds[end]
+        gs, ge = gt_img_bounds[start], gt_img_bounds[end]
+        det_groups = (det_imgs[ds:de] - start) * num_classes + \
+            det_labels[ds:de]
+        gt_groups = (gt_imgs[gs:ge] - start) * num_classes + \
+            gt_labels[gs:ge]
+        results = _tpfp_chunk(
+            dets[ds:de],
+            det_groups,
+            gt_bboxes[gs:ge],
+            gt_groups,
+            gt_ignore[gs:ge],
+            gt_group_of[gs:ge] if use_group_of else None,
+            mode,
+            iou_thr,
+            area_ranges,
+            extra_length,
+            ioa_thr=ioa_thr)
+        if use_group_of:
+            results = results[:3] + (results[3] + gs, ) + results[4:]
+        chunk_results.append(results)
+    tp = np.concatenate([res[0] for res in chunk_results], axis=1) \
+        if chunk_results else np.zeros((num_scales, 0), dtype=np.float32)
+    fp = np.concatenate([res[1] for res in chunk_results], axis=1) \
+        if chunk_results else np.zeros((num_scales, 0), dtype=np.float32)
+
+    # ignored gts or gts beyond the specific scale are not counted
+    num_gts = np.zeros((num_classes, num_scales), dtype=int)
+    counted = ~gt_ignore
+    gt_areas = (gt_bboxes[:, 2] - gt_bboxes[:, 0] + extra_length) * (
+        gt_bboxes[:, 3] - gt_bboxes[:, 1] + extra_length)
+    for k, (min_area, max_area) in enumerate(area_ranges):
+        in_range = counted
+        if min_area is not None:
+            in_range = counted & (gt_areas >= min_area) & (gt_areas < max_area)
+        num_gts[:, k] = np.bincount(gt_labels[in_range], minlength=num_classes)
+
+    # gather the results of each class in the order of `get_cls_results`
+    is_group_of_cls = np.zeros(num_classes, dtype=bool)
+    if use_group_of:
+        match_group_of = np.concatenate([res[2] for res in chunk_results])
+        group_gt_inds = np.concatenate([res[3] for res in chunk_results])
+        tp_group = np.concatenate([res[4] for res in chunk_results])
+        det_bboxes_group = np.concatenate([res[5] for res in chunk_results])
+        keep = np.flatnonzero(~match_group_of)
+        entry_labels = np.r_[det_labels[keep], gt_labels[group_gt_inds]]
+        entry_imgs = np.r_[det_imgs[keep], gt_imgs[group_gt_inds]]
+        entry_kinds = np.r_[np.zeros(keep.size, dtype=np.int64),
+                            np.ones(group_gt_inds.size, dtype=np.int64)]
+        entry_inds = np.r_[keep, group_gt_inds]
+        order = np.lexsort((entry_inds, entry_kinds, entry_imgs, entry_labels))
+        entry_tp = np.r_[tp[0, keep], tp_group][order][None]
+        entry_fp = np.r_[fp[0, keep], (tp_group <= 0).astype(float)][order]
+        entry_fp = entry_fp[None]
+        entry_dets = np.concatenate((dets[keep], det_bboxes_group))[order]
+        entry_labels = entry_labels[order]
+        is_group_of_cls[gt_labels[group_gt_inds]] = True
+    else:
+        order = np.argsort(det_labels, kind='stable')
+        entry_tp, entry_fp = tp[:, order], fp[:, order]
+        entry_dets = dets[order]
+        entry_labels = det_labels[order]
+    cls_bounds = np.searchsorted(entry_labels, np.arange(num_classes + 1))
+
+    cls_results = []
+    for i in range(num_classes):
+        start, end = cls_bounds[i], cls_bounds[i + 1]
+        cls_tp = entry_tp[:, start:end].astype(np.float32)
+        cls_fp, cls_dtype = entry_fp[:, start:end], cls_dtypes[i]
+        if is_group_of_cls[i]:
+            # concatenating group-of results promotes to float64
+            cls_fp = cls_fp.astype(float)
+            cls_dtype = np.result_type(cls_dtype, float)
+        else:
+            cls_fp = cls_fp.astype(np.float32)
+        cls_dets = entry_dets[start:end].astype(cls_dtype)
+        cls_results.append((cls_tp, cls_fp, cls_dets, num_gts[i]))
+    return cls_results
+
+
+def _eval_cls_result(tp, fp, cls_dets, num_gts, scale_ranges, eval_mode):
+    """Calculate recall, precision and AP of a class from its tp and fp.
+
+    Args:
+        tp (ndarray): tp of all detections, shape (num_scales, num_dets).
+        fp (ndarray): fp of all detections, shape (num_scales, num_dets).
+        cls_dets (ndarray): Detected bboxes, shape (num_dets, 5).
+        num_gts (ndarray): Number of gts of each scale, shape (num_scales, ).
+        scale_ranges (list[tuple] | None): Same as `eval_map()`.
+        eval_mode (str): Same as `eval_map()`.
+
+    Returns:
+        dict: Evaluation result of the class.
+    """
+    num_dets = cls_dets.shape[0]
+    # sort all det bboxes by score, also sort tp and fp
+    sort_inds = np.argsort(-cls_dets[:, -1])
+    tp = tp[:, sort_inds]
+    fp = fp[:, sort_inds]
+    # calculate recall and precision with tp and fp
+    tp = np.cumsum(tp, axis=1)
+    fp = np.cumsum(fp, axis=1)
+    eps = np.finfo(np.float32).eps
+    recalls = tp / np.maximum(num_gts[:, np.newaxis], eps)
+    precisions = tp / np.maximum((tp + fp), eps)
+    # calculate AP
+    if scale_ranges is None:
+        recalls = recalls[0, :]
+        precisions = precisions[0, :]
+        num_gts = num_gts.item()
+    ap = average_precision(recalls, precisions, eval_mode)
+    return {
+        'num_gts': num_gts,
+        'num_dets': num_dets,
+        'recall': recalls,
+        'precision': precisions,
+        'ap': ap
+    }
+
+
+def _eval_map_per_class(det_results, annotations, tpfp_fn, num_classes,
+                        iou_thr, ioa_thr, area_ranges, scale_ranges, nproc,
+                        use_legacy_coordinate, use_group_of, eval_mode):
+    """Evaluate each class by calling ``tpfp_fn`` on every image with a
+    process pool.
+
+    Args are the same as `eval_map()`.
+
+    Returns:
+        list[dict]: Evaluation results of all classes.
     """
-    assert len(det_results) == len(annotations)
-    assert eval_mode in ['area', '11points'], \
-        f'Unrecognized {eval_mode} mode, only "area" and "11points" ' \
-        'are supported'
     if not use_legacy_coordinate:
         extra_length = 0.
     else:
         extra_length = 1.
 
     num_imgs = len(det_results)
-    num_scales = len(scale_ranges) if scale_ranges is not None else 1
-    num_classes = len(det_results[0])  # positive class num
-    area_ranges = ([(rg[0]**2, rg[1]**2) for rg in scale_ranges]
-                   if scale_ranges is not None else None)
+    num_scales = len(area_ranges) if area_ranges is not None else 1
 
     # There is no need to use multi processes to process
     # when num_imgs = 1 .
@@ -610,18 +1089,6 @@ def eval_map(det_results,
         # get gt and det bboxes of this class
         cls_dets, cls_gts, cls_gts_ignore = get_cls_results(
             det_results, annotations, i)
-        # choose proper function according to datasets to compute tp and fp
-        if tpfp_fn is None:
-            if dataset in ['det', 'vid']:
-                tpfp_fn = tpfp_imagenet
-            elif dataset in ['oid_challenge', 'oid_v6'] \
-                    or use_group_of is True:
-                tpfp_fn = tpfp_openimages
-            else:
-                tpfp_fn = tpfp_default
-        if not callable(tpfp_fn):
-            raise ValueError(
-                f'tpfp_fn has to be a function or None, but got {tpfp_fn}')
 
         if num_imgs > 1:
             # compute tp and fp for each image with multiple processes
@@ -670,35 +1137,138 @@ def eval_map(det_results,
                 for k, (min_area, max_area) in enumerate(area_ranges):
                     num_gts[k] += np.sum((gt_areas >= min_area)
                                          & (gt_areas < max_area))
-        # sort all det bboxes by score, also sort tp and fp
-        cls_dets = np.vstack(cls_dets)
-        num_dets = cls_dets.shape[0]
-        sort_inds = np.argsort(-cls_dets[:, -1])
-        tp = np.hstack(tp)[:, sort_inds]
-        fp = np.hstack(fp)[:, sort_inds]
-        # calculate recall and precision with tp and fp
-        tp = np.cumsum(tp, axis=1)
-        fp = np.cumsum(fp, axis=1)
-        eps = np.finfo(np.float32).eps
-        recalls = tp / np.maximum(num_gts[:, np.newaxis], eps)
-        precisions = tp / np.maximum((tp + fp), eps)
-        # calculate AP
-        if scale_ranges is None:
-            recalls = recalls[0, :]
-            precisions = precisions[0, :]
-            num_gts = num_gts.item()
-        ap = average_precision(recalls, precisions, eval_mode)
-        eval_results.append({
-            'num_gts': num_gts,
-            'num_dets': num_dets,
-            'recall': recalls,
-            'precision': precisions,
-            'ap': ap
-        })
+        eval_results.append(
+            _eval_cls_result(
+                np.hstack(tp), np.hstack(fp), np.vstack(cls_dets), num_gts,
+                scale_ranges, eval_mode))
 
     if num_imgs > 1:
         pool.close()
 
+    return eval_results
+
+
+def eval_map(det_results,
+             annotations,
+             scale_ranges=None,
+             iou_thr=0.5,
+             ioa_thr=None,
+             dataset=None,
+             logger=None,
+             tpfp_fn=None,
+             nproc=4,
+             use_legacy_coordinate=False,
+             use_group_of=False,
+             eval_mode='area',
+             use_vectorized=True):
+    """Evaluate mAP of a dataset.
+
+    Args:
+        det_results (list[list]): [[cls1_det, cls2_det, ...], ...].
+            The outer list indicates images, and the inner list indicates
+            per-class detected bboxes.
+        annotations (list[dict]): Ground truth annotations where each item of
+            the list indicates an image. Keys of annotations are:
+
+            - `bboxes`: numpy array of shape (n, 4)
+            - `labels`: numpy array of shape (n, )
+            - `bboxes_ignore` (optional): numpy array of shape (k, 4)
+            - `labels_ignore` (optional): numpy array of shape (k, )
+        scale_ranges (list[tuple] | None): Range of scales to be evaluated,
+            in the format [(min1, max1), (min2, max2), ...]. A range of
+            (32, 64) means the area range between (32**2, 64**2).
+            Defaults to None.
+        iou_thr (float): IoU threshold to be considered as matched.
+            Defaults to 0.5.
+        ioa_thr (float | None): IoA threshold to be considered as matched,
+            which only used in OpenImages evaluation. Defaults to None.
+        dataset (list[str] | str | None): Dataset name or dataset classes,
+            there are minor differences in metrics for different datasets, e.g.
+            "voc", "imagenet_det", etc. Defaults to None.
+        logger (logging.Logger | str | None): The way to print the mAP
+            summary. See `mmengine.logging.print_log()` for details.
+            Defaults to None.
+        tpfp_fn (callable | None): The function used to determine true/
+            false positives. If None, :func:`tpfp_default` is used as default
+            unless dataset is 'det' or 'vid' (:func:`tpfp_imagenet` in this
+            case). If it is given as a function, then this function is used
+            to evaluate tp & fp. Default None.
+        nproc (int): Processes used for computing TP and FP.
+            Defaults to 4.
+        use_legacy_coordinate (bool): Whether to use coordinate system in
+            mmdet v1.x. which means width, height should be
+            calculated as 'x2 - x1 + 1` and 'y2 - y1 + 1' respectively.
+            Defaults to False.
+        use_group_of (bool): Whether to use group of when calculate TP and FP,
+            which only used in OpenImages evaluation. Defaults to False.
+        eval_mode (str): 'area' or '11points', 'area' means calculating the
+            area under precision-recall curve, '11points' means calculating
+            the average precision of recalls at [0, 0.1, ..., 1],
+            PASCAL VOC2007 uses `11points` as default evaluate mode, while
+            others are 'area'. Defaults to 'area'.
+        use_vectorized (bool): Whether to compute TP and FP of all classes
+            in a single vectorized pass when ``tpfp_fn`` is one of
+            :func:`tpfp_default`, :func:`tpfp_imagenet` and
+            :func:`tpfp_openimages`. The results are identical to calling
+            ``tpfp_fn`` per class and image with ``nproc`` processes, which
+            is still used for custom ``tpfp_fn`` and for group-of evaluation
+            with multiple scale ranges. Defaults to True.
+
+    Returns:
+        tuple: (mAP, [dict, dict, ...])
+    """
+    assert len(det_results) == len(annotations)
+    assert eval_mode in ['area', '11points'], \
+        f'Unrecognized {eval_mode} mode, only "area" and "11points" ' \
+        'are supported'
+    num_scales = len(scale_ranges) if scale_ranges is not None else 1
+    num_classes = len(det_results[0])  # positive class num
+    area_ranges = ([(rg[0]**2, rg[1]**2) for rg in scale_ranges]
+                   if scale_ranges is not None else None)
+
+    # choose proper function according to datasets to compute tp and fp
+    if tpfp_fn is None:
+        if dataset in ['det', 'vid']:
+            tpfp_fn = tpfp_imagenet
+        elif dataset in ['oid_challenge', 'oid_v6'] \
+                or use_group_of is True:
+            tpfp_fn = tpfp_openimages
+        else:
+            tpfp_fn = tpfp_default
+    if not callable(tpfp_fn):
+        raise ValueError(
+            f'tpfp_fn has to be a function or None, but got {tpfp_fn}')
+
+    vectorized_mode = None
+    if use_vectorized and not use_group_of:
+        if tpfp_fn is tpfp_default:
+            vectorized_mode = 'default'
+        elif tpfp_fn is tpfp_imagenet:
+            vectorized_mode = 'imagenet'
+    elif use_vectorized and tpfp_fn is tpfp_openimages \
+            and ioa_thr is not None and num_scales == 1:
+        vectorized_mode = 'openimages'
+
+    if vectorized_mode is not None:
+        cls_results = _vectorized_cls_tpfp(
+            det_results,
+            annotations,
+            vectorized_mode,
+            iou_thr,
+            area_ranges,
+            use_legacy_coordinate=use_legacy_coordinate,
+            ioa_thr=ioa_thr)
+        eval_results = [
+            _eval_cls_result(*cls_result, scale_ranges, eval_mode)
+            for cls_result in cls_results
+        ]
+    else:
+        eval_results = _eval_map_per_class(det_results, annotations, tpfp_fn,
+                                           num_classes, iou_thr, ioa_thr,
+                                           area_ranges, scale_ranges, nproc,
+                                           use_legacy_coordinate, use_group_of,
+                                           eval_mode)
+
     if scale_ranges is not None:
         # shape (num_classes, num_scales)
         all_ap = np.vstack([cls_result['ap'] for cls_result in eval_results])
@@ -1,12 +1,14 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import copy
 import datetime
 import itertools
 import os.path as osp
 import tempfile
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from typing import Dict, List, Optional, Sequence, Union
 
 import numpy as np
+import pycocotools.mask as maskUtils
 import torch
 from mmengine.evaluator import BaseMetric
 from mmengine.fileio import dump, get_local_path, load
@@ -15,7 +17,7 @@ from terminaltables import AsciiTable
 
 from mmdet.datasets.api_wrappers import COCO, COCOeval, COCOevalMP
 from mmdet.registry import METRICS
-from mmdet.structures.mask import encode_mask_results
+from mmdet.structures.mask import RLEMasks, encode_mask_results
 from ..functional import eval_recalls
 
 
@@ -64,6 +66,19 @@ class CocoMetric(BaseMetric):
         sort_categories (bool): Whether sort categories in annotations. Only
             used for `Objects365V1Dataset`. Defaults to False.
         use_mp_eval (bool): Whether to use mul-processing evaluation
+        incremental_eval (bool): Whether to match the detections of each
+            image to its ground truth in :meth:`process`, while inference is
+            still running. Only the compact per-image match tables are kept,
+            and :meth:`compute_metrics` just accumulates and summarizes them,
+            which gives the same results as the default evaluation. The
+            'proposal_fast' metric and ``format_only`` are not supported in
+            this mode, and no result files are dumped. Defaults to False.
+        in_memory_results (bool): Whether to build the COCO api of
+            predictions, as well as that of the ground truth converted from
+            the dataset, directly from the results collected in
+            :meth:`process`, rather than dumping them to json files and
+            loading them back. The json files are still dumped when
+            ``outfile_prefix`` is given. Defaults to False.
     """
     default_prefix: Optional[str] = 'coco'
 
@@ -81,7 +96,9 @@ class CocoMetric(BaseMetric):
                  collect_device: str = 'cpu',
                  prefix: Optional[str] = None,
                  sort_categories: bool = False,
-                 use_mp_eval: bool = False) -> None:
+                 use_mp_eval: bool = False,
+                 incremental_eval: bool = False,
+                 in_memory_results: bool = False) -> None:
         super().__init__(collect_device=collect_device, prefix=prefix)
         # coco evaluation metrics
         self.metrics = metric if isinstance(metric, list) else [metric]
@@ -96,6 +113,14 @@ class CocoMetric(BaseMetric):
         self.classwise = classwise
         # whether to use multi processing evaluation, default False
         self.use_mp_eval = use_mp_eval
+        # whether to match detections per image during `process`
+        self.incremental_eval = incremental_eval
+        if incremental_eval and 'proposal_fast' in self.metrics:
+            raise KeyError('proposal_fast is not supported when '
+                           '`incremental_eval` is True.')
+        if incremental_eval and format_only:
+            raise ValueError('format_only is not supported when '
+                             '`incremental_eval` is True.')
 
         # proposal_nums used to compute recall or precision.
         self.proposal_nums = list(proposal_nums)
@@ -145,6 +170,10 @@ class CocoMetric(BaseMetric):
         # handle dataset lazy init
         self.cat_ids = None
         self.img_ids = None
+        # per-image evaluators used when `incremental_eval` is True
+        self._incremental_evals = None
+        # whether to skip the json round trip of results
+        self.in_memory_results = in_memory_results
 
     def fast_eval_recall(self,
                          results: List[dict],
@@ -271,6 +300,35 @@ class CocoMetric(BaseMetric):
 
         return result_files
 
+    def results2coco(self, results: Sequence[dict]) -> dict:
+        """Convert the detection results to COCO style annotations in
+        memory, without dumping them to json files.
+
+        Args:
+            results (Sequence[dict]): Testing results of the
+                dataset.
+
+        Returns:
+            dict: Possible keys are "bbox", "segm", "proposal", and values
+            are the annotations in the format of ``COCO.loadRes``.
+        """
+        bbox_anns = []
+        segm_anns = [] if 'masks' in results[0] else None
+        for idx, result in enumerate(results):
+            result = dict(result, img_id=result.get('img_id', idx))
+            bbox_anns.extend(
+                self._pred_to_coco_anns(
+                    result, 'bbox', start_id=len(bbox_anns) + 1))
+            if segm_anns is not None:
+                segm_anns.extend(
+                    self._pred_to_coco_anns(
+                        result, 'segm', start_id=len(segm_anns) + 1))
+
+        result_anns = dict(bbox=bbox_anns, proposal=bbox_anns)
+        if segm_anns is not None:
+            result_anns['segm'] = segm_anns
+        return result_anns
+
     def gt_to_coco_json(self, gt_dicts: Sequence[dict],
                         outfile_prefix: str) -> str:
         """Convert ground truth to coco format json file.
@@ -283,6 +341,20 @@ class CocoMetric(BaseMetric):
         Returns:
             str: The filename of the json file.
         """
+        coco_json = self.gt_to_coco_dict(gt_dicts)
+        converted_json_path = f'{outfile_prefix}.gt.json'
+        dump(coco_json, converted_json_path)
+        return converted_json_path
+
+    def gt_to_coco_dict(self, gt_dicts: Sequence[dict]) -> dict:
+        """Convert ground truth to a coco format dict.
+
+        Args:
+            gt_dicts (Sequence[dict]): Ground truth of the dataset.
+
+        Returns:
+            dict: The ground truth in coco format.
+        """
         categories = [
             dict(id=id, name=name)
             for id, name in enumerate(self.dataset_meta['classes'])
@@ -337,9 +409,267 @@ class CocoMetric(BaseMetric):
         )
         if len(annotations) > 0:
             coco_json['annotations'] = annotations
-        converted_json_path = f'{outfile_prefix}.gt.json'
-        dump(coco_json, converted_json_path)
-        return converted_json_path
+        return coco_json
+
+    def _init_incremental_evals(self) -> None:
+        """Initialize the COCO evaluators which match detections to ground
+        truth image by image in incremental evaluation."""
+        # handle lazy init
+        if self.cat_ids is None:
+            if self._coco_api is None:
+                # category ids of the ground truth converted from the
+                # dataset are the label indices
+                self.cat_ids = list(range(len(self.dataset_meta['classes'])))
+            else:
+                self.cat_ids = self._coco_api.get_cat_ids(
+                    cat_names=self.dataset_meta['classes'])
+        if self.img_ids is None and self._coco_api is not None:
+            self.img_ids = self._coco_api.get_img_ids()
+
+        self._incremental_evals = dict()
+        for metric in self.metrics:
+            iou_type = 'bbox' if metric == 'proposal' else metric
+            coco_eval = COCOevalMP(self._coco_api, None, iou_type)
+            coco_eval.params.catIds = list(np.unique(self.cat_ids))
+            coco_eval.params.maxDets = sorted(self.proposal_nums)
+            coco_eval.params.iouThrs = self.iou_thrs
+            if metric == 'proposal':
+                coco_eval.params.useCats = 0
+            self._incremental_evals[metric] = coco_eval
+
+    def _gt_to_coco_anns(self, gt: dict) -> List[dict]:
+        """Get the COCO style ground truth annotations of an image, either
+        from the annotation file or converted like :meth:`gt_to_coco_json`.
+
+        Args:
+            gt (dict): Ground truth of the image.
+
+        Returns:
+            List[dict]: The copied annotations, whose 'segmentation' is
+            converted to RLE if needed.
+        """
+        if self._coco_api is not None:
+            ann_ids = self._coco_api.get_ann_ids(img_ids=[gt['img_id']])
+            anns = [dict(ann) for ann in self._coco_api.load_anns(ann_ids)]
+            if 'segm' in self.metrics:
+                for ann in anns:
+                    ann['segmentation'] = self._coco_api.annToRLE(ann)
+            return anns
+
+        anns = []
+        for ann in gt['anns']:
+            bbox = ann['bbox']
+            coco_bbox = [
+                bbox[0],
+                bbox[1],
+                bbox[2] - bbox[0],
+                bbox[3] - bbox[1],
+            ]
+            annotation = dict(
+                id=len(anns) + 1,
+                image_id=gt['img_id'],
+                bbox=coco_bbox,
+                iscrowd=ann.get('ignore_flag', 0),
+                category_id=int(ann['bbox_label']),
+                area=coco_bbox[2] * coco_bbox[3])
+            if ann.get('mask', None):
+                mask = ann['mask']
+                if isinstance(mask, list):
+                    rle = maskUtils.merge(
+                        maskUtils.frPyObjects(mask, gt['height'], gt['width']))
+                elif isinstance(mask['counts'], list):
+                    rle = maskUtils.frPyObjects(mask, gt['height'],
+                                                gt['width'])
+                else:
+                    rle = mask
+                annotation['segmentation'] = rle
+            anns.append(annotation)
+        return anns
+
+    def _pred_to_coco_anns(self,
+                           result: dict,
+                           iou_type: str,
+                           start_id: int = 1) -> List[dict]:
+        """Convert the predictions of an image to COCO style annotations,
+        the same as loading the dumped json file with ``COCO.loadRes``.
+
+        Args:
+            result (dict): Predictions of the image.
+            iou_type (str): 'bbox' or 'segm'.
+            start_id (int): The annotation id of the first prediction.
+                Defaults to 1.
+
+        Returns:
+            List[dict]: The converted annotations.
+        """
+        num_dets = len(result['labels'])
+        if num_dets == 0:
+            return []
+        image_id = result['img_id']
+        cat_ids = np.asarray(self.cat_ids)[result['labels']].tolist()
+        ids = range(start_id, start_id + num_dets)
+        if iou_type == 'bbox':
+            # the same float64 values as `xyxy2xywh` and json dumping
+            bboxes = np.asarray(result['bboxes'], dtype=np.float64)
+            bboxes = np.concatenate(
+                [bboxes[:, :2], bboxes[:, 2:] - bboxes[:, :2]], axis=1)
+            areas = (bboxes[:, 2] * bboxes[:, 3]).tolist()
+            scores = np.asarray(result['scores'], dtype=np.float64).tolist()
+            return [
+                dict(
+                    id=ann_id,
+                    image_id=image_id,
+                    bbox=bbox,
+                    score=score,
+                    category_id=cat_id,
+                    area=area,
+                    iscrowd=0) for ann_id, bbox, score, cat_id, area in zip(
+                        ids, bboxes.tolist(), scores, cat_ids, areas)
+            ]
+
+        masks = list(result['masks'])
+        scores = np.asarray(
+            result.get('mask_scores', result['scores']),
+            dtype=np.float64).tolist()
+        # the bbox of mask predictions is dropped before `loadRes`, so the
+        # area and bbox are computed from the masks
+        areas = maskUtils.area(masks).tolist()
+        bboxes = maskUtils.toBbox(masks).tolist()
+        return [
+            dict(
+                id=ann_id,
+                image_id=image_id,
+                segmentation=mask,
+                bbox=bbox,
+                score=score,
+                category_id=cat_id,
+                area=area,
+                iscrowd=0) for ann_id, mask, bbox, score, cat_id, area in zip(
+                    ids, masks, bboxes, scores, cat_ids, areas)
+        ]
+
+    def _evaluate_img(self, gt: dict, result: Optional[dict]) -> dict:
+        """Match the detections of an image to its ground truth.
+
+        The matching reuses :meth:`COCOevalMP.evaluateImg`, and only keeps
+        what ``COCOeval.accumulate`` needs from its outputs.
+
+        Args:
+            gt (dict): Ground truth of the image.
+            result (dict, optional): Predictions of the image. None means
+                no detection.
+
+        Returns:
+            dict: The per-image match tables of each metric, whose values are
+            lists of (category index, area range index, match table).
+        """
+        if self._incremental_evals is None:
+            self._init_incremental_evals()
+        img_id = gt['img_id']
+        gt_anns = self._gt_to_coco_anns(gt)
+        for ann in gt_anns:
+            ann['ignore'] = 'iscrowd' in ann and ann['iscrowd']
+
+        record = dict(img_id=img_id, num_dets=0, eval_imgs=dict())
+        for metric, coco_eval in self._incremental_evals.items():
+            p = coco_eval.params
+            dt_anns = [] if result is None else self._pred_to_coco_anns(
+                result, p.iouType)
+            record['num_dets'] = len(dt_anns)
+            coco_eval._gts = defaultdict(list)
+            coco_eval._dts = defaultdict(list)
+            for ann in gt_anns:
+                if ann['category_id'] in p.catIds or not p.useCats:
+                    coco_eval._gts[img_id,
+                                   ann['category_id']].append(dict(ann))
+            for ann in dt_anns:
+                if ann['category_id'] in p.catIds or not p.useCats:
+                    coco_eval._dts[img_id, ann['category_id']].append(ann)
+
+            if p.useCats:
+                cat_ids = sorted({cat_id
+                                  for _, cat_id in coco_eval._gts}
+                                 | {cat_id
+                                    for _, cat_id in coco_eval._dts})
+                cat_inds = [p.catIds.index(cat_id) for cat_id in cat_ids]
+            else:
+                cat_ids, cat_inds = [-1], [0]
+            eval_imgs = []
+            for cat_idx, cat_id in zip(cat_inds, cat_ids):
+                for area_idx, area_rng in enumerate(p.areaRng):
+                    eval_img = coco_eval.evaluateImg(img_id, cat_id, area_rng,
+                                                     p.maxDets[-1])
+                    if eval_img is None:
+                        continue
+                    eval_imgs.append(
+                        (cat_idx, area_idx,
+                         dict(
+                             dtScores=np.array(eval_img['dtScores']),
+                             dtMatches=eval_img['dtMatches'].astype(bool),
+                             dtIgnore=eval_img['dtIgnore'],
+                             gtIgnore=np.array(
+                                 eval_img['gtIgnore'], dtype=np.uint8))))
+            record['eval_imgs'][metric] = eval_imgs
+        return record
+
+    def _accumulate_incremental(self, metric: str,
+                                records: Sequence[dict]) -> COCOeval:
+        """Gather the per-image match tables of ``metric`` into a COCO
+        evaluator, as if ``evaluate()`` had been called.
+
+        Args:
+            metric (str): The metric to gather.
+            records (Sequence[dict]): The per-image results of
+                :meth:`_evaluate_img`.
+
+        Returns:
+            COCOeval: The evaluator ready to ``accumulate()``.
+        """
+        params = copy.deepcopy(self._incremental_evals[metric].params)
+        params.imgIds = list(
+            np.unique([record['img_id'] for record in records]))
+        img_inds = {img_id: i for i, img_id in enumerate(params.imgIds)}
+        num_cats = len(params.catIds) if params.useCats else 1
+        num_areas = len(params.areaRng)
+        num_imgs = len(params.imgIds)
+
+        eval_imgs = [None] * (num_cats * num_areas * num_imgs)
+        for record in records:
+            img_idx = img_inds[record['img_id']]
+            for cat_idx, area_idx, eval_img in record['eval_imgs'][metric]:
+                eval_imgs[cat_idx * num_areas * num_imgs +
+                          area_idx * num_imgs + img_idx] = eval_img
+
+        if self.use_mp_eval:
+            coco_eval = COCOevalMP(self._coco_api, None, params.iouType)
+        else:
+            coco_eval = COCOeval(self._coco_api, None, params.iouType)
+        coco_eval.params = params
+        coco_eval.evalImgs = eval_imgs
+        coco_eval._paramsEval = copy.deepcopy(params)
+        return coco_eval
+
+    def _load_res(self, anns: List[dict]) -> COCO:
+        """Build the COCO api of predictions from the annotations converted
+        by :meth:`results2coco`, the same as ``COCO.loadRes``.
+
+        Args:
+            anns (List[dict]): The annotations of predictions.
+
+        Returns:
+            COCO: The COCO api of predictions.
+        """
+        if len(anns) == 0:
+            # keep the same behavior as `COCO.loadRes`
+            raise IndexError('The predictions are empty.')
+        img_ids = {ann['image_id'] for ann in anns}
+        assert img_ids <= set(self._coco_api.get_img_ids()), \
+            'Results do not correspond to current coco set'
+        return COCO(
+            dict(
+                images=list(self._coco_api.dataset['images']),
+                categories=copy.deepcopy(self._coco_api.dataset['categories']),
+                annotations=anns))
 
     # TODO: data_batch is no longer needed, consider adjusting the
     #  parameter position
@@ -362,9 +692,12 @@ class CocoMetric(BaseMetric):
             result['labels'] = pred['labels'].cpu().numpy()
             # encode mask to RLE
             if 'masks' in pred:
-                result['masks'] = encode_mask_results(
-                    pred['masks'].detach().cpu().numpy()) if isinstance(
-                        pred['masks'], torch.Tensor) else pred['masks']
+                masks = pred['masks']
+                if isinstance(masks, torch.Tensor):
+                    masks = masks.detach().cpu().numpy()
+                # RLE masks are not decoded to bitmaps
+                result['masks'] = encode_mask_results(masks) if isinstance(
+                    masks, (np.ndarray, RLEMasks)) else masks
             # some detectors use different scores for bbox and mask
             if 'mask_scores' in pred:
                 result['mask_scores'] = pred['mask_scores'].cpu().numpy()
@@ -380,6 +713,10 @@ class CocoMetric(BaseMetric):
                     'ground truth is required for evaluation when ' \
                     '`ann_file` is not provided'
                 gt['anns'] = data_sample['instances']
+            if self.incremental_eval:
+                # only keep the match tables of this image
+                self.results.append(self._evaluate_img(gt, result))
+                continue
             # add converted result to the results list
             self.results.append((gt, result))
 
@@ -395,32 +732,57 @@ class CocoMetric(BaseMetric):
         """
         logger: MMLogger = MMLogger.get_current_instance()
 
-        # split gt and prediction list
-        gts, preds = zip(*results)
-
         tmp_dir = None
-        if self.outfile_prefix is None:
-            tmp_dir = tempfile.TemporaryDirectory()
-            outfile_prefix = osp.join(tmp_dir.name, 'results')
+        if self.incremental_eval:
+            # detections have been matched in `process`
+            if self._incremental_evals is None:
+                self._init_incremental_evals()
+            results = list(results)
+            if self.img_ids is not None:
+                # images without any prediction still count their gts
+                seen = {record['img_id'] for record in results}
+                results += [
+                    self._evaluate_img(dict(img_id=img_id), None)
+                    for img_id in self.img_ids if img_id not in seen
+                ]
+            num_dets = sum(record['num_dets'] for record in results)
+            result_files = dict()
         else:
-            outfile_prefix = self.outfile_prefix
-
-        if self._coco_api is None:
-            # use converted gt json file to initialize coco api
-            logger.info('Converting ground truth to coco format...')
-            coco_json_path = self.gt_to_coco_json(
-                gt_dicts=gts, outfile_prefix=outfile_prefix)
-            self._coco_api = COCO(coco_json_path)
-
-        # handle lazy init
-        if self.cat_ids is None:
-            self.cat_ids = self._coco_api.get_cat_ids(
-                cat_names=self.dataset_meta['classes'])
-        if self.img_ids is None:
-            self.img_ids = self._coco_api.get_img_ids()
+            # split gt and prediction list
+            gts, preds = zip(*results)
+
+            # json files are dumped only if required
+            dump_results = (not self.in_memory_results
+                            or self.outfile_prefix is not None)
+            if self.outfile_prefix is None and dump_results:
+                tmp_dir = tempfile.TemporaryDirectory()
+                outfile_prefix = osp.join(tmp_dir.name, 'results')
+            else:
+                outfile_prefix = self.outfile_prefix
 
-        # convert predictions to coco format and dump to json file
-        result_files = self.results2json(preds, outfile_prefix)
+            if self._coco_api is None:
+                logger.info('Converting ground truth to coco format...')
+                if dump_results:
+                    # use converted gt json file to initialize coco api
+                    coco_json_path = self.gt_to_coco_json(
+                        gt_dicts=gts, outfile_prefix=outfile_prefix)
+                    self._coco_api = COCO(coco_json_path)
+                else:
+                    self._coco_api = COCO(self.gt_to_coco_dict(gts))
+
+            # handle lazy init
+            if self.cat_ids is None:
+                self.cat_ids = self._coco_api.get_cat_ids(
+                    cat_names=self.dataset_meta['classes'])
+            if self.img_ids is None:
+                self.img_ids = self._coco_api.get_img_ids()
+
+            # convert predictions to coco format and dump to json file
+            result_files = dict()
+            if dump_results:
+                result_files = self.results2json(preds, outfile_prefix)
+            if self.in_memory_results and not self.format_only:
+                result_files = self.results2coco(preds)
 
         eval_results = OrderedDict()
         if self.format_only:
@@ -446,35 +808,48 @@ class CocoMetric(BaseMetric):
 
             # evaluate proposal, bbox and segm
             iou_type = 'bbox' if metric == 'proposal' else metric
-            if metric not in result_files:
-                raise KeyError(f'{metric} is not in results')
-            try:
-                predictions = load(result_files[metric])
-                if iou_type == 'segm':
-                    # Refer to https://github.com/cocodataset/cocoapi/blob/master/PythonAPI/pycocotools/coco.py#L331  # noqa
-                    # When evaluating mask AP, if the results contain bbox,
-                    # cocoapi will use the box area instead of the mask area
-                    # for calculating the instance area. Though the overall AP
-                    # is not affected, this leads to different
-                    # small/medium/large mask AP results.
-                    for x in predictions:
-                        x.pop('bbox')
-                coco_dt = self._coco_api.loadRes(predictions)
-
-            except IndexError:
-                logger.error(
-                    'The testing results of the whole dataset is empty.')
-                break
-
-            if self.use_mp_eval:
-                coco_eval = COCOevalMP(self._coco_api, coco_dt, iou_type)
+            if self.incremental_eval:
+                if num_dets == 0:
+                    logger.error(
+                        'The testing results of the whole dataset is empty.')
+                    break
+                coco_eval = self._accumulate_incremental(metric, results)
             else:
-                coco_eval = COCOeval(self._coco_api, coco_dt, iou_type)
-
-            coco_eval.params.catIds = self.cat_ids
-            coco_eval.params.imgIds = self.img_ids
-            coco_eval.params.maxDets = list(self.proposal_nums)
-            coco_eval.params.iouThrs = self.iou_thrs
+                if metric not in result_files:
+                    raise KeyError(f'{metric} is not in results')
+                try:
+                    if self.in_memory_results:
+                        # the predictions are already in the format of
+                        # `loadRes`, with areas computed from masks for segm
+                        coco_dt = self._load_res(result_files[metric])
+                    else:
+                        predictions = load(result_files[metric])
+                        if iou_type == 'segm':
+                            # Refer to https://github.com/cocodataset/cocoapi/blob/master/PythonAPI/pycocotools/coco.py#L331  # noqa
+                            # When evaluating mask AP, if the results contain
+                            # bbox, cocoapi will use the box area instead of
+                            # the mask area for calculating the instance area.
+                            # Though the overall AP is not affected, this
+                            # leads to different small/medium/large mask AP
+                            # results.
+                            for x in predictions:
+                                x.pop('bbox')
+                        coco_dt = self._coco_api.loadRes(predictions)
+
+                except IndexError:
+                    logger.error(
+                        'The testing results of the whole dataset is empty.')
+                    break
+
+                if self.use_mp_eval:
+                    coco_eval = COCOevalMP(self._coco_api, coco_dt, iou_type)
+                else:
+                    coco_eval = COCOeval(self._coco_api, coco_dt, iou_type)
+
+                coco_eval.params.catIds = self.cat_ids
+                coco_eval.params.imgIds = self.img_ids
+                coco_eval.params.maxDets = list(self.proposal_nums)
+                coco_eval.params.iouThrs = self.iou_thrs
 
             # mapping of cocoEval.stats
             coco_metric_names = {
@@ -500,7 +875,8 @@ class CocoMetric(BaseMetric):
 
             if metric == 'proposal':
                 coco_eval.params.useCats = 0
-                coco_eval.evaluate()
+                if not self.incremental_eval:
+                    coco_eval.evaluate()
                 coco_eval.accumulate()
                 coco_eval.summarize()
                 if metric_items is None:
@@ -514,7 +890,8 @@ class CocoMetric(BaseMetric):
                         f'{coco_eval.stats[coco_metric_names[item]]:.3f}')
                     eval_results[item] = val
             else:
-                coco_eval.evaluate()
+                if not self.incremental_eval:
+                    coco_eval.evaluate()
                 coco_eval.accumulate()
                 coco_eval.summarize()
                 if self.classwise:  # Compute per-category AP
@@ -529,7 +906,12 @@ class CocoMetric(BaseMetric):
                         t = []
                         # area range index 0: all area ranges
                         # max dets index -1: typically 100 per image
-                        nm = self._coco_api.loadCats(cat_id)[0]
+                        if self._coco_api is not None:
+                            nm = self._coco_api.loadCats(cat_id)[0]
+                        else:
+                            # gts converted from the dataset are labelled
+                            # by class indices
+                            nm = dict(name=self.dataset_meta['classes'][idx])
                         precision = precisions[:, :, idx, 0, -1]
                         precision = precision[precision > -1]
                         if precision.size:
@@ -6,7 +6,7 @@ from mmengine.evaluator import DumpResults
 from mmengine.evaluator.metric import _to_cpu
 
 from mmdet.registry import METRICS
-from mmdet.structures.mask import encode_mask_results
+from mmdet.structures.mask import RLEMasks, encode_mask_results
 
 
 @METRICS.register_module()
@@ -37,7 +37,10 @@ class DumpDetResults(DumpResults):
                 pred = data_sample['pred_instances']
                 # encode mask to RLE
                 if 'masks' in pred:
-                    pred['masks'] = encode_mask_results(pred['masks'].numpy())
+                    masks = pred['masks']
+                    if not isinstance(masks, RLEMasks):
+                        masks = masks.numpy()
+                    pred['masks'] = encode_mask_results(masks)
             if 'pred_panoptic_seg' in data_sample:
                 warnings.warn(
                     'Panoptic segmentation map will not be compressed. '
@@ -1,7 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .data_preprocessor import (BatchFixedSizePad, BatchResize,
-                                BatchSyncRandomResize, BoxInstDataPreprocessor,
-                                DetDataPreprocessor,
+from .data_preprocessor import (BatchFixedSizePad, BatchMixUp, BatchMosaic,
+                                BatchRandomAffine, BatchResize,
+                                BatchSyncRandomResize, BatchYOLOXHSVRandomAug,
+                                BoxInstDataPreprocessor, DetDataPreprocessor,
                                 MultiBranchDataPreprocessor)
 from .reid_data_preprocessor import ReIDDataPreprocessor
 from .track_data_preprocessor import TrackDataPreprocessor
@@ -9,5 +10,6 @@ from .track_data_preprocessor import TrackDataPreprocessor
 __all__ = [
     'DetDataPreprocessor', 'BatchSyncRandomResize', 'BatchFixedSizePad',
     'MultiBranchDataPreprocessor', 'BatchResize', 'BoxInstDataPreprocessor',
-    'TrackDataPreprocessor', 'ReIDDataPreprocessor'
+    'TrackDataPreprocessor', 'ReIDDataPreprocessor', 'BatchMosaic',
+    'BatchMixUp', 'BatchRandomAffine', 'BatchYOLOXHSVRandomAug'
 ]
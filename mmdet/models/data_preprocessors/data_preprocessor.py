@@ -10,7 +10,7 @@ import torch.nn.functional as F
 from mmengine.dist import barrier, broadcast, get_dist_info
 from mmengine.logging import MessageHub
 from mmengine.model import BaseDataPreprocessor, ImgDataPreprocessor
-from mmengine.structures import PixelData
+from mmengine.structures import InstanceData, PixelData
 from mmengine.utils import is_seq_of
 from torch import Tensor
 
@@ -18,6 +18,7 @@ from mmdet.models.utils import unfold_wo_center
 from mmdet.models.utils.misc import samplelist_boxtype2tensor
 from mmdet.registry import MODELS
 from mmdet.structures import DetDataSample
+from mmdet.structures.bbox import BaseBoxes, HorizontalBoxes
 from mmdet.structures.mask import BitmapMasks
 from mmdet.utils import ConfigType
 
@@ -375,6 +376,603 @@ class BatchFixedSizePad(nn.Module):
         return inputs, data_samples
 
 
+class _BatchPixelAugment(nn.Module):
+    """Base class of the batch augmentations which fill or mix pixels of the
+    normalized batch inputs.
+
+    The pixel values in the arguments of the augmentations are in the space
+    of the raw images, i.e. before the normalization of the data
+    preprocessor, so that they are the same as the per-sample transforms.
+
+    Args:
+        mean (Sequence[Number], optional): The pixel mean used by the data
+            preprocessor. Defaults to None.
+        std (Sequence[Number], optional): The pixel standard deviation used
+            by the data preprocessor. Defaults to None.
+    """
+
+    def __init__(self,
+                 mean: Optional[Sequence[Number]] = None,
+                 std: Optional[Sequence[Number]] = None) -> None:
+        super().__init__()
+        self.mean = mean
+        self.std = std
+
+    def _normalize_value(self, value: Union[Number, Sequence[Number]],
+                         inputs: Tensor) -> Tensor:
+        """Normalize a raw pixel value to a (C, 1, 1) tensor."""
+        value = inputs.new_tensor(value).expand(inputs.size(1))
+        if self.mean is not None:
+            value = value - inputs.new_tensor(self.mean)
+        if self.std is not None:
+            value = value / inputs.new_tensor(self.std)
+        return value.view(-1, 1, 1)
+
+    @staticmethod
+    def _sample_axis_aligned(inputs: Tensor, scale: Tensor, offset: Tensor,
+                             out_size: Tuple[int, int]) -> Tensor:
+        """Sample each image with an axis-aligned linear map from the output
+        coordinates to the input coordinates, i.e. ``u = scale * x +
+        offset``.
+
+        Args:
+            inputs (Tensor): Images in shape (N, C, H, W).
+            scale (Tensor): Scale of x and y of each image, in shape (N, 2).
+            offset (Tensor): Offset of x and y of each image, in shape (N, 2).
+            out_size (tuple[int, int]): The output size (h, w).
+
+        Returns:
+            Tensor: Sampled images in shape (N, C, out_h, out_w).
+        """
+        h, w = inputs.shape[-2:]
+        out_h, out_w = out_size
+        # coordinates of pixel centers
+        xs = inputs.new_tensor(range(out_w)) + 0.5
+        ys = inputs.new_tensor(range(out_h)) + 0.5
+        u = scale[:, None, None, 0] * xs[None, None] + offset[:, None, None, 0]
+        v = scale[:, None, None, 1] * ys[None, :, None] + offset[:, None, None,
+                                                                 1]
+        grid = torch.stack(
+            torch.broadcast_tensors(u * (2 / w) - 1,
+                                    v * (2 / h) - 1), dim=-1)
+        return F.grid_sample(
+            inputs, grid, mode='bilinear', align_corners=False)
+
+    @staticmethod
+    def _get_boxes(instances: InstanceData) -> HorizontalBoxes:
+        """Get the bboxes of instances as :obj:`HorizontalBoxes`."""
+        bboxes = instances.bboxes
+        if isinstance(bboxes, BaseBoxes):
+            return bboxes.clone()
+        return HorizontalBoxes(bboxes, clone=True)
+
+    @staticmethod
+    def _with_boxes(instances: InstanceData,
+                    bboxes: HorizontalBoxes) -> InstanceData:
+        """Copy the instances with new bboxes of the same type as the old
+        bboxes."""
+        results = instances.new()
+        for key, value in instances.items():
+            if key == 'bboxes':
+                if not isinstance(value, BaseBoxes):
+                    bboxes = bboxes.tensor
+                results.bboxes = bboxes
+            else:
+                results[key] = value
+        return results
+
+
+@MODELS.register_module()
+class BatchMosaic(_BatchPixelAugment):
+    """Batch version of :class:`mmdet.datasets.transforms.Mosaic`.
+
+    Each image of the batch is combined with 3 images randomly chosen from
+    the same batch, rather than from the dataset. The images are resized and
+    pasted by ``grid_sample`` over the whole batch, so the batch inputs
+    should be padded images of similar sizes. ``img_shape`` of the data
+    samples gives the valid region of each image.
+
+    The output images are in shape (2 * img_scale[1], 2 * img_scale[0]), and
+    are usually cropped back by :class:`BatchRandomAffine` with a negative
+    ``border``. Only bboxes are supported. As the images of a batch should
+    be in the same shape, ``prob`` is the probability of applying mosaic to
+    the whole batch.
+
+    Args:
+        img_scale (Sequence[int]): Image size before mosaic pipeline of single
+            image. The shape order should be (width, height).
+            Defaults to (640, 640).
+        center_ratio_range (Sequence[float]): Center ratio range of mosaic
+            output. Defaults to (0.5, 1.5).
+        bbox_clip_border (bool, optional): Whether to clip the objects outside
+            the border of the image. Defaults to True.
+        pad_val (float): Pad value. Defaults to 114.
+        prob (float): Probability of applying this transformation.
+            Defaults to 1.0.
+        mean (Sequence[Number], optional): The pixel mean used by the data
+            preprocessor. Defaults to None.
+        std (Sequence[Number], optional): The pixel standard deviation used
+            by the data preprocessor. Defaults to None.
+    """
+
+    def __init__(self,
+                 img_scale: Tuple[int, int] = (640, 640),
+                 center_ratio_range: Tuple[float, float] = (0.5, 1.5),
+                 bbox_clip_border: bool = True,
+                 pad_val: float = 114.0,
+                 prob: float = 1.0,
+                 mean: Optional[Sequence[Number]] = None,
+                 std: Optional[Sequence[Number]] = None) -> None:
+        assert 0 <= prob <= 1.0, 'The probability should be in range [0,1]. ' \
+                                 f'got {prob}.'
+        super().__init__(mean=mean, std=std)
+        self.img_scale = img_scale
+        self.center_ratio_range = center_ratio_range
+        self.bbox_clip_border = bbox_clip_border
+        self.pad_val = pad_val
+        self.prob = prob
+
+    def forward(
+        self, inputs: Tensor, data_samples: List[DetDataSample]
+    ) -> Tuple[Tensor, List[DetDataSample]]:
+        """Combine each image of the batch with 3 other images."""
+        if np.random.uniform(0, 1) > self.prob:
+            return inputs, data_samples
+
+        num_imgs = inputs.size(0)
+        out_w, out_h = self.img_scale[0] * 2, self.img_scale[1] * 2
+
+        # the first image is itself, the others are randomly chosen
+        src_inds = np.concatenate([
+            np.arange(num_imgs)[:, None],
+            np.random.randint(0, num_imgs, (num_imgs, 3))
+        ],
+                                  axis=1)
+        img_shapes = np.array([s.img_shape[:2] for s in data_samples],
+                              dtype=np.float64)[src_inds]
+        scale_ratios = np.minimum(self.img_scale[1] / img_shapes[..., 0],
+                                  self.img_scale[0] / img_shapes[..., 1])
+        resized_h = (img_shapes[..., 0] * scale_ratios).astype(np.int64)
+        resized_w = (img_shapes[..., 1] * scale_ratios).astype(np.int64)
+        center_x = (np.random.uniform(*self.center_ratio_range,
+                                      (num_imgs, 1)) *
+                    self.img_scale[0]).astype(np.int64)
+        center_y = (np.random.uniform(*self.center_ratio_range,
+                                      (num_imgs, 1)) *
+                    self.img_scale[1]).astype(np.int64)
+
+        # paste coordinates of top_left, top_right, bottom_left and
+        # bottom_right images, the same as `Mosaic._mosaic_combine`
+        is_left = np.array([True, False, True, False])
+        is_top = np.array([True, True, False, False])
+        x1 = np.where(is_left, np.maximum(center_x - resized_w, 0), center_x)
+        x2 = np.where(is_left, center_x, np.minimum(center_x + resized_w,
+                                                    out_w))
+        y1 = np.where(is_top, np.maximum(center_y - resized_h, 0), center_y)
+        y2 = np.where(is_top, center_y, np.minimum(center_y + resized_h,
+                                                   out_h))
+        pad_x = x1 - np.where(is_left, resized_w - (x2 - x1), 0)
+        pad_y = y1 - np.where(is_top, resized_h - (y2 - y1), 0)
+
+        outputs = self._normalize_value(self.pad_val,
+                                        inputs).expand(num_imgs, -1, out_h,
+                                                       out_w)
+        xs = torch.arange(out_w, device=inputs.device)
+        ys = torch.arange(out_h, device=inputs.device)
+        for i in range(4):
+            scale = inputs.new_tensor(1 / scale_ratios[:, i])[:, None]
+            offset = -inputs.new_tensor(
+                np.stack([pad_x[:, i], pad_y[:, i]], axis=1)) * scale
+            patches = self._sample_axis_aligned(
+                inputs[torch.from_numpy(src_inds[:, i]).to(inputs.device)],
+                scale.expand(-1, 2), offset, (out_h, out_w))
+            region = inputs.new_tensor(
+                np.stack([x1[:, i], y1[:, i], x2[:, i], y2[:, i]], axis=1))
+            valid = (xs >= region[:, None, None, 0]) & (
+                xs < region[:, None, None,
+                            2]) & (ys[:, None] >= region[:, None, None, 1]) & (
+                                ys[:, None] < region[:, None, None, 3])
+            outputs = torch.where(valid[:, None], patches, outputs)
+
+        keys = ['gt_instances']
+        if 'ignored_instances' in data_samples[0]:
+            keys.append('ignored_instances')
+        results = []
+        for i in range(num_imgs):
+            mosaic_instances = {}
+            for key in keys:
+                patches = []
+                for j, src_ind in enumerate(src_inds[i].tolist()):
+                    instances = data_samples[src_ind].get(key)
+                    assert 'masks' not in instances, \
+                        'BatchMosaic only supports bbox.'
+                    bboxes = self._get_boxes(instances)
+                    bboxes.rescale_([scale_ratios[i, j]] * 2)
+                    bboxes.translate_([pad_x[i, j], pad_y[i, j]])
+                    patches.append(self._with_boxes(instances, bboxes))
+                instances = patches[0].cat(patches)
+                bboxes = self._get_boxes(instances)
+                if self.bbox_clip_border:
+                    bboxes.clip_([out_h, out_w])
+                inside_inds = bboxes.is_inside([out_h, out_w])
+                mosaic_instances[key] = self._with_boxes(instances,
+                                                         bboxes)[inside_inds]
+            results.append(mosaic_instances)
+
+        for data_sample, mosaic_instances in zip(data_samples, results):
+            for key, instances in mosaic_instances.items():
+                data_sample.set_field(instances, key)
+            data_sample.set_metainfo({
+                'img_shape': (out_h, out_w),
+                'pad_shape': (out_h, out_w),
+                'batch_input_shape': (out_h, out_w)
+            })
+        return outputs.contiguous(), data_samples
+
+
+@MODELS.register_module()
+class BatchMixUp(_BatchPixelAugment):
+    """Batch version of :class:`mmdet.datasets.transforms.MixUp`.
+
+    Each image of the batch is mixed with another image randomly chosen from
+    the same batch, rather than from the dataset. The chosen images are
+    resized, flipped and cropped by ``grid_sample`` over the whole batch.
+    Images are not mixed with chosen images without bboxes. Only bboxes are
+    supported.
+
+    Args:
+        img_scale (Sequence[int]): Image output size after mixup pipeline.
+            The shape order should be (width, height). Defaults to (640, 640).
+        ratio_range (Sequence[float]): Scale ratio of mixup image.
+            Defaults to (0.5, 1.5).
+        flip_ratio (float): Horizontal flip ratio of mixup image.
+            Defaults to 0.5.
+        pad_val (float): Pad value. Defaults to 114.
+        bbox_clip_border (bool, optional): Whether to clip the objects outside
+            the border of the image. Defaults to True.
+        mean (Sequence[Number], optional): The pixel mean used by the data
+            preprocessor. Defaults to None.
+        std (Sequence[Number], optional): The pixel standard deviation used
+            by the data preprocessor. Defaults to None.
+    """
+
+    def __init__(self,
+                 img_scale: Tuple[int, int] = (640, 640),
+                 ratio_range: Tuple[float, float] = (0.5, 1.5),
+                 flip_ratio: float = 0.5,
+                 pad_val: float = 114.0,
+                 bbox_clip_border: bool = True,
+                 mean: Optional[Sequence[Number]] = None,
+                 std: Optional[Sequence[Number]] = None) -> None:
+        super().__init__(mean=mean, std=std)
+        self.img_scale = img_scale
+        self.ratio_range = ratio_range
+        self.flip_ratio = flip_ratio
+        self.pad_val = pad_val
+        self.bbox_clip_border = bbox_clip_border
+
+    def forward(
+        self, inputs: Tensor, data_samples: List[DetDataSample]
+    ) -> Tuple[Tensor, List[DetDataSample]]:
+        """Mix each image of the batch with another image."""
+        num_imgs = inputs.size(0)
+        h, w = inputs.shape[-2:]
+        src_inds = np.random.randint(0, num_imgs, num_imgs)
+        is_mixed = np.array(
+            [len(data_samples[i].gt_instances) > 0 for i in src_inds])
+
+        src_shapes = np.array([s.img_shape[:2] for s in data_samples],
+                              dtype=np.float64)
+        target_h, target_w = src_shapes.astype(np.int64).T
+        src_shapes = src_shapes[src_inds]
+        jit_factors = np.random.uniform(*self.ratio_range, num_imgs)
+        is_flip = np.random.uniform(0, 1, num_imgs) > self.flip_ratio
+        scale_ratios = np.minimum(
+            self.img_scale[1] / src_shapes[:, 0],
+            self.img_scale[0] / src_shapes[:, 1]) * jit_factors
+        origin_h = (self.img_scale[1] * jit_factors).astype(np.int64)
+        origin_w = (self.img_scale[0] * jit_factors).astype(np.int64)
+        x_offsets = np.random.randint(
+            0,
+            np.maximum(origin_w, target_w) - target_w + 1)
+        y_offsets = np.random.randint(
+            0,
+            np.maximum(origin_h, target_h) - target_h + 1)
+
+        # map the output coordinates to the chosen images, with the offsets
+        # of random crop and the horizontal flip
+        scale = np.stack([np.where(is_flip, -1, 1),
+                          np.ones(num_imgs)], axis=1) / scale_ratios[:, None]
+        offset = np.stack(
+            [np.where(is_flip, origin_w - x_offsets, x_offsets), y_offsets],
+            axis=1) / scale_ratios[:, None]
+        scale, offset = inputs.new_tensor(scale), inputs.new_tensor(offset)
+        mixed = self._sample_axis_aligned(
+            inputs[torch.from_numpy(src_inds).to(inputs.device)], scale,
+            offset, (h, w))
+
+        xs = inputs.new_tensor(range(w)) + 0.5
+        ys = inputs.new_tensor(range(h)) + 0.5
+        u = scale[:, None, None, 0] * xs + offset[:, None, None, 0]
+        v = scale[:, None, None, 1] * ys[:, None] + offset[:, None, None, 1]
+        src_shapes = inputs.new_tensor(src_shapes)
+        valid = (u >= 0) & (u < src_shapes[:, None, None, 1]) & (v >= 0) & (
+            v < src_shapes[:, None, None, 0])
+        mixed = torch.where(valid[:, None], mixed,
+                            self._normalize_value(self.pad_val, inputs))
+        targets = inputs.new_tensor(np.stack([target_w, target_h], axis=1))
+        in_target = (xs < targets[:, None, None, 0]) & (
+            ys[:, None] < targets[:, None, None, 1])
+        in_target &= torch.from_numpy(is_mixed).to(inputs.device)[:, None,
+                                                                  None]
+        outputs = torch.where(in_target[:, None], 0.5 * inputs + 0.5 * mixed,
+                              inputs)
+
+        keys = ['gt_instances']
+        if 'ignored_instances' in data_samples[0]:
+            keys.append('ignored_instances')
+        results = []
+        for i, src_ind in enumerate(src_inds.tolist()):
+            mixup_instances = {}
+            for key in keys:
+                instances = data_samples[i].get(key)
+                if not is_mixed[i]:
+                    mixup_instances[key] = instances
+                    continue
+                retrieve_instances = data_samples[src_ind].get(key)
+                assert 'masks' not in instances, \
+                    'BatchMixUp only supports bbox.'
+                bboxes = self._get_boxes(retrieve_instances)
+                bboxes.rescale_([scale_ratios[i]] * 2)
+                if self.bbox_clip_border:
+                    bboxes.clip_([origin_h[i], origin_w[i]])
+                if is_flip[i]:
+                    bboxes.flip_([origin_h[i], origin_w[i]],
+                                 direction='horizontal')
+                bboxes.translate_([-x_offsets[i], -y_offsets[i]])
+                if self.bbox_clip_border:
+                    bboxes.clip_([target_h[i], target_w[i]])
+                instances = instances.cat(
+                    [instances,
+                     self._with_boxes(retrieve_instances, bboxes)])
+                inside_inds = self._get_boxes(instances).is_inside(
+                    [target_h[i], target_w[i]])
+                mixup_instances[key] = instances[inside_inds]
+            results.append(mixup_instances)
+
+        for data_sample, mixup_instances in zip(data_samples, results):
+            for key, instances in mixup_instances.items():
+                data_sample.set_field(instances, key)
+        return outputs, data_samples
+
+
+@MODELS.register_module()
+class BatchRandomAffine(_BatchPixelAugment):
+    """Batch version of :class:`mmdet.datasets.transforms.RandomAffine`.
+
+    A random affine matrix is generated for each image, and all the images
+    are warped by a single ``grid_sample``. The output size is computed from
+    the size of the batch inputs, so the images should fill the batch inputs,
+    e.g. the outputs of :class:`BatchMosaic`. Only bboxes are supported.
+
+    Args:
+        max_rotate_degree (float): Maximum degrees of rotation transform.
+            Defaults to 10.
+        max_translate_ratio (float): Maximum ratio of translation.
+            Defaults to 0.1.
+        scaling_ratio_range (tuple[float]): Min and max ratio of
+            scaling transform. Defaults to (0.5, 1.5).
+        max_shear_degree (float): Maximum degrees of shear
+            transform. Defaults to 2.
+        border (tuple[int]): Distance from width and height sides of input
+            image to adjust output shape. Only used after mosaic.
+            Defaults to (0, 0).
+        border_val (tuple[int]): Border padding values of 3 channels.
+            Defaults to (114, 114, 114).
+        bbox_clip_border (bool, optional): Whether to clip the objects outside
+            the border of the image. Defaults to True.
+        mean (Sequence[Number], optional): The pixel mean used by the data
+            preprocessor. Defaults to None.
+        std (Sequence[Number], optional): The pixel standard deviation used
+            by the data preprocessor. Defaults to None.
+    """
+
+    def __init__(self,
+                 max_rotate_degree: float = 10.0,
+                 max_translate_ratio: float = 0.1,
+                 scaling_ratio_range: Tuple[float, float] = (0.5, 1.5),
+                 max_shear_degree: float = 2.0,
+                 border: Tuple[int, int] = (0, 0),
+                 border_val: Tuple[int, int, int] = (114, 114, 114),
+                 bbox_clip_border: bool = True,
+                 mean: Optional[Sequence[Number]] = None,
+                 std: Optional[Sequence[Number]] = None) -> None:
+        super().__init__(mean=mean, std=std)
+        assert 0 <= max_translate_ratio <= 1
+        assert scaling_ratio_range[0] <= scaling_ratio_range[1]
+        assert scaling_ratio_range[0] > 0
+        self.max_rotate_degree = max_rotate_degree
+        self.max_translate_ratio = max_translate_ratio
+        self.scaling_ratio_range = scaling_ratio_range
+        self.max_shear_degree = max_shear_degree
+        self.border = border
+        self.border_val = border_val
+        self.bbox_clip_border = bbox_clip_border
+
+    def _get_random_homography_matrices(self, num_imgs: int, height: int,
+                                        width: int) -> np.ndarray:
+        """Generate the warp matrices of all images in the same way as
+        ``RandomAffine._get_random_homography_matrix``."""
+
+        def uniform(low, high):
+            return np.random.uniform(low, high, num_imgs)
+
+        rotation = np.radians(
+            uniform(-self.max_rotate_degree, self.max_rotate_degree))
+        scaling = uniform(*self.scaling_ratio_range)
+        x_shear = np.tan(
+            np.radians(uniform(-self.max_shear_degree, self.max_shear_degree)))
+        y_shear = np.tan(
+            np.radians(uniform(-self.max_shear_degree, self.max_shear_degree)))
+        trans_x = uniform(-self.max_translate_ratio,
+                          self.max_translate_ratio) * width
+        trans_y = uniform(-self.max_translate_ratio,
+                          self.max_translate_ratio) * height
+
+        cos, sin = np.cos(rotation) * scaling, np.sin(rotation) * scaling
+        # translate @ shear @ rotation @ scaling
+        warp_matrices = np.zeros((num_imgs, 3, 3))
+        warp_matrices[:, 0, 0] = cos + x_shear * sin
+        warp_matrices[:, 0, 1] = -sin + x_shear * cos
+        warp_matrices[:, 0, 2] = trans_x
+        warp_matrices[:, 1, 0] = y_shear * cos + sin
+        warp_matrices[:, 1, 1] = -y_shear * sin + cos
+        warp_matrices[:, 1, 2] = trans_y
+        warp_matrices[:, 2, 2] = 1
+        return warp_matrices
+
+    def forward(
+        self, inputs: Tensor, data_samples: List[DetDataSample]
+    ) -> Tuple[Tensor, List[DetDataSample]]:
+        """Warp a batch of images and bboxes by random affine matrices."""
+        num_imgs = inputs.size(0)
+        h, w = inputs.shape[-2:]
+        height = h + self.border[1] * 2
+        width = w + self.border[0] * 2
+        warp_matrices = inputs.new_tensor(
+            self._get_random_homography_matrices(num_imgs, height, width))
+
+        # the pixel indices of the outputs mapped to the inputs, in the same
+        # way as `cv2.warpPerspective`
+        ys, xs = torch.meshgrid(
+            inputs.new_tensor(range(height)),
+            inputs.new_tensor(range(width)),
+            indexing='ij')
+        coords = torch.stack([xs, ys, torch.ones_like(xs)], dim=-1)
+        coords = torch.einsum('nij,hwj->nhwi', torch.inverse(warp_matrices),
+                              coords)
+        coords = coords[..., :2] / coords[..., 2:3]
+        grid = (coords * 2 + 1) / coords.new_tensor([w, h]) - 1
+        border_val = self._normalize_value(self.border_val, inputs)
+        outputs = F.grid_sample(
+            inputs - border_val,
+            grid,
+            mode='bilinear',
+            padding_mode='zeros',
+            align_corners=False) + border_val
+
+        keys = ['gt_instances']
+        if 'ignored_instances' in data_samples[0]:
+            keys.append('ignored_instances')
+        for data_sample, warp_matrix in zip(data_samples, warp_matrices):
+            for key in keys:
+                instances = data_sample.get(key)
+                assert 'masks' not in instances, \
+                    'BatchRandomAffine only supports bbox.'
+                bboxes = self._get_boxes(instances)
+                bboxes.project_(warp_matrix)
+                if self.bbox_clip_border:
+                    bboxes.clip_([height, width])
+                valid_index = bboxes.is_inside([height, width])
+                data_sample.set_field(
+                    self._with_boxes(instances, bboxes)[valid_index], key)
+            data_sample.set_metainfo({
+                'img_shape': (height, width),
+                'pad_shape': (height, width),
+                'batch_input_shape': (height, width)
+            })
+        return outputs, data_samples
+
+
+@MODELS.register_module()
+class BatchYOLOXHSVRandomAug(_BatchPixelAugment):
+    """Batch version of :class:`mmdet.datasets.transforms.YOLOXHSVRandomAug`.
+
+    The images are denormalized, converted to HSV in the value ranges of
+    OpenCV, shifted by random gains of each image and converted back, all in
+    tensor operations over the whole batch. Unlike the per-sample transform,
+    the intermediate values are not rounded to uint8.
+
+    Args:
+        hue_delta (int): delta of hue. Defaults to 5.
+        saturation_delta (int): delta of saturation. Defaults to 30.
+        value_delta (int): delat of value. Defaults to 30.
+        bgr_to_rgb (bool): Whether the data preprocessor converts the images
+            from BGR to RGB. Defaults to False.
+        mean (Sequence[Number], optional): The pixel mean used by the data
+            preprocessor. Defaults to None.
+        std (Sequence[Number], optional): The pixel standard deviation used
+            by the data preprocessor. Defaults to None.
+    """
+
+    def __init__(self,
+                 hue_delta: int = 5,
+                 saturation_delta: int = 30,
+                 value_delta: int = 30,
+                 bgr_to_rgb: bool = False,
+                 mean: Optional[Sequence[Number]] = None,
+                 std: Optional[Sequence[Number]] = None) -> None:
+        super().__init__(mean=mean, std=std)
+        self.hue_delta = hue_delta
+        self.saturation_delta = saturation_delta
+        self.value_delta = value_delta
+        self.bgr_to_rgb = bgr_to_rgb
+
+    def forward(
+        self, inputs: Tensor, data_samples: List[DetDataSample]
+    ) -> Tuple[Tensor, List[DetDataSample]]:
+        """Randomly shift the hue, saturation and value of a batch of
+        images."""
+        num_imgs = inputs.size(0)
+        hsv_gains = np.random.uniform(-1, 1, (num_imgs, 3)) * [
+            self.hue_delta, self.saturation_delta, self.value_delta
+        ]
+        # random selection of h, s, v
+        hsv_gains *= np.random.randint(0, 2, (num_imgs, 3))
+        hsv_gains = inputs.new_tensor(np.trunc(hsv_gains))[..., None, None]
+
+        imgs = inputs
+        if self.std is not None:
+            imgs = imgs * inputs.new_tensor(self.std).view(-1, 1, 1)
+        if self.mean is not None:
+            imgs = imgs + inputs.new_tensor(self.mean).view(-1, 1, 1)
+        if not self.bgr_to_rgb:
+            imgs = imgs.flip(1)
+
+        # rgb to hsv, with hue in [0, 180) and others in [0, 255]
+        value, max_inds = imgs.max(dim=1)
+        delta = value - imgs.min(dim=1)[0]
+        saturation = torch.where(value > 0, delta / value.clamp(min=1e-6),
+                                 torch.zeros_like(value)) * 255
+        r, g, b = imgs.unbind(dim=1)
+        safe_delta = delta.clamp(min=1e-6)
+        hue = torch.where(
+            max_inds == 0, torch.remainder((g - b) / safe_delta, 6),
+            torch.where(max_inds == 1, (b - r) / safe_delta + 2,
+                        (r - g) / safe_delta + 4)) * 30
+        hue = torch.where(delta > 0, hue, torch.zeros_like(hue))
+
+        hue = torch.remainder(hue + hsv_gains[:, 0], 180)
+        saturation = (saturation + hsv_gains[:, 1]).clamp(0, 255)
+        value = (value + hsv_gains[:, 2]).clamp(0, 255)
+
+        # hsv to rgb
+        chroma = value * saturation / 255
+        k = torch.remainder(
+            inputs.new_tensor([5, 3, 1]).view(1, 3, 1, 1) +
+            (hue / 30)[:, None], 6)
+        imgs = value[:, None] - chroma[:, None] * torch.minimum(
+            k, 4 - k).clamp(0, 1)
+
+        if not self.bgr_to_rgb:
+            imgs = imgs.flip(1)
+        if self.mean is not None:
+            imgs = imgs - inputs.new_tensor(self.mean).view(-1, 1, 1)
+        if self.std is not None:
+            imgs = imgs / inputs.new_tensor(self.std).view(-1, 1, 1)
+        return imgs, data_samples
+
+
 @MODELS.register_module()
 class MultiBranchDataPreprocessor(BaseDataPreprocessor):
     """DataPreprocessor wrapper for multi-branch data.
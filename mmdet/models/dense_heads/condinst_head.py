@@ -16,8 +16,8 @@ from mmdet.structures.bbox import cat_boxes
 from mmdet.utils import (ConfigType, InstanceList, MultiConfig, OptConfigType,
                          OptInstanceList, reduce_mean)
 from ..task_modules.prior_generators import MlvlPointGenerator
-from ..utils import (aligned_bilinear, filter_scores_and_topk, multi_apply,
-                     relative_coordinate_maps, select_single_mlvl)
+from ..utils import (aligned_bilinear, filter_scores_and_topk, masks_to_rle,
+                     multi_apply, relative_coordinate_maps, select_single_mlvl)
 from ..utils.misc import empty_instances
 from .base_mask_head import BaseMaskHead
 from .fcos_head import FCOSHead
@@ -1199,8 +1199,9 @@ class CondInstMaskHead(BaseMaskHead):
                 - scores (Tensor): Classification scores, has shape
                   (num_instance,).
                 - labels (Tensor): Has shape (num_instances,).
-                - masks (Tensor): Processed mask results, has
-                  shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Processed mask results,
+                  has shape (num_instances, h, w). They are
+                  :obj:`RLEMasks` if ``rle_mask`` of the cfg is True.
         """
         cfg = self.test_cfg if cfg is None else cfg
         scale_factor = bboxes.new_tensor(img_meta['scale_factor']).repeat(
@@ -1208,19 +1209,23 @@ class CondInstMaskHead(BaseMaskHead):
         img_h, img_w = img_meta['img_shape'][:2]
         ori_h, ori_w = img_meta['ori_shape'][:2]
 
-        mask_preds = mask_preds.sigmoid().unsqueeze(0)
-        mask_preds = aligned_bilinear(mask_preds, self.mask_out_stride)
-        mask_preds = mask_preds[:, :, :img_h, :img_w]
+        def mask_fn(mask_preds: Tensor) -> Tensor:
+            mask_preds = mask_preds.sigmoid().unsqueeze(0)
+            mask_preds = aligned_bilinear(mask_preds, self.mask_out_stride)
+            mask_preds = mask_preds[:, :, :img_h, :img_w]
+            if rescale:
+                mask_preds = F.interpolate(
+                    mask_preds, (ori_h, ori_w),
+                    mode='bilinear',
+                    align_corners=False)
+            return mask_preds.squeeze(0) > cfg.mask_thr
+
         if rescale:  # in-placed rescale the bboxes
             scale_factor = bboxes.new_tensor(img_meta['scale_factor']).repeat(
                 (1, 2))
             bboxes /= scale_factor
 
-            masks = F.interpolate(
-                mask_preds, (ori_h, ori_w),
-                mode='bilinear',
-                align_corners=False).squeeze(0) > cfg.mask_thr
-        else:
-            masks = mask_preds.squeeze(0) > cfg.mask_thr
-
-        return masks
+        if cfg.get('rle_mask', False):
+            out_shape = (ori_h, ori_w) if rescale else (img_h, img_w)
+            return masks_to_rle(mask_fn, mask_preds, out_shape)
+        return mask_fn(mask_preds)
@@ -14,11 +14,13 @@ from mmengine.structures import InstanceData
 from torch import Tensor
 
 from mmdet.models.layers.transformer import inverse_sigmoid
-from mmdet.models.utils import (filter_scores_and_topk, multi_apply,
-                                select_single_mlvl, sigmoid_geometric_mean)
+from mmdet.models.utils import (filter_scores_and_topk, masks_to_rle,
+                                multi_apply, select_single_mlvl,
+                                sigmoid_geometric_mean)
 from mmdet.registry import MODELS
 from mmdet.structures.bbox import (cat_boxes, distance2bbox, get_box_tensor,
                                    get_box_wh, scale_boxes)
+from mmdet.structures.mask import RLEMasks
 from mmdet.utils import ConfigType, InstanceList, OptInstanceList, reduce_mean
 from .rtmdet_head import RTMDetHead
 
@@ -457,7 +459,9 @@ class RTMDetInsHead(RTMDetHead):
                   (num_instances, ).
                 - bboxes (Tensor): Has a shape (num_instances, 4),
                   the last dimension 4 arrange as (x1, y1, x2, y2).
-                - masks (Tensor): Has a shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Has a shape
+                  (num_instances, h, w). They are :obj:`RLEMasks` if
+                  ``rle_mask`` of the cfg is True.
         """
         stride = self.prior_generator.strides[0][0]
         if rescale:
@@ -493,28 +497,45 @@ class RTMDetInsHead(RTMDetHead):
             mask_logits = self._mask_predict_by_feat_single(
                 mask_feat, results.kernels, results.priors)
 
-            mask_logits = F.interpolate(
-                mask_logits.unsqueeze(0), scale_factor=stride, mode='bilinear')
             if rescale:
                 ori_h, ori_w = img_meta['ori_shape'][:2]
+                out_shape = (ori_h, ori_w)
+            else:
+                out_shape = (mask_feat.shape[-2] * stride,
+                             mask_feat.shape[-1] * stride)
+
+            def mask_fn(mask_logits: Tensor) -> Tensor:
                 mask_logits = F.interpolate(
-                    mask_logits,
-                    size=[
-                        math.ceil(mask_logits.shape[-2] * scale_factor[0]),
-                        math.ceil(mask_logits.shape[-1] * scale_factor[1])
-                    ],
-                    mode='bilinear',
-                    align_corners=False)[..., :ori_h, :ori_w]
-            masks = mask_logits.sigmoid().squeeze(0)
-            masks = masks > cfg.mask_thr_binary
-            results.masks = masks
+                    mask_logits.unsqueeze(0),
+                    scale_factor=stride,
+                    mode='bilinear')
+                if rescale:
+                    mask_logits = F.interpolate(
+                        mask_logits,
+                        size=[
+                            math.ceil(mask_logits.shape[-2] * scale_factor[0]),
+                            math.ceil(mask_logits.shape[-1] * scale_factor[1])
+                        ],
+                        mode='bilinear',
+                        align_corners=False)[..., :ori_h, :ori_w]
+                masks = mask_logits.sigmoid().squeeze(0)
+                return masks > cfg.mask_thr_binary
+
+            if cfg.get('rle_mask', False):
+                # avoid keeping the full bitmaps of all the masks
+                results.masks = masks_to_rle(mask_fn, mask_logits, out_shape)
+            else:
+                results.masks = mask_fn(mask_logits)
         else:
             h, w = img_meta['ori_shape'][:2] if rescale else img_meta[
                 'img_shape'][:2]
-            results.masks = torch.zeros(
-                size=(results.bboxes.shape[0], h, w),
-                dtype=torch.bool,
-                device=results.bboxes.device)
+            if cfg.get('rle_mask', False):
+                results.masks = RLEMasks([], h, w)
+            else:
+                results.masks = torch.zeros(
+                    size=(results.bboxes.shape[0], h, w),
+                    dtype=torch.bool,
+                    device=results.bboxes.device)
 
         return results
 
@@ -14,7 +14,8 @@ from mmdet.models.utils.misc import floordiv
 from mmdet.registry import MODELS
 from mmdet.utils import ConfigType, InstanceList, MultiConfig, OptConfigType
 from ..layers import mask_matrix_nms
-from ..utils import center_of_mass, generate_coordinate, multi_apply
+from ..utils import (center_of_mass, generate_coordinate, masks_to_rle,
+                     multi_apply)
 from .base_mask_head import BaseMaskHead
 
 
@@ -480,8 +481,8 @@ class SOLOHead(BaseMaskHead):
                 - scores (Tensor): Classification scores, has shape
                   (num_instance,).
                 - labels (Tensor): Has shape (num_instances,).
-                - masks (Tensor): Processed mask results, has
-                  shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Processed mask results,
+                  has shape (num_instances, h, w).
         """
         mlvl_cls_scores = [
             item.permute(0, 2, 3, 1) for item in mlvl_cls_scores
@@ -509,6 +510,40 @@ class SOLOHead(BaseMaskHead):
 
         return results_list
 
+    def _rescale_masks(self, mask_preds: Tensor, upsampled_size: tuple,
+                       img_meta: dict, cfg: ConfigType) -> Tensor:
+        """Rescale the mask predictions to the original image and binarize
+        them.
+
+        Args:
+            mask_preds (Tensor): Mask predictions of the instances, has shape
+                (num_instances, feat_h, feat_w).
+            upsampled_size (tuple): The size of the upsampled mask
+                predictions before cropping the padding.
+            img_meta (dict): Meta information of corresponding image.
+            cfg (dict): Config used in test phase. If its ``rle_mask`` is
+                True, the masks are computed chunk by chunk and returned as
+                :obj:`RLEMasks`.
+
+        Returns:
+            Tensor | :obj:`RLEMasks`: Binary masks of the instances, has
+            shape (num_instances, ori_h, ori_w).
+        """
+        h, w = img_meta['img_shape'][:2]
+        ori_shape = img_meta['ori_shape'][:2]
+
+        def mask_fn(mask_preds: Tensor) -> Tensor:
+            mask_preds = F.interpolate(
+                mask_preds.unsqueeze(0), size=upsampled_size,
+                mode='bilinear')[:, :, :h, :w]
+            mask_preds = F.interpolate(
+                mask_preds, size=ori_shape, mode='bilinear').squeeze(0)
+            return mask_preds > cfg.mask_thr
+
+        if cfg.get('rle_mask', False):
+            return masks_to_rle(mask_fn, mask_preds, ori_shape)
+        return mask_fn(mask_preds)
+
     def _predict_by_feat_single(self,
                                 cls_scores: Tensor,
                                 mask_preds: Tensor,
@@ -533,8 +568,8 @@ class SOLOHead(BaseMaskHead):
                 - scores (Tensor): Classification scores, has shape
                   (num_instance,).
                 - labels (Tensor): Has shape (num_instances,).
-                - masks (Tensor): Processed mask results, has
-                  shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Processed mask results,
+                  has shape (num_instances, h, w).
         """
 
         def empty_results(cls_scores, ori_shape):
@@ -551,7 +586,6 @@ class SOLOHead(BaseMaskHead):
 
         featmap_size = mask_preds.size()[-2:]
 
-        h, w = img_meta['img_shape'][:2]
         upsampled_size = (featmap_size[0] * 4, featmap_size[1] * 4)
 
         score_mask = (cls_scores > cfg.score_thr)
@@ -601,14 +635,8 @@ class SOLOHead(BaseMaskHead):
         # mask_matrix_nms may return an empty Tensor
         if len(keep_inds) == 0:
             return empty_results(cls_scores, img_meta['ori_shape'][:2])
-        mask_preds = mask_preds[keep_inds]
-        mask_preds = F.interpolate(
-            mask_preds.unsqueeze(0), size=upsampled_size,
-            mode='bilinear')[:, :, :h, :w]
-        mask_preds = F.interpolate(
-            mask_preds, size=img_meta['ori_shape'][:2],
-            mode='bilinear').squeeze(0)
-        masks = mask_preds > cfg.mask_thr
+        masks = self._rescale_masks(mask_preds[keep_inds], upsampled_size,
+                                    img_meta, cfg)
 
         results = InstanceData()
         results.masks = masks
@@ -935,8 +963,8 @@ class DecoupledSOLOHead(SOLOHead):
                 - scores (Tensor): Classification scores, has shape
                   (num_instance,).
                 - labels (Tensor): Has shape (num_instances,).
-                - masks (Tensor): Processed mask results, has
-                  shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Processed mask results,
+                  has shape (num_instances, h, w).
         """
         mlvl_cls_scores = [
             item.permute(0, 2, 3, 1) for item in mlvl_cls_scores
@@ -999,8 +1027,8 @@ class DecoupledSOLOHead(SOLOHead):
                 - scores (Tensor): Classification scores, has shape
                   (num_instance,).
                 - labels (Tensor): Has shape (num_instances,).
-                - masks (Tensor): Processed mask results, has
-                  shape (num_instances, h, w).
+                - masks (Tensor | :obj:`RLEMasks`): Processed mask results,
+                  has shape (num_instances, h, w).
         """
 
         def empty_results(cls_scores, ori_shape):
@@ -1016,7 +1044,6 @@ class DecoupledSOLOHead(SOLOHead):
 
         featmap_size = mask_preds_x.size()[-2:]
 
-        h, w = img_meta['img_shape'][:2]
         upsampled_size = (featmap_size[0] * 4, featmap_size[1] * 4)
 
         score_mask = (cls_scores > cfg.score_thr)
@@ -1087,14 +1114,8 @@ class DecoupledSOLOHead(SOLOHead):
         # mask_matrix_nms may return an empty Tensor
         if len(keep_inds) == 0:
             return empty_results(cls_scores, img_meta['ori_shape'][:2])
-        mask_preds = mask_preds[keep_inds]
-        mask_preds = F.interpolate(
-            mask_preds.unsqueeze(0), size=upsampled_size,
-            mode='bilinear')[:, :, :h, :w]
-        mask_preds = F.interpolate(
-            mask_preds, size=img_meta['ori_shape'][:2],
-            mode='bilinear').squeeze(0)
-        masks = mask_preds > cfg.mask_thr
+        masks = self._rescale_masks(mask_preds[keep_inds], upsampled_size,
+                                    img_meta, cfg)
 
         results = InstanceData()
         results.masks = masks
@@ -16,7 +16,7 @@ from torch.nn.modules.utils import _pair
 from mmdet.models.task_modules.samplers import SamplingResult
 from mmdet.models.utils import empty_instances
 from mmdet.registry import MODELS
-from mmdet.structures.mask import mask_target
+from mmdet.structures.mask import RLEMasks, mask_target
 from mmdet.utils import ConfigType, InstanceList, OptConfigType, OptMultiConfig
 
 BYTES_PER_FLOAT = 4
@@ -292,7 +292,11 @@ class FCNMaskHead(BaseModule):
             labels (Tensor): Labels of bboxes, has shape (n, )
             img_meta (dict): image information.
             rcnn_test_cfg (obj:`ConfigDict`): `test_cfg` of Bbox Head.
-                Defaults to None.
+                Defaults to None. Its ``mask_paste_mem_limit`` is the memory
+                budget in bytes of the masks pasted together, which defaults
+                to ``GPU_MEM_LIMIT``. If its ``rle_mask`` is True, the masks
+                are only pasted in the regions around the boxes and encoded
+                to :obj:`RLEMasks`.
             rescale (bool): If True, return boxes in original image space.
                 Defaults to False.
             activate_map (book): Whether get results with augmentations test.
@@ -300,7 +304,8 @@ class FCNMaskHead(BaseModule):
                 Defaults to False.
 
         Returns:
-            Tensor: Encoded masks, has shape (n, img_w, img_h)
+            Tensor | :obj:`RLEMasks`: Encoded masks, has shape
+            (n, img_w, img_h)
 
         Example:
             >>> from mmengine.config import Config
@@ -346,12 +351,54 @@ class FCNMaskHead(BaseModule):
             img_w = np.round(img_w * w_scale.item()).astype(np.int32)
 
         N = len(mask_preds)
+        mem_limit = rcnn_test_cfg.get('mask_paste_mem_limit', GPU_MEM_LIMIT)
+        threshold = rcnn_test_cfg.mask_thr_binary
+        if not self.class_agnostic:
+            mask_preds = mask_preds[range(N), labels][:, None]
+
+        if rcnn_test_cfg.get('rle_mask', False):
+            assert threshold >= 0, 'RLE masks are always binary'
+            return _paste_masks_to_rle(mask_preds, bboxes, int(img_h),
+                                       int(img_w), threshold, mem_limit)
+
+        im_mask = torch.zeros(
+            N,
+            img_h,
+            img_w,
+            device=device,
+            dtype=torch.bool if threshold >= 0 else torch.uint8)
+
+        if device.type == 'cpu' and not torch.onnx.is_in_onnx_export():
+            # CPU is most efficient when each mask is only pasted in the
+            # region around its box, so that it performs minimal number of
+            # operations. The regions of similar sizes are pasted together.
+            regions = _get_paste_regions(bboxes, img_h, img_w)
+            for inds in _split_regions(regions, mem_limit):
+                region_h, region_w = (regions[inds, 2:] -
+                                      regions[inds, :2]).max(dim=0).values
+                if region_h == 0 or region_w == 0:
+                    continue
+                masks_chunk = _do_paste_mask_in_regions(
+                    mask_preds[inds], bboxes[inds], regions[inds],
+                    int(region_h), int(region_w))
+
+                if threshold >= 0:
+                    masks_chunk = (masks_chunk >= threshold).to(
+                        dtype=torch.bool)
+                else:
+                    # for visualization and debugging
+                    masks_chunk = (masks_chunk * 255).to(dtype=torch.uint8)
+
+                for ind, mask, (y0, x0, y1, x1) in zip(
+                        inds.tolist(), masks_chunk, regions[inds].tolist()):
+                    im_mask[ind, y0:y1, x0:x1] = mask[:y1 - y0, :x1 - x0]
+            return im_mask
+
         # The actual implementation split the input into chunks,
         # and paste them chunk by chunk.
         if device.type == 'cpu':
-            # CPU is most efficient when they are pasted one by one with
-            # skip_empty=True, so that it performs minimal number of
-            # operations.
+            # Paste the masks one by one with skip_empty=True when exporting
+            # to ONNX.
             num_chunks = N
         else:
             # GPU benefits from parallelism for larger chunks,
@@ -363,22 +410,11 @@ class FCNMaskHead(BaseModule):
             # See https://github.com/open-mmlab/mmdetection/pull/5191
             num_chunks = int(
                 np.ceil(N * int(img_h) * int(img_w) * BYTES_PER_FLOAT /
-                        GPU_MEM_LIMIT))
-            assert (num_chunks <=
-                    N), 'Default GPU_MEM_LIMIT is too small; try increasing it'
+                        mem_limit))
+            assert (num_chunks <= N), \
+                'mask_paste_mem_limit is too small; try increasing it'
         chunks = torch.chunk(torch.arange(N, device=device), num_chunks)
 
-        threshold = rcnn_test_cfg.mask_thr_binary
-        im_mask = torch.zeros(
-            N,
-            img_h,
-            img_w,
-            device=device,
-            dtype=torch.bool if threshold >= 0 else torch.uint8)
-
-        if not self.class_agnostic:
-            mask_preds = mask_preds[range(N), labels][:, None]
-
         for inds in chunks:
             masks_chunk, spatial_inds = _do_paste_mask(
                 mask_preds[inds],
@@ -472,3 +508,137 @@ def _do_paste_mask(masks: Tensor,
         return img_masks[:, 0], (slice(y0_int, y1_int), slice(x0_int, x1_int))
     else:
         return img_masks[:, 0], ()
+
+
+def _get_paste_regions(boxes: Tensor, img_h: int, img_w: int) -> Tensor:
+    """Get the regions around the boxes to paste the masks in, which are the
+    regions of :func:`_do_paste_mask` with ``skip_empty=True`` for each box.
+
+    Args:
+        boxes (Tensor): N, 4
+        img_h (int): Height of the image to be pasted.
+        img_w (int): Width of the image to be pasted.
+
+    Returns:
+        Tensor: The regions of shape (N, 4) in the format of
+        (y0, x0, y1, x1), whose sizes are non-negative.
+    """
+    x0 = torch.clamp(boxes[:, 0].floor() - 1, min=0)
+    y0 = torch.clamp(boxes[:, 1].floor() - 1, min=0)
+    x1 = torch.clamp(boxes[:, 2].ceil() + 1, max=int(img_w))
+    y1 = torch.clamp(boxes[:, 3].ceil() + 1, max=int(img_h))
+    regions = torch.stack([y0, x0, y1, x1], dim=1).to(dtype=torch.int64)
+    regions[:, 2:] = torch.maximum(regions[:, 2:], regions[:, :2])
+    return regions
+
+
+def _split_regions(regions: Tensor, mem_limit: int) -> List[Tensor]:
+    """Split the regions into chunks of similar sizes, the masks of each of
+    which are pasted in a padded region within the memory limit.
+
+    Args:
+        regions (Tensor): The regions of :func:`_get_paste_regions`.
+        mem_limit (int): The memory limit in bytes of a chunk.
+
+    Returns:
+        list[Tensor]: The indices of the regions of each chunk.
+    """
+    sizes = regions[:, 2:] - regions[:, :2]
+    order = torch.argsort(sizes[:, 0] * sizes[:, 1])
+    sizes = sizes[order]
+    chunks = []
+    start = 0
+    while start < len(order):
+        # the padded size of the chunk if it ends at each region
+        costs = torch.cummax(sizes[start:, 0], dim=0).values * \
+            torch.cummax(sizes[start:, 1], dim=0).values * \
+            torch.arange(1, len(order) - start + 1,
+                         device=regions.device) * BYTES_PER_FLOAT
+        end = start + max(int((costs <= mem_limit).sum()), 1)
+        chunks.append(order[start:end])
+        start = end
+    return chunks
+
+
+def _do_paste_mask_in_regions(masks: Tensor, boxes: Tensor, regions: Tensor,
+                              region_h: int, region_w: int) -> Tensor:
+    """Paste instance masks in the regions around their boxes.
+
+    The masks are sampled at the same pixels as :func:`_do_paste_mask`, but
+    each of them only in a region of size (region_h, region_w) starting at
+    the top left of its region.
+
+    Args:
+        masks (Tensor): N, 1, H, W
+        boxes (Tensor): N, 4
+        regions (Tensor): The regions of :func:`_get_paste_regions`.
+        region_h (int): Height of the padded regions.
+        region_w (int): Width of the padded regions.
+
+    Returns:
+        Tensor: The pasted masks of shape (N, region_h, region_w).
+    """
+    device = masks.device
+    x0, y0, x1, y1 = torch.split(boxes, 1, dim=1)  # each is Nx1
+
+    N = masks.shape[0]
+
+    img_y = (regions[:, 0:1] + torch.arange(region_h, device=device)).to(
+        torch.float32) + 0.5
+    img_x = (regions[:, 1:2] + torch.arange(region_w, device=device)).to(
+        torch.float32) + 0.5
+    img_y = (img_y - y0) / (y1 - y0) * 2 - 1
+    img_x = (img_x - x0) / (x1 - x0) * 2 - 1
+    # img_x, img_y have shapes (N, w), (N, h)
+    img_x[torch.isinf(img_x)] = 0
+    img_y[torch.isinf(img_y)] = 0
+
+    gx = img_x[:, None, :].expand(N, region_h, region_w)
+    gy = img_y[:, :, None].expand(N, region_h, region_w)
+    grid = torch.stack([gx, gy], dim=3)
+
+    img_masks = F.grid_sample(
+        masks.to(dtype=torch.float32), grid, align_corners=False)
+    return img_masks[:, 0]
+
+
+def _paste_masks_to_rle(masks: Tensor, boxes: Tensor, img_h: int, img_w: int,
+                        threshold: float, mem_limit: int) -> RLEMasks:
+    """Paste instance masks in the regions around their boxes and encode
+    them to RLE without the full bitmaps.
+
+    Args:
+        masks (Tensor): N, 1, H, W
+        boxes (Tensor): N, 4
+        img_h (int): Height of the image to be pasted.
+        img_w (int): Width of the image to be pasted.
+        threshold (float): The threshold to binarize the masks.
+        mem_limit (int): The memory limit in bytes of the masks pasted
+            together.
+
+    Returns:
+        :obj:`RLEMasks`: The pasted masks.
+    """
+    if len(masks) == 0:
+        return RLEMasks([], img_h, img_w)
+    regions = _get_paste_regions(boxes, img_h, img_w)
+    chunks = _split_regions(regions, mem_limit)
+    rle_masks = []
+    for inds in chunks:
+        region_sizes = regions[inds, 2:] - regions[inds, :2]
+        region_h, region_w = region_sizes.max(dim=0).values.clamp(
+            min=1).tolist()
+        masks_chunk = _do_paste_mask_in_regions(masks[inds], boxes[inds],
+                                                regions[inds], region_h,
+                                                region_w) >= threshold
+        # clear the pixels out of the region of each mask
+        masks_chunk &= (torch.arange(region_h, device=masks.device) <
+                        region_sizes[:, :1])[:, :, None]
+        masks_chunk &= (torch.arange(region_w, device=masks.device) <
+                        region_sizes[:, 1:])[:, None, :]
+        rle_masks.append(
+            RLEMasks.from_box_masks(masks_chunk.cpu().numpy(),
+                                    regions[inds][:, [1, 0]].cpu().numpy(),
+                                    img_h, img_w))
+    order = torch.cat(chunks).argsort().cpu().numpy()
+    return RLEMasks.cat(rle_masks)[order]
@@ -1,5 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .aflink import AppearanceFreeLink
+from .association import LinearAssignment, overlap_pairs
 from .camera_motion_compensation import CameraMotionCompensation
 from .interpolation import InterpolateTracklets
 from .kalman_filter import KalmanFilter
@@ -7,5 +8,6 @@ from .similarity import embed_similarity
 
 __all__ = [
     'KalmanFilter', 'InterpolateTracklets', 'embed_similarity',
-    'AppearanceFreeLink', 'CameraMotionCompensation'
+    'AppearanceFreeLink', 'CameraMotionCompensation', 'LinearAssignment',
+    'overlap_pairs'
 ]
@@ -1,15 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from collections import defaultdict
 from typing import Tuple
 
 import numpy as np
 import torch
 from mmengine.model import BaseModule
 from mmengine.runner.checkpoint import load_checkpoint
-from scipy.optimize import linear_sum_assignment
 from torch import Tensor, nn
 
 from mmdet.registry import TASK_UTILS
+from .association import LinearAssignment
+from .interpolation import group_tracks
 
 INFINITY = 1e5
 
@@ -125,7 +125,7 @@ class AFLinkModel(BaseModule):
         x1 = self.pooling(x1).squeeze(-1).squeeze(-1)
         x2 = self.pooling(x2).squeeze(-1).squeeze(-1)
         y = self.classifier(x1, x2)
-        y = torch.softmax(y, dim=1)[0, 1]
+        y = torch.softmax(y, dim=1)[:, 1]
         return y
 
 
@@ -137,6 +137,11 @@ class AppearanceFreeLink(BaseModule):
     "StrongSORT: Make DeepSORT Great Again"
     `StrongSORT<https://arxiv.org/abs/2202.13514>`_.
 
+    The candidate pairs of the tracks that meet the temporal and the spatial
+    constraints are found at once by searching the sorted start frames, and
+    are scored by the AFLink model in batches of ``batch_size`` pairs, which
+    bounds the memory on long videos.
+
     Args:
         checkpoint (str): Checkpoint path.
         temporal_threshold (tuple, optional): The temporal constraint
@@ -145,17 +150,21 @@ class AppearanceFreeLink(BaseModule):
             tracklets association. Defaults to 75.
         confidence_threshold (float, optional): The minimum confidence
             threshold for tracklets association. Defaults to 0.95.
+        batch_size (int, optional): The number of the candidate pairs scored
+            by the model in a batch. Defaults to 1024.
     """
 
     def __init__(self,
                  checkpoint: str,
                  temporal_threshold: tuple = (0, 30),
                  spatial_threshold: int = 75,
-                 confidence_threshold: float = 0.95):
+                 confidence_threshold: float = 0.95,
+                 batch_size: int = 1024):
         super(AppearanceFreeLink, self).__init__()
         self.temporal_threshold = temporal_threshold
         self.spatial_threshold = spatial_threshold
         self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
 
         self.model = AFLinkModel()
         if checkpoint:
@@ -165,7 +174,7 @@ class AppearanceFreeLink(BaseModule):
         self.model.eval()
 
         self.device = next(self.model.parameters()).device
-        self.fn_l2 = lambda x, y: np.sqrt(x**2 + y**2)
+        self.assigner = LinearAssignment(solver='scipy')
 
     def data_transform(self,
                        track1: np.ndarray,
@@ -176,26 +185,31 @@ class AppearanceFreeLink(BaseModule):
         motion embeddings.
 
         Args:
-            track1 (ndarray): the first track with shape (N,C).
-            track2 (ndarray): the second track with shape (M,C).
+            track1 (ndarray): the first tracks with shape (N,C) or (B,N,C).
+            track2 (ndarray): the second tracks with shape (M,C) or (B,M,C).
             length (int): the unified length of tracks. Defaults to 30.
 
         Returns:
             Tuple[ndarray]: the transformed track1 and track2.
         """
         # fill or cut track1
-        length_1 = track1.shape[0]
-        track1 = track1[-length:] if length_1 >= length else \
-            np.pad(track1, ((length - length_1, 0), (0, 0)))
+        length_1 = track1.shape[-2]
+        pad = [(0, 0)] * (track1.ndim - 2)
+        track1 = track1[..., -length:, :] if length_1 >= length else \
+            np.pad(track1, pad + [(length - length_1, 0), (0, 0)])
 
         # fill or cut track1
-        length_2 = track2.shape[0]
-        track2 = track2[:length] if length_2 >= length else \
-            np.pad(track2, ((0, length - length_2), (0, 0)))
+        length_2 = track2.shape[-2]
+        track2 = track2[..., :length, :] if length_2 >= length else \
+            np.pad(track2, pad + [(0, length - length_2), (0, 0)])
 
         # min-max normalization
-        min_ = np.concatenate((track1, track2), axis=0).min(axis=0)
-        max_ = np.concatenate((track1, track2), axis=0).max(axis=0)
+        min_ = np.minimum(
+            track1.min(axis=-2, keepdims=True),
+            track2.min(axis=-2, keepdims=True))
+        max_ = np.maximum(
+            track1.max(axis=-2, keepdims=True),
+            track2.max(axis=-2, keepdims=True))
         subtractor = (max_ + min_) / 2
         divisor = (max_ - min_) / 2 + 1e-5
         track1 = (track1 - subtractor) / divisor
@@ -203,6 +217,72 @@ class AppearanceFreeLink(BaseModule):
 
         return track1, track2
 
+    def candidate_pairs(self, first_frames: np.ndarray,
+                        last_frames: np.ndarray, first_xys: np.ndarray,
+                        last_xys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the pairs of the tracks that meet the temporal and the
+        spatial constraints, where the second track starts after the first
+        one ends.
+
+        Args:
+            first_frames (ndarray): The first frames of the tracks.
+            last_frames (ndarray): The last frames of the tracks.
+            first_xys (ndarray): The top-left corners of the first boxes of
+                the tracks with shape (K, 2).
+            last_xys (ndarray): The top-left corners of the last boxes of the
+                tracks with shape (K, 2).
+
+        Returns:
+            tuple[ndarray, ndarray]: The indices of the first and the second
+            tracks of the pairs.
+        """
+        order = np.argsort(first_frames, kind='stable')
+        sorted_first_frames = first_frames[order]
+        starts = np.searchsorted(sorted_first_frames,
+                                 last_frames + self.temporal_threshold[0])
+        ends = np.searchsorted(
+            sorted_first_frames,
+            last_frames + self.temporal_threshold[1],
+            side='right')
+        counts = np.maximum(ends - starts, 0)
+        rows = np.repeat(np.arange(len(first_frames)), counts)
+        offsets = np.arange(len(rows)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        cols = order[np.repeat(starts, counts) + offsets]
+
+        dists = np.linalg.norm(last_xys[rows] - first_xys[cols], axis=1)
+        valid = (rows != cols) & (dists <= self.spatial_threshold)
+        return rows[valid], cols[valid]
+
+    @torch.no_grad()
+    def score_pairs(self, tails: np.ndarray, heads: np.ndarray, rows:
+                    np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Score the candidate pairs by the AFLink model in batches.
+
+        Args:
+            tails (ndarray): The last 30 rows of the tracks padded in the
+                front, with shape (K, 30, 5).
+            heads (ndarray): The first 30 rows of the tracks padded in the
+                back, with shape (K, 30, 5).
+            rows (ndarray): The indices of the first tracks of the pairs.
+            cols (ndarray): The indices of the second tracks of the pairs.
+
+        Returns:
+            ndarray: The confidences of the pairs.
+        """
+        confidences = np.zeros(len(rows))
+        for i in range(0, len(rows), self.batch_size):
+            track1, track2 = self.data_transform(
+                tails[rows[i:i + self.batch_size]],
+                heads[cols[i:i + self.batch_size]])
+            track1 = torch.tensor(
+                track1, dtype=torch.float).to(self.device).unsqueeze(1)
+            track2 = torch.tensor(
+                track2, dtype=torch.float).to(self.device).unsqueeze(1)
+            confidences[i:i + self.batch_size] = self.model(
+                track1, track2).cpu().numpy()
+        return confidences
+
     def forward(self, pred_tracks: np.ndarray) -> np.ndarray:
         """Forward function.
 
@@ -216,64 +296,61 @@ class AppearanceFreeLink(BaseModule):
         # sort tracks by the frame id
         pred_tracks = pred_tracks[np.argsort(pred_tracks[:, 0])]
 
-        # gather tracks information
-        id2info = defaultdict(list)
-        for row in pred_tracks:
-            frame_id, track_id, x1, y1, x2, y2 = row[:6]
-            id2info[track_id].append([frame_id, x1, y1, x2 - x1, y2 - y1])
-        id2info = {k: np.array(v) for k, v in id2info.items()}
-        num_track = len(id2info)
-        track_ids = np.array(list(id2info))
-        cost_matrix = np.full((num_track, num_track), INFINITY)
-
-        # compute the cost matrix
-        for i, id_i in enumerate(track_ids):
-            for j, id_j in enumerate(track_ids):
-                if id_i == id_j:
-                    continue
-                info_i, info_j = id2info[id_i], id2info[id_j]
-                frame_i, box_i = info_i[-1][0], info_i[-1][1:3]
-                frame_j, box_j = info_j[0][0], info_j[0][1:3]
-                # temporal constraint
-                if not self.temporal_threshold[0] <= \
-                        frame_j - frame_i <= self.temporal_threshold[1]:
-                    continue
-                # spatial constraint
-                if self.fn_l2(box_i[0] - box_j[0], box_i[1] - box_j[1]) \
-                        > self.spatial_threshold:
-                    continue
-                # confidence constraint
-                track_i, track_j = self.data_transform(info_i, info_j)
-
-                # numpy to torch
-                track_i = torch.tensor(
-                    track_i, dtype=torch.float).to(self.device)
-                track_j = torch.tensor(
-                    track_j, dtype=torch.float).to(self.device)
-                track_i = track_i.unsqueeze(0).unsqueeze(0)
-                track_j = track_j.unsqueeze(0).unsqueeze(0)
-
-                confidence = self.model(track_i,
-                                        track_j).detach().cpu().numpy()
-                if confidence >= self.confidence_threshold:
-                    cost_matrix[i, j] = 1 - confidence
-
-        # linear assignment
-        indices = linear_sum_assignment(cost_matrix)
-        _id2id = dict()  # the temporary assignment results
-        id2id = dict()  # the final assignment results
-        for i, j in zip(indices[0], indices[1]):
-            if cost_matrix[i, j] < INFINITY:
-                _id2id[i] = j
-        for k, v in _id2id.items():
-            if k in id2id:
-                id2id[v] = id2id[k]
-            else:
-                id2id[v] = k
+        # gather tracks information of (frame_id, x1, y1, w, h)
+        tracks, starts = group_tracks(pred_tracks)
+        infos = np.stack((tracks[:, 0], tracks[:, 2], tracks[:, 3],
+                          tracks[:, 4] - tracks[:, 2],
+                          tracks[:, 5] - tracks[:, 3]),
+                         axis=1)
+        track_ids = tracks[starts[:-1], 1]
+        num_track = len(track_ids)
+
+        # the last and the first 30 rows of the tracks
+        length = 30
+        steps = np.arange(length)
+        lengths = np.diff(starts)
+        tail_inds = starts[1:, None] - length + steps
+        tails = np.where((tail_inds >= starts[:-1, None])[..., None],
+                         infos[np.maximum(tail_inds, 0)], 0)
+        head_inds = starts[:-1, None] + steps
+        heads = np.where((steps < lengths[:, None])[..., None],
+                         infos[np.minimum(head_inds, len(infos) - 1)], 0)
+
+        # the candidate pairs of the temporal and the spatial constraints
+        first_rows, last_rows = starts[:-1], starts[1:] - 1
+        rows, cols = self.candidate_pairs(infos[first_rows, 0],
+                                          infos[last_rows, 0],
+                                          infos[first_rows, 1:3],
+                                          infos[last_rows, 1:3])
+        # confidence constraint
+        confidences = self.score_pairs(tails, heads, rows, cols)
+        valid = confidences >= self.confidence_threshold
+        rows, cols = rows[valid], cols[valid]
+
+        # linear assignment, which matches as many pairs as possible and
+        # then minimizes the costs
+        matched_cols, _ = self.assigner.assign(num_track, num_track, rows,
+                                               cols, 1 - confidences[valid],
+                                               INFINITY)
+
+        # link the second tracks to the first tracks of the chains
+        id2id = dict()
+        for i in np.nonzero(matched_cols > -1)[0]:
+            id2id[track_ids[matched_cols[i]]] = track_ids[i]
+        for k in list(id2id):
+            v, visited = id2id[k], {k}
+            while v in id2id and v not in visited:
+                visited.add(v)
+                v = id2id[v]
+            id2id[k] = v
 
         # link
-        for k, v in id2id.items():
-            pred_tracks[pred_tracks[:, 1] == k, 1] = v
+        if id2id:
+            track_inds = np.searchsorted(track_ids, pred_tracks[:, 1])
+            new_ids = track_ids.copy()
+            new_ids[np.searchsorted(track_ids, list(id2id))] = list(
+                id2id.values())
+            pred_tracks[:, 1] = new_ids[track_inds]
 
         # deduplicate
         _, index = np.unique(pred_tracks[:, :2], return_index=True, axis=0)
@@ -0,0 +1,362 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import time
+from collections import defaultdict
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from torch import Tensor
+
+try:
+    import lap
+except ImportError:
+    lap = None
+
+from mmdet.registry import TASK_UTILS
+from mmdet.structures.bbox import bbox_overlaps
+
+
+def overlap_pairs(bboxes1: Tensor, bboxes2: Tensor) -> Tuple[Tensor, Tensor]:
+    """Find the pairs of overlapping boxes without computing the dense
+    overlaps.
+
+    The boxes of ``bboxes2`` are sorted by their left edges, so that the
+    candidates of a box of ``bboxes1`` are the ones whose left edges lie in
+    ``(x1 - max_width, x2)``, which are found by binary search. Only the
+    candidates are checked for the overlaps, which takes
+    ``O((N + M) log M + K)`` for ``K`` candidates instead of ``O(NM)``.
+
+    Args:
+        bboxes1 (Tensor): of shape (N, 4) in (x1, y1, x2, y2) format.
+        bboxes2 (Tensor): of shape (M, 4) in (x1, y1, x2, y2) format.
+
+    Returns:
+        tuple[Tensor, Tensor]: The indices in ``bboxes1`` and ``bboxes2`` of
+        the pairs with positive overlaps, sorted by the former.
+    """
+    rows = bboxes1.new_zeros((0, ), dtype=torch.long)
+    if len(bboxes1) == 0 or len(bboxes2) == 0:
+        return rows, rows.clone()
+    left, order = bboxes2[:, 0].contiguous().sort()
+    max_width = (bboxes2[:, 2] - bboxes2[:, 0]).max()
+    starts = torch.searchsorted(
+        left, (bboxes1[:, 0] - max_width).contiguous(), right=True)
+    ends = torch.searchsorted(left, bboxes1[:, 2].contiguous())
+    counts = (ends - starts).clamp(min=0)
+    rows = torch.repeat_interleave(
+        torch.arange(len(bboxes1), device=bboxes1.device), counts)
+    offsets = torch.arange(len(rows), device=bboxes1.device) - \
+        torch.repeat_interleave(counts.cumsum(0) - counts, counts)
+    cols = order[torch.repeat_interleave(starts, counts) + offsets]
+
+    boxes1, boxes2 = bboxes1[rows], bboxes2[cols]
+    overlap_x = torch.min(boxes1[:, 2], boxes2[:, 2]) > torch.max(
+        boxes1[:, 0], boxes2[:, 0])
+    overlap_y = torch.min(boxes1[:, 3], boxes2[:, 3]) > torch.max(
+        boxes1[:, 1], boxes2[:, 1])
+    valid = overlap_x & overlap_y
+    return rows[valid], cols[valid]
+
+
+@TASK_UTILS.register_module()
+class LinearAssignment:
+    """Solve the association between tracks and detections as a linear
+    assignment with a cost limit.
+
+    The problem is the one solved by ``lap.lapjv(cost, extend_cost=True,
+    cost_limit=cost_limit)``: the pairs with costs over ``cost_limit`` are
+    never matched, and the sum of the costs of the matched pairs plus
+    ``cost_limit`` for each unmatched pair is minimized. Instead of solving
+    the dense matrix, only the feasible pairs are kept, e.g. the overlapping
+    boxes found by :func:`overlap_pairs` for the IoU costs, and the bipartite
+    graph of the feasible pairs is split into the connected components,
+    which are independent problems:
+
+    - The components with one track or one detection, which are most of
+      them in crowded scenes, take the pair of the smallest cost, and are
+      solved at once with vectorized operations.
+    - The other components are solved one by one by ``lap.lapjv`` if
+      ``lap`` is installed, or by ``scipy.optimize.linear_sum_assignment``.
+
+    The time spent in each stage and the sizes of the problems are counted
+    in :attr:`timings` and :attr:`counters` to profile the association.
+
+    Args:
+        solver (str): The solver of the components with more than one track
+            and detection. Options are 'auto', 'lap' and 'scipy'. 'auto'
+            uses 'lap' if it is installed and 'scipy' otherwise.
+            Defaults to 'auto'.
+        split_components (bool): Whether to split the problem into the
+            connected components. If False, the feasible pairs are solved as
+            one problem. Defaults to True.
+    """
+
+    def __init__(self,
+                 solver: str = 'auto',
+                 split_components: bool = True) -> None:
+        assert solver in ('auto', 'lap', 'scipy'), \
+            f'Unsupported solver {solver}'
+        if solver == 'auto':
+            solver = 'scipy' if lap is None else 'lap'
+        if solver == 'lap' and lap is None:
+            raise RuntimeError('lap is not installed,\
+                 please install it by: pip install lap')
+        self.solver = solver
+        self.split_components = split_components
+        self.reset_timings()
+
+    def reset_timings(self) -> None:
+        """Reset the timings and the counters."""
+        # the seconds spent in gating, splitting and solving
+        self.timings = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    def gate(self, bboxes1: Tensor, bboxes2: Tensor) -> Tuple[Tensor, Tensor]:
+        """Find the pairs of overlapping boxes by :func:`overlap_pairs`.
+
+        The pairs of boxes without overlaps have zero IoUs, so they are
+        infeasible for the IoU costs with ``cost_limit < 1``.
+        """
+        start = time.perf_counter()
+        rows, cols = overlap_pairs(bboxes1, bboxes2)
+        self.timings['gate'] += time.perf_counter() - start
+        return rows, cols
+
+    def __call__(self, cost: np.ndarray,
+                 cost_limit: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Solve a dense cost matrix.
+
+        The entries that are not finite or over ``cost_limit`` are
+        infeasible.
+
+        Args:
+            cost (np.ndarray): of shape (N, M).
+            cost_limit (float): The largest cost of the matched pairs.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The index of the matched column of
+            each row and the index of the matched row of each column, which
+            are -1 for the unmatched ones, as returned by ``lap.lapjv``.
+        """
+        start = time.perf_counter()
+        rows, cols = np.nonzero(cost <= cost_limit)
+        self.timings['gate'] += time.perf_counter() - start
+        return self.assign(cost.shape[0], cost.shape[1], rows, cols,
+                           cost[rows, cols], cost_limit)
+
+    def full_assign(self, cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Solve a dense cost matrix without a cost limit.
+
+        As ``motmetrics.lap.linear_sum_assignment`` does, as many pairs of
+        finite costs as possible are matched, and then the total cost of
+        them is minimized. The callers drop the matched pairs over their
+        thresholds afterwards.
+
+        Args:
+            cost (np.ndarray): of shape (N, M). The entries that are not
+                finite are infeasible.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The matches as returned by
+            :meth:`__call__`.
+        """
+        start = time.perf_counter()
+        row = np.full(cost.shape[0], -1, dtype=np.int64)
+        col = np.full(cost.shape[1], -1, dtype=np.int64)
+        finite = np.isfinite(cost)
+        if finite.any():
+            # an infeasible pair costs more than the difference of any two
+            # assignments of the feasible pairs, which maximizes the matches
+            max_cost = np.abs(cost[finite]).max() + 1
+            large_cost = 2 * min(cost.shape) * max_cost + 1
+            rows, cols = linear_sum_assignment(
+                np.where(finite, cost.astype(np.float64), large_cost))
+            matched = finite[rows, cols]
+            row[rows[matched]] = cols[matched]
+            col[cols[matched]] = rows[matched]
+        self.timings['solve'] += time.perf_counter() - start
+        self.counters['calls'] += 1
+        return row, col
+
+    def assign_by_iou(self,
+                      bboxes1: Tensor,
+                      bboxes2: Tensor,
+                      cost_limit: float,
+                      labels1: Optional[Tensor] = None,
+                      labels2: Optional[Tensor] = None,
+                      weights2: Optional[Tensor] = None
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+        """Solve the association with the costs of ``1 - IoU``.
+
+        Only the IoUs of the overlapping pairs of the same labels are
+        computed, which is exact as long as ``cost_limit < 1``.
+
+        Args:
+            bboxes1 (Tensor): of shape (N, 4), e.g. the tracks.
+            bboxes2 (Tensor): of shape (M, 4), e.g. the detections.
+            cost_limit (float): The largest cost of the matched pairs.
+            labels1 (Tensor, optional): of shape (N, ). The pairs of
+                different labels are not matched. Defaults to None.
+            labels2 (Tensor, optional): of shape (M, ). Defaults to None.
+            weights2 (Tensor, optional): of shape (M, ), the weights of the
+                IoUs, e.g. the detection scores. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The matches as returned by
+            :meth:`assign`.
+        """
+        rows, cols = self.gate(bboxes1, bboxes2)
+        if labels1 is not None and labels2 is not None:
+            same_labels = labels1[rows] == labels2[cols]
+            rows, cols = rows[same_labels], cols[same_labels]
+        ious = bbox_overlaps(bboxes1[rows], bboxes2[cols], is_aligned=True)
+        if weights2 is not None:
+            ious = ious * weights2[cols]
+        return self.assign(
+            len(bboxes1), len(bboxes2),
+            rows.cpu().numpy(),
+            cols.cpu().numpy(), (1 - ious).cpu().numpy().astype(np.float64),
+            cost_limit)
+
+    def assign(self, num_rows: int, num_cols: int, rows: np.ndarray,
+               cols: np.ndarray, costs: np.ndarray,
+               cost_limit: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Solve the sparse problem given by the feasible pairs.
+
+        Args:
+            num_rows (int): The number of the rows, e.g. the tracks.
+            num_cols (int): The number of the columns, e.g. the detections.
+            rows (np.ndarray): of shape (K, ), the rows of the pairs.
+            cols (np.ndarray): of shape (K, ), the columns of the pairs.
+            costs (np.ndarray): of shape (K, ), the costs of the pairs. The
+                pairs with costs over ``cost_limit`` are ignored.
+            cost_limit (float): The largest cost of the matched pairs.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The index of the matched column of
+            each row and the index of the matched row of each column, which
+            are -1 for the unmatched ones, as returned by ``lap.lapjv``.
+        """
+        start = time.perf_counter()
+        row_match = np.full(num_rows, -1, dtype=np.int64)
+        col_match = np.full(num_cols, -1, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        costs = np.asarray(costs, dtype=np.float64)
+        valid = costs <= cost_limit
+        rows, cols, costs = rows[valid], cols[valid], costs[valid]
+        self.counters['calls'] += 1
+        self.counters['pairs'] += len(rows)
+        if len(rows) == 0:
+            self.timings['split'] += time.perf_counter() - start
+            return row_match, col_match
+
+        # the rows and the columns are the nodes 0..N-1 and N..N+M-1
+        if self.split_components:
+            graph = coo_matrix((np.ones(len(rows)), (rows, cols + num_rows)),
+                               shape=(num_rows + num_cols, ) * 2)
+            num_comps, labels = connected_components(graph, directed=False)
+        else:
+            num_comps = 1
+            labels = np.zeros(num_rows + num_cols, dtype=np.int64)
+        row_labels, col_labels = labels[:num_rows], labels[num_rows:]
+        edge_labels = row_labels[rows]
+        # the rows and the columns without feasible pairs are ignored
+        has_pair = np.zeros(num_rows + num_cols, dtype=bool)
+        has_pair[rows] = True
+        has_pair[cols + num_rows] = True
+        num_comp_rows = np.bincount(
+            row_labels[has_pair[:num_rows]], minlength=num_comps)
+        num_comp_cols = np.bincount(
+            col_labels[has_pair[num_rows:]], minlength=num_comps)
+
+        # the components with one row or one column match the pair with the
+        # smallest cost
+        is_star = np.minimum(num_comp_rows, num_comp_cols)[edge_labels] == 1
+        star_edges = np.nonzero(is_star)[0]
+        order = np.lexsort((costs[star_edges], edge_labels[star_edges]))
+        star_edges = star_edges[order]
+        first = np.ones(len(star_edges), dtype=bool)
+        first[1:] = edge_labels[star_edges[1:]] != edge_labels[
+            star_edges[:-1]]
+        star_edges = star_edges[first]
+        row_match[rows[star_edges]] = cols[star_edges]
+        col_match[cols[star_edges]] = rows[star_edges]
+        self.counters['star_components'] += len(star_edges)
+        self.timings['split'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        edges = np.nonzero(~is_star)[0]
+        if len(edges) > 0:
+            # the nodes of each component, and the local indices of the
+            # nodes in their components
+            comp_rows, local_rows, row_starts = self._group_nodes(
+                np.nonzero(has_pair[:num_rows])[0], row_labels, num_comps)
+            comp_cols, local_cols, col_starts = self._group_nodes(
+                np.nonzero(has_pair[num_rows:])[0], col_labels, num_comps)
+            edges = edges[np.argsort(edge_labels[edges], kind='stable')]
+            bounds = np.flatnonzero(np.diff(edge_labels[edges])) + 1
+            for comp_edges in np.split(edges, bounds):
+                label = edge_labels[comp_edges[0]]
+                self._solve(
+                    comp_rows[row_starts[label]:row_starts[label + 1]],
+                    comp_cols[col_starts[label]:col_starts[label + 1]],
+                    local_rows[rows[comp_edges]],
+                    local_cols[cols[comp_edges]], costs[comp_edges],
+                    cost_limit, row_match, col_match)
+                self.counters['components'] += 1
+                self.counters['max_component_size'] = max(
+                    self.counters['max_component_size'], len(comp_edges))
+        self.timings['solve'] += time.perf_counter() - start
+        return row_match, col_match
+
+    @staticmethod
+    def _group_nodes(
+            nodes: np.ndarray, labels: np.ndarray,
+            num_comps: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sort the nodes by their components.
+
+        Returns:
+            tuple[np.ndarray]: The sorted nodes, the local indices of all the
+            nodes in their components, and the start of each component in
+            the sorted nodes.
+        """
+        nodes = nodes[np.argsort(labels[nodes], kind='stable')]
+        starts = np.zeros(num_comps + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(labels[nodes], minlength=num_comps), out=starts[1:])
+        local_inds = np.zeros(len(labels), dtype=np.int64)
+        local_inds[nodes] = np.arange(len(nodes)) - starts[labels[nodes]]
+        return nodes, local_inds, starts
+
+    def _solve(self, comp_rows: np.ndarray, comp_cols: np.ndarray,
+               local_rows: np.ndarray, local_cols: np.ndarray,
+               costs: np.ndarray, cost_limit: float, row_match: np.ndarray,
+               col_match: np.ndarray) -> None:
+        """Solve a component by the dense solver and write the matches."""
+        if self.solver == 'lap':
+            # the infeasible pairs cost more than leaving both unmatched
+            cost = np.full((len(comp_rows), len(comp_cols)), cost_limit + 1.)
+            cost[local_rows, local_cols] = costs
+            _, local_row_match, _ = lap.lapjv(
+                cost, extend_cost=True, cost_limit=cost_limit)
+            matched_rows = np.nonzero(local_row_match >= 0)[0]
+            matched_cols = local_row_match[matched_rows]
+            feasible = cost[matched_rows, matched_cols] <= cost_limit
+        else:
+            # minimizing the costs minus ``cost_limit`` is the same as the
+            # extended problem, where the infeasible pairs cost 0 as if they
+            # were unmatched
+            cost = np.ones((len(comp_rows), len(comp_cols)))
+            cost[local_rows, local_cols] = costs - cost_limit
+            matched_rows, matched_cols = linear_sum_assignment(
+                np.minimum(cost, 0))
+            # the pairs of costs equal to ``cost_limit`` are feasible
+            feasible = cost[matched_rows, matched_cols] <= 0
+        matched_rows = matched_rows[feasible]
+        matched_cols = matched_cols[feasible]
+        row_match[comp_rows[matched_rows]] = comp_cols[matched_cols]
+        col_match[comp_cols[matched_cols]] = comp_rows[matched_rows]
@@ -1,20 +1,37 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import numpy as np
+from typing import Tuple
 
-try:
-    from sklearn.gaussian_process import GaussianProcessRegressor as GPR
-    from sklearn.gaussian_process.kernels import RBF
-    HAS_SKIKIT_LEARN = True
-except ImportError:
-    HAS_SKIKIT_LEARN = False
+import numpy as np
 
 from mmdet.registry import TASK_UTILS
 
 
+def group_tracks(pred_tracks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sort the rows of the tracks by the track ids and the frame ids.
+
+    Args:
+        pred_tracks (ndarray): With shape (N, C). Each row starts with
+            (frame_id, track_id).
+
+    Returns:
+        tuple[ndarray, ndarray]: The sorted rows and the start of each track
+        in them, with shape (K + 1, ) for K tracks.
+    """
+    pred_tracks = pred_tracks[np.lexsort(
+        (pred_tracks[:, 0], pred_tracks[:, 1]))]
+    is_start = np.ones(len(pred_tracks), dtype=bool)
+    is_start[1:] = pred_tracks[1:, 1] != pred_tracks[:-1, 1]
+    starts = np.append(np.nonzero(is_start)[0], len(pred_tracks))
+    return pred_tracks, starts
+
+
 @TASK_UTILS.register_module()
 class InterpolateTracklets:
     """Interpolate tracks to make tracks more complete.
 
+    All the tracks of a video are interpolated at once with vectorized
+    operations on the rows of the tracks sorted by the track ids.
+
     Args:
         min_num_frames (int, optional): The minimum length of a track that will
             be interpolated. Defaults to 5.
@@ -24,70 +41,62 @@ class InterpolateTracklets:
             interpolation) method. Defaults to False.
         smooth_tau (int, optional): smoothing parameter in GSI. Defaults to 10.
     """
+    # the most elements of the kernels of the tracks smoothed in a batch
+    max_batch_elements = 2**22
 
     def __init__(self,
                  min_num_frames: int = 5,
                  max_num_frames: int = 20,
                  use_gsi: bool = False,
                  smooth_tau: int = 10):
-        if not HAS_SKIKIT_LEARN:
-            raise RuntimeError('sscikit-learn is not installed,\
-                 please install it by: pip install scikit-learn')
         self.min_num_frames = min_num_frames
         self.max_num_frames = max_num_frames
         self.use_gsi = use_gsi
         self.smooth_tau = smooth_tau
 
-    def _interpolate_track(self,
-                           track: np.ndarray,
-                           track_id: int,
-                           max_num_frames: int = 20) -> np.ndarray:
-        """Interpolate a track linearly to make the track more complete.
+    def interpolate(self, pred_tracks: np.ndarray,
+                    starts: np.ndarray) -> np.ndarray:
+        """Interpolate the tracks linearly to make them more complete.
 
         This function is proposed in
         "ByteTrack: Multi-Object Tracking by Associating Every Detection Box."
         `ByteTrack<https://arxiv.org/abs/2110.06864>`_.
 
+        The gaps shorter than ``max_num_frames`` of the tracks longer than
+        ``min_num_frames`` are filled.
+
         Args:
-            track (ndarray): With shape (N, 7). Each row denotes
+            pred_tracks (ndarray): With shape (N, 7) sorted by
+                :func:`group_tracks`. Each row denotes
                 (frame_id, track_id, x1, y1, x2, y2, score).
-            max_num_frames (int, optional): The maximum disconnected length in
-                the track. Defaults to 20.
+            starts (ndarray): The start of each track in ``pred_tracks``.
 
         Returns:
-            ndarray: The interpolated track with shape (N, 7). Each row denotes
-                (frame_id, track_id, x1, y1, x2, y2, score)
+            ndarray: The interpolated rows with shape (M, 7) and scores of 1.
         """
-        assert (track[:, 1] == track_id).all(), \
-            'The track id should not changed when interpolate a track.'
-
-        frame_ids = track[:, 0]
-        interpolated_track = np.zeros((0, 7))
-        # perform interpolation for the disconnected frames in the track.
-        for i in np.where(np.diff(frame_ids) > 1)[0]:
-            left_frame_id = frame_ids[i]
-            right_frame_id = frame_ids[i + 1]
-            num_disconnected_frames = int(right_frame_id - left_frame_id)
-
-            if 1 < num_disconnected_frames < max_num_frames:
-                left_bbox = track[i, 2:6]
-                right_bbox = track[i + 1, 2:6]
-
-                # perform interpolation for two adjacent tracklets.
-                for j in range(1, num_disconnected_frames):
-                    cur_bbox = j / (num_disconnected_frames) * (
-                        right_bbox - left_bbox) + left_bbox
-                    cur_result = np.ones((7, ))
-                    cur_result[0] = j + left_frame_id
-                    cur_result[1] = track_id
-                    cur_result[2:6] = cur_bbox
-
-                    interpolated_track = np.concatenate(
-                        (interpolated_track, cur_result[None]), axis=0)
-
-        interpolated_track = np.concatenate((track, interpolated_track),
-                                            axis=0)
-        return interpolated_track
+        lengths = np.diff(starts)
+        is_long = np.repeat(lengths > self.min_num_frames, lengths)
+        gaps = np.diff(pred_tracks[:, 0])
+        # the rows followed by a gap in the same long track
+        lefts = np.nonzero(
+            (pred_tracks[1:, 1] == pred_tracks[:-1, 1]) & is_long[:-1]
+            & (gaps > 1) & (gaps < self.max_num_frames))[0]
+        gaps = gaps[lefts]
+        num_missing = gaps.astype(np.int64) - 1
+
+        inds = np.repeat(np.arange(len(lefts)), num_missing)
+        steps = np.arange(len(inds)) - np.repeat(
+            np.cumsum(num_missing) - num_missing, num_missing) + 1
+        left_rows = pred_tracks[lefts[inds]]
+        right_rows = pred_tracks[lefts[inds] + 1]
+        ratios = (steps / gaps[inds])[:, None]
+
+        interpolated_tracks = np.ones((len(inds), 7))
+        interpolated_tracks[:, 0] = left_rows[:, 0] + steps
+        interpolated_tracks[:, 1] = left_rows[:, 1]
+        interpolated_tracks[:, 2:6] = left_rows[:, 2:6] + ratios * (
+            right_rows[:, 2:6] - left_rows[:, 2:6])
+        return interpolated_tracks
 
     def gaussian_smoothed_interpolation(self,
                                         track: np.ndarray,
@@ -98,6 +107,11 @@ class InterpolateTracklets:
         "StrongSORT: Make DeepSORT Great Again"
         `StrongSORT<https://arxiv.org/abs/2202.13514>`_.
 
+        The boxes are smoothed by the mean of a Gaussian process regression
+        with a fixed RBF kernel fitted on the track, as
+        ``GaussianProcessRegressor(RBF(len_scale, 'fixed'))`` does, which is
+        computed in closed form for the four coordinates at once.
+
         Args:
             track (ndarray): With shape (N, 7). Each row denotes
                 (frame_id, track_id, x1, y1, x2, y2, score).
@@ -108,27 +122,22 @@ class InterpolateTracklets:
             ndarray: The interpolated tracks with shape (N, 7). Each row
                 denotes (frame_id, track_id, x1, y1, x2, y2, score)
         """
-        len_scale = np.clip(smooth_tau * np.log(smooth_tau**3 / len(track)),
-                            smooth_tau**-1, smooth_tau**2)
-        gpr = GPR(RBF(len_scale, 'fixed'))
-        t = track[:, 0].reshape(-1, 1)
-        x1 = track[:, 2].reshape(-1, 1)
-        y1 = track[:, 3].reshape(-1, 1)
-        x2 = track[:, 4].reshape(-1, 1)
-        y2 = track[:, 5].reshape(-1, 1)
-        gpr.fit(t, x1)
-        x1_gpr = gpr.predict(t)
-        gpr.fit(t, y1)
-        y1_gpr = gpr.predict(t)
-        gpr.fit(t, x2)
-        x2_gpr = gpr.predict(t)
-        gpr.fit(t, y2)
-        y2_gpr = gpr.predict(t)
-        gsi_track = [[
-            t[i, 0], track[i, 1], x1_gpr[i], y1_gpr[i], x2_gpr[i], y2_gpr[i],
-            track[i, 6]
-        ] for i in range(len(t))]
-        return np.array(gsi_track)
+        return self._smooth(track[None], smooth_tau)[0]
+
+    def _smooth(self, tracks: np.ndarray, smooth_tau: int) -> np.ndarray:
+        """Gaussian-smoothed interpolation of a batch of tracks of the same
+        length with shape (B, N, 7)."""
+        len_scale = np.clip(
+            smooth_tau * np.log(smooth_tau**3 / tracks.shape[1]),
+            smooth_tau**-1, smooth_tau**2)
+        t = tracks[:, :, 0] / len_scale
+        kernel = np.exp(-0.5 * (t[:, :, None] - t[:, None, :])**2)
+        # the default noise level of GaussianProcessRegressor
+        noise = 1e-10 * np.eye(tracks.shape[1])
+        smoothed = tracks.copy()
+        smoothed[:, :, 2:6] = kernel @ np.linalg.solve(kernel + noise,
+                                                       tracks[:, :, 2:6])
+        return smoothed
 
     def forward(self, pred_tracks: np.ndarray) -> np.ndarray:
         """Forward function.
@@ -140,29 +149,27 @@ class InterpolateTracklets:
             ndarray: The interpolated tracks with shape (N, 7). Each row
             denotes (frame_id, track_id, x1, y1, x2, y2, score).
         """
-        max_track_id = int(np.max(pred_tracks[:, 1]))
-        min_track_id = int(np.min(pred_tracks[:, 1]))
-
-        # perform interpolation for each track
-        interpolated_tracks = []
-        for track_id in range(min_track_id, max_track_id + 1):
-            inds = pred_tracks[:, 1] == track_id
-            track = pred_tracks[inds]
-            num_frames = len(track)
-            if num_frames <= 2:
-                continue
-
-            if num_frames > self.min_num_frames:
-                interpolated_track = self._interpolate_track(
-                    track, track_id, self.max_num_frames)
-            else:
-                interpolated_track = track
-
-            if self.use_gsi:
-                interpolated_track = self.gaussian_smoothed_interpolation(
-                    interpolated_track, self.smooth_tau)
-
-            interpolated_tracks.append(interpolated_track)
-
-        interpolated_tracks = np.concatenate(interpolated_tracks)
-        return interpolated_tracks[interpolated_tracks[:, 0].argsort()]
+        pred_tracks, starts = group_tracks(pred_tracks)
+        # the tracks with no more than 2 frames are dropped
+        lengths = np.diff(starts)
+        pred_tracks = pred_tracks[np.repeat(lengths > 2, lengths)]
+        starts = np.append(0, np.cumsum(lengths[lengths > 2]))
+
+        interpolated_tracks = self.interpolate(pred_tracks, starts)
+        pred_tracks, starts = group_tracks(
+            np.concatenate((pred_tracks, interpolated_tracks)))
+
+        if self.use_gsi:
+            # smooth the tracks of the same length in a batch
+            lengths = np.diff(starts)
+            for length in np.unique(lengths):
+                track_starts = starts[:-1][lengths == length]
+                # bound the memory of the kernels of a batch
+                batch_size = max(self.max_batch_elements // length**2, 1)
+                for i in range(0, len(track_starts), batch_size):
+                    inds = track_starts[i:i + batch_size, None] + \
+                        np.arange(length)
+                    pred_tracks[inds] = self._smooth(pred_tracks[inds],
+                                                     self.smooth_tau)
+
+        return pred_tracks[np.lexsort((pred_tracks[:, 1], pred_tracks[:, 0]))]
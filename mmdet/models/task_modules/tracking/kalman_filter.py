@@ -1,5 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 import torch
@@ -241,10 +241,176 @@ class KalmanFilter:
         squared_maha = np.sum(z * z, axis=0)
         return squared_maha
 
+    @staticmethod
+    def _batch_diag(x: np.array) -> np.array:
+        """Build the (N, D, D) diagonal matrices of (N, D) diagonals."""
+        num, dim = x.shape
+        out = np.zeros((num, dim, dim), dtype=x.dtype)
+        out[:, np.arange(dim), np.arange(dim)] = x
+        return out
+
+    def batch_initiate(self,
+                       measurements: np.array) -> Tuple[np.array, np.array]:
+        """Create tracks from a batch of unassociated measurements.
+
+        Args:
+            measurements (ndarray): The (N, 4) bounding box coordinates
+                (x, y, a, h) with center position (x, y), aspect ratio a, and
+                height h.
+
+        Returns:
+            (ndarray, ndarray): Returns the (N, 8) mean vectors and (N, 8, 8)
+                covariance matrices of the new tracks.
+        """
+        measurements = np.asarray(measurements, dtype=np.float64)
+        mean = np.concatenate(
+            [measurements, np.zeros_like(measurements)], axis=1)
+        pos = 2 * self._std_weight_position * measurements[:, 3]
+        vel = 10 * self._std_weight_velocity * measurements[:, 3]
+        std = np.stack([
+            pos, pos, np.full_like(pos, 1e-2), pos,
+            vel, vel, np.full_like(vel, 1e-5), vel
+        ], axis=1)
+        return mean, self._batch_diag(np.square(std))
+
+    def batch_predict(self, mean: np.array,
+                      covariance: np.array) -> Tuple[np.array, np.array]:
+        """Run Kalman filter prediction step on a batch of tracks.
+
+        Args:
+            mean (ndarray): The (N, 8) mean vectors of the object states at
+                the previous time step.
+            covariance (ndarray): The (N, 8, 8) covariance matrices of the
+                object states at the previous time step.
+
+        Returns:
+            (ndarray, ndarray): Returns the mean vectors and covariance
+                matrices of the predicted states.
+        """
+        pos = self._std_weight_position * mean[:, 3]
+        vel = self._std_weight_velocity * mean[:, 3]
+        std = np.stack([
+            pos, pos, np.full_like(pos, 1e-2), pos,
+            vel, vel, np.full_like(vel, 1e-5), vel
+        ], axis=1)
+        motion_cov = self._batch_diag(np.square(std))
+
+        mean = np.matmul(mean, self._motion_mat.T)
+        covariance = np.matmul(
+            np.matmul(self._motion_mat, covariance),
+            self._motion_mat.T) + motion_cov
+        return mean, covariance
+
+    def batch_project(
+            self,
+            mean: np.array,
+            covariance: np.array,
+            bbox_scores: Optional[np.array] = None
+    ) -> Tuple[np.array, np.array]:
+        """Project a batch of state distributions to measurement space.
+
+        Args:
+            mean (ndarray): The (N, 8) mean vectors of the states.
+            covariance (ndarray): The (N, 8, 8) covariance matrices of the
+                states.
+            bbox_scores (ndarray, optional): The (N, ) confidence scores of
+                the bboxes used by the NSA Kalman filter. Defaults to None,
+                which is the same as the scores of 0.
+
+        Returns:
+            (ndarray, ndarray): Returns the (N, 4) projected mean vectors and
+            (N, 4, 4) covariance matrices.
+        """
+        pos = self._std_weight_position * mean[:, 3]
+        std = np.stack([pos, pos, np.full_like(pos, 1e-1), pos], axis=1)
+        if self.use_nsa and bbox_scores is not None:
+            std = (1 - np.asarray(bbox_scores))[:, None] * std
+        innovation_cov = self._batch_diag(np.square(std))
+
+        mean = np.matmul(mean, self._update_mat.T)
+        covariance = np.matmul(
+            np.matmul(self._update_mat, covariance), self._update_mat.T)
+        return mean, covariance + innovation_cov
+
+    def batch_update(
+            self,
+            mean: np.array,
+            covariance: np.array,
+            measurements: np.array,
+            bbox_scores: Optional[np.array] = None
+    ) -> Tuple[np.array, np.array]:
+        """Run Kalman filter correction step on a batch of tracks.
+
+        Args:
+            mean (ndarray): The (N, 8) mean vectors of the predicted states.
+            covariance (ndarray): The (N, 8, 8) covariance matrices of the
+                states.
+            measurements (ndarray): The (N, 4) measurement vectors
+                (x, y, a, h), where (x, y) is the center position, a the
+                aspect ratio, and h the height of the bounding box.
+            bbox_scores (ndarray, optional): The (N, ) confidence scores of
+                the bboxes. Defaults to None.
+
+        Returns:
+             (ndarray, ndarray): Returns the measurement-corrected state
+             distributions.
+        """
+        projected_mean, projected_cov = self.batch_project(
+            mean, covariance, bbox_scores)
+        # K = P * H^T * S^-1, i.e. K^T = S^-1 * H * P as P and S are symmetric
+        kalman_gain = np.linalg.solve(
+            projected_cov, np.matmul(self._update_mat,
+                                     covariance)).transpose(0, 2, 1)
+        innovation = measurements - projected_mean
+
+        new_mean = mean + np.matmul(kalman_gain,
+                                    innovation[..., None])[..., 0]
+        new_covariance = covariance - np.matmul(
+            np.matmul(kalman_gain, projected_cov), kalman_gain.transpose(
+                0, 2, 1))
+        return new_mean, new_covariance
+
+    def batch_gating_distance(self,
+                              mean: np.array,
+                              covariance: np.array,
+                              measurements: np.array,
+                              only_position: bool = False) -> np.array:
+        """Compute gating distances between a batch of state distributions and
+        measurements.
+
+        Args:
+            mean (ndarray): The (N, 8) mean vectors of the states.
+            covariance (ndarray): The (N, 8, 8) covariance matrices of the
+                states.
+            measurements (ndarray): The (M, 4) measurements, each in format
+                (x, y, a, h).
+            only_position (bool, optional): If True, distance computation is
+                done with respect to the bounding box center position only.
+                Defaults to False.
+
+        Returns:
+            ndarray: Returns an (N, M) array, where the (i, j)-th element
+            contains the squared Mahalanobis distance between the i-th state
+            and `measurements[j]`.
+        """
+        mean, covariance = self.batch_project(mean, covariance)
+        if only_position:
+            mean, covariance = mean[:, :2], covariance[:, :2, :2]
+            measurements = measurements[:, :2]
+
+        # the inverses of the small cholesky factors turn the triangular
+        # solves of all the (track, measurement) pairs into one matmul
+        inv_cholesky_factor = np.linalg.inv(np.linalg.cholesky(covariance))
+        d = measurements[None] - mean[:, None]
+        z = np.matmul(d, inv_cholesky_factor.transpose(0, 2, 1))
+        return np.sum(z * z, axis=-1)
+
     def track(self, tracks: dict,
               bboxes: torch.Tensor) -> Tuple[dict, np.array]:
         """Track forward.
 
+        The states of all the tracks are predicted and gated in a batch.
+
         Args:
             tracks (dict[int:dict]): Track buffer.
             bboxes (Tensor): Detected bounding boxes.
@@ -252,16 +418,17 @@ class KalmanFilter:
         Returns:
             (dict[int:dict], ndarray): Updated tracks and bboxes.
         """
-        costs = []
-        for id, track in tracks.items():
-            track.mean, track.covariance = self.predict(
-                track.mean, track.covariance)
-            gating_distance = self.gating_distance(track.mean,
-                                                   track.covariance,
-                                                   bboxes.cpu().numpy(),
-                                                   self.center_only)
-            costs.append(gating_distance)
-
-        costs = np.stack(costs, 0)
+        tracks_list = list(tracks.values())
+        if len(tracks_list) == 0:
+            return tracks, np.zeros((0, len(bboxes)))
+        means = np.stack([track.mean for track in tracks_list])
+        covariances = np.stack([track.covariance for track in tracks_list])
+        means, covariances = self.batch_predict(means, covariances)
+        for track, mean, covariance in zip(tracks_list, means, covariances):
+            track.mean, track.covariance = mean, covariance
+
+        costs = self.batch_gating_distance(means, covariances,
+                                           bboxes.cpu().numpy(),
+                                           self.center_only)
         costs[costs > self.gating_threshold] = np.nan
         return tracks, costs
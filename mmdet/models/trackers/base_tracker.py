@@ -2,10 +2,13 @@
 from abc import ABCMeta, abstractmethod
 from typing import List, Optional, Tuple
 
+import numpy as np
 import torch
 import torch.nn.functional as F
 from addict import Dict
 
+from .track_store import TrackStore
+
 
 class BaseTracker(metaclass=ABCMeta):
     """Base tracker model.
@@ -17,23 +20,28 @@ class BaseTracker(metaclass=ABCMeta):
         num_frames_retain (int, optional). If a track is disappeared more than
             `num_frames_retain` frames, it will be deleted in the memo.
              Defaults to 10.
+        max_history (int, optional): The most entries kept in the buffers of
+            each track, which are ring buffers of the :obj:`TrackStore`.
+            None means the whole history is kept. Defaults to None.
     """
 
     def __init__(self,
                  momentums: Optional[dict] = None,
-                 num_frames_retain: int = 10) -> None:
+                 num_frames_retain: int = 10,
+                 max_history: Optional[int] = None) -> None:
         super().__init__()
         if momentums is not None:
             assert isinstance(momentums, dict), 'momentums must be a dict'
         self.momentums = momentums
         self.num_frames_retain = num_frames_retain
+        self.max_history = max_history
 
         self.reset()
 
     def reset(self) -> None:
         """Reset the buffer of the tracker."""
         self.num_tracks = 0
-        self.tracks = dict()
+        self.tracks = TrackStore(self.momentums, self.max_history)
 
     @property
     def empty(self) -> bool:
@@ -41,9 +49,9 @@ class BaseTracker(metaclass=ABCMeta):
         return False if self.tracks else True
 
     @property
-    def ids(self) -> List[dict]:
+    def ids(self) -> List[int]:
         """All ids in the tracker."""
-        return list(self.tracks.keys())
+        return self.tracks.ids
 
     @property
     def with_reid(self) -> bool:
@@ -69,7 +77,6 @@ class BaseTracker(metaclass=ABCMeta):
 
         assert 'ids' in memo_items
         num_objs = len(kwargs['ids'])
-        id_indice = memo_items.index('ids')
         assert 'frame_ids' in memo_items
         frame_id = int(kwargs['frame_ids'])
         if isinstance(kwargs['frame_ids'], int):
@@ -80,63 +87,114 @@ class BaseTracker(metaclass=ABCMeta):
             if len(v) != num_objs:
                 raise ValueError('kwargs value must both equal')
 
-        for obj in zip(*kwargs.values()):
-            id = int(obj[id_indice])
-            if id in self.tracks:
-                self.update_track(id, obj)
-            else:
-                self.init_track(id, obj)
+        ids = kwargs['ids'].tolist()
+        new_inds = [i for i, id in enumerate(ids) if id not in self.tracks]
+        tracked_inds = [i for i, id in enumerate(ids) if id in self.tracks]
+        self.tracks.update(ids, **kwargs)
+
+        if len(new_inds) > 0:
+            objs = {k: v[new_inds] for k, v in kwargs.items()}
+            self.init_tracks([ids[i] for i in new_inds], objs)
+        if len(tracked_inds) > 0:
+            objs = {k: v[tracked_inds] for k, v in kwargs.items()}
+            self.update_tracks([ids[i] for i in tracked_inds], objs)
 
         self.pop_invalid_tracks(frame_id)
 
     def pop_invalid_tracks(self, frame_id: int) -> None:
         """Pop out invalid tracks."""
-        invalid_ids = []
-        for k, v in self.tracks.items():
-            if frame_id - v['frame_ids'][-1] >= self.num_frames_retain:
-                invalid_ids.append(k)
-        for invalid_id in invalid_ids:
-            self.tracks.pop(invalid_id)
+        if self.empty:
+            return
+        invalids = frame_id - self.get('frame_ids') >= self.num_frames_retain
+        self.tracks.remove([
+            id for id, invalid in zip(self.ids, invalids.tolist()) if invalid
+        ])
+
+    def update_tracks(self, ids: List[int], objs: dict) -> None:
+        """Update the tracked tracks.
+
+        The buffers of the tracks have been updated by :meth:`update` before,
+        override it to update the other states of the tracks in a batch. It
+        calls :meth:`update_track` for each track by default.
+
+        Args:
+            ids (list[int]): The ids of the tracks.
+            objs (dict[str, Tensor]): The memo items of the tracks.
+        """
+        # skip iterating the objects if there are no per-track states
+        if type(self).update_track is BaseTracker.update_track:
+            return
+        for id, obj in zip(ids, zip(*objs.values())):
+            self.update_track(id, obj)
+
+    def init_tracks(self, ids: List[int], objs: dict) -> None:
+        """Initialize the new tracks.
+
+        The buffers of the tracks have been initialized by :meth:`update`
+        before, override it to initialize the other states of the tracks in
+        a batch. It calls :meth:`init_track` for each track by default.
+
+        Args:
+            ids (list[int]): The ids of the tracks.
+            objs (dict[str, Tensor]): The memo items of the tracks.
+        """
+        if type(self).init_track is BaseTracker.init_track:
+            return
+        for id, obj in zip(ids, zip(*objs.values())):
+            self.init_track(id, obj)
 
     def update_track(self, id: int, obj: Tuple[torch.Tensor]):
-        """Update a track."""
-        for k, v in zip(self.memo_items, obj):
-            v = v[None]
-            if self.momentums is not None and k in self.momentums:
-                m = self.momentums[k]
-                self.tracks[id][k] = (1 - m) * self.tracks[id][k] + m * v
-            else:
-                self.tracks[id][k].append(v)
+        """Update a track.
+
+        The buffers of the track have been updated by :meth:`update` before,
+        override it to update the other states of the track.
+        """
+        pass
 
     def init_track(self, id: int, obj: Tuple[torch.Tensor]):
-        """Initialize a track."""
-        self.tracks[id] = Dict()
-        for k, v in zip(self.memo_items, obj):
-            v = v[None]
-            if self.momentums is not None and k in self.momentums:
-                self.tracks[id][k] = v
-            else:
-                self.tracks[id][k] = [v]
+        """Initialize a track.
+
+        The buffers of the track have been initialized by :meth:`update`
+        before, override it to initialize the other states of the track.
+        """
+        pass
+
+    def get_kf_states(self, ids: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack the states of the Kalman filter of some tracks.
+
+        Args:
+            ids (list[int]): The ids of the tracks.
+
+        Returns:
+            tuple(np.ndarray, np.ndarray): The (N, 8) means and the (N, 8, 8)
+            covariances.
+        """
+        if len(ids) == 0:
+            return np.zeros((0, 8)), np.zeros((0, 8, 8))
+        tracks = [self.tracks[id] for id in ids]
+        means = np.stack([track.mean for track in tracks])
+        covariances = np.stack([track.covariance for track in tracks])
+        return means, covariances
+
+    def set_kf_states(self, ids: List[int], means: np.ndarray,
+                      covariances: np.ndarray) -> None:
+        """Set the states of the Kalman filter of some tracks.
+
+        Args:
+            ids (list[int]): The ids of the tracks.
+            means (np.ndarray): The (N, 8) means.
+            covariances (np.ndarray): The (N, 8, 8) covariances.
+        """
+        for id, mean, covariance in zip(ids, means, covariances):
+            track = self.tracks[id]
+            track.mean, track.covariance = mean, covariance
 
     @property
     def memo(self) -> dict:
         """Return all buffers in the tracker."""
         outs = Dict()
         for k in self.memo_items:
-            outs[k] = []
-
-        for id, objs in self.tracks.items():
-            for k, v in objs.items():
-                if k not in outs:
-                    continue
-                if self.momentums is not None and k in self.momentums:
-                    v = v
-                else:
-                    v = v[-1]
-                outs[k].append(v)
-
-        for k, v in outs.items():
-            outs[k] = torch.cat(v, dim=0)
+            outs[k] = self.tracks.get(k)
         return outs
 
     def get(self,
@@ -157,26 +215,7 @@ class BaseTracker(metaclass=ABCMeta):
         Returns:
             Tensor: The results of the demanded item.
         """
-        if ids is None:
-            ids = self.ids
-
-        outs = []
-        for id in ids:
-            out = self.tracks[id][item]
-            if isinstance(out, list):
-                if num_samples is not None:
-                    out = out[-num_samples:]
-                    out = torch.cat(out, dim=0)
-                    if behavior == 'mean':
-                        out = out.mean(dim=0, keepdim=True)
-                    elif behavior is None:
-                        out = out[None]
-                    else:
-                        raise NotImplementedError()
-                else:
-                    out = out[-1]
-            outs.append(out)
-        return torch.cat(outs, dim=0)
+        return self.tracks.get(item, ids, num_samples, behavior)
 
     @abstractmethod
     def track(self, *args, **kwargs):
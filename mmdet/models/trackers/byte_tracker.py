@@ -1,18 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from typing import List, Optional, Tuple
 
-try:
-    import lap
-except ImportError:
-    lap = None
 import numpy as np
 import torch
 from mmengine.structures import InstanceData
 
 from mmdet.registry import MODELS, TASK_UTILS
 from mmdet.structures import DetDataSample
-from mmdet.structures.bbox import (bbox_cxcyah_to_xyxy, bbox_overlaps,
-                                   bbox_xyxy_to_cxcyah)
+from mmdet.structures.bbox import bbox_cxcyah_to_xyxy, bbox_xyxy_to_cxcyah
 from .base_tracker import BaseTracker
 
 
@@ -37,6 +32,8 @@ class ByteTracker(BaseTracker):
                 tracklets. Defaults to 0.3.
         num_tentatives (int, optional): Number of continuous frames to confirm
             a track. Defaults to 3.
+        assigner (dict): Configuration of the association solver.
+            Defaults to dict(type='LinearAssignment').
     """
 
     def __init__(self,
@@ -46,14 +43,13 @@ class ByteTracker(BaseTracker):
                  weight_iou_with_det_scores: bool = True,
                  match_iou_thrs: dict = dict(high=0.1, low=0.5, tentative=0.3),
                  num_tentatives: int = 3,
+                 assigner: dict = dict(type='LinearAssignment'),
                  **kwargs):
         super().__init__(**kwargs)
 
-        if lap is None:
-            raise RuntimeError('lap is not installed,\
-                 please install it by: pip install lap')
         if motion is not None:
             self.motion = TASK_UTILS.build(motion)
+        self.assigner = TASK_UTILS.build(assigner)
 
         self.obj_score_thrs = obj_score_thrs
         self.init_track_thr = init_track_thr
@@ -75,47 +71,44 @@ class ByteTracker(BaseTracker):
         ids = [id for id, track in self.tracks.items() if track.tentative]
         return ids
 
-    def init_track(self, id: int, obj: Tuple[torch.Tensor]) -> None:
-        """Initialize a track."""
-        super().init_track(id, obj)
-        if self.tracks[id].frame_ids[-1] == 0:
-            self.tracks[id].tentative = False
-        else:
-            self.tracks[id].tentative = True
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.initiate(
-            bbox)
-
-    def update_track(self, id: int, obj: Tuple[torch.Tensor]) -> None:
-        """Update a track."""
-        super().update_track(id, obj)
-        if self.tracks[id].tentative:
-            if len(self.tracks[id]['bboxes']) >= self.num_tentatives:
-                self.tracks[id].tentative = False
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        track_label = self.tracks[id]['labels'][-1]
-        label_idx = self.memo_items.index('labels')
-        obj_label = obj[label_idx]
-        assert obj_label == track_label
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.update(
-            self.tracks[id].mean, self.tracks[id].covariance, bbox)
+    def init_tracks(self, ids: List[int], objs: dict) -> None:
+        """Initialize the new tracks."""
+        for id, frame_id in zip(ids, objs['frame_ids'].tolist()):
+            self.tracks[id].tentative = frame_id != 0
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(ids, *self.kf.batch_initiate(bboxes))
+
+    def update_tracks(self, ids: List[int], objs: dict) -> None:
+        """Update the tracked tracks."""
+        for id in ids:
+            track = self.tracks[id]
+            if track.tentative:
+                if len(track['bboxes']) >= self.num_tentatives:
+                    track.tentative = False
+        # the label of a track is kept across the frames
+        track_labels = self.get('labels', ids, num_samples=2)
+        assert (track_labels == objs['labels'][:, None].to(track_labels)).all()
+        means, covariances = self.get_kf_states(ids)
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(
+            ids, *self.kf.batch_update(means, covariances, bboxes))
 
     def pop_invalid_tracks(self, frame_id: int) -> None:
         """Pop out invalid tracks."""
-        invalid_ids = []
-        for k, v in self.tracks.items():
-            # case1: disappeared frames >= self.num_frames_retrain
-            case1 = frame_id - v['frame_ids'][-1] >= self.num_frames_retain
-            # case2: tentative tracks but not matched in this frame
-            case2 = v.tentative and v['frame_ids'][-1] != frame_id
-            if case1 or case2:
-                invalid_ids.append(k)
-        for invalid_id in invalid_ids:
-            self.tracks.pop(invalid_id)
+        if self.empty:
+            return
+        last_frame_ids = self.get('frame_ids')
+        tentatives = torch.tensor(
+            [bool(track.tentative) for track in self.tracks.values()],
+            dtype=torch.bool,
+            device=last_frame_ids.device)
+        # case1: disappeared frames >= self.num_frames_retrain
+        case1 = frame_id - last_frame_ids >= self.num_frames_retain
+        # case2: tentative tracks but not matched in this frame
+        case2 = tentatives & (last_frame_ids != frame_id)
+        invalids = (case1 | case2).tolist()
+        self.tracks.remove(
+            [id for id, invalid in zip(self.ids, invalids) if invalid])
 
     def assign_ids(
             self,
@@ -143,36 +136,21 @@ class ByteTracker(BaseTracker):
             tuple(np.ndarray, np.ndarray): The assigning ids.
         """
         # get track_bboxes
-        track_bboxes = np.zeros((0, 4))
-        for id in ids:
-            track_bboxes = np.concatenate(
-                (track_bboxes, self.tracks[id].mean[:4][None]), axis=0)
+        track_bboxes = self.get_kf_states(ids)[0][:, :4]
         track_bboxes = torch.from_numpy(track_bboxes).to(det_bboxes)
         track_bboxes = bbox_cxcyah_to_xyxy(track_bboxes)
 
-        # compute distance
-        ious = bbox_overlaps(track_bboxes, det_bboxes)
-        if weight_iou_with_det_scores:
-            ious *= det_scores
         # support multi-class association
-        track_labels = torch.tensor([
-            self.tracks[id]['labels'][-1] for id in ids
-        ]).to(det_bboxes.device)
-
-        cate_match = det_labels[None, :] == track_labels[:, None]
-        # to avoid det and track of different categories are matched
-        cate_cost = (1 - cate_match.int()) * 1e6
-
-        dists = (1 - ious + cate_cost).cpu().numpy()
+        track_labels = self.get('labels', ids).to(det_labels)
 
         # bipartite match
-        if dists.size > 0:
-            cost, row, col = lap.lapjv(
-                dists, extend_cost=True, cost_limit=1 - match_iou_thr)
-        else:
-            row = np.zeros(len(ids)).astype(np.int32) - 1
-            col = np.zeros(len(det_bboxes)).astype(np.int32) - 1
-        return row, col
+        return self.assigner.assign_by_iou(
+            track_bboxes,
+            det_bboxes,
+            1 - match_iou_thr,
+            labels1=track_labels,
+            labels2=det_labels,
+            weights2=det_scores if weight_iou_with_det_scores else None)
 
     def track(self, data_sample: DetDataSample, **kwargs) -> InstanceData:
         """Tracking forward function.
@@ -230,13 +208,15 @@ class ByteTracker(BaseTracker):
             second_det_ids = ids[second_det_inds]
 
             # 1. use Kalman Filter to predict current location
-            for id in self.confirmed_ids:
+            confirmed_ids = self.confirmed_ids
+            if len(confirmed_ids) > 0:
+                means, covariances = self.get_kf_states(confirmed_ids)
                 # track is lost in previous frame
-                if self.tracks[id].frame_ids[-1] != frame_id - 1:
-                    self.tracks[id].mean[7] = 0
-                (self.tracks[id].mean,
-                 self.tracks[id].covariance) = self.kf.predict(
-                     self.tracks[id].mean, self.tracks[id].covariance)
+                lost = self.get('frame_ids', confirmed_ids) != frame_id - 1
+                means[lost.cpu().numpy(), 7] = 0
+                self.set_kf_states(
+                    confirmed_ids,
+                    *self.kf.batch_predict(means, covariances))
 
             # 2. first match
             first_match_track_inds, first_match_det_inds = self.assign_ids(
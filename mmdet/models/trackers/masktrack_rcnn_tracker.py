@@ -1,5 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import List
+from typing import List, Optional
 
 import torch
 from mmengine.structures import InstanceData
@@ -25,13 +25,18 @@ class MaskTrackRCNNTracker(BaseTracker):
                 score.
             - det_label (float): The coefficient of `label_deltas` when
                 computing match score.
+        max_history (int, optional): The most entries kept in the buffers of
+            each track. Only the latest bboxes, labels and roi feats are used
+            for matching, so only the latest entries are kept by default to
+            save the memory of the masks. Defaults to 1.
     """
 
     def __init__(self,
                  match_weights: dict = dict(
                      det_score=1.0, iou=2.0, det_label=10.0),
+                 max_history: Optional[int] = 1,
                  **kwargs):
-        super().__init__(**kwargs)
+        super().__init__(max_history=max_history, **kwargs)
         self.match_weights = match_weights
 
     def get_match_score(self, bboxes: Tensor, labels: Tensor, scores: Tensor,
@@ -1,10 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import List, Optional, Tuple
+from typing import List, Optional
 
-try:
-    import lap
-except ImportError:
-    lap = None
 import numpy as np
 import torch
 from addict import Dict
@@ -51,9 +47,6 @@ class OCSORTTracker(SORTTracker):
                  vel_consist_weight: float = 0.2,
                  vel_delta_t: int = 3,
                  **kwargs):
-        if lap is None:
-            raise RuntimeError('lap is not installed,\
-                 please install it by: pip install lap')
         super().__init__(motion=motion, **kwargs)
         self.obj_score_thr = obj_score_thr
         self.init_track_thr = init_track_thr
@@ -71,48 +64,40 @@ class OCSORTTracker(SORTTracker):
         ids = [id for id, track in self.tracks.items() if track.tentative]
         return ids
 
-    def init_track(self, id: int, obj: Tuple[torch.Tensor]):
-        """Initialize a track."""
-        super().init_track(id, obj)
-        if self.tracks[id].frame_ids[-1] == 0:
-            self.tracks[id].tentative = False
-        else:
-            self.tracks[id].tentative = True
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.initiate(
-            bbox)
-        # track.obs maintains the history associated detections to this track
-        self.tracks[id].obs = []
-        bbox_id = self.memo_items.index('bboxes')
-        self.tracks[id].obs.append(obj[bbox_id])
-        # a placefolder to save mean/covariance before losing tracking it
-        # parameters to save: mean, covariance, measurement
-        self.tracks[id].tracked = True
-        self.tracks[id].saved_attr = Dict()
-        self.tracks[id].velocity = torch.tensor(
-            (-1, -1)).to(obj[bbox_id].device)  # placeholder
-
-    def update_track(self, id: int, obj: Tuple[torch.Tensor]):
-        """Update a track."""
-        super().update_track(id, obj)
-        if self.tracks[id].tentative:
-            if len(self.tracks[id]['bboxes']) >= self.num_tentatives:
-                self.tracks[id].tentative = False
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.update(
-            self.tracks[id].mean, self.tracks[id].covariance, bbox)
-        self.tracks[id].tracked = True
-        bbox_id = self.memo_items.index('bboxes')
-        self.tracks[id].obs.append(obj[bbox_id])
-
-        bbox1 = self.k_step_observation(self.tracks[id])
-        bbox2 = obj[bbox_id]
-        self.tracks[id].velocity = self.vel_direction(bbox1, bbox2).to(
-            obj[bbox_id].device)
+    def init_tracks(self, ids: List[int], objs: dict) -> None:
+        """Initialize the new tracks."""
+        for id, frame_id, bbox in zip(ids, objs['frame_ids'].tolist(),
+                                      objs['bboxes']):
+            track = self.tracks[id]
+            track.tentative = frame_id != 0
+            # track.obs maintains the history associated detections to this
+            # track
+            track.obs = [bbox]
+            # a placefolder to save mean/covariance before losing tracking it
+            # parameters to save: mean, covariance, measurement
+            track.tracked = True
+            track.saved_attr = Dict()
+            track.velocity = torch.tensor(
+                (-1, -1)).to(bbox.device)  # placeholder
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(ids, *self.kf.batch_initiate(bboxes))
+
+    def update_tracks(self, ids: List[int], objs: dict) -> None:
+        """Update the tracked tracks."""
+        means, covariances = self.get_kf_states(ids)
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(
+            ids, *self.kf.batch_update(means, covariances, bboxes))
+        for id, bbox in zip(ids, objs['bboxes']):
+            track = self.tracks[id]
+            if track.tentative:
+                if len(track['bboxes']) >= self.num_tentatives:
+                    track.tentative = False
+            track.tracked = True
+            track.obs.append(bbox)
+
+            bbox1 = self.k_step_observation(track)
+            track.velocity = self.vel_direction(bbox1, bbox).to(bbox.device)
 
     def vel_direction(self, bbox1: torch.Tensor, bbox2: torch.Tensor):
         """Estimate the direction vector between two boxes."""
@@ -184,10 +169,7 @@ class OCSORTTracker(SORTTracker):
         OC-SORT uses velocity consistency besides IoU for association
         """
         # get track_bboxes
-        track_bboxes = np.zeros((0, 4))
-        for id in ids:
-            track_bboxes = np.concatenate(
-                (track_bboxes, self.tracks[id].mean[:4][None]), axis=0)
+        track_bboxes = self.get_kf_states(ids)[0][:, :4]
         track_bboxes = torch.from_numpy(track_bboxes).to(det_bboxes)
         track_bboxes = bbox_cxcyah_to_xyxy(track_bboxes)
 
@@ -197,9 +179,7 @@ class OCSORTTracker(SORTTracker):
             ious *= det_scores
 
         # support multi-class association
-        track_labels = torch.tensor([
-            self.tracks[id]['labels'][-1] for id in ids
-        ]).to(det_bboxes.device)
+        track_labels = self.get('labels', ids).to(det_labels)
         cate_match = det_labels[None, :] == track_labels[:, None]
         # to avoid det and track of different categories are matched
         cate_cost = (1 - cate_match.int()) * 1e6
@@ -234,13 +214,7 @@ class OCSORTTracker(SORTTracker):
             dists += valid_norm_angle.cpu().numpy() * self.vel_consist_weight
 
         # bipartite match
-        if dists.size > 0:
-            cost, row, col = lap.lapjv(
-                dists, extend_cost=True, cost_limit=1 - match_iou_thr)
-        else:
-            row = np.zeros(len(ids)).astype(np.int32) - 1
-            col = np.zeros(len(det_bboxes)).astype(np.int32) - 1
-        return row, col
+        return self.assigner(dists, 1 - match_iou_thr)
 
     def last_obs(self, track: Dict):
         """extract the last associated observation."""
@@ -276,26 +250,14 @@ class OCSORTTracker(SORTTracker):
         Returns:
             tuple(int): The assigning ids.
         """
-        # compute distance
-        ious = bbox_overlaps(track_obs, det_bboxes)
-        if weight_iou_with_det_scores:
-            ious *= det_scores
-
-        # support multi-class association
-        cate_match = det_labels[None, :] == last_track_labels[:, None]
-        # to avoid det and track of different categories are matched
-        cate_cost = (1 - cate_match.int()) * 1e6
-
-        dists = (1 - ious + cate_cost).cpu().numpy()
-
         # bipartite match
-        if dists.size > 0:
-            cost, row, col = lap.lapjv(
-                dists, extend_cost=True, cost_limit=1 - match_iou_thr)
-        else:
-            row = np.zeros(len(track_obs)).astype(np.int32) - 1
-            col = np.zeros(len(det_bboxes)).astype(np.int32) - 1
-        return row, col
+        return self.assigner.assign_by_iou(
+            track_obs,
+            det_bboxes,
+            1 - match_iou_thr,
+            labels1=last_track_labels,
+            labels2=det_labels,
+            weights2=det_scores if weight_iou_with_det_scores else None)
 
     def online_smooth(self, track: Dict, obj: torch.Tensor):
         """Once a track is recovered from being lost, online smooth its
@@ -373,17 +335,20 @@ class OCSORTTracker(SORTTracker):
             det_ids = ids[det_inds]
 
             # 1. predict by Kalman Filter
-            for id in self.confirmed_ids:
+            confirmed_ids = self.confirmed_ids
+            if len(confirmed_ids) > 0:
+                means, covariances = self.get_kf_states(confirmed_ids)
                 # track is lost in previous frame
-                if self.tracks[id].frame_ids[-1] != frame_id - 1:
-                    self.tracks[id].mean[7] = 0
-                if self.tracks[id].tracked:
-                    self.tracks[id].saved_attr.mean = self.tracks[id].mean
-                    self.tracks[id].saved_attr.covariance = self.tracks[
-                        id].covariance
-                (self.tracks[id].mean,
-                 self.tracks[id].covariance) = self.kf.predict(
-                     self.tracks[id].mean, self.tracks[id].covariance)
+                lost = self.get('frame_ids', confirmed_ids) != frame_id - 1
+                means[lost.cpu().numpy(), 7] = 0
+                for id, mean, covariance in zip(confirmed_ids, means,
+                                                covariances):
+                    if self.tracks[id].tracked:
+                        self.tracks[id].saved_attr.mean = mean
+                        self.tracks[id].saved_attr.covariance = covariance
+                self.set_kf_states(
+                    confirmed_ids,
+                    *self.kf.batch_predict(means, covariances))
 
             # 2. match detections and tracks' predicted locations
             match_track_inds, raw_match_det_inds = self.ocm_assign_ids(
@@ -446,10 +411,8 @@ class OCSORTTracker(SORTTracker):
                     last_box = self.last_obs(self.tracks[id.item()])
                     last_observations.append(last_box)
                 last_observations = torch.stack(last_observations)
-                last_track_labels = torch.tensor([
-                    self.tracks[id.item()]['labels'][-1]
-                    for id in unmatched_track_inds
-                ]).to(det_bboxes.device)
+                last_track_labels = self.get(
+                    'labels', unmatched_track_inds).to(det_bboxes.device)
 
                 remain_det_ids = torch.full((unmatch_det_bboxes.size(0), ),
                                             -1,
@@ -52,7 +52,9 @@ class QuasiDenseTracker(BaseTracker):
                  with_cats: bool = True,
                  match_metric: str = 'bisoftmax',
                  **kwargs):
-        super().__init__(**kwargs)
+        # the tracks only keep the latest states and the running embeds
+        super().__init__(
+            momentums=dict(embed=memo_momentum), max_history=1, **kwargs)
         assert 0 <= memo_momentum <= 1.0
         assert memo_tracklet_frames >= 0
         assert memo_backdrop_frames >= 0
@@ -69,14 +71,9 @@ class QuasiDenseTracker(BaseTracker):
         assert match_metric in ['bisoftmax', 'softmax', 'cosine']
         self.match_metric = match_metric
 
-        self.num_tracks = 0
-        self.tracks = dict()
-        self.backdrops = []
-
     def reset(self):
         """Reset the buffer of the tracker."""
-        self.num_tracks = 0
-        self.tracks = dict()
+        super().reset()
         self.backdrops = []
 
     def update(self, ids: Tensor, bboxes: Tensor, embeds: Tensor,
@@ -92,38 +89,37 @@ class QuasiDenseTracker(BaseTracker):
             frame_id (int): The id of current frame, 0-index.
         """
         tracklet_inds = ids > -1
+        track_ids = ids[tracklet_inds]
+        track_bboxes = bboxes[tracklet_inds]
 
-        for id, bbox, embed, label, score in zip(ids[tracklet_inds],
-                                                 bboxes[tracklet_inds],
-                                                 embeds[tracklet_inds],
-                                                 labels[tracklet_inds],
-                                                 scores[tracklet_inds]):
-            id = int(id)
+        if len(track_ids) > 0:
             # update the tracked ones and initialize new tracks
-            if id in self.tracks.keys():
-                velocity = (bbox - self.tracks[id]['bbox']) / (
-                    frame_id - self.tracks[id]['last_frame'])
-                self.tracks[id]['bbox'] = bbox
-                self.tracks[id]['embed'] = (
-                    1 - self.memo_momentum
-                ) * self.tracks[id]['embed'] + self.memo_momentum * embed
-                self.tracks[id]['last_frame'] = frame_id
-                self.tracks[id]['label'] = label
-                self.tracks[id]['score'] = score
-                self.tracks[id]['velocity'] = (
-                    self.tracks[id]['velocity'] * self.tracks[id]['acc_frame']
-                    + velocity) / (
-                        self.tracks[id]['acc_frame'] + 1)
-                self.tracks[id]['acc_frame'] += 1
-            else:
-                self.tracks[id] = dict(
-                    bbox=bbox,
-                    embed=embed,
-                    label=label,
-                    score=score,
-                    last_frame=frame_id,
-                    velocity=torch.zeros_like(bbox),
-                    acc_frame=0)
+            velocities = torch.zeros_like(track_bboxes)
+            acc_frames = torch.zeros_like(track_ids)
+            is_tracked = torch.tensor(
+                [id in self.tracks for id in track_ids.tolist()],
+                dtype=torch.bool)
+            if is_tracked.any():
+                tracked_ids = track_ids[is_tracked]
+                tracked_inds = is_tracked.to(track_bboxes.device)
+                acc_frame = self.get('acc_frame', tracked_ids)
+                interval = frame_id - self.get('last_frame', tracked_ids)
+                velocity = (track_bboxes[tracked_inds] - self.get(
+                    'bbox', tracked_ids)) / interval.to(track_bboxes)[:, None]
+                acc = acc_frame.to(track_bboxes)[:, None]
+                velocities[tracked_inds] = (
+                    self.get('velocity', tracked_ids) * acc + velocity) / (
+                        acc + 1)
+                acc_frames[is_tracked] = acc_frame + 1
+            self.tracks.update(
+                track_ids,
+                bbox=track_bboxes,
+                embed=embeds[tracklet_inds],
+                label=labels[tracklet_inds],
+                score=scores[tracklet_inds],
+                last_frame=torch.full_like(track_ids, frame_id),
+                velocity=velocities,
+                acc_frame=acc_frames)
         # backdrop update according to IoU
         backdrop_inds = torch.nonzero(ids == -1, as_tuple=False).squeeze(1)
         ious = bbox_overlaps(bboxes[backdrop_inds], bboxes)
@@ -140,12 +136,13 @@ class QuasiDenseTracker(BaseTracker):
                 labels=labels[backdrop_inds]))
 
         # pop memo
-        invalid_ids = []
-        for k, v in self.tracks.items():
-            if frame_id - v['last_frame'] >= self.memo_tracklet_frames:
-                invalid_ids.append(k)
-        for invalid_id in invalid_ids:
-            self.tracks.pop(invalid_id)
+        if not self.empty:
+            invalids = frame_id - self.get(
+                'last_frame') >= self.memo_tracklet_frames
+            self.tracks.remove([
+                id for id, invalid in zip(self.ids, invalids.tolist())
+                if invalid
+            ])
 
         if len(self.backdrops) > self.memo_backdrop_frames:
             self.backdrops.pop()
@@ -153,20 +150,13 @@ class QuasiDenseTracker(BaseTracker):
     @property
     def memo(self) -> Tuple[Tensor, ...]:
         """Get tracks memory."""
-        memo_embeds = []
-        memo_ids = []
-        memo_bboxes = []
-        memo_labels = []
-        # velocity of tracks
-        memo_vs = []
         # get tracks
-        for k, v in self.tracks.items():
-            memo_bboxes.append(v['bbox'][None, :])
-            memo_embeds.append(v['embed'][None, :])
-            memo_ids.append(k)
-            memo_labels.append(v['label'].view(1, 1))
-            memo_vs.append(v['velocity'][None, :])
-        memo_ids = torch.tensor(memo_ids, dtype=torch.long).view(1, -1)
+        memo_bboxes = [self.get('bbox')]
+        memo_embeds = [self.get('embed')]
+        memo_ids = torch.tensor(self.ids, dtype=torch.long).view(1, -1)
+        memo_labels = [self.get('label').view(-1, 1)]
+        # velocity of tracks
+        memo_vs = [self.get('velocity')]
         # get backdrops
         for backdrop in self.backdrops:
             backdrop_ids = torch.full((1, backdrop['embeds'].size(0)),
@@ -1,15 +1,9 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import List, Optional, Tuple
+from typing import List, Optional
 
 import numpy as np
 import torch
 from mmengine.structures import InstanceData
-
-try:
-    import motmetrics
-    from motmetrics.lap import linear_sum_assignment
-except ImportError:
-    motmetrics = None
 from torch import Tensor
 
 from mmdet.registry import MODELS, TASK_UTILS
@@ -41,6 +35,15 @@ class SORTTracker(BaseTracker):
             Defaults to 0.7.
         num_tentatives (int, optional): Number of continuous frames to confirm
             a track. Defaults to 3.
+        assigner (dict): Configuration of the association solver.
+            Defaults to dict(type='LinearAssignment').
+        cost_limited (bool): Whether to solve the assignments with the
+            thresholds as the cost limits, so that only the pairs within the
+            thresholds are considered and the IoU matching only computes the
+            IoUs of the overlapping boxes. Otherwise, a full assignment of
+            all the pairs is solved and the matched pairs over the thresholds
+            are dropped afterwards, as SORT and DeepSORT originally do, which
+            may match different pairs. Defaults to False.
     """
 
     def __init__(self,
@@ -53,14 +56,15 @@ class SORTTracker(BaseTracker):
                      match_score_thr=2.0),
                  match_iou_thr: float = 0.7,
                  num_tentatives: int = 3,
+                 assigner: dict = dict(type='LinearAssignment'),
+                 cost_limited: bool = False,
                  **kwargs):
-        if motmetrics is None:
-            raise RuntimeError('motmetrics is not installed,\
-                 please install it by: pip install motmetrics')
         super().__init__(**kwargs)
         if motion is not None:
             self.motion = TASK_UTILS.build(motion)
             assert self.motion is not None, 'SORT/Deep SORT need KalmanFilter'
+        self.assigner = TASK_UTILS.build(assigner)
+        self.cost_limited = cost_limited
         self.obj_score_thr = obj_score_thr
         self.reid = reid
         self.match_iou_thr = match_iou_thr
@@ -72,40 +76,92 @@ class SORTTracker(BaseTracker):
         ids = [id for id, track in self.tracks.items() if not track.tentative]
         return ids
 
-    def init_track(self, id: int, obj: Tuple[Tensor]) -> None:
-        """Initialize a track."""
-        super().init_track(id, obj)
-        self.tracks[id].tentative = True
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.initiate(
-            bbox)
-
-    def update_track(self, id: int, obj: Tuple[Tensor]) -> None:
-        """Update a track."""
-        super().update_track(id, obj)
-        if self.tracks[id].tentative:
-            if len(self.tracks[id]['bboxes']) >= self.num_tentatives:
-                self.tracks[id].tentative = False
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.update(
-            self.tracks[id].mean, self.tracks[id].covariance, bbox)
+    def init_tracks(self, ids: List[int], objs: dict) -> None:
+        """Initialize the new tracks."""
+        for id in ids:
+            self.tracks[id].tentative = True
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(ids, *self.kf.batch_initiate(bboxes))
+
+    def update_tracks(self, ids: List[int], objs: dict) -> None:
+        """Update the tracked tracks."""
+        for id in ids:
+            track = self.tracks[id]
+            if track.tentative:
+                if len(track['bboxes']) >= self.num_tentatives:
+                    track.tentative = False
+        means, covariances = self.get_kf_states(ids)
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        self.set_kf_states(
+            ids, *self.kf.batch_update(means, covariances, bboxes))
 
     def pop_invalid_tracks(self, frame_id: int) -> None:
         """Pop out invalid tracks."""
-        invalid_ids = []
-        for k, v in self.tracks.items():
-            # case1: disappeared frames >= self.num_frames_retrain
-            case1 = frame_id - v['frame_ids'][-1] >= self.num_frames_retain
-            # case2: tentative tracks but not matched in this frame
-            case2 = v.tentative and v['frame_ids'][-1] != frame_id
-            if case1 or case2:
-                invalid_ids.append(k)
-        for invalid_id in invalid_ids:
-            self.tracks.pop(invalid_id)
+        if self.empty:
+            return
+        last_frame_ids = self.get('frame_ids')
+        tentatives = torch.tensor(
+            [bool(track.tentative) for track in self.tracks.values()],
+            dtype=torch.bool,
+            device=last_frame_ids.device)
+        # case1: disappeared frames >= self.num_frames_retrain
+        case1 = frame_id - last_frame_ids >= self.num_frames_retain
+        # case2: tentative tracks but not matched in this frame
+        case2 = tentatives & (last_frame_ids != frame_id)
+        invalids = (case1 | case2).tolist()
+        self.tracks.remove(
+            [id for id, invalid in zip(self.ids, invalids) if invalid])
+
+    def match_dists(self, dists: np.ndarray, thr: float) -> np.ndarray:
+        """Match the tracks and the detections by a dense distance matrix.
+
+        Args:
+            dists (np.ndarray): of shape (N, M). The entries that are not
+                finite are infeasible.
+            thr (float): The largest distance of the matched pairs.
+
+        Returns:
+            np.ndarray: The index of the matched detection of each track,
+            which is -1 for the unmatched ones.
+        """
+        if self.cost_limited:
+            return self.assigner(dists, thr)[0]
+        row, _ = self.assigner.full_assign(dists)
+        matched = np.nonzero(row > -1)[0]
+        row[matched[~(dists[matched, row[matched]] <= thr)]] = -1
+        return row
+
+    def match_ious(self, track_bboxes: Tensor, det_bboxes: Tensor,
+                   track_labels: Tensor, det_labels: Tensor) -> np.ndarray:
+        """Match the tracks and the detections of the same labels whose IoUs
+        are over ``match_iou_thr``.
+
+        Args:
+            track_bboxes (Tensor): of shape (N, 4).
+            det_bboxes (Tensor): of shape (M, 4).
+            track_labels (Tensor): of shape (N, ).
+            det_labels (Tensor): of shape (M, ).
+
+        Returns:
+            np.ndarray: The index of the matched detection of each track,
+            which is -1 for the unmatched ones.
+        """
+        # the largest distance below 1 - match_iou_thr, as the IoUs of the
+        # matched pairs should be strictly over the threshold, so the
+        # distances are compared in float64
+        thr = np.nextafter(1 - self.match_iou_thr, -np.inf)
+        if self.cost_limited:
+            return self.assigner.assign_by_iou(
+                track_bboxes,
+                det_bboxes,
+                thr,
+                labels1=track_labels,
+                labels2=det_labels)[0]
+        ious = bbox_overlaps(track_bboxes, det_bboxes)
+        cate_match = det_labels[None, :] == track_labels[:, None]
+        cate_cost = (1 - cate_match.int()) * 1e6
+        dists = (1 - ious + cate_cost).cpu().numpy().astype(np.float64)
+        return self.match_dists(dists, thr)
 
     def track(self,
               model: torch.nn.Module,
@@ -201,22 +257,19 @@ class SORTTracker(BaseTracker):
                     reid_dists = torch.cdist(track_embeds, embeds)
 
                     # support multi-class association
-                    track_labels = torch.tensor([
-                        self.tracks[id]['labels'][-1] for id in active_ids
-                    ]).to(bboxes.device)
+                    track_labels = self.get('labels', active_ids).to(labels)
                     cate_match = labels[None, :] == track_labels[:, None]
                     cate_cost = (1 - cate_match.int()) * 1e6
                     reid_dists = (reid_dists + cate_cost).cpu().numpy()
 
-                    valid_inds = [list(self.ids).index(_) for _ in active_ids]
+                    inds = {id: i for i, id in enumerate(self.ids)}
+                    valid_inds = [inds[id] for id in active_ids]
                     reid_dists[~np.isfinite(costs[valid_inds, :])] = np.nan
 
-                    row, col = linear_sum_assignment(reid_dists)
-                    for r, c in zip(row, col):
-                        dist = reid_dists[r, c]
-                        if not np.isfinite(dist):
-                            continue
-                        if dist <= self.reid['match_score_thr']:
+                    row = self.match_dists(reid_dists,
+                                           self.reid['match_score_thr'])
+                    for r, c in enumerate(row):
+                        if c > -1:
                             ids[c] = active_ids[r]
 
             active_ids = [
@@ -226,21 +279,13 @@ class SORTTracker(BaseTracker):
             if len(active_ids) > 0:
                 active_dets = torch.nonzero(ids == -1).squeeze(1)
                 track_bboxes = self.get('bboxes', active_ids)
-                ious = bbox_overlaps(track_bboxes, bboxes[active_dets])
 
                 # support multi-class association
-                track_labels = torch.tensor([
-                    self.tracks[id]['labels'][-1] for id in active_ids
-                ]).to(bboxes.device)
-                cate_match = labels[None, active_dets] == track_labels[:, None]
-                cate_cost = (1 - cate_match.int()) * 1e6
-
-                dists = (1 - ious + cate_cost).cpu().numpy()
-
-                row, col = linear_sum_assignment(dists)
-                for r, c in zip(row, col):
-                    dist = dists[r, c]
-                    if dist < 1 - self.match_iou_thr:
+                track_labels = self.get('labels', active_ids).to(labels)
+                row = self.match_ious(track_bboxes, bboxes[active_dets],
+                                      track_labels, labels[active_dets])
+                for r, c in enumerate(row):
+                    if c > -1:
                         ids[active_dets[c]] = active_ids[r]
 
             new_track_inds = ids == -1
@@ -1,21 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from typing import Optional, Tuple
+from typing import List, Optional
 
 import numpy as np
 import torch
 from mmengine.structures import InstanceData
-
-try:
-    import motmetrics
-    from motmetrics.lap import linear_sum_assignment
-except ImportError:
-    motmetrics = None
 from torch import Tensor
 
 from mmdet.models.utils import imrenormalize
 from mmdet.registry import MODELS
 from mmdet.structures import TrackDataSample
-from mmdet.structures.bbox import bbox_overlaps, bbox_xyxy_to_cxcyah
+from mmdet.structures.bbox import bbox_xyxy_to_cxcyah
 from mmdet.utils import OptConfigType
 from .sort_tracker import SORTTracker
 
@@ -75,31 +69,21 @@ class StrongSORTTracker(SORTTracker):
                  match_iou_thr: float = 0.7,
                  num_tentatives: int = 2,
                  **kwargs):
-        if motmetrics is None:
-            raise RuntimeError('motmetrics is not installed,\
-                 please install it by: pip install motmetrics')
         super().__init__(motion, obj_score_thr, reid, match_iou_thr,
                          num_tentatives, **kwargs)
 
-    def update_track(self, id: int, obj: Tuple[Tensor]) -> None:
-        """Update a track."""
-        for k, v in zip(self.memo_items, obj):
-            v = v[None]
-            if self.momentums is not None and k in self.momentums:
-                m = self.momentums[k]
-                self.tracks[id][k] = (1 - m) * self.tracks[id][k] + m * v
-            else:
-                self.tracks[id][k].append(v)
-
-        if self.tracks[id].tentative:
-            if len(self.tracks[id]['bboxes']) >= self.num_tentatives:
-                self.tracks[id].tentative = False
-        bbox = bbox_xyxy_to_cxcyah(self.tracks[id].bboxes[-1])  # size = (1, 4)
-        assert bbox.ndim == 2 and bbox.shape[0] == 1
-        bbox = bbox.squeeze(0).cpu().numpy()
-        score = float(self.tracks[id].scores[-1].cpu())
-        self.tracks[id].mean, self.tracks[id].covariance = self.kf.update(
-            self.tracks[id].mean, self.tracks[id].covariance, bbox, score)
+    def update_tracks(self, ids: List[int], objs: dict) -> None:
+        """Update the tracked tracks."""
+        for id in ids:
+            track = self.tracks[id]
+            if track.tentative:
+                if len(track['bboxes']) >= self.num_tentatives:
+                    track.tentative = False
+        means, covariances = self.get_kf_states(ids)
+        bboxes = bbox_xyxy_to_cxcyah(objs['bboxes']).cpu().numpy()
+        scores = objs['scores'].cpu().numpy()
+        self.set_kf_states(
+            ids, *self.kf.batch_update(means, covariances, bboxes, scores))
 
     def track(self,
               model: torch.nn.Module,
@@ -199,7 +183,8 @@ class StrongSORTTracker(SORTTracker):
                         self.reid.get('num_samples', None),
                         behavior='mean')
                     reid_dists = cosine_distance(track_embeds, embeds)
-                    valid_inds = [list(self.ids).index(_) for _ in active_ids]
+                    inds = {id: i for i, id in enumerate(self.ids)}
+                    valid_inds = [inds[id] for id in active_ids]
                     reid_dists[~np.isfinite(motion_dists[
                         valid_inds, :])] = np.nan
 
@@ -208,19 +193,15 @@ class StrongSORTTracker(SORTTracker):
                         weight_motion * motion_dists[valid_inds]
 
                     # support multi-class association
-                    track_labels = torch.tensor([
-                        self.tracks[id]['labels'][-1] for id in active_ids
-                    ]).to(bboxes.device)
+                    track_labels = self.get('labels', active_ids).to(labels)
                     cate_match = labels[None, :] == track_labels[:, None]
                     cate_cost = ((1 - cate_match.int()) * 1e6).cpu().numpy()
                     match_dists = match_dists + cate_cost
 
-                    row, col = linear_sum_assignment(match_dists)
-                    for r, c in zip(row, col):
-                        dist = match_dists[r, c]
-                        if not np.isfinite(dist):
-                            continue
-                        if dist <= self.reid['match_score_thr']:
+                    row = self.match_dists(match_dists,
+                                           self.reid['match_score_thr'])
+                    for r, c in enumerate(row):
+                        if c > -1:
                             ids[c] = active_ids[r]
 
             active_ids = [
@@ -230,21 +211,13 @@ class StrongSORTTracker(SORTTracker):
             if len(active_ids) > 0:
                 active_dets = torch.nonzero(ids == -1).squeeze(1)
                 track_bboxes = self.get('bboxes', active_ids)
-                ious = bbox_overlaps(track_bboxes, bboxes[active_dets])
 
                 # support multi-class association
-                track_labels = torch.tensor([
-                    self.tracks[id]['labels'][-1] for id in active_ids
-                ]).to(bboxes.device)
-                cate_match = labels[None, active_dets] == track_labels[:, None]
-                cate_cost = (1 - cate_match.int()) * 1e6
-
-                dists = (1 - ious + cate_cost).cpu().numpy()
-
-                row, col = linear_sum_assignment(dists)
-                for r, c in zip(row, col):
-                    dist = dists[r, c]
-                    if dist < 1 - self.match_iou_thr:
+                track_labels = self.get('labels', active_ids).to(labels)
+                row = self.match_ious(track_bboxes, bboxes[active_dets],
+                                      track_labels, labels[active_dets])
+                for r, c in enumerate(row):
+                    if c > -1:
                         ids[active_dets[c]] = active_ids[r]
 
             new_track_inds = ids == -1
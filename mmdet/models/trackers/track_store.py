@@ -0,0 +1,379 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from collections.abc import Sequence
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import torch
+from addict import Dict as ADict
+from torch import Tensor
+
+IdsType = Union[Tensor, List[int]]
+
+
+class TrackHistory(Sequence):
+    """List-like view of the history of an item of a track.
+
+    The entries are of shape (1, ...), the same as the elements of the lists
+    that kept the history before, so that ``history[-1]``, ``len(history)``,
+    slicing and slice assignment keep working. The entries are views of the
+    ring buffer of :class:`TrackStore`, which are overwritten once the track
+    has ``max_history`` newer entries.
+
+    Args:
+        store (:obj:`TrackStore`): The store of the tracks.
+        slot (int): The slot of the track in the store.
+        item (str): The name of the item.
+    """
+
+    __slots__ = ('_store', '_slot', '_item')
+
+    def __init__(self, store: 'TrackStore', slot: int, item: str) -> None:
+        self._store = store
+        self._slot = slot
+        self._item = item
+
+    def __len__(self) -> int:
+        return min(int(self._store._lengths[self._slot]),
+                   self._store._history)
+
+    def _pos(self, index: int) -> int:
+        num_entries = len(self)
+        if index < 0:
+            index += num_entries
+        if not 0 <= index < num_entries:
+            raise IndexError('track history index out of range')
+        length = int(self._store._lengths[self._slot])
+        return (length - num_entries + index) % self._store._history
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tensor, list]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        pos = self._pos(index)
+        return self._store._buffers[self._item][self._slot, pos:pos + 1]
+
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        if isinstance(index, slice):
+            indices = range(len(self))[index]
+            value = list(value)
+            if len(value) != len(indices):
+                raise ValueError('The length of the history of a track '
+                                 'can not be changed by assignment')
+            for i, v in zip(indices, value):
+                self[i] = v
+            return
+        buffer = self._store._buffers[self._item]
+        buffer[self._slot, self._pos(index)] = value.reshape(
+            buffer.shape[2:]).to(buffer)
+
+
+class TrackView:
+    """View of a track in :class:`TrackStore`.
+
+    It supports the same item and attribute access as the ``addict.Dict``
+    that kept a track before. The memo items are read from the buffers of the
+    store, e.g. ``track.bboxes[-1]`` or ``track['labels'][-1]``, while other
+    attributes, e.g. the states of the Kalman filter ``track.mean``, are kept
+    in a ``addict.Dict`` of the track.
+
+    Args:
+        store (:obj:`TrackStore`): The store of the tracks.
+        id (int): The id of the track.
+    """
+
+    __slots__ = ('_store', '_id')
+
+    def __init__(self, store: 'TrackStore', id: int) -> None:
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_id', id)
+
+    def __getitem__(self, key: str):
+        store = self._store
+        if key not in store._buffers:
+            return store._extras[self._id][key]
+        slot = store._slots[self._id]
+        if key in store.momentums:
+            return store._buffers[key][slot:slot + 1]
+        return TrackHistory(store, slot, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        store = self._store
+        if key not in store._buffers:
+            store._extras[self._id][key] = value
+        elif key in store.momentums:
+            buffer = store._buffers[key]
+            buffer[store._slots[self._id]] = value.reshape(
+                buffer.shape[1:]).to(buffer)
+        else:
+            raise TypeError(f'The history of `{key}` can only be modified '
+                            'by `TrackStore.update` or item assignment')
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __setattr__(self, name: str, value) -> None:
+        self[name] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._store._buffers or \
+            key in self._store._extras[self._id]
+
+    def keys(self) -> List[str]:
+        """The memo items and the other attributes of the track."""
+        store = self._store
+        return list(store._buffers) + list(store._extras[self._id])
+
+
+class TrackStore:
+    """Structure-of-arrays buffer of the tracks.
+
+    Each memo item is kept in a preallocated tensor of shape
+    (capacity, max_history, ...), which is used as a ring buffer of the
+    history of every track, while the items with momentums are kept in a
+    tensor of shape (capacity, ...). Updating a batch of tracks writes each
+    item with a single indexing op, and :meth:`get` gathers the latest or the
+    mean of the latest ``num_samples`` entries of all the tracks at once.
+    The slots of the removed tracks are reused by the new ones, and the
+    buffers grow by doubling when the slots are exhausted.
+
+    The store can be used as the dict of the tracks kept by the trackers
+    before, i.e. ``store[id]`` returns a :class:`TrackView` of the track, and
+    ``items()``, ``pop(id)`` and ``id in store`` follow the iteration order of
+    the dict.
+
+    Args:
+        momentums (dict[str, float], optional): Momentums to update the items.
+            The items with momentums only keep their running value.
+            Defaults to None.
+        max_history (int, optional): The most entries kept in the history of
+            each item of a track. None means the whole history is kept.
+            Defaults to None.
+        init_capacity (int): The number of slots allocated at first.
+            Defaults to 32.
+    """
+
+    def __init__(self,
+                 momentums: Optional[Dict[str, float]] = None,
+                 max_history: Optional[int] = None,
+                 init_capacity: int = 32) -> None:
+        assert max_history is None or max_history > 0
+        assert init_capacity > 0
+        self.momentums = momentums if momentums is not None else dict()
+        self.max_history = max_history
+        self.init_capacity = init_capacity
+        self.reset()
+
+    def reset(self) -> None:
+        """Remove all the tracks and release the buffers."""
+        self._buffers: Dict[str, Tensor] = dict()
+        self._capacity = self.init_capacity
+        self._history = self.max_history if self.max_history else 8
+        self._lengths = torch.zeros(self._capacity, dtype=torch.long)
+        # the insertion order of the dict keeps the order of the tracks
+        self._slots: Dict[int, int] = dict()
+        self._extras: Dict[int, ADict] = dict()
+        self._free_slots: List[int] = []
+        self._num_used_slots = 0
+        self._all_slots: Optional[Tensor] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._slots
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._slots)
+
+    def __getitem__(self, id: int) -> TrackView:
+        if id not in self._slots:
+            raise KeyError(id)
+        return TrackView(self, id)
+
+    def keys(self) -> List[int]:
+        """All ids in the store."""
+        return list(self._slots)
+
+    def values(self) -> Iterator[TrackView]:
+        """Views of all the tracks."""
+        return (TrackView(self, id) for id in self._slots)
+
+    def items(self) -> Iterator[Tuple[int, TrackView]]:
+        """Ids and views of all the tracks."""
+        return ((id, TrackView(self, id)) for id in self._slots)
+
+    @property
+    def ids(self) -> List[int]:
+        """All ids in the store."""
+        return list(self._slots)
+
+    def pop(self, id: int) -> None:
+        """Remove a track."""
+        self.remove([id])
+
+    def remove(self, ids: IdsType) -> None:
+        """Remove tracks.
+
+        Args:
+            ids (Tensor | list[int]): The ids of the tracks.
+        """
+        if isinstance(ids, Tensor):
+            ids = ids.tolist()
+        if len(ids) == 0:
+            return
+        slots = [self._slots.pop(int(id)) for id in ids]
+        for id in ids:
+            self._extras.pop(int(id))
+        self._lengths[slots] = 0
+        self._free_slots.extend(slots)
+        self._all_slots = None
+
+    def _alloc_slot(self, id: int) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._num_used_slots
+            self._num_used_slots += 1
+            if slot >= self._capacity:
+                self._grow(capacity=self._capacity * 2)
+        self._slots[id] = slot
+        self._extras[id] = ADict()
+        self._all_slots = None
+        return slot
+
+    def _grow(self,
+              capacity: Optional[int] = None,
+              history: Optional[int] = None) -> None:
+        """Reallocate the buffers with more slots or a longer history."""
+        capacity = capacity or self._capacity
+        history = history or self._history
+        for item, buffer in self._buffers.items():
+            if item in self.momentums:
+                new_buffer = buffer.new_zeros((capacity, ) + buffer.shape[1:])
+                new_buffer[:self._capacity] = buffer
+            else:
+                new_buffer = buffer.new_zeros((capacity, history) +
+                                              buffer.shape[2:])
+                # the history never wraps around without `max_history`
+                new_buffer[:self._capacity, :self._history] = buffer
+            self._buffers[item] = new_buffer
+        lengths = self._lengths.new_zeros(capacity)
+        lengths[:self._capacity] = self._lengths
+        self._lengths = lengths
+        self._capacity = capacity
+        self._history = history
+
+    def _get_slots(self, ids: Optional[IdsType] = None) -> Tensor:
+        if ids is None:
+            if self._all_slots is None:
+                self._all_slots = torch.tensor(
+                    list(self._slots.values()), dtype=torch.long)
+            return self._all_slots
+        if isinstance(ids, Tensor):
+            ids = ids.tolist()
+        return torch.tensor([self._slots[int(id)] for id in ids],
+                            dtype=torch.long)
+
+    def update(self, ids: IdsType, **items: Tensor) -> None:
+        """Append the items of a batch of tracks, and initialize the tracks
+        not in the store.
+
+        Args:
+            ids (Tensor | list[int]): The ids of the tracks of shape (N, ).
+                The ids should be unique.
+            items (dict[str, Tensor]): The items of shape (N, ...). The items
+                with momentums are updated by their momentums except for the
+                new tracks, and the others are appended to the history.
+        """
+        if isinstance(ids, Tensor):
+            ids = ids.tolist()
+        if len(ids) == 0:
+            return
+        slots, is_new = [], []
+        for id in ids:
+            id = int(id)
+            slot = self._slots.get(id)
+            is_new.append(slot is None)
+            slots.append(self._alloc_slot(id) if slot is None else slot)
+        slots = torch.tensor(slots, dtype=torch.long)
+        is_new = torch.tensor(is_new, dtype=torch.bool)
+
+        lengths = self._lengths[slots]
+        if self.max_history is None and int(lengths.max()) >= self._history:
+            self._grow(history=self._history * 2)
+        pos = lengths % self._history
+
+        for item, value in items.items():
+            buffer = self._buffers.get(item)
+            if buffer is None:
+                shape = (self._capacity, ) if item in self.momentums else \
+                    (self._capacity, self._history)
+                buffer = value.new_zeros(shape + value.shape[1:])
+                self._buffers[item] = buffer
+            value = value.to(buffer)
+            buffer_slots = slots.to(buffer.device)
+            if item in self.momentums:
+                m = self.momentums[item]
+                new = is_new.to(buffer.device).view((-1, ) + (1, ) *
+                                                    (value.dim() - 1))
+                buffer[buffer_slots] = torch.where(
+                    new, value, (1 - m) * buffer[buffer_slots] + m * value)
+            else:
+                buffer[buffer_slots, pos.to(buffer.device)] = value
+        self._lengths[slots] += 1
+
+    def get(self,
+            item: str,
+            ids: Optional[IdsType] = None,
+            num_samples: Optional[int] = None,
+            behavior: Optional[str] = None) -> Tensor:
+        """Gather an item of the tracks.
+
+        Args:
+            item (str): The demanded item.
+            ids (Tensor | list[int], optional): The demanded ids. Defaults to
+                None, which means all the tracks in the order of :attr:`ids`.
+            num_samples (int, optional): Number of the latest entries to
+                calculate the results. Defaults to None, which means only the
+                latest entry.
+            behavior (str, optional): Behavior to calculate the results.
+                Options are `mean` | None. Defaults to None.
+
+        Returns:
+            Tensor: The latest entries of shape (N, ...) without
+            ``num_samples``, otherwise the mean of the latest entries of
+            shape (N, ...) with ``behavior='mean'`` or the latest entries of
+            shape (N, num_samples, ...) with ``behavior=None``. The items
+            with momentums are always of shape (N, ...).
+        """
+        buffer = self._buffers[item]
+        slots = self._get_slots(ids)
+        buffer_slots = slots.to(buffer.device)
+        if item in self.momentums:
+            return buffer[buffer_slots]
+        lengths = self._lengths[slots]
+        if num_samples is None:
+            pos = (lengths - 1) % self._history
+            return buffer[buffer_slots, pos.to(buffer.device)]
+
+        num_samples = min(num_samples, self._history)
+        offsets = torch.arange(-num_samples, 0)
+        pos = (lengths[:, None] + offsets) % self._history
+        samples = buffer[buffer_slots[:, None], pos.to(buffer.device)]
+        num_valid = lengths.clamp(max=num_samples)
+        if behavior == 'mean':
+            valid = offsets >= -num_valid[:, None]
+            shape = valid.shape + (1, ) * (samples.dim() - 2)
+            valid = valid.to(buffer.device).view(shape)
+            samples = torch.where(valid, samples, samples.new_zeros(()))
+            return samples.sum(dim=1) / num_valid.to(samples).view(
+                shape[:1] + shape[2:])
+        elif behavior is None:
+            if len(num_valid) > 0 and int(num_valid.min()) != int(
+                    num_valid.max()):
+                raise ValueError('The tracks have different numbers of '
+                                 'entries, use `behavior="mean"` instead')
+            num_min = int(num_valid.min()) if len(num_valid) else num_samples
+            return samples[:, num_samples - num_min:]
+        else:
+            raise NotImplementedError()
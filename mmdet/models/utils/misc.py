@@ -1,6 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from functools import partial
-from typing import List, Optional, Sequence, Tuple, Union
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
@@ -13,7 +13,7 @@ from torch.nn import functional as F
 
 from mmdet.structures import SampleList
 from mmdet.structures.bbox import BaseBoxes, get_box_type, stack_boxes
-from mmdet.structures.mask import BitmapMasks, PolygonMasks
+from mmdet.structures.mask import BitmapMasks, PolygonMasks, RLEMasks
 from mmdet.utils import OptInstanceList
 
 
@@ -236,13 +236,13 @@ def mask2ndarray(mask):
     """Convert Mask to ndarray..
 
     Args:
-        mask (:obj:`BitmapMasks` or :obj:`PolygonMasks` or
-        torch.Tensor or np.ndarray): The mask to be converted.
+        mask (:obj:`BitmapMasks` or :obj:`PolygonMasks` or :obj:`RLEMasks`
+        or torch.Tensor or np.ndarray): The mask to be converted.
 
     Returns:
         np.ndarray: Ndarray mask of shape (n, h, w) that has been converted
     """
-    if isinstance(mask, (BitmapMasks, PolygonMasks)):
+    if isinstance(mask, (BitmapMasks, PolygonMasks, RLEMasks)):
         mask = mask.to_ndarray()
     elif isinstance(mask, torch.Tensor):
         mask = mask.detach().cpu().numpy()
@@ -251,6 +251,35 @@ def mask2ndarray(mask):
     return mask
 
 
+def masks_to_rle(mask_fn: Callable[[Tensor], Tensor],
+                 inputs: Tensor,
+                 out_shape: Tuple[int, int],
+                 mem_limit: int = 1024**3) -> RLEMasks:
+    """Compute binary masks chunk by chunk and encode them to RLE, so that
+    the full bitmaps of all the masks are not kept at once.
+
+    Args:
+        mask_fn (Callable): A function computing the binary masks of shape
+            (n, H, W) from the inputs of n masks. The masks should be
+            computed independently of each other.
+        inputs (Tensor): The inputs of all the masks, shape (N, ...).
+        out_shape (tuple[int]): The shape (H, W) of the masks.
+        mem_limit (int): The memory limit in bytes of the float masks of a
+            chunk. Defaults to 1 GB.
+
+    Returns:
+        :obj:`RLEMasks`: The RLE masks.
+    """
+    h, w = out_shape
+    if len(inputs) == 0:
+        return RLEMasks([], h, w)
+    chunk_size = max(mem_limit // (h * w * 4), 1)
+    return RLEMasks.cat([
+        RLEMasks.from_ndarray(mask_fn(chunk).cpu().numpy())
+        for chunk in inputs.split(chunk_size)
+    ])
+
+
 def flip_tensor(src_tensor, flip_direction):
     """flip tensor base on flip_direction.
 
@@ -3,17 +3,19 @@ from typing import Optional, Tuple, TypeVar, Union
 
 import cv2
 import numpy as np
+import pycocotools.mask as maskUtils
 import torch
 from torch import BoolTensor, Tensor
 
-from mmdet.structures.mask.structures import BitmapMasks, PolygonMasks
+from mmdet.structures.mask.structures import (BitmapMasks, PolygonMasks,
+                                              RLEMasks)
 from .base_boxes import BaseBoxes
 from .bbox_overlaps import bbox_overlaps
 from .box_type import register_box
 
 T = TypeVar('T')
 DeviceType = Union[str, torch.device]
-MaskType = Union[BitmapMasks, PolygonMasks]
+MaskType = Union[BitmapMasks, PolygonMasks, RLEMasks]
 
 
 @register_box(name='hbox')
@@ -393,8 +395,8 @@ class HorizontalBoxes(BaseBoxes):
         """Create horizontal boxes from instance masks.
 
         Args:
-            masks (:obj:`BitmapMasks` or :obj:`PolygonMasks`): BitmapMasks or
-                PolygonMasks instance with length of n.
+            masks (:obj:`BitmapMasks` or :obj:`PolygonMasks` or
+                :obj:`RLEMasks`): Instance masks with length of n.
 
         Returns:
             :obj:`HorizontalBoxes`: Converted boxes with shape of (n, 4).
@@ -413,20 +415,30 @@ class HorizontalBoxes(BaseBoxes):
                     boxes[idx, :] = np.array(
                         [x[0], y[0], x[-1] + 1, y[-1] + 1], dtype=np.float32)
         elif isinstance(masks, PolygonMasks):
-            for idx, poly_per_obj in enumerate(masks.masks):
-                # simply use a number that is big enough for comparison with
-                # coordinates
-                xy_min = np.array([masks.width * 2, masks.height * 2],
-                                  dtype=np.float32)
-                xy_max = np.zeros(2, dtype=np.float32)
-                for p in poly_per_obj:
-                    xy = np.array(p).reshape(-1, 2).astype(np.float32)
-                    xy_min = np.minimum(xy_min, np.min(xy, axis=0))
-                    xy_max = np.maximum(xy_max, np.max(xy, axis=0))
-                boxes[idx, :2] = xy_min
-                boxes[idx, 2:] = xy_max
+            coords, poly_offsets, inst_offsets = masks.packed
+            xy = coords.reshape(-1, 2).astype(np.float32)
+            # simply use a number that is big enough for comparison with
+            # coordinates
+            xy_min = np.array([masks.width * 2, masks.height * 2],
+                              dtype=np.float32)
+            boxes[:, :2] = xy_min
+            # reduce the vertices of each instance at once, the vertices
+            # of an instance are contiguous in the packed coordinates
+            starts = poly_offsets[inst_offsets] // 2
+            nonempty = starts[1:] > starts[:-1]
+            if nonempty.any():
+                starts = starts[:-1][nonempty]
+                boxes[nonempty, :2] = np.minimum(
+                    xy_min, np.minimum.reduceat(xy, starts, axis=0))
+                boxes[nonempty, 2:] = np.maximum(
+                    0, np.maximum.reduceat(xy, starts, axis=0))
+        elif isinstance(masks, RLEMasks):
+            if num_masks > 0:
+                # in format [x, y, w, h], and zeros for empty masks
+                boxes[:] = maskUtils.toBbox(masks.masks)
+                boxes[:, 2:] += boxes[:, :2]
         else:
             raise TypeError(
-                '`masks` must be `BitmapMasks`  or `PolygonMasks`, '
-                f'but got {type(masks)}.')
+                '`masks` must be `BitmapMasks`, `PolygonMasks` or '
+                f'`RLEMasks`, but got {type(masks)}.')
         return HorizontalBoxes(boxes)
@@ -1,11 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .mask_target import mask_target
 from .structures import (BaseInstanceMasks, BitmapMasks, PolygonMasks,
-                         bitmap_to_polygon, polygon_to_bitmap)
+                         RLEMasks, batch_bitmap_to_polygon, bitmap_to_polygon,
+                         polygon_to_bitmap)
 from .utils import encode_mask_results, mask2bbox, split_combined_polys
 
 __all__ = [
     'split_combined_polys', 'mask_target', 'BaseInstanceMasks', 'BitmapMasks',
     'PolygonMasks', 'encode_mask_results', 'mask2bbox', 'polygon_to_bitmap',
-    'bitmap_to_polygon'
+    'bitmap_to_polygon', 'RLEMasks', 'batch_bitmap_to_polygon'
 ]
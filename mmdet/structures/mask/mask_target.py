@@ -3,6 +3,8 @@ import numpy as np
 import torch
 from torch.nn.modules.utils import _pair
 
+from .structures import BitmapMasks
+
 
 def mask_target(pos_proposals_list, pos_assigned_gt_inds_list, gt_masks_list,
                 cfg):
@@ -55,6 +57,14 @@ def mask_target(pos_proposals_list, pos_assigned_gt_inds_list, gt_masks_list,
         >>>     gt_masks_list, cfg)
         >>> assert mask_targets.shape == (5,) + cfg['mask_size']
     """
+    if len(pos_proposals_list) > 0 and all(
+            isinstance(gt_masks, BitmapMasks) and pos_proposals.is_cpu
+            for pos_proposals, gt_masks in zip(pos_proposals_list,
+                                               gt_masks_list)):
+        # crop and resize the bitmaps of all the images at once on CPU
+        return bitmap_mask_target(pos_proposals_list,
+                                  pos_assigned_gt_inds_list, gt_masks_list,
+                                  cfg)
     cfg_list = [cfg for _ in range(len(pos_proposals_list))]
     mask_targets = map(mask_target_single, pos_proposals_list,
                        pos_assigned_gt_inds_list, gt_masks_list, cfg_list)
@@ -125,3 +135,44 @@ def mask_target_single(pos_proposals, pos_assigned_gt_inds, gt_masks, cfg):
         mask_targets = pos_proposals.new_zeros((0, ) + mask_size)
 
     return mask_targets
+
+
+def bitmap_mask_target(pos_proposals_list, pos_assigned_gt_inds_list,
+                       gt_masks_list, cfg):
+    """Compute mask target for positive proposals in multiple images with
+    bitmap masks on CPU.
+
+    The masks of all the images are cropped and resized by one call of
+    :func:`BitmapMasks.batch_crop_and_resize`, which only converts the
+    windows of the masks covered by the proposals to float.
+
+    Args:
+        pos_proposals_list (list[Tensor]): Positive proposals in multiple
+            images, each has shape (num_pos, 4).
+        pos_assigned_gt_inds_list (list[Tensor]): Assigned GT indices for each
+            positive proposals, each has shape (num_pos,).
+        gt_masks_list (list[:obj:`BitmapMasks`]): Ground truth masks of each
+            image.
+        cfg (dict): Config dict that specifies the mask size.
+
+    Returns:
+        Tensor: Mask target of each image, has shape (num_pos, w, h).
+    """
+    mask_size = _pair(cfg.mask_size)
+    binarize = not cfg.get('soft_mask_target', False)
+    proposals_list = []
+    for pos_proposals, gt_masks in zip(pos_proposals_list, gt_masks_list):
+        proposals_np = pos_proposals.cpu().numpy().copy()
+        maxh, maxw = gt_masks.height, gt_masks.width
+        proposals_np[:, [0, 2]] = np.clip(proposals_np[:, [0, 2]], 0, maxw)
+        proposals_np[:, [1, 3]] = np.clip(proposals_np[:, [1, 3]], 0, maxh)
+        proposals_list.append(proposals_np)
+    inds_list = [inds.cpu().numpy() for inds in pos_assigned_gt_inds_list]
+
+    mask_targets = BitmapMasks.batch_crop_and_resize(
+        gt_masks_list,
+        proposals_list,
+        inds_list,
+        mask_size,
+        binarize=binarize)
+    return torch.from_numpy(mask_targets).float()
@@ -1,6 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-import itertools
+import operator
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Sequence, Type, TypeVar
 
 import cv2
@@ -10,6 +11,7 @@ import pycocotools.mask as maskUtils
 import shapely.geometry as geometry
 import torch
 from mmcv.ops.roi_align import roi_align
+from numpy.lib.stride_tricks import sliding_window_view
 
 T = TypeVar('T')
 
@@ -114,6 +116,15 @@ class BaseInstanceMasks(metaclass=ABCMeta):
     def areas(self):
         """ndarray: areas of each instance."""
 
+    @property
+    def nbytes(self):
+        """int: The memory in bytes taken by the data of the masks.
+
+        Defaults to the size of the masks converted by :meth:`to_ndarray`,
+        which the subclasses override with the size of their own data.
+        """
+        return self.to_ndarray().nbytes
+
     @abstractmethod
     def to_ndarray(self):
         """Convert masks to the format of ndarray.
@@ -375,6 +386,11 @@ class BitmapMasks(BaseInstanceMasks):
             empty_masks = np.empty((0, *out_shape), dtype=np.uint8)
             return BitmapMasks(empty_masks, *out_shape)
 
+        if torch.device(device).type == 'cpu':
+            resized_masks = BitmapMasks.batch_crop_and_resize(
+                [self], [bboxes], [inds], out_shape, binarize=binarize)
+            return BitmapMasks(resized_masks, *out_shape)
+
         # convert bboxes to tensor
         if isinstance(bboxes, np.ndarray):
             bboxes = torch.from_numpy(bboxes).to(device=device)
@@ -399,6 +415,99 @@ class BitmapMasks(BaseInstanceMasks):
             resized_masks = []
         return BitmapMasks(resized_masks, *out_shape)
 
+    @staticmethod
+    def batch_crop_and_resize(masks_list,
+                              bboxes_list,
+                              inds_list,
+                              out_shape,
+                              binarize=True,
+                              max_elements=2**24):
+        """Crop and resize the masks of multiple images on CPU at once.
+
+        This is a numpy implementation of the aligned ``roi_align`` used by
+        :func:`crop_and_resize`, vectorized over the bboxes of all the
+        images. The bilinear sampling of ``roi_align`` is separable, so each
+        bbox is computed as two small matrix products with the window of its
+        mask that is sampled. Only these windows are converted to float, and
+        the bboxes are processed in chunks of similar window sizes to bound
+        the memory.
+
+        Args:
+            masks_list (list[:obj:`BitmapMasks`]): The masks of each image.
+            bboxes_list (list[ndarray | Tensor]): The bboxes of each image,
+                each of shape (K_i, 4).
+            inds_list (list[ndarray | Tensor]): The indices of the masks to
+                crop of each image, each of shape (K_i, ).
+            out_shape (tuple[int]): Target (h, w) of resized masks.
+            binarize (bool): Whether to binarize the resized masks with a
+                threshold of 0.5. Defaults to True.
+            max_elements (int): The maximum number of window elements
+                processed in a chunk. Defaults to 2**24.
+
+        Returns:
+            ndarray: The resized masks of all the bboxes concatenated, of
+            shape (K, h, w). The dtype is bool if ``binarize`` is True, else
+            float32.
+        """
+        out_h, out_w = out_shape
+        bboxes = np.concatenate([
+            _to_numpy(bboxes).reshape(-1, 4).astype(np.float32)
+            for bboxes in bboxes_list
+        ])
+        inds = np.concatenate([
+            _to_numpy(inds).reshape(-1).astype(np.int64) for inds in inds_list
+        ])
+        img_inds = np.repeat(
+            np.arange(len(masks_list)),
+            [len(_to_numpy(inds).reshape(-1)) for inds in inds_list])
+        num_bboxes = len(bboxes)
+        resized_masks = np.zeros((num_bboxes, out_h, out_w), dtype=np.float32)
+        if num_bboxes == 0:
+            return resized_masks >= 0.5 if binarize else resized_masks
+
+        heights = np.array([masks.height for masks in masks_list])[img_inds]
+        widths = np.array([masks.width for masks in masks_list])[img_inds]
+        y_inds, y_weights, y_starts, y_lens = _roi_align_samples(
+            bboxes[:, 1], bboxes[:, 3], out_h, heights)
+        x_inds, x_weights, x_starts, x_lens = _roi_align_samples(
+            bboxes[:, 0], bboxes[:, 2], out_w, widths)
+
+        win_sizes = y_lens * x_lens
+        order = np.argsort(win_sizes, kind='stable')
+        start = 0
+        while start < num_bboxes:
+            # the largest window of the chunk bounds the padded windows
+            costs = np.arange(1, num_bboxes - start + 1) * \
+                win_sizes[order[start:]]
+            end = start + max(
+                int(np.searchsorted(costs, max_elements, side='right')), 1)
+            chunk = order[start:end]
+            win_h, win_w = y_lens[chunk].max(), x_lens[chunk].max()
+            win_y_starts, win_x_starts = y_starts[chunk], x_starts[chunk]
+            windows = np.zeros((len(chunk), win_h, win_w), dtype=np.float32)
+            for img_ind in np.unique(img_inds[chunk]):
+                is_img = img_inds[chunk] == img_ind
+                masks = masks_list[img_ind]
+                h, w = min(win_h, masks.height), min(win_w, masks.width)
+                # shift the windows to be inside the masks, which gathers
+                # each window as a contiguous block of the sliding windows
+                win_y_starts[is_img] = np.minimum(win_y_starts[is_img],
+                                                  masks.height - h)
+                win_x_starts[is_img] = np.minimum(win_x_starts[is_img],
+                                                  masks.width - w)
+                windows[is_img, :h, :w] = sliding_window_view(
+                    masks.masks, (h, w), axis=(1, 2))[inds[chunk][is_img],
+                                                      win_y_starts[is_img],
+                                                      win_x_starts[is_img]]
+            y_dense = _dense_sample_weights(y_inds[chunk], y_weights[chunk],
+                                            win_y_starts, win_h)
+            x_dense = _dense_sample_weights(x_inds[chunk], x_weights[chunk],
+                                            win_x_starts, win_w)
+            resized_masks[chunk] = y_dense @ windows @ x_dense.transpose(
+                0, 2, 1)
+            start = end
+        return resized_masks >= 0.5 if binarize else resized_masks
+
     def expand(self, expanded_h, expanded_w, top, left):
         """See :func:`BaseInstanceMasks.expand`."""
         if len(self.masks) == 0:
@@ -548,6 +657,11 @@ class BitmapMasks(BaseInstanceMasks):
         """See :py:attr:`BaseInstanceMasks.areas`."""
         return self.masks.sum((1, 2))
 
+    @property
+    def nbytes(self):
+        """See :py:attr:`BaseInstanceMasks.nbytes`."""
+        return self.masks.nbytes
+
     def to_ndarray(self):
         """See :func:`BaseInstanceMasks.to_ndarray`."""
         return self.masks
@@ -644,7 +758,107 @@ class PolygonMasks(BaseInstanceMasks):
 
         self.height = height
         self.width = width
-        self.masks = masks
+        self._masks = masks
+        self._packed = None
+
+    @classmethod
+    def from_packed(cls, coords, poly_offsets, inst_offsets, height, width):
+        """Create polygon masks from the packed representation.
+
+        Args:
+            coords (ndarray): The coordinates of all the polygons in one flat
+                array, in format [x0, y0, x1, y1, ...].
+            poly_offsets (ndarray): The start of each polygon in ``coords``
+                followed by the end of the last one, shape (num_polys + 1, ).
+            inst_offsets (ndarray): The first polygon of each mask followed
+                by the end of the last one, shape (num_masks + 1, ).
+            height (int): height of masks
+            width (int): width of masks
+
+        Returns:
+            :obj:`PolygonMasks`: The polygon masks.
+        """
+        self = cls.__new__(cls)
+        self.height = height
+        self.width = width
+        self._masks = None
+        self._packed = (coords, poly_offsets, inst_offsets)
+        return self
+
+    @property
+    def packed(self):
+        """tuple[ndarray]: The packed representation of the masks, i.e. the
+        ``coords``, ``poly_offsets`` and ``inst_offsets`` of
+        :meth:`from_packed`.
+
+        The arrays are shared by the masks derived from these masks and
+        should not be modified in place.
+        """
+        if self._packed is None:
+            polys = [p for poly_per_obj in self._masks for p in poly_per_obj]
+            if len(polys) > 0:
+                coords = np.concatenate([p.reshape(-1) for p in polys])
+            else:
+                coords = np.zeros(0, dtype=np.float32)
+            poly_offsets = np.zeros(len(polys) + 1, dtype=np.int64)
+            np.cumsum([p.size for p in polys], out=poly_offsets[1:])
+            inst_offsets = np.zeros(len(self._masks) + 1, dtype=np.int64)
+            np.cumsum([len(poly_per_obj) for poly_per_obj in self._masks],
+                      out=inst_offsets[1:])
+            self._packed = (coords, poly_offsets, inst_offsets)
+        return self._packed
+
+    @property
+    def masks(self):
+        """list[list[ndarray]]: The polygons of each mask.
+
+        It is built from :attr:`packed` on first access if the masks are
+        created by :meth:`from_packed`, and the polygons are views of the
+        packed coordinates.
+        """
+        if self._masks is None:
+            coords, poly_offsets, inst_offsets = self._packed
+            polys = [
+                coords[start:end]
+                for start, end in zip(poly_offsets[:-1].tolist(),
+                                      poly_offsets[1:].tolist())
+            ]
+            self._masks = [
+                polys[start:end]
+                for start, end in zip(inst_offsets[:-1].tolist(),
+                                      inst_offsets[1:].tolist())
+            ]
+        return self._masks
+
+    @masks.setter
+    def masks(self, masks):
+        self._masks = masks
+        self._packed = None
+
+    def _with_coords(self, coords, out_shape):
+        """Create masks with the same polygons as these masks but new
+        coordinates."""
+        _, poly_offsets, inst_offsets = self.packed
+        return PolygonMasks.from_packed(
+            coords.reshape(-1), poly_offsets, inst_offsets, *out_shape)
+
+    def _gather(self, inds):
+        """Gather the masks of the given indices into new masks."""
+        coords, poly_offsets, inst_offsets = self.packed
+        inds = np.asarray(inds, dtype=np.int64).reshape(-1)
+        poly_inds = _concat_ranges(inst_offsets[inds], inst_offsets[inds + 1])
+        poly_lens = poly_offsets[poly_inds + 1] - poly_offsets[poly_inds]
+        coord_inds = _concat_ranges(poly_offsets[poly_inds],
+                                    poly_offsets[poly_inds + 1])
+        new_poly_offsets = np.zeros(len(poly_inds) + 1, dtype=np.int64)
+        np.cumsum(poly_lens, out=new_poly_offsets[1:])
+        new_inst_offsets = np.zeros(len(inds) + 1, dtype=np.int64)
+        np.cumsum(
+            inst_offsets[inds + 1] - inst_offsets[inds],
+            out=new_inst_offsets[1:])
+        return PolygonMasks.from_packed(coords[coord_inds], new_poly_offsets,
+                                        new_inst_offsets, self.height,
+                                        self.width)
 
     def __getitem__(self, index):
         """Index the polygon masks.
@@ -655,41 +869,28 @@ class PolygonMasks(BaseInstanceMasks):
         Returns:
             :obj:`PolygonMasks`: The indexed polygon masks.
         """
-        if isinstance(index, np.ndarray):
-            if index.dtype == bool:
-                index = np.where(index)[0].tolist()
-            else:
-                index = index.tolist()
-        if isinstance(index, list):
-            masks = [self.masks[i] for i in index]
-        else:
-            try:
-                masks = self.masks[index]
-            except Exception:
-                raise ValueError(
-                    f'Unsupported input of type {type(index)} for indexing!')
-        if len(masks) and isinstance(masks[0], np.ndarray):
-            masks = [masks]  # ensure a list of three levels
-        return PolygonMasks(masks, self.height, self.width)
+        return self._gather(_index_to_array(index, len(self)))
 
     def __iter__(self):
         return iter(self.masks)
 
     def __repr__(self):
         s = self.__class__.__name__ + '('
-        s += f'num_masks={len(self.masks)}, '
+        s += f'num_masks={len(self)}, '
         s += f'height={self.height}, '
         s += f'width={self.width})'
         return s
 
     def __len__(self):
         """Number of masks."""
-        return len(self.masks)
+        if self._masks is None:
+            return len(self._packed[2]) - 1
+        return len(self._masks)
 
     def rescale(self, scale, interpolation=None):
         """see :func:`BaseInstanceMasks.rescale`"""
         new_w, new_h = mmcv.rescale_size((self.width, self.height), scale)
-        if len(self.masks) == 0:
+        if len(self) == 0:
             rescaled_masks = PolygonMasks([], new_h, new_w)
         else:
             rescaled_masks = self.resize((new_h, new_w))
@@ -697,45 +898,30 @@ class PolygonMasks(BaseInstanceMasks):
 
     def resize(self, out_shape, interpolation=None):
         """see :func:`BaseInstanceMasks.resize`"""
-        if len(self.masks) == 0:
+        if len(self) == 0:
             resized_masks = PolygonMasks([], *out_shape)
         else:
             h_scale = out_shape[0] / self.height
             w_scale = out_shape[1] / self.width
-            resized_masks = []
-            for poly_per_obj in self.masks:
-                resized_poly = []
-                for p in poly_per_obj:
-                    p = p.copy()
-                    p[0::2] = p[0::2] * w_scale
-                    p[1::2] = p[1::2] * h_scale
-                    resized_poly.append(p)
-                resized_masks.append(resized_poly)
-            resized_masks = PolygonMasks(resized_masks, *out_shape)
+            coords = self.packed[0]
+            resized_coords = coords.reshape(-1, 2) * [w_scale, h_scale]
+            resized_masks = self._with_coords(
+                resized_coords.astype(coords.dtype, copy=False), out_shape)
         return resized_masks
 
     def flip(self, flip_direction='horizontal'):
         """see :func:`BaseInstanceMasks.flip`"""
         assert flip_direction in ('horizontal', 'vertical', 'diagonal')
-        if len(self.masks) == 0:
+        if len(self) == 0:
             flipped_masks = PolygonMasks([], self.height, self.width)
         else:
-            flipped_masks = []
-            for poly_per_obj in self.masks:
-                flipped_poly_per_obj = []
-                for p in poly_per_obj:
-                    p = p.copy()
-                    if flip_direction == 'horizontal':
-                        p[0::2] = self.width - p[0::2]
-                    elif flip_direction == 'vertical':
-                        p[1::2] = self.height - p[1::2]
-                    else:
-                        p[0::2] = self.width - p[0::2]
-                        p[1::2] = self.height - p[1::2]
-                    flipped_poly_per_obj.append(p)
-                flipped_masks.append(flipped_poly_per_obj)
-            flipped_masks = PolygonMasks(flipped_masks, self.height,
-                                         self.width)
+            flipped_coords = self.packed[0].reshape(-1, 2).copy()
+            if flip_direction in ('horizontal', 'diagonal'):
+                flipped_coords[:, 0] = self.width - flipped_coords[:, 0]
+            if flip_direction in ('vertical', 'diagonal'):
+                flipped_coords[:, 1] = self.height - flipped_coords[:, 1]
+            flipped_masks = self._with_coords(flipped_coords,
+                                              (self.height, self.width))
         return flipped_masks
 
     def crop(self, bbox):
@@ -751,9 +937,21 @@ class PolygonMasks(BaseInstanceMasks):
         w = np.maximum(x2 - x1, 1)
         h = np.maximum(y2 - y1, 1)
 
-        if len(self.masks) == 0:
+        if len(self) == 0:
             cropped_masks = PolygonMasks([], h, w)
         else:
+            coords, poly_offsets, inst_offsets = self.packed
+            coords = coords.reshape(-1, 2).astype(np.float64)
+            # polygons with a positive area inside the crop box are only
+            # shifted, and the ones outside the crop box are dropped, only
+            # the polygons across the border are cropped by shapely.
+            min_xy, max_xy = _polygon_bounds(coords, poly_offsets)
+            areas = _polygon_areas(coords, poly_offsets)
+            inside = (min_xy >= [x1, y1]).all(1) & (max_xy <= [x2, y2]).all(1)
+            inside &= areas > 0
+            outside = (max_xy <= [x1, y1]).any(1) | (min_xy >= [x2, y2]).any(1)
+            shifted_coords = (coords - [x1, y1]).reshape(-1)
+
             # reference: https://github.com/facebookresearch/fvcore/blob/main/fvcore/transforms/transform.py  # noqa
             crop_box = geometry.box(x1, y1, x2, y2).buffer(0.0)
             cropped_masks = []
@@ -761,11 +959,19 @@ class PolygonMasks(BaseInstanceMasks):
             # reference: https://github.com/shapely/shapely/issues/1345
             initial_settings = np.seterr()
             np.seterr(invalid='ignore')
-            for poly_per_obj in self.masks:
+            inst_offsets = inst_offsets.tolist()
+            poly_offsets = poly_offsets.tolist()
+            for i in range(len(inst_offsets) - 1):
                 cropped_poly_per_obj = []
-                for p in poly_per_obj:
-                    p = p.copy()
-                    p = geometry.Polygon(p.reshape(-1, 2)).buffer(0.0)
+                for j in range(inst_offsets[i], inst_offsets[i + 1]):
+                    start, end = poly_offsets[j], poly_offsets[j + 1]
+                    if inside[j]:
+                        cropped_poly_per_obj.append(shifted_coords[start:end])
+                        continue
+                    if outside[j]:
+                        continue
+                    p = coords[start // 2:end // 2]
+                    p = geometry.Polygon(p).buffer(0.0)
                     # polygon must be valid to perform intersection.
                     if not p.is_valid:
                         continue
@@ -783,12 +989,12 @@ class PolygonMasks(BaseInstanceMasks):
                         if not isinstance(
                                 poly, geometry.Polygon) or not poly.is_valid:
                             continue
-                        coords = np.asarray(poly.exterior.coords)
+                        coords_ = np.asarray(poly.exterior.coords)
                         # remove an extra identical vertex at the end
-                        coords = coords[:-1]
-                        coords[:, 0] -= x1
-                        coords[:, 1] -= y1
-                        cropped_poly_per_obj.append(coords.reshape(-1))
+                        coords_ = coords_[:-1]
+                        coords_[:, 0] -= x1
+                        coords_[:, 1] -= y1
+                        cropped_poly_per_obj.append(coords_.reshape(-1))
                 # a dummy polygon to avoid misalignment between masks and boxes
                 if len(cropped_poly_per_obj) == 0:
                     cropped_poly_per_obj = [np.array([0, 0, 0, 0, 0, 0])]
@@ -799,11 +1005,17 @@ class PolygonMasks(BaseInstanceMasks):
 
     def pad(self, out_shape, pad_val=0):
         """padding has no effect on polygons`"""
-        return PolygonMasks(self.masks, *out_shape)
+        if self._masks is None:
+            return PolygonMasks.from_packed(*self._packed, *out_shape)
+        return PolygonMasks(self._masks, *out_shape)
 
-    def expand(self, *args, **kwargs):
-        """TODO: Add expand for polygon"""
-        raise NotImplementedError
+    def expand(self, expanded_h, expanded_w, top, left):
+        """See :func:`BaseInstanceMasks.expand`."""
+        if len(self) == 0:
+            return PolygonMasks([], expanded_h, expanded_w)
+        coords = self.packed[0].reshape(-1, 2)
+        expanded_coords = coords + np.array([left, top], dtype=coords.dtype)
+        return self._with_coords(expanded_coords, (expanded_h, expanded_w))
 
     def crop_and_resize(self,
                         bboxes,
@@ -814,37 +1026,28 @@ class PolygonMasks(BaseInstanceMasks):
                         binarize=True):
         """see :func:`BaseInstanceMasks.crop_and_resize`"""
         out_h, out_w = out_shape
-        if len(self.masks) == 0:
+        if len(self) == 0:
             return PolygonMasks([], out_h, out_w)
 
         if not binarize:
             raise ValueError('Polygons are always binary, '
                              'setting binarize=False is unsupported')
 
-        resized_masks = []
-        for i in range(len(bboxes)):
-            mask = self.masks[inds[i]]
-            bbox = bboxes[i, :]
-            x1, y1, x2, y2 = bbox
-            w = np.maximum(x2 - x1, 1)
-            h = np.maximum(y2 - y1, 1)
-            h_scale = out_h / max(h, 0.1)  # avoid too large scale
-            w_scale = out_w / max(w, 0.1)
-
-            resized_mask = []
-            for p in mask:
-                p = p.copy()
-                # crop
-                # pycocotools will clip the boundary
-                p[0::2] = p[0::2] - bbox[0]
-                p[1::2] = p[1::2] - bbox[1]
-
-                # resize
-                p[0::2] = p[0::2] * w_scale
-                p[1::2] = p[1::2] * h_scale
-                resized_mask.append(p)
-            resized_masks.append(resized_mask)
-        return PolygonMasks(resized_masks, *out_shape)
+        bboxes = np.asarray(bboxes)
+        resized_masks = self._gather(np.asarray(inds)[:len(bboxes)])
+        coords, poly_offsets, inst_offsets = resized_masks.packed
+        w = np.maximum(bboxes[:, 2] - bboxes[:, 0], 1)
+        h = np.maximum(bboxes[:, 3] - bboxes[:, 1], 1)
+        scales = np.stack([out_w / w, out_h / h], axis=1)
+        # the mask of each vertex
+        num_verts = (poly_offsets[inst_offsets[1:]] -
+                     poly_offsets[inst_offsets[:-1]]) // 2
+        vert_inds = np.repeat(np.arange(len(bboxes)), num_verts)
+        # crop, pycocotools will clip the boundary, then resize
+        resized_coords = (coords.reshape(-1, 2) -
+                          bboxes[vert_inds, :2]) * scales[vert_inds]
+        return resized_masks._with_coords(
+            resized_coords.astype(coords.dtype, copy=False), out_shape)
 
     def translate(self,
                   out_shape,
@@ -864,21 +1067,17 @@ class PolygonMasks(BaseInstanceMasks):
         assert border_value is None or border_value == 0, \
             'Here border_value is not '\
             f'used, and defaultly should be None or 0. got {border_value}.'
-        if len(self.masks) == 0:
+        if len(self) == 0:
             translated_masks = PolygonMasks([], *out_shape)
         else:
-            translated_masks = []
-            for poly_per_obj in self.masks:
-                translated_poly_per_obj = []
-                for p in poly_per_obj:
-                    p = p.copy()
-                    if direction == 'horizontal':
-                        p[0::2] = np.clip(p[0::2] + offset, 0, out_shape[1])
-                    elif direction == 'vertical':
-                        p[1::2] = np.clip(p[1::2] + offset, 0, out_shape[0])
-                    translated_poly_per_obj.append(p)
-                translated_masks.append(translated_poly_per_obj)
-            translated_masks = PolygonMasks(translated_masks, *out_shape)
+            translated_coords = self.packed[0].reshape(-1, 2).copy()
+            if direction == 'horizontal':
+                translated_coords[:, 0] = np.clip(
+                    translated_coords[:, 0] + offset, 0, out_shape[1])
+            elif direction == 'vertical':
+                translated_coords[:, 1] = np.clip(
+                    translated_coords[:, 1] + offset, 0, out_shape[0])
+            translated_masks = self._with_coords(translated_coords, out_shape)
         return translated_masks
 
     def shear(self,
@@ -888,29 +1087,20 @@ class PolygonMasks(BaseInstanceMasks):
               border_value=0,
               interpolation='bilinear'):
         """See :func:`BaseInstanceMasks.shear`."""
-        if len(self.masks) == 0:
+        if len(self) == 0:
             sheared_masks = PolygonMasks([], *out_shape)
         else:
-            sheared_masks = []
             if direction == 'horizontal':
                 shear_matrix = np.stack([[1, magnitude],
                                          [0, 1]]).astype(np.float32)
             elif direction == 'vertical':
                 shear_matrix = np.stack([[1, 0], [magnitude,
                                                   1]]).astype(np.float32)
-            for poly_per_obj in self.masks:
-                sheared_poly = []
-                for p in poly_per_obj:
-                    p = np.stack([p[0::2], p[1::2]], axis=0)  # [2, n]
-                    new_coords = np.matmul(shear_matrix, p)  # [2, n]
-                    new_coords[0, :] = np.clip(new_coords[0, :], 0,
-                                               out_shape[1])
-                    new_coords[1, :] = np.clip(new_coords[1, :], 0,
-                                               out_shape[0])
-                    sheared_poly.append(
-                        new_coords.transpose((1, 0)).reshape(-1))
-                sheared_masks.append(sheared_poly)
-            sheared_masks = PolygonMasks(sheared_masks, *out_shape)
+            coords = self.packed[0].reshape(-1, 2)
+            new_coords = np.matmul(coords, shear_matrix.T)  # [n, 2]
+            new_coords[:, 0] = np.clip(new_coords[:, 0], 0, out_shape[1])
+            new_coords[:, 1] = np.clip(new_coords[:, 1], 0, out_shape[0])
+            sheared_masks = self._with_coords(new_coords, out_shape)
         return sheared_masks
 
     def rotate(self,
@@ -921,31 +1111,19 @@ class PolygonMasks(BaseInstanceMasks):
                border_value=0,
                interpolation='bilinear'):
         """See :func:`BaseInstanceMasks.rotate`."""
-        if len(self.masks) == 0:
+        if len(self) == 0:
             rotated_masks = PolygonMasks([], *out_shape)
         else:
-            rotated_masks = []
             rotate_matrix = cv2.getRotationMatrix2D(center, -angle, scale)
-            for poly_per_obj in self.masks:
-                rotated_poly = []
-                for p in poly_per_obj:
-                    p = p.copy()
-                    coords = np.stack([p[0::2], p[1::2]], axis=1)  # [n, 2]
-                    # pad 1 to convert from format [x, y] to homogeneous
-                    # coordinates format [x, y, 1]
-                    coords = np.concatenate(
-                        (coords, np.ones((coords.shape[0], 1), coords.dtype)),
-                        axis=1)  # [n, 3]
-                    rotated_coords = np.matmul(
-                        rotate_matrix[None, :, :],
-                        coords[:, :, None])[..., 0]  # [n, 2, 1] -> [n, 2]
-                    rotated_coords[:, 0] = np.clip(rotated_coords[:, 0], 0,
-                                                   out_shape[1])
-                    rotated_coords[:, 1] = np.clip(rotated_coords[:, 1], 0,
-                                                   out_shape[0])
-                    rotated_poly.append(rotated_coords.reshape(-1))
-                rotated_masks.append(rotated_poly)
-            rotated_masks = PolygonMasks(rotated_masks, *out_shape)
+            coords = self.packed[0].reshape(-1, 2)
+            # equivalent to multiplying the homogeneous coordinates [x, y, 1]
+            rotated_coords = np.matmul(
+                coords, rotate_matrix[:, :2].T) + rotate_matrix[:, 2]
+            rotated_coords[:, 0] = np.clip(rotated_coords[:, 0], 0,
+                                           out_shape[1])
+            rotated_coords[:, 1] = np.clip(rotated_coords[:, 1], 0,
+                                           out_shape[0])
+            rotated_masks = self._with_coords(rotated_coords, out_shape)
         return rotated_masks
 
     def to_bitmap(self):
@@ -960,43 +1138,43 @@ class PolygonMasks(BaseInstanceMasks):
         This func is modified from `detectron2
         <https://github.com/facebookresearch/detectron2/blob/ffff8acc35ea88ad1cb1806ab0f00b4c1c5dbfd9/detectron2/structures/masks.py#L387>`_.
         The function only works with Polygons using the shoelace formula.
+        The areas of all the polygons are computed at once on the packed
+        coordinates and summed per instance.
 
         Return:
             ndarray: areas of each instance
         """  # noqa: W501
-        area = []
-        for polygons_per_obj in self.masks:
-            area_per_obj = 0
-            for p in polygons_per_obj:
-                area_per_obj += self._polygon_area(p[0::2], p[1::2])
-            area.append(area_per_obj)
-        return np.asarray(area)
-
-    def _polygon_area(self, x, y):
-        """Compute the area of a component of a polygon.
+        coords, poly_offsets, inst_offsets = self.packed
+        poly_areas = _polygon_areas(coords.reshape(-1, 2), poly_offsets)
+        num_masks = len(inst_offsets) - 1
+        inst_inds = np.repeat(np.arange(num_masks), np.diff(inst_offsets))
+        return np.bincount(
+            inst_inds, weights=poly_areas, minlength=num_masks)
 
-        Using the shoelace formula:
-        https://stackoverflow.com/questions/24467972/calculate-area-of-polygon-given-x-y-coordinates
-
-        Args:
-            x (ndarray): x coordinates of the component
-            y (ndarray): y coordinates of the component
-
-        Return:
-            float: the are of the component
-        """  # noqa: 501
-        return 0.5 * np.abs(
-            np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    @property
+    def nbytes(self):
+        """See :py:attr:`BaseInstanceMasks.nbytes`."""
+        if self._packed is not None:
+            return sum(array.nbytes for array in self._packed)
+        return sum(p.nbytes for poly_per_obj in self._masks
+                   for p in poly_per_obj)
 
     def to_ndarray(self):
         """Convert masks to the format of ndarray."""
         if len(self.masks) == 0:
             return np.empty((0, self.height, self.width), dtype=np.uint8)
-        bitmap_masks = []
-        for poly_per_obj in self.masks:
-            bitmap_masks.append(
-                polygon_to_bitmap(poly_per_obj, self.height, self.width))
-        return np.stack(bitmap_masks)
+        # convert all the polygons by one call and merge them per instance
+        rles = maskUtils.frPyObjects(
+            [poly for poly_per_obj in self.masks for poly in poly_per_obj],
+            self.height, self.width)
+        inst_offsets = self.packed[2]
+        rles = [
+            maskUtils.merge(rles[start:end])
+            for start, end in zip(inst_offsets[:-1], inst_offsets[1:])
+        ]
+        # decode all the masks into one buffer of shape (H, W, N)
+        bitmap_masks = maskUtils.decode(rles).transpose(2, 0, 1)
+        return np.ascontiguousarray(bitmap_masks, dtype=bool)
 
     def to_tensor(self, dtype, device):
         """See :func:`BaseInstanceMasks.to_tensor`."""
@@ -1142,8 +1320,687 @@ class PolygonMasks(BaseInstanceMasks):
             raise ValueError('masks should not be an empty list.')
         assert all(isinstance(m, cls) for m in masks)
 
-        mask_list = list(itertools.chain(*[m.masks for m in masks]))
-        return cls(mask_list, masks[0].height, masks[0].width)
+        packed = [m.packed for m in masks]
+        # skip the empty coordinates, which may have a different dtype
+        coords = [p[0] for p in packed if p[0].size > 0]
+        coords = np.concatenate(coords) if coords else packed[0][0]
+        poly_offsets = [np.zeros(1, dtype=np.int64)]
+        inst_offsets = [np.zeros(1, dtype=np.int64)]
+        # the running totals of the coordinates and the polygons
+        num_coords, num_polys = 0, 0
+        for p in packed:
+            poly_offsets.append(p[1][1:] + num_coords)
+            inst_offsets.append(p[2][1:] + num_polys)
+            num_coords += int(p[1][-1])
+            num_polys += int(p[2][-1])
+        return cls.from_packed(coords, np.concatenate(poly_offsets),
+                               np.concatenate(inst_offsets), masks[0].height,
+                               masks[0].width)
+
+
+class RLEMasks(BaseInstanceMasks):
+    """This class represents masks in the form of run-length encoding (RLE).
+
+    The masks are kept as the runs of foreground pixels of each mask, in the
+    column-major order of COCO's RLE, so that most of the operations work on
+    the runs and the masks are only decoded to bitmaps when needed, e.g. by
+    :meth:`to_ndarray`, :meth:`to_tensor` and :meth:`crop_and_resize`. This
+    takes much less memory than :obj:`BitmapMasks` for images with many
+    instances. Operations without a run-length counterpart, e.g.
+    :meth:`rotate` and :meth:`shear`, decode and encode the masks.
+
+    Args:
+        masks (list[dict]): RLE of each object in COCO's format, i.e. a dict
+            of ``size`` and ``counts``, where ``counts`` is either compressed
+            (str | bytes) or uncompressed (list[int]).
+        height (int): height of masks
+        width (int): width of masks
+
+    Example:
+        >>> from mmdet.structures.mask import RLEMasks
+        >>> bitmaps = np.zeros((2, 16, 16), dtype=np.uint8)
+        >>> bitmaps[0, 2:6, 3:9] = 1
+        >>> bitmaps[1, 8:, 4:] = 1
+        >>> self = RLEMasks.from_ndarray(bitmaps)
+        >>> new = self.flip('horizontal').crop(np.array([2, 2, 12, 12]))
+        >>> assert (new.areas == [24, 32]).all()
+        >>> assert new.to_ndarray().shape == (2, 10, 10)
+    """
+
+    def __init__(self, masks, height, width):
+        assert isinstance(masks, list)
+        if len(masks) > 0:
+            assert isinstance(masks[0], dict)
+
+        self.height = height
+        self.width = width
+        # compress the uncompressed RLE
+        self._masks = [
+            maskUtils.frPyObjects(mask, height, width)
+            if isinstance(mask['counts'], list) else mask for mask in masks
+        ]
+        self._packed = None
+
+    @classmethod
+    def from_packed(cls, runs, inst_offsets, height, width):
+        """Create RLE masks from the packed runs.
+
+        Args:
+            runs (ndarray): The start and end of the runs of foreground
+                pixels of all the masks in shape (num_runs, 2), as the
+                indices of the pixels in column-major order. The runs of
+                each mask should be sorted and disjoint.
+            inst_offsets (ndarray): The first run of each mask followed by
+                the end of the last one, shape (num_masks + 1, ).
+            height (int): height of masks
+            width (int): width of masks
+
+        Returns:
+            :obj:`RLEMasks`: The RLE masks.
+        """
+        self = cls.__new__(cls)
+        self.height = height
+        self.width = width
+        self._masks = None
+        self._packed = (runs, inst_offsets)
+        return self
+
+    @classmethod
+    def from_ndarray(cls, masks):
+        """Encode bitmap masks.
+
+        Args:
+            masks (ndarray): Bitmap masks in shape (N, H, W).
+
+        Returns:
+            :obj:`RLEMasks`: The RLE masks.
+        """
+        num_masks, height, width = masks.shape
+        if num_masks == 0:
+            return cls([], height, width)
+        rles = maskUtils.encode(
+            np.asfortranarray(masks.transpose(1, 2, 0).astype(np.uint8)))
+        return cls(rles, height, width)
+
+    @classmethod
+    def from_box_masks(cls, masks, offsets, height, width):
+        """Encode box-local bitmap masks without decoding the full masks.
+
+        Args:
+            masks (ndarray): Bitmap masks in shape (N, h, w), each of which
+                covers a region of its full mask. The pixels out of the full
+                masks are ignored.
+            offsets (ndarray): The (x, y) of the top left pixel of each
+                box-local mask in its full mask, shape (N, 2).
+            height (int): height of the full masks
+            width (int): width of the full masks
+
+        Returns:
+            :obj:`RLEMasks`: The RLE masks.
+        """
+        num_masks, h, w = masks.shape
+        offsets = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+        # the segments of foreground pixels in each column
+        cols = np.zeros((num_masks, w, h + 2), dtype=np.int8)
+        cols[:, :, 1:-1] = masks.transpose(0, 2, 1) > 0
+        diffs = np.diff(cols, axis=2)
+        inst_inds, cols, row_starts = np.nonzero(diffs == 1)
+        row_ends = np.nonzero(diffs == -1)[2]
+        return _rle_from_segments(inst_inds, cols + offsets[inst_inds, 0],
+                                  row_starts + offsets[inst_inds, 1],
+                                  row_ends + offsets[inst_inds, 1],
+                                  num_masks, (height, width))
+
+    @property
+    def packed(self):
+        """tuple[ndarray]: The packed runs of the masks, i.e. the ``runs``
+        and ``inst_offsets`` of :meth:`from_packed`.
+
+        The arrays are shared by the masks derived from these masks and
+        should not be modified in place.
+        """
+        if self._packed is None:
+            counts = [_rle_counts(mask['counts']) for mask in self._masks]
+            inst_inds = np.repeat(
+                np.arange(len(counts)), [len(c) // 2 for c in counts])
+            bounds = [np.cumsum(c)[:len(c) // 2 * 2] for c in counts]
+            if len(bounds) > 0:
+                bounds = np.concatenate(bounds).reshape(-1, 2)
+            else:
+                bounds = np.zeros((0, 2), dtype=np.int64)
+            self._packed = _merge_runs(inst_inds, bounds[:, 0], bounds[:, 1],
+                                       len(self._masks),
+                                       self.height * self.width)
+        return self._packed
+
+    @property
+    def masks(self):
+        """list[dict]: The compressed RLE of each mask in COCO's format."""
+        if self._masks is None:
+            runs, inst_offsets = self._packed
+            size = self.height * self.width
+            # the bounds of the runs of background and foreground pixels,
+            # `np.split` would give one spurious mask if there is no mask
+            bounds = []
+            if len(self) > 0:
+                bounds = np.split(runs.reshape(-1), inst_offsets[1:-1] * 2)
+            rles = []
+            for b in bounds:
+                counts = np.diff(np.concatenate([[0], b, [size]]))
+                if len(counts) > 1 and counts[-1] == 0:
+                    counts = counts[:-1]
+                counts = counts.tolist()
+                rles.append(
+                    dict(counts=counts, size=[self.height, self.width]))
+            self._masks = maskUtils.frPyObjects(
+                rles, self.height, self.width) if len(rles) > 0 else []
+        return self._masks
+
+    def _segments(self):
+        """Split the runs into the segments in each column.
+
+        Returns:
+            tuple[ndarray]: The mask, column, start row and end row of each
+            segment.
+        """
+        runs, inst_offsets = self.packed
+        inst_inds = np.repeat(np.arange(len(self)), np.diff(inst_offsets))
+        starts, ends = runs[:, 0], runs[:, 1]
+        first_cols = starts // self.height
+        last_cols = (ends - 1) // self.height
+        run_inds = np.repeat(np.arange(len(runs)), last_cols - first_cols + 1)
+        cols = _concat_ranges(first_cols, last_cols + 1)
+        row_starts = np.where(cols == first_cols[run_inds],
+                              starts[run_inds] % self.height, 0)
+        row_ends = np.where(cols == last_cols[run_inds],
+                            (ends[run_inds] - 1) % self.height + 1,
+                            self.height)
+        return inst_inds[run_inds], cols, row_starts, row_ends
+
+    def _from_segments(self, inst_inds, cols, row_starts, row_ends,
+                       out_shape):
+        """Create masks of shape ``out_shape`` from the segments in each
+        column, which are clipped to the masks."""
+        return _rle_from_segments(inst_inds, cols, row_starts, row_ends,
+                                  len(self), out_shape)
+
+    def _via_bitmap(self, func):
+        """Apply an operation of :obj:`BitmapMasks` to the decoded masks."""
+        return RLEMasks.from_ndarray(func(self.to_bitmap()).masks)
+
+    def __getitem__(self, index):
+        """Index the RLE masks.
+
+        Args:
+            index (int | ndarray | list | slice): The indices.
+
+        Returns:
+            :obj:`RLEMasks`: The indexed RLE masks.
+        """
+        index = _index_to_array(index, len(self))
+        if self._masks is not None:
+            return RLEMasks([self._masks[i] for i in index.tolist()],
+                            self.height, self.width)
+        runs, inst_offsets = self._packed
+        new_inst_offsets = np.zeros(len(index) + 1, dtype=np.int64)
+        np.cumsum(
+            inst_offsets[index + 1] - inst_offsets[index],
+            out=new_inst_offsets[1:])
+        run_inds = _concat_ranges(inst_offsets[index], inst_offsets[index + 1])
+        return RLEMasks.from_packed(runs[run_inds], new_inst_offsets,
+                                    self.height, self.width)
+
+    def __iter__(self):
+        return iter(self.masks)
+
+    def __repr__(self):
+        s = self.__class__.__name__ + '('
+        s += f'num_masks={len(self)}, '
+        s += f'height={self.height}, '
+        s += f'width={self.width})'
+        return s
+
+    def __len__(self):
+        """Number of masks."""
+        if self._masks is None:
+            return len(self._packed[1]) - 1
+        return len(self._masks)
+
+    def rescale(self, scale, interpolation='nearest'):
+        """See :func:`BaseInstanceMasks.rescale`."""
+        new_w, new_h = mmcv.rescale_size((self.width, self.height), scale)
+        return self.resize((new_h, new_w), interpolation=interpolation)
+
+    def resize(self, out_shape, interpolation='nearest'):
+        """See :func:`BaseInstanceMasks.resize`.
+
+        The masks are resized in the run-length domain with the nearest
+        interpolation, and by :obj:`BitmapMasks` otherwise.
+        """
+        if len(self) == 0:
+            return RLEMasks([], *out_shape)
+        if interpolation != 'nearest':
+            return self._via_bitmap(
+                lambda masks: masks.resize(out_shape, interpolation))
+        # the source row and column of each pixel of cv2.INTER_NEAREST
+        src_rows = _nearest_src_inds(self.height, out_shape[0])
+        src_cols = _nearest_src_inds(self.width, out_shape[1])
+        inst_inds, cols, row_starts, row_ends = self._segments()
+        col_starts = np.searchsorted(src_cols, cols)
+        col_ends = np.searchsorted(src_cols, cols + 1)
+        # a column may be dropped or repeated
+        seg_inds = np.repeat(np.arange(len(cols)), col_ends - col_starts)
+        return self._from_segments(
+            inst_inds[seg_inds], _concat_ranges(col_starts, col_ends),
+            np.searchsorted(src_rows, row_starts)[seg_inds],
+            np.searchsorted(src_rows, row_ends)[seg_inds], out_shape)
+
+    def flip(self, flip_direction='horizontal'):
+        """See :func:`BaseInstanceMasks.flip`."""
+        assert flip_direction in ('horizontal', 'vertical', 'diagonal')
+        if len(self) == 0:
+            return RLEMasks([], self.height, self.width)
+        inst_inds, cols, row_starts, row_ends = self._segments()
+        if flip_direction in ('horizontal', 'diagonal'):
+            cols = self.width - 1 - cols
+        if flip_direction in ('vertical', 'diagonal'):
+            row_starts, row_ends = \
+                self.height - row_ends, self.height - row_starts
+        return self._from_segments(inst_inds, cols, row_starts, row_ends,
+                                   (self.height, self.width))
+
+    def pad(self, out_shape, pad_val=0):
+        """See :func:`BaseInstanceMasks.pad`."""
+        if len(self) == 0:
+            return RLEMasks([], *out_shape)
+        if pad_val != 0:
+            return self._via_bitmap(
+                lambda masks: masks.pad(out_shape, pad_val))
+        return self._from_segments(*self._segments(), out_shape)
+
+    def crop(self, bbox):
+        """See :func:`BaseInstanceMasks.crop`."""
+        assert isinstance(bbox, np.ndarray)
+        assert bbox.ndim == 1
+
+        # clip the boundary
+        bbox = bbox.copy()
+        bbox[0::2] = np.clip(bbox[0::2], 0, self.width)
+        bbox[1::2] = np.clip(bbox[1::2], 0, self.height)
+        x1, y1, x2, y2 = bbox
+        w = np.maximum(x2 - x1, 1)
+        h = np.maximum(y2 - y1, 1)
+
+        if len(self) == 0:
+            return RLEMasks([], h, w)
+        inst_inds, cols, row_starts, row_ends = self._segments()
+        return self._from_segments(inst_inds, cols - x1, row_starts - y1,
+                                   row_ends - y1, (h, w))
+
+    def crop_and_resize(self,
+                        bboxes,
+                        out_shape,
+                        inds,
+                        device='cpu',
+                        interpolation='bilinear',
+                        binarize=True):
+        """See :func:`BaseInstanceMasks.crop_and_resize`.
+
+        Only the masks assigned to the bboxes are decoded, and the results
+        are :obj:`BitmapMasks`.
+        """
+        if len(self) == 0:
+            empty_masks = np.empty((0, *out_shape), dtype=np.uint8)
+            return BitmapMasks(empty_masks, *out_shape)
+
+        if isinstance(inds, torch.Tensor):
+            inds = inds.cpu().numpy()
+        unique_inds, inds = np.unique(np.asarray(inds), return_inverse=True)
+        return self[unique_inds].to_bitmap().crop_and_resize(
+            bboxes, out_shape, inds, device, interpolation, binarize)
+
+    def expand(self, expanded_h, expanded_w, top, left):
+        """See :func:`BaseInstanceMasks.expand`."""
+        if len(self) == 0:
+            return RLEMasks([], expanded_h, expanded_w)
+        inst_inds, cols, row_starts, row_ends = self._segments()
+        return self._from_segments(inst_inds, cols + left, row_starts + top,
+                                   row_ends + top, (expanded_h, expanded_w))
+
+    def translate(self,
+                  out_shape,
+                  offset,
+                  direction='horizontal',
+                  border_value=0,
+                  interpolation='bilinear'):
+        """See :func:`BaseInstanceMasks.translate`.
+
+        The masks are translated in the run-length domain by integer offsets
+        with a zero border, and by :obj:`BitmapMasks` otherwise.
+        """
+        if len(self) == 0:
+            return RLEMasks([], *out_shape)
+        if border_value != 0 or offset != int(offset):
+            return self._via_bitmap(lambda masks: masks.translate(
+                out_shape, offset, direction, border_value, interpolation))
+        offset = int(offset)
+        inst_inds, cols, row_starts, row_ends = self._segments()
+        # masks are cropped or padded to out_shape before translation
+        valid = cols < out_shape[1]
+        inst_inds, cols = inst_inds[valid], cols[valid]
+        row_starts = np.minimum(row_starts[valid], out_shape[0])
+        row_ends = np.minimum(row_ends[valid], out_shape[0])
+        if direction == 'horizontal':
+            cols = cols + offset
+        elif direction == 'vertical':
+            row_starts, row_ends = row_starts + offset, row_ends + offset
+        return self._from_segments(inst_inds, cols, row_starts, row_ends,
+                                   out_shape)
+
+    def shear(self,
+              out_shape,
+              magnitude,
+              direction='horizontal',
+              border_value=0,
+              interpolation='bilinear'):
+        """See :func:`BaseInstanceMasks.shear`."""
+        if len(self) == 0:
+            return RLEMasks([], *out_shape)
+        return self._via_bitmap(lambda masks: masks.shear(
+            out_shape, magnitude, direction, border_value, interpolation))
+
+    def rotate(self,
+               out_shape,
+               angle,
+               center=None,
+               scale=1.0,
+               border_value=0,
+               interpolation='bilinear'):
+        """See :func:`BaseInstanceMasks.rotate`."""
+        if len(self) == 0:
+            return RLEMasks([], *out_shape)
+        return self._via_bitmap(lambda masks: masks.rotate(
+            out_shape, angle, center, scale, border_value, interpolation))
+
+    def to_bitmap(self):
+        """convert RLE masks to bitmap masks."""
+        return BitmapMasks(self.to_ndarray(), self.height, self.width)
+
+    @property
+    def nbytes(self):
+        """See :py:attr:`BaseInstanceMasks.nbytes`."""
+        if self._packed is not None:
+            return sum(array.nbytes for array in self._packed)
+        return sum(len(mask['counts']) for mask in self._masks)
+
+    @property
+    def areas(self):
+        """See :py:attr:`BaseInstanceMasks.areas`."""
+        runs, inst_offsets = self.packed
+        inst_inds = np.repeat(np.arange(len(self)), np.diff(inst_offsets))
+        return np.bincount(
+            inst_inds, weights=runs[:, 1] - runs[:, 0],
+            minlength=len(self)).astype(np.int64)
+
+    def to_ndarray(self):
+        """See :func:`BaseInstanceMasks.to_ndarray`."""
+        if len(self) == 0:
+            return np.empty((0, self.height, self.width), dtype=np.uint8)
+        return np.ascontiguousarray(
+            maskUtils.decode(self.masks).transpose(2, 0, 1))
+
+    def to_tensor(self, dtype, device):
+        """See :func:`BaseInstanceMasks.to_tensor`."""
+        return torch.tensor(self.to_ndarray(), dtype=dtype, device=device)
+
+    @classmethod
+    def cat(cls: Type[T], masks: Sequence[T]) -> T:
+        """Concatenate a sequence of masks into one single mask instance.
+
+        Args:
+            masks (Sequence[RLEMasks]): A sequence of mask instances.
+
+        Returns:
+            RLEMasks: Concatenated mask instance.
+        """
+        assert isinstance(masks, Sequence)
+        if len(masks) == 0:
+            raise ValueError('masks should not be an empty list.')
+        assert all(isinstance(m, cls) for m in masks)
+
+        height, width = masks[0].height, masks[0].width
+        if all(m._masks is not None for m in masks):
+            return cls([rle for m in masks for rle in m._masks], height,
+                       width)
+        packed = [m.packed for m in masks]
+        inst_offsets = [np.zeros(1, dtype=np.int64)]
+        # the running total of the runs
+        num_runs = 0
+        for p in packed:
+            inst_offsets.append(p[1][1:] + num_runs)
+            num_runs += int(p[1][-1])
+        return cls.from_packed(
+            np.concatenate([p[0] for p in packed]),
+            np.concatenate(inst_offsets), height, width)
+
+
+def _index_to_array(index, num_masks):
+    """Convert an index of masks to an array of non-negative indices."""
+    if isinstance(index, slice):
+        index = np.arange(num_masks)[index]
+    elif isinstance(index, (list, np.ndarray)):
+        index = np.asarray(index)
+        if index.dtype == bool:
+            index = np.where(index)[0]
+    else:
+        try:
+            index = np.array([operator.index(index)])
+        except TypeError:
+            raise ValueError(
+                f'Unsupported input of type {type(index)} for indexing!')
+    index = index.astype(np.int64, copy=False)
+    if ((index < -num_masks) | (index >= num_masks)).any():
+        raise IndexError('masks index out of range')
+    return np.where(index < 0, index + num_masks, index)
+
+
+def _rle_counts(counts):
+    """Get the uncompressed counts of RLE, see ``rleFrString`` of
+    pycocotools for the compressed format."""
+    if isinstance(counts, list):
+        return np.asarray(counts, dtype=np.int64)
+    if isinstance(counts, str):
+        counts = counts.encode()
+    chars = np.frombuffer(counts, dtype=np.uint8).astype(np.int64) - 48
+    if len(chars) == 0:
+        return np.zeros(0, dtype=np.int64)
+    # each value is encoded by 5 bits per char, the 6th bit means more chars
+    last = (chars & 0x20) == 0
+    value_inds = np.concatenate([[0], np.cumsum(last)[:-1]])
+    char_starts = np.flatnonzero(np.concatenate([[True], last[:-1]]))
+    shifts = 5 * (np.arange(len(chars)) - char_starts[value_inds])
+    values = np.zeros(last.sum(), dtype=np.int64)
+    np.add.at(values, value_inds, (chars & 0x1f) << shifts)
+    # the 5th bit of the last char is the sign
+    negative = (chars[last] & 0x10) != 0
+    values[negative] -= 1 << (shifts[last][negative] + 5)
+    # the counts after the first three are encoded as the differences to
+    # the counts two before
+    values[2::2] = np.cumsum(values[2::2])
+    values[1::2] = np.cumsum(values[1::2])
+    return values
+
+
+def _merge_runs(inst_inds, starts, ends, num_masks, size):
+    """Pack the runs of masks, sorted and with the overlapping or adjacent
+    runs merged.
+
+    Returns:
+        tuple[ndarray]: The ``runs`` and ``inst_offsets`` of
+        :meth:`RLEMasks.from_packed`.
+    """
+    valid = ends > starts
+    # offset the runs of each mask to sort and merge them together
+    offsets = inst_inds[valid].astype(np.int64) * (size + 1)
+    starts = starts[valid] + offsets
+    ends = ends[valid] + offsets
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    if len(starts) > 0:
+        max_ends = np.maximum.accumulate(ends)
+        first = np.flatnonzero(
+            np.concatenate([[True], starts[1:] > max_ends[:-1]]))
+        starts = starts[first]
+        ends = np.maximum.reduceat(ends, first)
+    inst_inds = starts // (size + 1)
+    runs = np.stack([starts, ends], axis=1)
+    runs -= inst_inds[:, None] * (size + 1)
+    inst_offsets = np.zeros(num_masks + 1, dtype=np.int64)
+    np.cumsum(
+        np.bincount(inst_inds, minlength=num_masks), out=inst_offsets[1:])
+    return runs, inst_offsets
+
+
+def _to_numpy(data):
+    """Convert a tensor to ndarray, leaving other inputs as they are."""
+    if isinstance(data, torch.Tensor):
+        return data.detach().cpu().numpy()
+    return np.asarray(data)
+
+
+def _roi_align_samples(starts, ends, out_size, in_sizes):
+    """Compute the samples of aligned ``roi_align`` along one axis.
+
+    This follows ``roi_align`` of mmcv with ``spatial_scale=1.0``,
+    ``sampling_ratio=0`` and ``aligned=True`` in float32, whose bilinear
+    interpolation is the product of the interpolations along each axis.
+
+    Args:
+        starts (ndarray): The start coordinates of the RoIs, shape (R, ).
+        ends (ndarray): The end coordinates of the RoIs, shape (R, ).
+        out_size (int): The output size along the axis.
+        in_sizes (ndarray): The input size along the axis of each RoI.
+
+    Returns:
+        tuple[ndarray]: The input indices and the weights of the two
+        neighbours of each sample, both of shape (R, out_size, G, 2) where G
+        is the largest number of samples of a bin, and the first input index
+        and the number of input indices covered by each RoI. The weights are
+        divided by the number of samples of their bins.
+    """
+    in_sizes = in_sizes[:, None, None]
+    starts = starts.astype(np.float32) - np.float32(0.5)
+    lengths = (ends.astype(np.float32) - np.float32(0.5)) - starts
+    bin_sizes = (lengths / np.float32(out_size))[:, None, None]
+    grids = np.maximum(
+        np.ceil(lengths / np.float32(out_size)).astype(np.int64), 0)
+    grid_sizes = np.maximum(grids, 1).astype(np.float32)[:, None, None]
+    sample_inds = np.arange(max(grids.max(), 1))
+    bin_inds = np.arange(out_size, dtype=np.float32)[:, None]
+    pos = (starts[:, None, None] + bin_inds * bin_sizes) + \
+        (sample_inds.astype(np.float32) + np.float32(0.5)) * bin_sizes / \
+        grid_sizes
+    valid = (sample_inds < grids[:, None, None]) & (pos >= -1) & \
+        (pos <= in_sizes)
+
+    pos = np.maximum(pos, 0)
+    low = pos.astype(np.int64)
+    at_border = low >= in_sizes - 1
+    low = np.where(at_border, in_sizes - 1, low)
+    high = np.where(at_border, low, low + 1)
+    low_weights = np.where(at_border, np.float32(0),
+                           pos - low.astype(np.float32))
+    inds = np.stack([low, high], axis=-1)
+    weights = np.stack([1 - low_weights, low_weights], axis=-1)
+    weights *= valid[..., None] / grid_sizes[..., None]
+
+    valid = np.broadcast_to(valid[..., None], inds.shape)
+    first_inds = np.where(valid, inds, np.iinfo(np.int64).max).min(
+        axis=(1, 2, 3))
+    last_inds = np.where(valid, inds, -1).max(axis=(1, 2, 3))
+    empty = last_inds < 0
+    first_inds[empty] = 0
+    last_inds[empty] = 0
+    # point the invalid samples to the first index with zero weights
+    inds = np.where(valid, inds, first_inds[:, None, None, None])
+    return inds, weights, first_inds, last_inds - first_inds + 1
+
+
+def _dense_sample_weights(inds, weights, first_inds, length):
+    """Accumulate the sample weights of :func:`_roi_align_samples` into
+    dense interpolation matrices of shape (R, out_size, length) over the
+    input windows starting at ``first_inds``."""
+    num_rois, out_size = inds.shape[:2]
+    rows = np.arange(num_rois * out_size).reshape(num_rois, out_size, 1, 1)
+    flat_inds = rows * length + inds - first_inds[:, None, None, None]
+    dense = np.bincount(
+        flat_inds.reshape(-1),
+        weights=weights.reshape(-1),
+        minlength=num_rois * out_size * length)
+    return dense.reshape(num_rois, out_size, length).astype(np.float32)
+
+
+def _rle_from_segments(inst_inds, cols, row_starts, row_ends, num_masks,
+                       out_shape):
+    """Create RLE masks of shape ``out_shape`` from the segments of
+    foreground pixels in each column, which are clipped to the masks."""
+    height, width = out_shape
+    row_starts = np.clip(row_starts, 0, height)
+    row_ends = np.clip(row_ends, 0, height)
+    valid = (row_ends > row_starts) & (cols >= 0) & (cols < width)
+    runs = _merge_runs(inst_inds[valid],
+                       cols[valid] * height + row_starts[valid],
+                       cols[valid] * height + row_ends[valid], num_masks,
+                       height * width)
+    return RLEMasks.from_packed(*runs, height, width)
+
+
+def _nearest_src_inds(size, out_size):
+    """Get the source index of each output pixel of ``cv2.INTER_NEAREST``."""
+    scale = 1. / (out_size / size)
+    src_inds = np.floor(np.arange(out_size) * scale).astype(np.int64)
+    return np.minimum(src_inds, size - 1)
+
+
+def _concat_ranges(starts, ends):
+    """Concatenate ``np.arange(start, end)`` of the given starts and ends."""
+    lens = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lens) + lens, lens)
+    return offsets + np.arange(len(offsets))
+
+
+def _polygon_bounds(coords, poly_offsets):
+    """Compute the min and max vertices of the packed polygons, which are
+    inf and -inf for the empty polygons."""
+    num_polys = len(poly_offsets) - 1
+    min_xy = np.full((num_polys, 2), np.inf)
+    max_xy = np.full((num_polys, 2), -np.inf)
+    nonempty = poly_offsets[1:] > poly_offsets[:-1]
+    if nonempty.any():
+        starts = poly_offsets[:-1][nonempty] // 2
+        min_xy[nonempty] = np.minimum.reduceat(coords, starts, axis=0)
+        max_xy[nonempty] = np.maximum.reduceat(coords, starts, axis=0)
+    return min_xy, max_xy
+
+
+def _polygon_areas(coords, poly_offsets):
+    """Compute the areas of the packed polygons by the shoelace formula."""
+    num_polys = len(poly_offsets) - 1
+    if len(coords) == 0:
+        return np.zeros(num_polys)
+    lens = (poly_offsets[1:] - poly_offsets[:-1]) // 2
+    poly_inds = np.repeat(np.arange(num_polys), lens)
+    # the previous vertex of each vertex in its polygon
+    prev_inds = np.arange(len(coords)) - 1
+    nonempty = lens > 0
+    prev_inds[poly_offsets[:-1][nonempty] // 2] = \
+        poly_offsets[1:][nonempty] // 2 - 1
+    # accumulate in float64 for the float32 coordinates
+    x = coords[:, 0].astype(np.float64)
+    y = coords[:, 1].astype(np.float64)
+    cross = x * y[prev_inds] - y * x[prev_inds]
+    return 0.5 * np.abs(
+        np.bincount(poly_inds, weights=cross, minlength=num_polys))
 
 
 def polygon_to_bitmap(polygons, height, width):
@@ -1163,11 +2020,13 @@ def polygon_to_bitmap(polygons, height, width):
     return bitmap_mask
 
 
-def bitmap_to_polygon(bitmap):
+def bitmap_to_polygon(bitmap, offset=(0, 0)):
     """Convert masks from the form of bitmaps to polygons.
 
     Args:
         bitmap (ndarray): masks in bitmap representation.
+        offset (tuple[int]): The (x, y) offset added to all the points of
+            the polygons. Defaults to (0, 0).
 
     Return:
         list[ndarray]: the converted mask in polygon representation.
@@ -1180,7 +2039,8 @@ def bitmap_to_polygon(bitmap):
     #   boundaries of the holes. If there is another contour inside a hole
     #   of a connected component, it is still put at the top level.
     # cv2.CHAIN_APPROX_NONE: stores absolutely all the contour points.
-    outs = cv2.findContours(bitmap, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+    outs = cv2.findContours(
+        bitmap, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE, offset=offset)
     contours = outs[-2]
     hierarchy = outs[-1]
     if hierarchy is None:
@@ -1191,3 +2051,80 @@ def bitmap_to_polygon(bitmap):
     with_hole = (hierarchy.reshape(-1, 4)[:, 3] >= 0).any()
     contours = [c.reshape(-1, 2) for c in contours]
     return contours, with_hole
+
+
+def batch_bitmap_to_polygon(masks, tolerance=0., num_workers=0):
+    """Convert a batch of masks from the form of bitmaps to polygons.
+
+    Each mask is only converted in the crop around its bounding box, and the
+    masks of :obj:`RLEMasks` are decoded to the crops directly. The contours
+    are the same as :func:`bitmap_to_polygon` on the full masks, unless they
+    are simplified by ``tolerance``.
+
+    Args:
+        masks (ndarray | :obj:`BitmapMasks` | :obj:`RLEMasks`): The masks,
+            ndarray in shape (N, H, W).
+        tolerance (float): The maximum distance in pixels between the
+            simplified polygons and the contours, see ``cv2.approxPolyDP``.
+            The contours with less than 3 points after simplification are
+            dropped. 0 means no simplification. Defaults to 0.
+        num_workers (int): The number of threads to convert the masks, as
+            ``cv2.findContours`` releases the GIL. 0 means converting them in
+            the current thread. Defaults to 0.
+
+    Return:
+        list[tuple[list[ndarray], bool]]: The converted polygons in the full
+        masks and whether there are holes of each mask, as returned by
+        :func:`bitmap_to_polygon`.
+    """
+    if isinstance(masks, RLEMasks):
+        height, width = masks.height, masks.width
+        bboxes = masks.get_bboxes().numpy().astype(np.int64)
+        inst_inds, cols, row_starts, row_ends = masks._segments()
+        seg_offsets = np.searchsorted(inst_inds, np.arange(len(masks) + 1))
+
+        def get_crop(i, x0, y0, x1, y1):
+            start, end = seg_offsets[i], seg_offsets[i + 1]
+            # mark the segments in each column and fill them by cumsum
+            crop = np.zeros((x1 - x0, y1 - y0 + 1), dtype=np.int8)
+            crop[cols[start:end] - x0, row_starts[start:end] - y0] = 1
+            crop[cols[start:end] - x0, row_ends[start:end] - y0] = -1
+            return np.cumsum(crop, axis=1, dtype=np.int8)[:, :-1].T
+    else:
+        if isinstance(masks, BitmapMasks):
+            masks = masks.masks
+        height, width = masks.shape[1:]
+        bboxes = np.zeros((len(masks), 4), dtype=np.int64)
+        rows = masks.any(axis=2)
+        cols = masks.any(axis=1)
+        nonempty = rows.any(axis=1)
+        bboxes[nonempty, 0] = cols[nonempty].argmax(axis=1)
+        bboxes[nonempty, 1] = rows[nonempty].argmax(axis=1)
+        bboxes[nonempty, 2] = width - cols[nonempty, ::-1].argmax(axis=1)
+        bboxes[nonempty, 3] = height - rows[nonempty, ::-1].argmax(axis=1)
+
+        def get_crop(i, x0, y0, x1, y1):
+            return masks[i, y0:y1, x0:x1]
+
+    def convert(i):
+        x0, y0, x1, y1 = bboxes[i].tolist()
+        if x1 <= x0 or y1 <= y0:
+            return [], False
+        # keep one pixel of background around the mask so that the contours
+        # are the same as those in the full mask
+        x0, y0 = max(x0 - 1, 0), max(y0 - 1, 0)
+        x1, y1 = min(x1 + 1, width), min(y1 + 1, height)
+        contours, with_hole = bitmap_to_polygon(
+            get_crop(i, x0, y0, x1, y1), offset=(x0, y0))
+        if tolerance > 0:
+            contours = [
+                cv2.approxPolyDP(c, tolerance, True).reshape(-1, 2)
+                for c in contours
+            ]
+            contours = [c for c in contours if len(c) >= 3]
+        return contours, with_hole
+
+    if num_workers > 0:
+        with ThreadPoolExecutor(num_workers) as executor:
+            return list(executor.map(convert, range(len(bboxes))))
+    return [convert(i) for i in range(len(bboxes))]
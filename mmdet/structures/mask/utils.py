@@ -4,6 +4,8 @@ import pycocotools.mask as mask_util
 import torch
 from mmengine.utils import slice_list
 
+from .structures import RLEMasks
+
 
 def split_combined_polys(polys, poly_lens, polys_per_mask):
     """Split the combined 1-D polys into masks.
@@ -39,11 +41,15 @@ def encode_mask_results(mask_results):
     """Encode bitmap mask to RLE code.
 
     Args:
-        mask_results (list): bitmap mask results.
+        mask_results (list | :obj:`RLEMasks`): bitmap mask results, or RLE
+            masks whose RLE codes are returned without decoding them.
 
     Returns:
         list | tuple: RLE encoded mask.
     """
+    if isinstance(mask_results, RLEMasks):
+        # copy the codes as the callers may modify them
+        return [dict(rle) for rle in mask_results.masks]
     encoded_mask_results = []
     for mask in mask_results:
         encoded_mask_results.append(
@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Tuple, Union
 import cv2
 import mmcv
 import numpy as np
+import pycocotools.mask as maskUtils
 
 try:
     import seaborn as sns
@@ -17,7 +18,8 @@ from mmengine.visualization import Visualizer
 from ..evaluation import INSTANCE_OFFSET
 from ..registry import VISUALIZERS
 from ..structures import DetDataSample
-from ..structures.mask import BitmapMasks, PolygonMasks, bitmap_to_polygon
+from ..structures.mask import (BitmapMasks, PolygonMasks, RLEMasks,
+                               bitmap_to_polygon)
 from .palette import _get_adaptive_scales, get_palette, jitter_color
 
 
@@ -171,12 +173,23 @@ class DetLocalVisualizer(Visualizer):
         if 'masks' in instances:
             labels = instances.labels
             masks = instances.masks
-            if isinstance(masks, torch.Tensor):
-                masks = masks.numpy()
-            elif isinstance(masks, (PolygonMasks, BitmapMasks)):
-                masks = masks.to_ndarray()
-
-            masks = masks.astype(bool)
+            if isinstance(masks, RLEMasks):
+                # decode one mask at a time rather than the full bitmaps of
+                # all the instances
+                rles = masks.masks
+
+                def iter_masks():
+                    for rle in rles:
+                        yield maskUtils.decode(rle).astype(bool)
+            else:
+                if isinstance(masks, torch.Tensor):
+                    masks = masks.numpy()
+                elif isinstance(masks, (PolygonMasks, BitmapMasks)):
+                    masks = masks.to_ndarray()
+                masks = masks.astype(bool)
+
+                def iter_masks():
+                    return iter(masks)
 
             max_label = int(max(labels) if len(labels) > 0 else 0)
             mask_color = palette if self.mask_color is None \
@@ -187,11 +200,16 @@ class DetLocalVisualizer(Visualizer):
             text_colors = [text_palette[label] for label in labels]
 
             polygons = []
-            for i, mask in enumerate(masks):
+            for i, mask in enumerate(iter_masks()):
                 contours, _ = bitmap_to_polygon(mask)
                 polygons.extend(contours)
             self.draw_polygons(polygons, edge_colors='w', alpha=self.alpha)
-            self.draw_binary_masks(masks, colors=colors, alphas=self.alpha)
+            if isinstance(masks, RLEMasks):
+                for mask, color in zip(iter_masks(), colors):
+                    self.draw_binary_masks(
+                        mask, colors=color, alphas=self.alpha)
+            else:
+                self.draw_binary_masks(masks, colors=colors, alphas=self.alpha)
 
             if len(labels) > 0 and \
                     ('bboxes' not in instances or
@@ -200,7 +218,7 @@ class DetLocalVisualizer(Visualizer):
                 # A typical example of SOLO does not exist bbox branch.
                 areas = []
                 positions = []
-                for mask in masks:
+                for mask in iter_masks():
                     _, _, stats, centroids = cv2.connectedComponentsWithStats(
                         mask.astype(np.uint8), connectivity=8)
                     if stats.shape[0] > 1:
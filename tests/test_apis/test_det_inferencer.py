@@ -152,11 +152,24 @@ class TestDetInferencer(TestCase):
         data_sample.pred_instances.bboxes = np.array([[0, 0, 1, 1]])
         data_sample.pred_instances.labels = np.array([0])
         data_sample.pred_instances.scores = torch.FloatTensor([0.9])
-        res = DetInferencer('rtmdet-t').pred2dict(data_sample)
+        inferencer = DetInferencer('rtmdet-t')
+        res = inferencer.pred2dict(data_sample)
         self.assertListAlmostEqual(res['bboxes'], [[0, 0, 1, 1]])
         self.assertListAlmostEqual(res['labels'], [0])
         self.assertListAlmostEqual(res['scores'], [0.9])
 
+        # masks in polygons
+        masks = torch.zeros((1, 8, 10), dtype=torch.bool)
+        masks[0, 2:5, 3:7] = True
+        data_sample.pred_instances.masks = masks
+        res = inferencer.pred2dict(
+            data_sample, mask_format='polygon', polygon_tolerance=0.5)
+        self.assertEqual(len(res['masks']), 1)
+        self.assertEqual(len(res['masks'][0]), 1)
+        self.assertEqual(
+            sorted(np.array(res['masks'][0][0]).reshape(-1, 2).tolist()),
+            [[3, 2], [3, 4], [6, 2], [6, 4]])
+
     def assertListAlmostEqual(self, list1, list2, places=7):
         for i in range(len(list1)):
             if isinstance(list1[i], list):
@@ -0,0 +1,75 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+from mmengine.config import Config
+from mmengine.registry import init_default_scope
+
+from mmdet.apis import MultiStreamTracker, init_track_model
+
+
+class TestMultiStreamTracker(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_default_scope('mmdet')
+        config_file = Path(__file__).parent.parent.parent / 'configs' / \
+            'bytetrack' / 'bytetrack_yolox_x_8xb4-80e_crowdhuman-' \
+            'mot17halftrain_test-mot17halfval.py'
+        cfg = Config.fromfile(config_file)
+        cfg.model.detector.neck.out_channels = 1
+        cfg.model.detector.neck.num_csp_blocks = 1
+        cfg.model.detector.bbox_head.in_channels = 1
+        cfg.model.detector.bbox_head.feat_channels = 1
+        cfg.test_dataloader.dataset.pipeline[0].transforms[1].scale = (64,
+                                                                      64)
+        cls.model = init_track_model(cfg, device='cpu')
+
+    def test_step(self):
+        runner = MultiStreamTracker(
+            self.model, max_batch_size=3, max_queue_size=2)
+        rng = np.random.default_rng(0)
+        imgs = [
+            rng.integers(0, 255, (64, 64, 3), dtype=np.uint8),
+            rng.integers(0, 255, (48, 80, 3), dtype=np.uint8)
+        ]
+        for frame_id in range(2):
+            for stream_id, img in zip(['a', 'b'], imgs):
+                self.assertTrue(runner.push(stream_id, img))
+        self.assertEqual(runner.num_pending, 4)
+
+        # the frames of the streams are taken in turn, and in order
+        results = runner.step()
+        self.assertEqual([(stream_id, frame_id)
+                          for stream_id, frame_id, _ in results],
+                         [('a', 0), ('b', 0), ('a', 1)])
+        for _, _, result in results:
+            self.assertIn('pred_track_instances', result[0])
+        results = runner.flush()
+        self.assertEqual([(stream_id, frame_id)
+                          for stream_id, frame_id, _ in results], [('b', 1)])
+        self.assertIsNot(runner.streams['a'].tracker,
+                         runner.streams['b'].tracker)
+
+        stats = runner.stats()
+        self.assertEqual(stats['num_frames'], 4)
+        self.assertEqual(stats['mean_batch_size'], 2)
+        self.assertEqual(stats['streams']['b']['num_frames'], 2)
+
+    def test_overflow(self):
+        img = np.zeros((32, 32, 3), dtype=np.uint8)
+        runner = MultiStreamTracker(self.model, max_queue_size=2)
+        for _ in range(3):
+            runner.push('a', img)
+        # the oldest frame is dropped
+        self.assertEqual([frame[0] for frame in runner.streams['a'].queue],
+                         [1, 2])
+
+        runner = MultiStreamTracker(
+            self.model, max_queue_size=2, overflow='drop_newest')
+        self.assertEqual([runner.push('a', img) for _ in range(3)],
+                         [True, True, False])
+        self.assertEqual([frame[0] for frame in runner.streams['a'].queue],
+                         [0, 1])
+        self.assertEqual(runner.stats()['num_dropped'], 1)
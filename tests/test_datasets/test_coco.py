@@ -1,5 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import pickle
+import tempfile
 import unittest
+from unittest.mock import patch
+
+import numpy as np
 
 from mmdet.datasets import CocoDataset
 
@@ -46,3 +51,79 @@ class TestCocoDataset(unittest.TestCase):
                 ann_file='tests/data/coco_wrong_format_sample.json',
                 metainfo=metainfo,
                 pipeline=[])
+
+    def test_coco_dataset_with_ann_cache(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        metainfo = dict(classes=('bus', 'car'), task_name='new_task')
+        for filter_cfg in [None, dict(filter_empty_gt=True, min_size=32)]:
+            dataset = CocoDataset(
+                data_prefix=dict(img='imgs'),
+                ann_file='tests/data/coco_sample.json',
+                metainfo=metainfo,
+                filter_cfg=filter_cfg,
+                pipeline=[])
+            cached_dataset = CocoDataset(
+                data_prefix=dict(img='imgs'),
+                ann_file='tests/data/coco_sample.json',
+                metainfo=metainfo,
+                filter_cfg=filter_cfg,
+                ann_cache_dir=tmp_dir.name,
+                pipeline=[])
+            self.assertIsInstance(cached_dataset.data_list, np.ndarray)
+            self.assertEqual(len(dataset), len(cached_dataset))
+            for i in range(len(dataset)):
+                self.assertEqual(
+                    dataset.get_data_info(i), cached_dataset.get_data_info(i))
+                self.assertEqual(
+                    dataset.get_cat_ids(i), cached_dataset.get_cat_ids(i))
+
+        # the cache is reused, and only its path is pickled
+        cached_dataset = pickle.loads(pickle.dumps(cached_dataset))
+        self.assertEqual(
+            dataset.get_data_info(0), cached_dataset.get_data_info(0))
+        subset = cached_dataset.get_subset([1, 0])
+        data_info = subset.get_data_info(1)
+        self.assertEqual(data_info.pop('sample_idx'), 1)
+        self.assertEqual(data_info['img_id'],
+                         dataset.get_data_info(0)['img_id'])
+
+        with self.assertRaisesRegex(AssertionError, 'are not unique!'):
+            CocoDataset(
+                data_prefix=dict(img='imgs'),
+                ann_file='tests/data/coco_wrong_format_sample.json',
+                metainfo=dict(classes=('car', )),
+                ann_cache_dir=tmp_dir.name,
+                pipeline=[])
+        tmp_dir.cleanup()
+
+    @patch('mmdet.datasets.base_det_dataset.barrier')
+    @patch('mmdet.datasets.base_det_dataset.broadcast_object_list')
+    @patch('mmdet.datasets.base_det_dataset.get_world_size', lambda: 2)
+    def test_coco_dataset_shared_memory(self, *mocks):
+        kwargs = dict(
+            data_prefix=dict(img='imgs'),
+            ann_file='tests/data/coco_sample.json',
+            metainfo=dict(classes=('bus', 'car')),
+            filter_cfg=dict(filter_empty_gt=True, min_size=32),
+            pipeline=[])
+        dataset = CocoDataset(**kwargs)
+
+        # local rank 0 loads the annotations and maps the shared copy
+        with patch('mmdet.datasets.base_det_dataset.get_local_rank',
+                   lambda: 0):
+            shared_dataset = CocoDataset(shared_memory=True, **kwargs)
+        self.assertIsInstance(shared_dataset.data_bytes, np.memmap)
+        self.assertEqual(shared_dataset.cat_ids, dataset.cat_ids)
+        self.assertEqual(len(shared_dataset), len(dataset))
+        for i in range(len(dataset)):
+            self.assertEqual(
+                shared_dataset.get_data_info(i), dataset.get_data_info(i))
+
+        # fall back to loading by each rank if the local rank is unknown
+        with patch('mmdet.datasets.base_det_dataset.get_local_rank',
+                   side_effect=RuntimeError), \
+                patch.dict('os.environ', clear=True):
+            shared_dataset = CocoDataset(shared_memory=True, **kwargs)
+        self.assertFalse(shared_dataset.shared_memory)
+        self.assertNotIsInstance(shared_dataset.data_bytes, np.memmap)
+        self.assertEqual(len(shared_dataset), len(dataset))
@@ -229,3 +229,15 @@ class TestLVISDataset(unittest.TestCase):
         # with all illegal annotations
         self.assertEqual(len(dataset), 4)
         self.assertEqual(len(dataset.load_data_list()), 4)
+
+    def test_lvis_dataset_with_ann_cache(self):
+        # the annotation cache is not supported by LVIS datasets
+        for dataset_type in [LVISV05Dataset, LVISV1Dataset]:
+            with self.assertRaisesRegex(AssertionError, 'not supported'):
+                dataset_type(
+                    ann_file=self.json_name,
+                    data_prefix=dict(img='imgs'),
+                    metainfo=self.metainfo,
+                    ann_cache_dir='lvis_cache',
+                    lazy_init=True,
+                    pipeline=[])
@@ -1,6 +1,10 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import tempfile
 import unittest
 
+from mmengine.fileio import dump, load
+
 from mmdet.datasets import Objects365V1Dataset, Objects365V2Dataset
 
 
@@ -39,6 +43,26 @@ class TestObjects365V1Dataset(unittest.TestCase):
         self.assertListEqual(dataset.get_cat_ids(0), [0, 1])
         self.assertEqual(dataset.cat_ids, [1, 2])
 
+    def test_obj365v1_dataset_with_ann_cache(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        kwargs = dict(
+            data_prefix=dict(img='imgs'),
+            ann_file='tests/data/Objects365/unsorted_obj365_sample.json',
+            metainfo=dict(classes=('bus', 'car')),
+            filter_cfg=dict(filter_empty_gt=True, min_size=32),
+            pipeline=[])
+        dataset = Objects365V1Dataset(**kwargs)
+        cached_dataset = Objects365V1Dataset(
+            ann_cache_dir=tmp_dir.name, **kwargs)
+        self.assertIsNotNone(cached_dataset.ann_cache)
+        # the categories of the cache are sorted as well
+        self.assertEqual(cached_dataset.cat_ids, [1, 2])
+        self.assertEqual(len(dataset), len(cached_dataset))
+        for i in range(len(dataset)):
+            self.assertEqual(
+                dataset.get_data_info(i), cached_dataset.get_data_info(i))
+        tmp_dir.cleanup()
+
     def test_obj365v1_annotation_ids_unique(self):
         # test annotation ids not unique error
         metainfo = dict(classes=('car', ), task_name='new_task')
@@ -77,3 +101,36 @@ class TestObjects365V2Dataset(unittest.TestCase):
                 ann_file='tests/data/coco_wrong_format_sample.json',
                 metainfo=metainfo,
                 pipeline=[])
+
+    def test_obj365v2_dataset_with_ann_cache(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        # rename the images as the ones in Objects365 v2, and the last one
+        # is in `objv2_ignore_list`
+        ann = load('tests/data/coco_sample.json')
+        for img_info in ann['images']:
+            img_info['file_name'] = osp.join('images', 'v2', 'patch0',
+                                             img_info['file_name'])
+        ann['images'][-1]['file_name'] = osp.join(
+            'images', 'v1', 'patch6', 'objects365_v1_00320532.jpg')
+        ann_file = osp.join(tmp_dir.name, 'obj365v2_sample.json')
+        dump(ann, ann_file)
+
+        for filter_cfg in [None, dict(filter_empty_gt=True, min_size=32)]:
+            kwargs = dict(
+                data_prefix=dict(img='imgs'),
+                ann_file=ann_file,
+                metainfo=dict(classes=('bus', 'car')),
+                filter_cfg=filter_cfg,
+                pipeline=[])
+            dataset = Objects365V2Dataset(**kwargs)
+            cached_dataset = Objects365V2Dataset(
+                ann_cache_dir=osp.join(tmp_dir.name, 'cache'), **kwargs)
+            self.assertIsNotNone(cached_dataset.ann_cache)
+            self.assertEqual(len(dataset), len(cached_dataset))
+            for i in range(len(dataset)):
+                data_info = cached_dataset.get_data_info(i)
+                self.assertEqual(dataset.get_data_info(i), data_info)
+                self.assertTrue(
+                    data_info['img_path'].startswith(
+                        osp.join('imgs', 'patch0')))
+        tmp_dir.cleanup()
@@ -0,0 +1,143 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import json
+import os
+import os.path as osp
+import tempfile
+import unittest
+
+from mmdet.datasets import ODVGDataset
+
+
+class TestODVGDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        od_records, vg_records = [], []
+        for i in range(20):
+            od_records.append(
+                dict(
+                    filename=f'{i}.jpg',
+                    height=100,
+                    width=200,
+                    detection=dict(instances=[
+                        dict(bbox=[10, 10, 50, 60], label=i % 3),
+                        dict(bbox=[10, 10, 10.5, 60], label=1),
+                        dict(bbox=[300, 10, 350, 60], label=2)
+                    ])))
+            vg_records.append(
+                dict(
+                    filename=f'{i}.jpg',
+                    height=100,
+                    width=200,
+                    grounding=dict(
+                        caption=f'caption {i} é',
+                        regions=[
+                            dict(
+                                bbox=[10, 10, 50, 60],
+                                phrase='a',
+                                tokens_positive=[[0, 1]]),
+                            dict(
+                                bbox=[[1, 1, 20, 20], [300, 1, 320, 20]],
+                                phrase='b',
+                                tokens_positive=[[2, 3]])
+                        ])))
+        with open(osp.join(self.tmp_dir.name, 'od.jsonl'), 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in od_records))
+        with open(osp.join(self.tmp_dir.name, 'vg.jsonl'), 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in vg_records) + '\n')
+        with open(osp.join(self.tmp_dir.name, 'label_map.json'), 'w') as f:
+            json.dump({'0': 'cat', '1': 'dog', '2': 'bird'}, f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _build(self, ann_file, **kwargs):
+        if ann_file == 'od.jsonl':
+            kwargs['label_map_file'] = 'label_map.json'
+        return ODVGDataset(
+            data_root=self.tmp_dir.name,
+            ann_file=ann_file,
+            data_prefix=dict(img='imgs'),
+            return_classes=True,
+            pipeline=[],
+            **kwargs)
+
+    def test_odvg_dataset(self):
+        dataset = self._build('od.jsonl', serialize_data=False)
+        self.assertEqual(len(dataset), 20)
+        data_info = dataset.get_data_info(3)
+        self.assertEqual(data_info['img_path'],
+                         osp.join(self.tmp_dir.name, 'imgs', '3.jpg'))
+        self.assertEqual(data_info['text'], {
+            '0': 'cat',
+            '1': 'dog',
+            '2': 'bird'
+        })
+        self.assertEqual(
+            data_info['instances'],
+            [dict(ignore_flag=0, bbox=[10, 10, 50, 60], bbox_label=0)])
+
+        dataset = self._build('vg.jsonl', serialize_data=False)
+        self.assertEqual(len(dataset), 20)
+        data_info = dataset.get_data_info(3)
+        self.assertEqual(data_info['text'], 'caption 3 é')
+        self.assertEqual(len(data_info['instances']), 2)
+        self.assertEqual(list(data_info['phrases']), [0, 1])
+
+    def test_parallel_parsing_and_sidecar(self):
+        cache_dir = osp.join(self.tmp_dir.name, 'cache')
+        for ann_file in ['od.jsonl', 'vg.jsonl']:
+            dataset = self._build(ann_file, serialize_data=False)
+            expected = [dataset.get_data_info(i) for i in range(len(dataset))]
+            for kwargs in [
+                    dict(),
+                    dict(num_parse_workers=3),
+                    dict(num_parse_workers=3, serialize_data=False),
+                    dict(ann_cache_dir=cache_dir),
+                    dict(ann_cache_dir=cache_dir, serialize_data=False)
+            ]:
+                dataset = self._build(ann_file, **kwargs)
+                self.assertEqual(
+                    [dataset.get_data_info(i) for i in range(len(dataset))],
+                    expected)
+
+        # the sidecar is reused
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+        dataset = self._build('od.jsonl', ann_cache_dir=cache_dir, indices=5)
+        self.assertEqual(len(dataset), 5)
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+
+    def test_lazy_load(self):
+        cache_dir = osp.join(self.tmp_dir.name, 'cache')
+        for ann_file in ['od.jsonl', 'vg.jsonl']:
+            dataset = self._build(ann_file, serialize_data=False)
+            expected = [dataset.get_data_info(i) for i in range(len(dataset))]
+            for kwargs in [dict(), dict(ann_cache_dir=cache_dir)]:
+                dataset = self._build(ann_file, lazy_load=True, **kwargs)
+                self.assertIsNotNone(dataset.jsonl_index)
+                self.assertEqual(
+                    [dataset.get_data_info(i) for i in range(len(dataset))],
+                    expected)
+                self.assertEqual(dataset.get_data_info(-1), expected[-1])
+
+        # the index is reused
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+        dataset = self._build(
+            'vg.jsonl', lazy_load=True, ann_cache_dir=cache_dir, indices=5)
+        self.assertEqual(len(dataset), 5)
+        self.assertEqual(dataset.get_data_info(4), expected[4])
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+        # blank lines are skipped
+        with open(osp.join(self.tmp_dir.name, 'vg.jsonl'), 'a') as f:
+            f.write('\n\n')
+        dataset = self._build('vg.jsonl', lazy_load=True)
+        self.assertEqual(len(dataset), 20)
+
+        # so are the lines of whitespaces, as the ones of the eager loading
+        with open(osp.join(self.tmp_dir.name, 'vg.jsonl'), 'a') as f:
+            f.write(' \t\r\n  \n \r')
+        self.assertEqual(len(self._build('vg.jsonl')), 20)
+        dataset = self._build('vg.jsonl', lazy_load=True)
+        self.assertEqual(len(dataset), 20)
+        self.assertEqual(dataset.get_data_info(-1), expected[-1])
@@ -10,7 +10,7 @@ from mmengine.structures import InstanceData, LabelData, PixelData
 from mmdet.datasets.transforms import (PackDetInputs, PackReIDInputs,
                                        PackTrackInputs)
 from mmdet.structures import DetDataSample, ReIDDataSample
-from mmdet.structures.mask import BitmapMasks
+from mmdet.structures.mask import BitmapMasks, PolygonMasks
 
 
 class TestPackDetInputs(unittest.TestCase):
@@ -96,6 +96,40 @@ class TestPackDetInputs(unittest.TestCase):
         self.assertIsInstance(results['data_samples'].proposals.scores,
                               torch.Tensor)
 
+    def test_rasterize_masks(self):
+        results = copy.deepcopy(self.results1)
+        results['gt_masks'] = PolygonMasks.random(
+            num_masks=3, height=300, width=400)
+        results['gt_masks'] = results['gt_masks'].rescale(2.0).pad(
+            (608, 800))
+        transform = PackDetInputs(
+            meta_keys=self.meta_keys, rasterize_masks=True)
+        packed_results = transform(copy.deepcopy(results))
+        gt_masks = packed_results['data_samples'].gt_instances.masks
+        self.assertIsInstance(gt_masks, BitmapMasks)
+        self.assertEqual(gt_masks.masks.shape, (2, 608, 800))
+        self.assertTrue((gt_masks.masks == results['gt_masks'][
+            [0, 1]].to_ndarray()).all())
+        self.assertIsInstance(
+            packed_results['data_samples'].ignored_instances.masks,
+            BitmapMasks)
+
+        # keep the polygons by default
+        transform = PackDetInputs(meta_keys=self.meta_keys)
+        packed_results = transform(copy.deepcopy(results))
+        self.assertIsInstance(
+            packed_results['data_samples'].gt_instances.masks, PolygonMasks)
+
+    def test_record_nbytes(self):
+        transform = PackDetInputs(
+            meta_keys=self.meta_keys, record_nbytes=True)
+        packed_results = transform(copy.deepcopy(self.results1))
+        nbytes = packed_results['data_samples'].nbytes
+        self.assertEqual(nbytes['img'], 300 * 400 * 8)
+        self.assertEqual(nbytes['masks'], 3 * 300 * 400 * 8)
+        self.assertEqual(nbytes['seg_map'], 300 * 400 * 8)
+        self.assertEqual(nbytes['total'], 5 * 300 * 400 * 8)
+
     def test_repr(self):
         transform = PackDetInputs(meta_keys=self.meta_keys)
         self.assertEqual(
@@ -2,20 +2,23 @@
 import copy
 import os
 import os.path as osp
+import shutil
 import sys
+import tempfile
 import unittest
 from unittest.mock import MagicMock, Mock, patch
 
 import mmcv
 import numpy as np
 
-from mmdet.datasets.transforms import (FilterAnnotations, LoadAnnotations,
+from mmdet.datasets.transforms import (CachedLoadImageFromFile,
+                                       FilterAnnotations, LoadAnnotations,
                                        LoadEmptyAnnotations,
                                        LoadImageFromNDArray,
                                        LoadMultiChannelImageFromFiles,
                                        LoadProposals, LoadTrackAnnotations)
 from mmdet.evaluation import INSTANCE_OFFSET
-from mmdet.structures.mask import BitmapMasks, PolygonMasks
+from mmdet.structures.mask import BitmapMasks, PolygonMasks, RLEMasks
 
 try:
     import panopticapi
@@ -110,6 +113,42 @@ class TestLoadAnnotations(unittest.TestCase):
         self.assertEqual(len(results['gt_masks']), 3)
         self.assertIsInstance(results['gt_masks'], BitmapMasks)
 
+        transform = LoadAnnotations(
+            with_bbox=False,
+            with_label=False,
+            with_seg=False,
+            with_mask=True,
+            poly2mask=True,
+            rle_mask=True)
+        rle_results = transform(copy.deepcopy(self.results))
+        self.assertIsInstance(rle_results['gt_masks'], RLEMasks)
+        self.assertTrue((rle_results['gt_masks'].to_ndarray() ==
+                         results['gt_masks'].masks).all())
+
+        # convert all the instances at once
+        for rle_mask in (False, True):
+            transform = LoadAnnotations(
+                with_bbox=False,
+                with_label=False,
+                with_seg=False,
+                with_mask=True,
+                poly2mask=True,
+                rle_mask=rle_mask,
+                batch_poly2mask=True)
+            batch_results = transform(copy.deepcopy(self.results))
+            self.assertIsInstance(batch_results['gt_masks'],
+                                  RLEMasks if rle_mask else BitmapMasks)
+            self.assertTrue((batch_results['gt_masks'].to_ndarray() ==
+                             results['gt_masks'].masks).all())
+
+        # the masks decoded at once are C-contiguous
+        masks = transform._batch_poly2mask(
+            [instance['mask'] for instance in self.results['instances']], 300,
+            400)
+        self.assertEqual(masks.shape, (3, 300, 400))
+        self.assertTrue(masks.flags.c_contiguous)
+        self.assertTrue((masks == results['gt_masks'].masks).all())
+
     def test_load_semseg(self):
         transform = LoadAnnotations(
             with_bbox=False, with_label=False, with_seg=True, with_mask=False)
@@ -369,6 +408,88 @@ class TestLoadImageFromNDArray(unittest.TestCase):
                               'backend_args=None)'))
 
 
+class TestCachedLoadImageFromFile(unittest.TestCase):
+
+    def setUp(self):
+        """Setup the model and optimizer which are used in every test method.
+
+        TestCase calls functions in this order: setUp() -> testMethod() ->
+        tearDown() -> cleanUp()
+        """
+        data_prefix = osp.join(osp.dirname(__file__), '../../data')
+        self.results = {'img_path': osp.join(data_prefix, 'color.jpg')}
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_transform(self):
+        transform = CachedLoadImageFromFile(cache_dir=self.tmp_dir.name)
+        results = transform(copy.deepcopy(self.results))
+        img = mmcv.imread(self.results['img_path'])
+        self.assertTrue((results['img'] == img).all())
+        self.assertEqual(results['img_shape'], img.shape[:2])
+        self.assertEqual(results['ori_shape'], img.shape[:2])
+        # the image is cached under its own name without temporary files
+        cache_path = transform._cache_path(self.results['img_path'])
+        self.assertTrue(osp.isfile(cache_path))
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir.name)),
+            sorted(['.usage', osp.basename(cache_path)]))
+
+        # load from the cache, even if the file is gone
+        with patch('mmcv.transforms.loading.fileio.get') as mock_get, \
+                patch('mmcv.transforms.LoadImageFromFile.transform') as \
+                mock_transform:
+            results = transform(copy.deepcopy(self.results))
+            mock_get.assert_not_called()
+            mock_transform.assert_not_called()
+        self.assertTrue((results['img'] == img).all())
+        self.assertTrue(osp.isfile(cache_path))
+        # the cached image is copy-on-write
+        results['img'][:] = 0
+        results = transform(copy.deepcopy(self.results))
+        self.assertTrue((results['img'] == img).all())
+
+        # to_float32 and another process sharing the cache
+        transform = CachedLoadImageFromFile(
+            cache_dir=self.tmp_dir.name, to_float32=True)
+        results = transform(copy.deepcopy(self.results))
+        self.assertEqual(results['img'].dtype, np.float32)
+        self.assertTrue((results['img'] == img).all())
+
+        # a different color type is cached separately
+        transform = CachedLoadImageFromFile(
+            cache_dir=self.tmp_dir.name, color_type='grayscale')
+        results = transform(copy.deepcopy(self.results))
+        self.assertEqual(results['img'].ndim, 2)
+
+    def test_evict(self):
+        transform = CachedLoadImageFromFile(
+            cache_dir=self.tmp_dir.name, max_bytes=1000)
+        transform(copy.deepcopy(self.results))
+        self.assertEqual(len(os.listdir(self.tmp_dir.name)), 1)
+
+        # the default cache is removed at exit
+        transform = CachedLoadImageFromFile()
+        self.assertTrue(osp.isdir(transform.cache_dir))
+        transform(copy.deepcopy(self.results))
+        self.assertEqual(len(os.listdir(transform.cache_dir)), 2)
+        shutil.rmtree(transform.cache_dir)
+
+    def test_repr(self):
+        transform = CachedLoadImageFromFile(cache_dir=self.tmp_dir.name)
+        self.assertEqual(
+            repr(transform), ('CachedLoadImageFromFile('
+                              f"cache_dir='{self.tmp_dir.name}', "
+                              f'max_bytes={4 * 1024**3}, '
+                              'ignore_empty=False, '
+                              'to_float32=False, '
+                              "color_type='color', "
+                              "imdecode_backend='cv2', "
+                              'backend_args=None)'))
+
+
 class TestLoadMultiChannelImageFromFiles(unittest.TestCase):
 
     def setUp(self):
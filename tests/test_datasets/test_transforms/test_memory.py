@@ -0,0 +1,110 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import unittest
+
+import numpy as np
+
+from mmdet.datasets.transforms import LimitSampleMemory, sample_nbytes
+from mmdet.structures.bbox import HorizontalBoxes
+from mmdet.structures.mask import (BaseInstanceMasks, BitmapMasks,
+                                   PolygonMasks, RLEMasks)
+
+
+class TestLimitSampleMemory(unittest.TestCase):
+
+    def setUp(self):
+        masks = np.zeros((4, 40, 50), dtype=np.uint8)
+        for i in range(4):
+            masks[i, :10 * (i + 1), :10 * (i + 1)] = 1
+        self.results = dict(
+            img=np.zeros((40, 50, 3), dtype=np.uint8),
+            img_shape=(40, 50),
+            scale_factor=(2., 2.),
+            gt_bboxes=HorizontalBoxes(
+                np.array([[0, 0, 10, 10], [0, 0, 20, 20], [0, 0, 30, 30],
+                          [0, 0, 40, 40]],
+                         dtype=np.float32)),
+            gt_bboxes_labels=np.array([0, 1, 2, 3], dtype=np.int64),
+            gt_ignore_flags=np.zeros(4, dtype=bool),
+            gt_masks=BitmapMasks(masks, 40, 50),
+            gt_seg_map=np.zeros((40, 50), dtype=np.uint8))
+
+    def test_sample_nbytes(self):
+        nbytes = sample_nbytes(self.results)
+        self.assertEqual(
+            nbytes,
+            dict(img=6000, masks=8000, seg_map=2000, total=16000))
+        masks = self.results['gt_masks']
+        self.assertLess(RLEMasks.from_ndarray(masks.masks).nbytes, 8000)
+        polygons = PolygonMasks(
+            [[np.array([0, 0, 10, 0, 10, 10], dtype=np.float32)]], 40, 50)
+        self.assertEqual(polygons.nbytes, 24)
+        # the subclasses do not have to implement nbytes, which defaults to
+        # the size of the masks in ndarray
+        self.assertNotIn('nbytes', BaseInstanceMasks.__abstractmethods__)
+        self.assertEqual(BaseInstanceMasks.nbytes.fget(polygons), 2000)
+
+    def test_transform(self):
+        # within the budget
+        transform = LimitSampleMemory(max_bytes=20000, log_interval=1)
+        results = transform(copy.deepcopy(self.results))
+        self.assertIsInstance(results['gt_masks'], BitmapMasks)
+        self.assertEqual(results['nbytes']['total'], 16000)
+        self.assertEqual(transform.num_exceeded, 0)
+
+        # compact masks
+        transform = LimitSampleMemory(max_bytes=10000)
+        results = transform(copy.deepcopy(self.results))
+        self.assertIsInstance(results['gt_masks'], RLEMasks)
+        self.assertTrue((results['gt_masks'].to_ndarray() ==
+                         self.results['gt_masks'].masks).all())
+        self.assertEqual(transform.num_exceeded, 1)
+        self.assertEqual(transform.num_applied['compact'], 1)
+
+        # downsample the sample
+        transform = LimitSampleMemory(
+            max_bytes=4000, policies='downsample')
+        results = transform(copy.deepcopy(self.results))
+        self.assertEqual(results['img'].shape, (20, 25, 3))
+        self.assertEqual(results['gt_masks'].masks.shape, (4, 20, 25))
+        self.assertEqual(results['gt_seg_map'].shape, (20, 25))
+        self.assertEqual(results['scale_factor'], (1., 1.))
+        self.assertEqual(results['nbytes']['total'], 4000)
+
+        # drop the smallest instances
+        transform = LimitSampleMemory(max_bytes=12000, policies='drop')
+        results = transform(copy.deepcopy(self.results))
+        self.assertEqual(len(results['gt_masks']), 2)
+        self.assertEqual(results['gt_bboxes_labels'].tolist(), [2, 3])
+        self.assertEqual(len(results['gt_bboxes']), 2)
+        self.assertEqual(len(results['gt_ignore_flags']), 2)
+
+        # apply the policies in order
+        transform = LimitSampleMemory(
+            max_bytes=8500, policies=['downsample', 'compact'])
+        results = transform(copy.deepcopy(self.results))
+        self.assertEqual(transform.num_applied['downsample'], 1)
+        self.assertEqual(transform.num_applied['compact'], 0)
+
+        # the bytes of the compressed masks are not proportional to their
+        # number, so the instances are dropped until the kept masks fit, and
+        # the samples without an image are not downsampled
+        masks = self.results['gt_masks'].masks.copy()
+        masks[3] = 0
+        masks[3, ::2] = 1
+        results = dict(
+            gt_bboxes_labels=np.array([0, 1, 2, 3], dtype=np.int64),
+            gt_masks=RLEMasks.from_ndarray(masks))
+        transform = LimitSampleMemory(
+            max_bytes=2100, policies=['downsample', 'drop'])
+        results = transform(results)
+        self.assertEqual(results['gt_bboxes_labels'].tolist(), [2, 3])
+        self.assertLessEqual(results['nbytes']['total'], 2100)
+        self.assertEqual(transform.num_applied['downsample'], 0)
+        self.assertEqual(transform.num_applied['drop'], 1)
+
+    def test_repr(self):
+        transform = LimitSampleMemory(max_bytes=100, policies='drop')
+        self.assertEqual(
+            repr(transform), 'LimitSampleMemory(max_bytes=100, '
+            "policies=['drop'], min_scale_factor=0.5, log_interval=1000)")
@@ -0,0 +1,86 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import multiprocessing as mp
+import pickle
+import sys
+import unittest
+
+import numpy as np
+
+from mmdet.datasets.transforms import CachedMixUp, CachedMosaic
+from mmdet.datasets.transforms.shared_cache import SharedResultsCache
+from mmdet.structures.bbox import HorizontalBoxes
+
+
+def _append_in_child(cache, value):
+    cache.append(dict(value=value))
+
+
+@unittest.skipIf(sys.platform == 'win32', 'POSIX only')
+class TestSharedResultsCache(unittest.TestCase):
+
+    def test_append_and_pop(self):
+        cache = SharedResultsCache(3, 1024, random_pop=False)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(IndexError):
+            cache[0]
+        for i in range(5):
+            cache.append(dict(value=i, img=np.full((4, 4), i)))
+        # FIFO popping
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(sorted(cache[i]['value'] for i in range(3)),
+                         [2, 3, 4])
+        self.assertTrue((cache[0]['img'] == 3).all())
+
+        cache = SharedResultsCache(3, 1024)
+        for i in range(10):
+            cache.append(dict(value=i))
+        self.assertEqual(len(cache), 3)
+        self.assertIn(9, [cache[i]['value'] for i in range(3)])
+
+        # too large results are not cached
+        with self.assertWarns(UserWarning):
+            cache.append(dict(img=np.zeros(1024, dtype=np.uint8)))
+        self.assertIn(9, [cache[i]['value'] for i in range(3)])
+
+        with self.assertRaises(TypeError):
+            pickle.dumps(cache)
+
+    def test_share_with_forked_workers(self):
+        cache = SharedResultsCache(4, 1024)
+        ctx = mp.get_context('fork')
+        workers = [
+            ctx.Process(target=_append_in_child, args=(cache, i))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(sorted(cache[i]['value'] for i in range(3)),
+                         [0, 1, 2])
+
+    def test_cached_transforms(self):
+        results = dict(
+            img=np.random.randint(0, 255, (20, 24, 3), dtype=np.uint8),
+            gt_bboxes=HorizontalBoxes(
+                np.array([[1, 1, 10, 10]], dtype=np.float32)),
+            gt_bboxes_labels=np.array([1], dtype=np.int64),
+            gt_ignore_flags=np.array([0], dtype=bool))
+
+        transform = CachedMosaic(
+            img_scale=(12, 10), max_cached_images=5, shared_cache=True)
+        self.assertIsInstance(transform.results_cache, SharedResultsCache)
+        for _ in range(6):
+            out = transform(copy.deepcopy(results))
+        self.assertEqual(len(transform.results_cache), 5)
+        self.assertEqual(out['img'].shape[:2], (20, 24))
+        self.assertIn('shared_cache=True', repr(transform))
+
+        transform = CachedMixUp(
+            img_scale=(12, 10), max_cached_images=2, shared_cache=True)
+        for _ in range(3):
+            out = transform(copy.deepcopy(results))
+        self.assertEqual(len(transform.results_cache), 2)
+        self.assertEqual(out['img'].shape[:2], (20, 24))
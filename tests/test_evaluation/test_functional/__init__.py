@@ -0,0 +1 @@
+# Copyright (c) OpenMMLab. All rights reserved.
@@ -0,0 +1,104 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest import TestCase
+
+import numpy as np
+
+from mmdet.evaluation.functional import eval_map
+
+
+def _create_dummy_data(rng,
+                       num_imgs,
+                       num_classes,
+                       with_ignore=True,
+                       with_group_of=False):
+    det_results, annotations = [], []
+    for _ in range(num_imgs):
+        num_gts = rng.integers(0, 8)
+        xy = rng.uniform(0, 80, (num_gts, 2))
+        gt_bboxes = np.hstack([xy, xy + rng.uniform(1, 40, (num_gts, 2))])
+        gt_labels = rng.integers(0, num_classes, num_gts)
+        img_results = []
+        for label in range(num_classes):
+            num_dets = rng.integers(0, 30)
+            cls_gts = gt_bboxes[gt_labels == label]
+            if len(cls_gts) > 0:
+                bboxes = cls_gts[rng.integers(0, len(cls_gts), num_dets)]
+                bboxes = bboxes + rng.normal(0, 4, (num_dets, 4))
+            else:
+                xy = rng.uniform(0, 80, (num_dets, 2))
+                bboxes = np.hstack(
+                    [xy, xy + rng.uniform(1, 40, (num_dets, 2))])
+            bboxes[:, 2:] = np.maximum(bboxes[:, 2:], bboxes[:, :2] + 0.5)
+            # quantized scores make ties between detections
+            scores = np.round(rng.random((num_dets, 1)) * 4) / 4
+            img_results.append(np.hstack([bboxes, scores]).astype(np.float32))
+        ann = dict(bboxes=gt_bboxes.astype(np.float32), labels=gt_labels)
+        if with_ignore:
+            num_ignores = rng.integers(0, 3)
+            xy = rng.uniform(0, 80, (num_ignores, 2))
+            ann['bboxes_ignore'] = np.hstack(
+                [xy, xy + rng.uniform(1, 40,
+                                      (num_ignores, 2))]).astype(np.float32)
+            ann['labels_ignore'] = rng.integers(0, num_classes, num_ignores)
+        if with_group_of:
+            ann['gt_is_group_ofs'] = rng.random(num_gts) < 0.3
+        det_results.append(img_results)
+        annotations.append(ann)
+    return det_results, annotations
+
+
+class TestEvalMap(TestCase):
+
+    def _assert_same_results(self, det_results, annotations, **kwargs):
+        mean_ap, results = eval_map(
+            det_results,
+            annotations,
+            logger='silent',
+            nproc=1,
+            use_vectorized=True,
+            **kwargs)
+        expected_map, expected = eval_map(
+            det_results,
+            annotations,
+            logger='silent',
+            nproc=1,
+            use_vectorized=False,
+            **kwargs)
+        np.testing.assert_array_equal(mean_ap, expected_map)
+        for result, expected_result in zip(results, expected):
+            for key in ['num_gts', 'num_dets', 'recall', 'precision', 'ap']:
+                np.testing.assert_array_equal(result[key],
+                                              expected_result[key])
+
+    def test_vectorized_tpfp_default(self):
+        rng = np.random.default_rng(0)
+        for use_legacy_coordinate in [False, True]:
+            for scale_ranges in [None, [(0, 10), (10, 20), (20, 1e5)]]:
+                det_results, annotations = _create_dummy_data(rng, 10, 3)
+                self._assert_same_results(
+                    det_results,
+                    annotations,
+                    scale_ranges=scale_ranges,
+                    use_legacy_coordinate=use_legacy_coordinate)
+
+    def test_vectorized_tpfp_imagenet(self):
+        rng = np.random.default_rng(1)
+        for scale_ranges in [None, [(0, 10), (10, 20), (20, 1e5)]]:
+            det_results, annotations = _create_dummy_data(rng, 10, 3)
+            self._assert_same_results(
+                det_results,
+                annotations,
+                scale_ranges=scale_ranges,
+                dataset='det')
+
+    def test_vectorized_tpfp_openimages(self):
+        rng = np.random.default_rng(2)
+        det_results, annotations = _create_dummy_data(
+            rng, 10, 3, with_ignore=False, with_group_of=True)
+        self._assert_same_results(
+            det_results,
+            annotations,
+            iou_thr=0.5,
+            ioa_thr=0.5,
+            dataset='oid_v6',
+            use_group_of=True)
@@ -373,6 +373,168 @@ class TestCocoMetric(TestCase):
         self.assertTrue(
             osp.isfile(osp.join(self.tmp_dir.name, 'test.gt.json')))
 
+    def test_incremental_evaluate(self):
+        # create dummy data
+        fake_json_file = osp.join(self.tmp_dir.name, 'fake_data.json')
+        self._create_dummy_coco_json(fake_json_file)
+        rng = np.random.RandomState(0)
+        dummy_pred = self._create_dummy_results()
+        bboxes = np.concatenate(
+            [dummy_pred['bboxes'].numpy()] * 3) + rng.randint(
+                -10, 10, size=(12, 4))
+        dummy_pred = dict(
+            bboxes=torch.from_numpy(bboxes.astype(np.float32)),
+            scores=torch.from_numpy(rng.rand(12)),
+            labels=torch.from_numpy(rng.randint(0, 2, size=12)),
+            masks=torch.from_numpy(
+                np.concatenate([dummy_pred['masks'].numpy()] * 3)))
+
+        with self.assertRaisesRegex(ValueError, 'format_only'):
+            CocoMetric(
+                ann_file=fake_json_file,
+                format_only=True,
+                outfile_prefix=f'{self.tmp_dir.name}/test',
+                incremental_eval=True)
+        with self.assertRaisesRegex(KeyError, 'proposal_fast'):
+            CocoMetric(
+                ann_file=fake_json_file,
+                metric='proposal_fast',
+                incremental_eval=True)
+
+        # should give the same results as evaluating the dumped json
+        eval_results = []
+        for incremental_eval in [False, True]:
+            coco_metric = CocoMetric(
+                ann_file=fake_json_file,
+                metric=['bbox', 'segm', 'proposal'],
+                classwise=True,
+                incremental_eval=incremental_eval)
+            coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+            coco_metric.process({}, [
+                dict(
+                    pred_instances=dummy_pred, img_id=0, ori_shape=(640, 640))
+            ])
+            eval_results.append(coco_metric.evaluate(size=1))
+        self.assertDictEqual(eval_results[0], eval_results[1])
+
+        # test without json
+        dummy_mask = np.zeros((10, 10), order='F', dtype=np.uint8)
+        dummy_mask[:5, :5] = 1
+        rle_mask = mask_util.encode(dummy_mask)
+        rle_mask['counts'] = rle_mask['counts'].decode('utf-8')
+        instances = [{
+            'bbox_label': label,
+            'bbox': bbox,
+            'ignore_flag': ignore_flag,
+            'mask': rle_mask,
+        } for bbox, label, ignore_flag in zip(
+            [[50, 60, 70, 80], [100, 120, 130, 150], [150, 160, 190, 200],
+             [250, 260, 350, 360]], [0, 0, 1, 0], [0, 1, 0, 0])]
+        eval_results = []
+        for incremental_eval in [False, True]:
+            coco_metric = CocoMetric(
+                ann_file=None,
+                metric=['bbox', 'segm'],
+                classwise=True,
+                outfile_prefix=f'{self.tmp_dir.name}/test',
+                incremental_eval=incremental_eval)
+            coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+            coco_metric.process({}, [
+                dict(
+                    pred_instances=dummy_pred,
+                    img_id=0,
+                    ori_shape=(640, 640),
+                    instances=instances)
+            ])
+            eval_results.append(coco_metric.evaluate(size=1))
+        self.assertDictEqual(eval_results[0], eval_results[1])
+
+        # test empty results
+        coco_metric = CocoMetric(
+            ann_file=fake_json_file, incremental_eval=True)
+        coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+        empty_pred = dict(
+            bboxes=torch.zeros((0, 4)),
+            scores=torch.zeros(0),
+            labels=torch.zeros(0, dtype=torch.long))
+        coco_metric.process(
+            {},
+            [dict(pred_instances=empty_pred, img_id=0, ori_shape=(640, 640))])
+        self.assertDictEqual(coco_metric.evaluate(size=1), dict())
+
+    def test_in_memory_results(self):
+        # create dummy data
+        fake_json_file = osp.join(self.tmp_dir.name, 'fake_data.json')
+        self._create_dummy_coco_json(fake_json_file)
+        rng = np.random.RandomState(0)
+        dummy_pred = self._create_dummy_results()
+        dummy_pred['bboxes'] = dummy_pred['bboxes'] + torch.from_numpy(
+            rng.randint(-10, 10, size=(4, 4)))
+        dummy_pred['scores'] = torch.from_numpy(rng.rand(4))
+
+        # should give the same results as evaluating the dumped json
+        eval_results = []
+        for in_memory_results in [False, True]:
+            coco_metric = CocoMetric(
+                ann_file=fake_json_file,
+                metric=['bbox', 'segm', 'proposal'],
+                classwise=True,
+                in_memory_results=in_memory_results)
+            coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+            coco_metric.process({}, [
+                dict(
+                    pred_instances=dummy_pred, img_id=0, ori_shape=(640, 640))
+            ])
+            eval_results.append(coco_metric.evaluate(size=1))
+        self.assertDictEqual(eval_results[0], eval_results[1])
+
+        # test without json
+        dummy_mask = np.zeros((10, 10), order='F', dtype=np.uint8)
+        dummy_mask[:5, :5] = 1
+        rle_mask = mask_util.encode(dummy_mask)
+        rle_mask['counts'] = rle_mask['counts'].decode('utf-8')
+        instances = [{
+            'bbox_label': label,
+            'bbox': bbox,
+            'ignore_flag': 0,
+            'mask': rle_mask,
+        } for bbox, label in zip([[50, 60, 70, 80], [100, 120, 130, 150],
+                                  [150, 160, 190, 200], [250, 260, 350, 360]],
+                                 [0, 0, 1, 0])]
+        coco_metric = CocoMetric(
+            ann_file=None,
+            metric=['bbox', 'segm'],
+            classwise=False,
+            in_memory_results=True)
+        coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+        coco_metric.process({}, [
+            dict(
+                pred_instances=self._create_dummy_results(),
+                img_id=0,
+                ori_shape=(640, 640),
+                instances=instances)
+        ])
+        eval_results = coco_metric.evaluate(size=1)
+        self.assertEqual(eval_results['coco/bbox_mAP'], 1.0)
+        self.assertEqual(eval_results['coco/segm_mAP'], 1.0)
+
+        # json files are still dumped if outfile_prefix is given
+        coco_metric = CocoMetric(
+            ann_file=fake_json_file,
+            outfile_prefix=f'{self.tmp_dir.name}/test',
+            in_memory_results=True)
+        coco_metric.dataset_meta = dict(classes=['car', 'bicycle'])
+        coco_metric.process({}, [
+            dict(
+                pred_instances=self._create_dummy_results(),
+                img_id=0,
+                ori_shape=(640, 640))
+        ])
+        eval_results = coco_metric.evaluate(size=1)
+        self.assertEqual(eval_results['coco/bbox_mAP'], 1.0)
+        self.assertTrue(
+            osp.isfile(osp.join(self.tmp_dir.name, 'test.bbox.json')))
+
     def test_format_only(self):
         # create dummy data
         fake_json_file = osp.join(self.tmp_dir.name, 'fake_data.json')
@@ -4,8 +4,10 @@ from unittest import TestCase
 import torch
 from mmengine.logging import MessageHub
 
-from mmdet.models.data_preprocessors import (BatchFixedSizePad,
+from mmdet.models.data_preprocessors import (BatchFixedSizePad, BatchMixUp,
+                                             BatchMosaic, BatchRandomAffine,
                                              BatchSyncRandomResize,
+                                             BatchYOLOXHSVRandomAug,
                                              DetDataPreprocessor,
                                              MultiBranchDataPreprocessor)
 from mmdet.structures import DetDataSample
@@ -322,6 +324,133 @@ class TestDetDataPreprocessor(TestCase):
             self.assertEqual(data_samples.gt_sem_seg.sem_seg.sum(),
                              seg_pad_sum)
 
+    def test_batch_mix_augments(self):
+        mean, std = [123.675, 116.28, 103.53], [58.395, 57.12, 57.375]
+        processor = DetDataPreprocessor(
+            mean=mean,
+            std=std,
+            batch_augments=[
+                dict(
+                    type='BatchMosaic', img_scale=(64, 48), mean=mean,
+                    std=std),
+                dict(
+                    type='BatchRandomAffine',
+                    border=(-32, -24),
+                    mean=mean,
+                    std=std),
+                dict(
+                    type='BatchMixUp', img_scale=(64, 48), mean=mean, std=std),
+                dict(type='BatchYOLOXHSVRandomAug', mean=mean, std=std)
+            ])
+        self.assertIsInstance(processor.batch_augments[0], BatchMosaic)
+        self.assertIsInstance(processor.batch_augments[1], BatchRandomAffine)
+        self.assertIsInstance(processor.batch_augments[2], BatchMixUp)
+        self.assertIsInstance(processor.batch_augments[3],
+                              BatchYOLOXHSVRandomAug)
+        for use_box_type in [True, False]:
+            packed_inputs = demo_mm_inputs(
+                3, [[3, 40, 60], [3, 48, 64], [3, 30, 50]],
+                use_box_type=use_box_type)
+            data = processor(packed_inputs, training=True)
+            batch_inputs = data['inputs']
+            self.assertEqual(batch_inputs.shape, (3, 3, 48, 64))
+            for data_sample in data['data_samples']:
+                self.assertEqual(data_sample.img_shape, (48, 64))
+                self.assertEqual(data_sample.batch_input_shape, (48, 64))
+                bboxes = data_sample.gt_instances.bboxes
+                self.assertIsInstance(bboxes, torch.Tensor)
+                self.assertEqual(
+                    len(bboxes), len(data_sample.gt_instances.labels))
+                self.assertTrue((bboxes[:, 0::2] >= 0).all()
+                                and (bboxes[:, 0::2] <= 64).all())
+                self.assertTrue((bboxes[:, 1::2] >= 0).all()
+                                and (bboxes[:, 1::2] <= 48).all())
+
+    def test_batch_mosaic(self):
+        inputs = torch.stack(
+            [torch.full((3, 24, 32), i * 10.) for i in range(4)])
+        data_samples = demo_mm_inputs(
+            4, (3, 24, 32), use_box_type=True)['data_samples']
+        num_gts = sum(len(x.gt_instances) for x in data_samples)
+        outputs, data_samples = BatchMosaic(
+            img_scale=(32, 24), center_ratio_range=(1, 1),
+            pad_val=255)(inputs, data_samples)
+        self.assertEqual(outputs.shape, (4, 3, 48, 64))
+        # each image is the top left part of its mosaic
+        for i in range(4):
+            self.assertTrue((outputs[i, :, :24, :32] == i * 10).all())
+        self.assertFalse((outputs == 255).any())
+        self.assertLessEqual(
+            sum(len(x.gt_instances) for x in data_samples), num_gts * 4)
+
+        # the batch is not changed when the mosaic is not applied
+        data_samples = demo_mm_inputs(
+            4, (3, 24, 32), use_box_type=True)['data_samples']
+        num_gts = sum(len(x.gt_instances) for x in data_samples)
+        outputs, data_samples = BatchMosaic(
+            img_scale=(32, 24), prob=0)(inputs, data_samples)
+        self.assertTrue(torch.equal(outputs, inputs))
+        self.assertEqual(
+            sum(len(x.gt_instances) for x in data_samples), num_gts)
+        self.assertEqual(data_samples[0].img_shape, (24, 32))
+        with self.assertRaises(AssertionError):
+            BatchMosaic(prob=1.5)
+
+    def test_batch_random_affine(self):
+        inputs = torch.rand(2, 3, 24, 32) * 255
+        data_samples = demo_mm_inputs(
+            2, (3, 24, 32), use_box_type=True)['data_samples']
+        bboxes = [x.gt_instances.bboxes.clone() for x in data_samples]
+        # identity transform
+        outputs, data_samples = BatchRandomAffine(
+            max_rotate_degree=0,
+            max_translate_ratio=0,
+            scaling_ratio_range=(1, 1),
+            max_shear_degree=0)(inputs, data_samples)
+        self.assertTrue(torch.allclose(outputs, inputs, atol=1e-3))
+        for data_sample, bbox in zip(data_samples, bboxes):
+            self.assertTrue(
+                torch.allclose(data_sample.gt_instances.bboxes.tensor,
+                               bbox.tensor))
+
+        outputs, data_samples = BatchRandomAffine(border=(-8,
+                                                          -4))(inputs,
+                                                               data_samples)
+        self.assertEqual(outputs.shape, (2, 3, 16, 16))
+        self.assertEqual(data_samples[0].img_shape, (16, 16))
+
+    def test_batch_mixup(self):
+        inputs = torch.rand(2, 3, 24, 32) * 255
+        data_samples = demo_mm_inputs(
+            2, (3, 24, 32), num_items=[0, 0],
+            use_box_type=True)['data_samples']
+        # images are not mixed with images without bboxes
+        outputs, data_samples = BatchMixUp(img_scale=(32, 24))(inputs,
+                                                               data_samples)
+        self.assertTrue(torch.equal(outputs, inputs))
+
+        data_samples = demo_mm_inputs(
+            2, (3, 24, 32), num_items=[3, 4],
+            use_box_type=True)['data_samples']
+        outputs, data_samples = BatchMixUp(img_scale=(32, 24))(inputs,
+                                                               data_samples)
+        self.assertEqual(outputs.shape, inputs.shape)
+        self.assertFalse(torch.equal(outputs, inputs))
+        self.assertGreaterEqual(len(data_samples[0].gt_instances), 3)
+
+    def test_batch_yolox_hsv_random_aug(self):
+        mean, std = [123.675, 116.28, 103.53], [58.395, 57.12, 57.375]
+        inputs = (torch.rand(2, 3, 24, 32) * 255 - torch.tensor(mean).view(
+            -1, 1, 1)) / torch.tensor(std).view(-1, 1, 1)
+        # hsv round trip
+        outputs, _ = BatchYOLOXHSVRandomAug(
+            hue_delta=0, saturation_delta=0, value_delta=0, mean=mean,
+            std=std)(inputs, None)
+        self.assertTrue(torch.allclose(outputs, inputs, atol=1e-3))
+
+        outputs, _ = BatchYOLOXHSVRandomAug(mean=mean, std=std)(inputs, None)
+        self.assertEqual(outputs.shape, inputs.shape)
+
 
 class TestMultiBranchDataPreprocessor(TestCase):
 
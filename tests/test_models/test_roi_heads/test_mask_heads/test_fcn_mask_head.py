@@ -8,6 +8,8 @@ from mmengine.structures import InstanceData
 from parameterized import parameterized
 
 from mmdet.models.roi_heads.mask_heads import FCNMaskHead
+from mmdet.models.roi_heads.mask_heads.fcn_mask_head import _do_paste_mask
+from mmdet.structures.mask import RLEMasks
 
 
 class TestFCNMaskHead(TestCase):
@@ -86,3 +88,44 @@ class TestFCNMaskHead(TestCase):
         self.assertIsInstance(result_list[0], InstanceData)
         self.assertEqual(len(result_list[0]), num_samples)
         self.assertEqual(result_list[0].masks.shape, (num_samples, s, s))
+
+    def test_paste_masks_in_regions(self):
+        num_classes = 6
+        mask_head = FCNMaskHead(
+            num_convs=1,
+            in_channels=1,
+            conv_out_channels=1,
+            num_classes=num_classes,
+            class_agnostic=True)
+        s = 64
+        img_metas = {'scale_factor': (1, 1), 'ori_shape': (s, s + 8, 3)}
+        mask_preds = torch.rand((10, 1, 14, 14))
+        xy = torch.rand((10, 2)) * s - 8
+        bboxes = torch.cat([xy, xy + torch.rand((10, 2)) * s], dim=1)
+        # an empty box and a box across the image border
+        bboxes[0] = torch.tensor([3., 3., 3., 10.])
+        bboxes[1] = torch.tensor([-5., 50., 20., 80.])
+        labels = torch.zeros(10, dtype=torch.long)
+
+        # paste one by one in the region around each box
+        expected = torch.zeros((10, s, s + 8), dtype=torch.bool)
+        for i in range(10):
+            masks, spatial_inds = _do_paste_mask(
+                mask_preds[i:i + 1].sigmoid(), bboxes[i:i + 1], s, s + 8)
+            expected[(torch.tensor([i]), ) + spatial_inds] = masks >= 0.5
+
+        for mem_limit in (1024, 1024**3):
+            rcnn_test_cfg = ConfigDict(
+                mask_thr_binary=0.5, mask_paste_mem_limit=mem_limit)
+            im_mask = mask_head._predict_by_feat_single(
+                mask_preds, bboxes.clone(), labels, img_metas, rcnn_test_cfg)
+            self.assertEqual(im_mask.shape, (10, s, s + 8))
+            self.assertTrue(torch.equal(im_mask, expected))
+
+            # encode the box-local masks to RLE
+            rcnn_test_cfg.rle_mask = True
+            rle_masks = mask_head._predict_by_feat_single(
+                mask_preds, bboxes.clone(), labels, img_metas, rcnn_test_cfg)
+            self.assertIsInstance(rle_masks, RLEMasks)
+            self.assertTrue(
+                (rle_masks.to_ndarray() == expected.numpy()).all())
@@ -34,3 +34,12 @@ class TestAppearanceFreeLink(TestCase):
         linked_track = aflink.forward(pred_track)
         assert isinstance(linked_track, np.ndarray)
         assert linked_track.shape == (10, 7)
+
+    def test_candidate_pairs(self):
+        aflink = TASK_UTILS.build(self.cfg)
+        first_frames = np.array([0, 12, 20, 45])
+        last_frames = np.array([10, 18, 40, 60])
+        xys = np.array([[0, 0], [10, 10], [500, 500], [20, 20]])
+        rows, cols = aflink.candidate_pairs(first_frames, last_frames, xys,
+                                            xys)
+        assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 3)]
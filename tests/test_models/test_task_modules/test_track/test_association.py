@@ -0,0 +1,122 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest import TestCase
+
+import numpy as np
+import torch
+from mmengine.registry import init_default_scope
+from scipy.optimize import linear_sum_assignment
+
+from mmdet.models.task_modules import overlap_pairs
+from mmdet.registry import TASK_UTILS
+from mmdet.structures.bbox import bbox_overlaps
+
+
+def extended_cost(cost, cost_limit):
+    """The optimal cost of the problem solved by ``lap.lapjv`` with
+    ``extend_cost=True``."""
+    num_rows, num_cols = cost.shape
+    big = 1e6
+    extended = np.full((num_rows + num_cols, num_cols + num_rows), big)
+    extended[:num_rows, :num_cols] = np.where(cost <= cost_limit, cost, big)
+    extended[np.arange(num_rows), num_cols + np.arange(num_rows)] = \
+        cost_limit / 2
+    extended[num_rows + np.arange(num_cols), np.arange(num_cols)] = \
+        cost_limit / 2
+    extended[num_rows:, num_cols:] = 0
+    rows, cols = linear_sum_assignment(extended)
+    return extended[rows, cols].sum()
+
+
+class TestLinearAssignment(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_default_scope('mmdet')
+
+    def test_assign(self):
+        rng = np.random.default_rng(0)
+        cost_limit = 0.7
+        for split_components in (True, False):
+            assigner = TASK_UTILS.build(
+                dict(
+                    type='LinearAssignment',
+                    solver='scipy',
+                    split_components=split_components))
+            for _ in range(100):
+                num_rows, num_cols = rng.integers(0, 8, 2)
+                cost = rng.uniform(0, 1, (num_rows, num_cols))
+                cost[rng.uniform(size=cost.shape) < 0.5] = np.inf
+                row, col = assigner(cost, cost_limit)
+                self.assertEqual(row.shape, (num_rows, ))
+                self.assertEqual(col.shape, (num_cols, ))
+                matched = np.nonzero(row > -1)[0]
+                self.assertTrue((col[row[matched]] == matched).all())
+                self.assertTrue((cost[matched, row[matched]] <=
+                                 cost_limit).all())
+                num_unmatched = num_rows + num_cols - 2 * len(matched)
+                total = cost[matched, row[matched]].sum() + \
+                    num_unmatched * cost_limit / 2
+                self.assertAlmostEqual(total,
+                                       extended_cost(cost, cost_limit))
+            self.assertGreater(assigner.counters['calls'], 0)
+            assigner.reset_timings()
+            self.assertEqual(len(assigner.timings), 0)
+
+    def test_full_assign(self):
+        assigner = TASK_UTILS.build(
+            dict(type='LinearAssignment', solver='scipy'))
+        # the full assignment matches both rows, while the cost-limited
+        # assignment only matches the cheapest pair
+        cost = np.array([[0.1, 0.5], [0.2, np.nan]])
+        row, col = assigner.full_assign(cost)
+        self.assertEqual(row.tolist(), [1, 0])
+        self.assertEqual(col.tolist(), [1, 0])
+        row, _ = assigner(cost, 0.3)
+        self.assertEqual(row.tolist(), [0, -1])
+
+        # as many finite pairs as possible are matched with the least cost
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            num_rows, num_cols = rng.integers(1, 7, 2)
+            cost = rng.uniform(0, 10, (num_rows, num_cols))
+            cost[rng.uniform(size=cost.shape) < 0.6] = np.inf
+            row, col = assigner.full_assign(cost)
+            matched = np.nonzero(row > -1)[0]
+            self.assertTrue((col[row[matched]] == matched).all())
+            self.assertTrue(np.isfinite(cost[matched, row[matched]]).all())
+            # the reference with a big cost for the infeasible pairs
+            big = 1e6
+            rows, cols = linear_sum_assignment(
+                np.where(np.isfinite(cost), cost, big))
+            feasible = np.isfinite(cost[rows, cols])
+            self.assertEqual(len(matched), feasible.sum())
+            self.assertAlmostEqual(cost[matched, row[matched]].sum(),
+                                   cost[rows, cols][feasible].sum())
+
+    def test_assign_by_iou(self):
+        assigner = TASK_UTILS.build(dict(type='LinearAssignment'))
+        track_bboxes = torch.tensor([[0., 0., 10., 10.], [20., 20., 30., 30.],
+                                     [50., 50., 60., 60.]])
+        det_bboxes = torch.tensor([[21., 21., 31., 31.], [1., 1., 11., 11.],
+                                   [51., 51., 61., 61.]])
+        row, col = assigner.assign_by_iou(
+            track_bboxes,
+            det_bboxes,
+            0.5,
+            labels1=torch.tensor([0, 0, 1]),
+            labels2=torch.tensor([0, 0, 0]))
+        self.assertEqual(row.tolist(), [1, 0, -1])
+        self.assertEqual(col.tolist(), [1, 0, -1])
+
+    def test_overlap_pairs(self):
+        xy = torch.rand(30, 2) * 100
+        bboxes1 = torch.cat([xy, xy + torch.rand(30, 2) * 30 + 1], dim=1)
+        xy = torch.rand(20, 2) * 100
+        bboxes2 = torch.cat([xy, xy + torch.rand(20, 2) * 30 + 1], dim=1)
+        rows, cols = overlap_pairs(bboxes1, bboxes2)
+        dense = torch.nonzero(bbox_overlaps(bboxes1, bboxes2) > 0)
+        self.assertEqual(
+            sorted(zip(rows.tolist(), cols.tolist())),
+            sorted(map(tuple, dense.tolist())))
+        rows, cols = overlap_pairs(bboxes1, bboxes2[:0])
+        self.assertEqual(len(rows), 0)
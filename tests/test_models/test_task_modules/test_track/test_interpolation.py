@@ -37,3 +37,19 @@ class TestInterpolateTracklets(TestCase):
         linked_track = interpolation.forward(pred_track)
         assert isinstance(linked_track, np.ndarray)
         assert linked_track.shape == (5, 7)
+
+    def test_interpolate(self):
+        pred_track = np.zeros((12, 7))
+        pred_track[:, 0] = np.array([1, 2, 3, 4, 5, 9, 1, 2, 3, 4, 5, 30])
+        pred_track[:, 1] = np.array([1] * 6 + [2] * 6)
+        pred_track[:, 2:6] = pred_track[:, :1]
+
+        interpolation = TASK_UTILS.build(
+            dict(type='InterpolateTracklets', min_num_frames=5))
+        linked_track = interpolation.forward(pred_track)
+        # only the gap shorter than max_num_frames is filled
+        assert linked_track.shape == (15, 7)
+        filled = linked_track[linked_track[:, 6] == 1]
+        assert (filled[:, 0] == np.array([6, 7, 8])).all()
+        assert (filled[:, 1] == 1).all()
+        assert np.allclose(filled[:, 2:6], filled[:, :1])
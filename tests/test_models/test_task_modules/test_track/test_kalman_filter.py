@@ -35,3 +35,33 @@ class TestKalmanFilter(TestCase):
         mean, covariance = self.kf.update(mean, covariance, measurement, score)
         assert len(mean) == 8
         assert covariance.shape == (8, 8)
+
+    def test_batch(self):
+        num_tracks = 5
+        measurements = np.random.rand(num_tracks, 4) * 100 + 1
+        means, covariances = self.kf.batch_initiate(measurements)
+        assert means.shape == (num_tracks, 8)
+        assert covariances.shape == (num_tracks, 8, 8)
+
+        # the batched steps are the same as the ones of each track
+        pred_means, pred_covariances = self.kf.batch_predict(
+            means, covariances)
+        new_means, new_covariances = self.kf.batch_update(
+            pred_means, pred_covariances, measurements + 1)
+        dists = self.kf.batch_gating_distance(new_means, new_covariances,
+                                              measurements[:3])
+        assert dists.shape == (num_tracks, 3)
+        for i in range(num_tracks):
+            mean, covariance = self.kf.initiate(measurements[i])
+            np.testing.assert_allclose(mean, means[i])
+            np.testing.assert_allclose(covariance, covariances[i])
+            mean, covariance = self.kf.predict(mean, covariance)
+            np.testing.assert_allclose(mean, pred_means[i])
+            np.testing.assert_allclose(covariance, pred_covariances[i])
+            mean, covariance = self.kf.update(mean, covariance,
+                                              measurements[i] + 1)
+            np.testing.assert_allclose(mean, new_means[i])
+            np.testing.assert_allclose(covariance, new_covariances[i])
+            np.testing.assert_allclose(
+                self.kf.gating_distance(mean, covariance, measurements[:3]),
+                dists[i])
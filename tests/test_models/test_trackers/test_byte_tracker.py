@@ -40,6 +40,27 @@ class TestByteTracker(TestCase):
             'ids', 'bboxes', 'scores', 'labels', 'frame_ids'
         ]
 
+    def test_update_label(self):
+        tracker = MODELS.build(dict(type='ByteTracker'))
+        tracker.kf = TASK_UTILS.build(dict(type='KalmanFilter'))
+        bboxes = random_boxes(self.num_objs, 512)
+        scores = torch.ones(self.num_objs)
+        ids = torch.arange(self.num_objs)
+        tracker.update(
+            ids=ids,
+            bboxes=bboxes,
+            scores=scores,
+            labels=torch.zeros(self.num_objs),
+            frame_ids=0)
+        # a track can not change its label
+        with self.assertRaises(AssertionError):
+            tracker.update(
+                ids=ids,
+                bboxes=bboxes,
+                scores=scores,
+                labels=torch.ones(self.num_objs),
+                frame_ids=1)
+
     def test_track(self):
 
         with torch.no_grad():
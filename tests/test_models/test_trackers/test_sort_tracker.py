@@ -2,6 +2,7 @@
 from unittest import TestCase
 from unittest.mock import MagicMock
 
+import numpy as np
 import torch
 from parameterized import parameterized
 
@@ -38,6 +39,26 @@ class TestSORTTracker(TestCase):
             'ids', 'bboxes', 'scores', 'labels', 'frame_ids'
         ]
 
+    def test_match(self):
+        tracker = MODELS.build(dict(type='SORTTracker', match_iou_thr=0.5))
+        dists = np.array([[0.1, 0.5], [0.2, np.nan]])
+        # a full assignment thresholded afterwards by default
+        self.assertEqual(tracker.match_dists(dists, 0.3).tolist(), [-1, 0])
+        # the IoUs should be strictly over match_iou_thr
+        track_bboxes = torch.tensor([[0., 0., 10., 10.], [20., 0., 30., 10.]])
+        det_bboxes = torch.tensor([[0., 0., 10., 20.], [20., 0., 30., 11.]])
+        labels = torch.zeros(2)
+        self.assertEqual(
+            tracker.match_ious(track_bboxes, det_bboxes, labels,
+                               labels).tolist(), [-1, 1])
+
+        tracker = MODELS.build(
+            dict(type='SORTTracker', match_iou_thr=0.5, cost_limited=True))
+        self.assertEqual(tracker.match_dists(dists, 0.3).tolist(), [0, -1])
+        self.assertEqual(
+            tracker.match_ious(track_bboxes, det_bboxes, labels,
+                               labels).tolist(), [-1, 1])
+
     @parameterized.expand([
         'deepsort/deepsort_faster-rcnn_r50_fpn_8xb2-4e'
         '_mot17halftrain_test-mot17halfval.py'
@@ -0,0 +1,82 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest import TestCase
+
+import torch
+
+from mmdet.models.trackers import TrackStore
+
+
+class TestTrackStore(TestCase):
+
+    def test_update_and_get(self):
+        store = TrackStore(momentums=dict(embeds=0.5), init_capacity=2)
+        self.assertEqual(len(store), 0)
+        for frame_id in range(10):
+            # track 0 is in all the frames, track 1 in the odd frames and
+            # track 2 from the 5th frame
+            ids = [0]
+            if frame_id % 2 == 1:
+                ids.append(1)
+            if frame_id >= 5:
+                ids.append(2)
+            num_objs = len(ids)
+            store.update(
+                ids,
+                frame_ids=torch.full((num_objs, ), frame_id),
+                bboxes=torch.full((num_objs, 4), float(frame_id)),
+                embeds=torch.full((num_objs, 2), float(frame_id)))
+        self.assertEqual(store.ids, [0, 1, 2])
+        self.assertIn(2, store)
+
+        # the latest entries
+        self.assertEqual(store.get('frame_ids').tolist(), [9, 9, 9])
+        self.assertEqual(store.get('bboxes', [2, 0]).shape, (2, 4))
+        # the mean of the latest entries
+        mean = store.get('bboxes', num_samples=3, behavior='mean')
+        self.assertEqual(mean[:, 0].tolist(), [8., 7., 8.])
+        with self.assertRaises(ValueError):
+            store.get('bboxes', num_samples=6)
+        samples = store.get('bboxes', [0, 2], num_samples=5)
+        self.assertEqual(samples.shape, (2, 5, 4))
+        # momentums
+        embed = 0.
+        for frame_id in range(1, 10):
+            embed = 0.5 * embed + 0.5 * frame_id
+        self.assertAlmostEqual(
+            store.get('embeds', [0])[0, 0].item(), embed, places=5)
+
+        # the view of a track
+        track = store[1]
+        self.assertEqual(len(track.bboxes), 5)
+        self.assertEqual(track['frame_ids'][-1].tolist(), [9])
+        self.assertEqual(track.bboxes[0].shape, (1, 4))
+        self.assertEqual(len(track.bboxes[-2:]), 2)
+        track.bboxes[-2:] = [torch.zeros(1, 4), torch.ones(1, 4)]
+        self.assertEqual(store.get('bboxes', [1])[0].tolist(), [1.] * 4)
+        track.tentative = True
+        self.assertTrue(store[1].tentative)
+        self.assertEqual(len(store[0].mean), 0)
+
+        # remove tracks and reuse the slots
+        store.remove([0, 2])
+        self.assertEqual(store.ids, [1])
+        self.assertNotIn(0, store)
+        store.update([3],
+                     frame_ids=torch.tensor([10]),
+                     bboxes=torch.zeros(1, 4),
+                     embeds=torch.ones(1, 2))
+        self.assertEqual(store.ids, [1, 3])
+        self.assertEqual(len(store[3].bboxes), 1)
+        self.assertEqual(store.get('embeds', [3]).tolist(), [[1., 1.]])
+
+    def test_max_history(self):
+        store = TrackStore(max_history=3)
+        for frame_id in range(5):
+            store.update([0],
+                         frame_ids=torch.tensor([frame_id]),
+                         bboxes=torch.full((1, 4), float(frame_id)))
+        self.assertEqual(len(store[0].bboxes), 3)
+        self.assertEqual([int(f) for f in store[0].frame_ids], [2, 3, 4])
+        self.assertEqual(store.get('frame_ids').tolist(), [4])
+        mean = store.get('bboxes', num_samples=10, behavior='mean')
+        self.assertEqual(mean[0].tolist(), [3.] * 4)
@@ -5,8 +5,8 @@ import torch
 from mmengine.structures import InstanceData
 
 from mmdet.models.utils import (empty_instances, filter_gt_instances,
-                                rename_loss_dict, reweight_loss_dict,
-                                unpack_gt_instances)
+                                masks_to_rle, rename_loss_dict,
+                                reweight_loss_dict, unpack_gt_instances)
 from mmdet.testing import demo_mm_inputs
 
 
@@ -108,3 +108,20 @@ def test_reweight_loss_dict():
     weighted_losses = reweight_loss_dict(copy.deepcopy(losses), weight)
     for name in losses.keys():
         assert weighted_losses[name] == losses[name] * weight
+
+
+def test_masks_to_rle():
+    logits = torch.randn(5, 8, 10)
+
+    def mask_fn(logits):
+        return logits > 0
+
+    # a chunk of 2 masks
+    rle_masks = masks_to_rle(
+        mask_fn, logits, (8, 10), mem_limit=2 * 8 * 10 * 4)
+    assert len(rle_masks) == 5
+    assert (rle_masks.to_ndarray() == (logits > 0).numpy()).all()
+
+    rle_masks = masks_to_rle(mask_fn, logits[:0], (8, 10))
+    assert len(rle_masks) == 0
+    assert rle_masks.to_ndarray().shape == (0, 8, 10)
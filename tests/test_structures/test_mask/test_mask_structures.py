@@ -1,9 +1,13 @@
 from unittest import TestCase
 
 import numpy as np
+import torch
+from mmcv.ops import roi_align
 from mmengine.testing import assert_allclose
 
-from mmdet.structures.mask import BitmapMasks, PolygonMasks
+from mmdet.structures.mask import (BitmapMasks, PolygonMasks, RLEMasks,
+                                   batch_bitmap_to_polygon, bitmap_to_polygon,
+                                   polygon_to_bitmap)
 
 
 class TestMaskStructures(TestCase):
@@ -57,6 +61,46 @@ class TestMaskStructures(TestCase):
         for i, m in enumerate(masks):
             assert_allclose(m.masks, cat_mask.masks[i * 3:(i + 1) * 3])
 
+    def test_bitmap_crop_and_resize(self):
+        rng = np.random.RandomState(0)
+        masks_list = [
+            BitmapMasks(rng.rand(3, 20, 30) > 0.5, 20, 30),
+            BitmapMasks(rng.rand(2, 25, 15), 25, 15)
+        ]
+        bboxes_list = [
+            np.array([[0, 0, 30, 20], [2.3, 4.5, 17.8, 9.1], [5, 5, 5, 9]],
+                     dtype=np.float32),
+            np.array([[1.2, 0.4, 14.6, 24.3]], dtype=np.float32)
+        ]
+        inds_list = [np.array([2, 0, 1]), np.array([1])]
+        resized_masks = BitmapMasks.batch_crop_and_resize(
+            masks_list,
+            bboxes_list,
+            inds_list, (7, 9),
+            binarize=False,
+            max_elements=100)
+        assert resized_masks.shape == (4, 7, 9)
+        assert resized_masks.dtype == np.float32
+
+        # same as roi_align
+        expected = []
+        for masks, bboxes, inds in zip(masks_list, bboxes_list, inds_list):
+            rois = np.hstack([np.arange(len(bboxes))[:, None], bboxes])
+            rois = torch.from_numpy(rois).float()
+            masks_th = torch.from_numpy(masks.masks[inds]).float()[:, None]
+            expected.append(
+                roi_align(masks_th, rois, (7, 9), 1.0, 0, 'avg',
+                          True).squeeze(1))
+        assert_allclose(resized_masks, torch.cat(expected).numpy(), atol=1e-6)
+
+        binary_masks = masks_list[0].crop_and_resize(bboxes_list[0], (7, 9),
+                                                     inds_list[0])
+        assert binary_masks.masks.dtype == bool
+        assert (binary_masks.masks == (resized_masks[:3] >= 0.5)).all()
+        empty_masks = BitmapMasks.batch_crop_and_resize(
+            masks_list, [np.zeros((0, 4))] * 2, [np.zeros(0)] * 2, (7, 9))
+        assert empty_masks.shape == (0, 7, 9)
+
     def test_polygon_cat(self):
         # test invalid inputs
         with self.assertRaises(AssertionError):
@@ -71,3 +115,235 @@ class TestMaskStructures(TestCase):
         assert len(cat_mask) == 3 * 5
         for i, m in enumerate(masks):
             assert_allclose(m.masks, cat_mask.masks[i * 3:(i + 1) * 3])
+
+        # test the empty inputs first and in the middle
+        empty = PolygonMasks([], 28, 28)
+        masks = PolygonMasks.random(num_masks=3)
+        for inputs in ([empty, masks], [masks, empty, masks], [empty, empty]):
+            cat_mask = PolygonMasks.cat(inputs)
+            expected = [p for m in inputs for p in m.masks]
+            assert len(cat_mask) == len(expected)
+            for polys, expected_polys in zip(cat_mask.masks, expected):
+                assert_allclose(polys, expected_polys)
+
+    def test_polygon_packed(self):
+        polys = [[np.array([0, 0, 4, 0, 4, 4, 0, 4], dtype=np.float32)],
+                 [
+                     np.array([1, 1, 3, 1, 2, 3], dtype=np.float32),
+                     np.array([5, 5, 8, 5, 8, 9, 5, 9], dtype=np.float32)
+                 ], [np.array([2, 6, 6, 6, 4, 9], dtype=np.float32)]]
+        masks = PolygonMasks(polys, 10, 10)
+        coords, poly_offsets, inst_offsets = masks.packed
+        assert coords.dtype == np.float32
+        assert_allclose(poly_offsets, [0, 8, 14, 22, 28])
+        assert_allclose(inst_offsets, [0, 1, 3, 4])
+
+        # the list view of the packed masks
+        packed_masks = PolygonMasks.from_packed(coords, poly_offsets,
+                                                inst_offsets, 10, 10)
+        assert len(packed_masks) == 3
+        for poly_per_obj, packed_poly_per_obj in zip(polys, packed_masks):
+            assert len(poly_per_obj) == len(packed_poly_per_obj)
+            for p, packed_p in zip(poly_per_obj, packed_poly_per_obj):
+                assert_allclose(p, packed_p)
+
+        # indexing
+        for index in (1, -2, [2, 1], np.array([2, 1]),
+                      np.array([False, True, True]), slice(1, None)):
+            indexed_masks = packed_masks[index]
+            expected = np.arange(3)[index]
+            expected = np.atleast_1d(expected)
+            assert len(indexed_masks) == len(expected)
+            for i, poly_per_obj in zip(expected, indexed_masks):
+                assert len(poly_per_obj) == len(polys[i])
+                for p, indexed_p in zip(polys[i], poly_per_obj):
+                    assert_allclose(p, indexed_p)
+        assert len(packed_masks[[]]) == 0
+        with self.assertRaises(IndexError):
+            packed_masks[3]
+
+        # geometric transforms
+        flipped_masks = packed_masks.flip('diagonal')
+        assert_allclose(flipped_masks.masks[1][1], [5, 5, 2, 5, 2, 1, 5, 1])
+        resized_masks = packed_masks.resize((20, 5))
+        assert_allclose(resized_masks.masks[0][0],
+                        [0, 0, 2, 0, 2, 8, 0, 8])
+        translated_masks = packed_masks.translate((10, 10), 3, 'vertical')
+        assert_allclose(translated_masks.masks[1][1],
+                        [5, 8, 8, 8, 8, 10, 5, 10])
+        rotated_masks = packed_masks.rotate((10, 10), 90, center=(5, 5))
+        assert_allclose(rotated_masks.masks[0][0], [10, 0, 10, 4, 6, 4, 6, 0],
+                        atol=1e-5, rtol=0)
+        sheared_masks = packed_masks.shear((10, 10), 0.5)
+        assert_allclose(sheared_masks.masks[2][0], [5, 6, 9, 6, 8.5, 9])
+        cropped_masks = packed_masks.crop(np.array([1, 1, 7, 7]))
+        # the polygon inside the crop box is only shifted
+        assert_allclose(cropped_masks.masks[1][0], [0, 0, 2, 0, 1, 2])
+        assert_allclose(cropped_masks.areas, [9, 2 + 4, 10 / 3])
+        resized_masks = packed_masks.crop_and_resize(
+            np.array([[0, 0, 5, 5], [5, 5, 10, 10]]), (10, 10),
+            np.array([1, 1]))
+        assert len(resized_masks) == 2
+        assert_allclose(resized_masks.masks[0][1],
+                        [10, 10, 16, 10, 16, 18, 10, 18])
+        assert_allclose(resized_masks.masks[1][1], [0, 0, 6, 0, 6, 8, 0, 8])
+        expanded_masks = packed_masks.expand(20, 30, 5, 6)
+        assert expanded_masks.height == 20 and expanded_masks.width == 30
+        assert_allclose(expanded_masks.masks[1][1],
+                        [11, 10, 14, 10, 14, 14, 11, 14])
+
+        # areas and bboxes
+        assert_allclose(packed_masks.areas, [16, 2 + 12, 6])
+        assert_allclose(packed_masks.get_bboxes().tensor,
+                        [[0, 0, 4, 4], [1, 1, 8, 9], [2, 6, 6, 9]])
+        empty_masks = PolygonMasks([], 10, 10)
+        assert empty_masks.areas.shape == (0, )
+        # float32 polygons with large coordinates are summed in float64
+        rng = np.random.RandomState(0)
+        large_polys = [[(rng.rand(40) * 100 + 5000).astype(np.float32)]
+                       for _ in range(4)]
+        expected_areas = []
+        for poly_per_obj in large_polys:
+            x, y = poly_per_obj[0][0::2].astype(
+                np.float64), poly_per_obj[0][1::2].astype(np.float64)
+            expected_areas.append(0.5 * np.abs(
+                np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1))))
+        assert_allclose(
+            PolygonMasks(large_polys, 6000, 6000).areas,
+            expected_areas,
+            rtol=1e-12,
+            atol=0)
+        assert empty_masks.get_bboxes().tensor.shape == (0, 4)
+
+        # rasterize all the masks at once
+        bitmaps = packed_masks.to_ndarray()
+        assert bitmaps.shape == (3, 10, 10) and bitmaps.dtype == bool
+        for bitmap, poly_per_obj in zip(bitmaps, polys):
+            assert (bitmap == polygon_to_bitmap(poly_per_obj, 10, 10)).all()
+
+    def test_rle(self):
+        rng = np.random.RandomState(0)
+        bitmaps = np.zeros((4, 20, 30), dtype=np.uint8)
+        for bitmap in bitmaps[:3]:
+            x1, y1 = rng.randint(0, 15, 2)
+            bitmap[y1:y1 + rng.randint(1, 10), x1:x1 + rng.randint(1, 20)] = 1
+            bitmap[rng.rand(20, 30) > 0.8] = 1
+        bitmap_masks = BitmapMasks(bitmaps, 20, 30)
+        rle_masks = RLEMasks.from_ndarray(bitmaps)
+        assert len(rle_masks) == 4
+        assert_allclose(rle_masks.to_ndarray(), bitmaps)
+        assert (rle_masks.areas == bitmap_masks.areas).all()
+        assert_allclose(rle_masks.get_bboxes().tensor,
+                        bitmap_masks.get_bboxes().tensor)
+
+        # the packed runs
+        runs, inst_offsets = rle_masks.packed
+        assert inst_offsets[-1] == len(runs)
+        packed_masks = RLEMasks.from_packed(runs, inst_offsets, 20, 30)
+        assert_allclose(packed_masks.to_ndarray(), bitmaps)
+        assert_allclose(
+            RLEMasks(packed_masks.masks, 20, 30).to_ndarray(), bitmaps)
+
+        def check(rle_results, bitmap_results):
+            assert isinstance(rle_results, RLEMasks)
+            assert (rle_results.height, rle_results.width) == \
+                (bitmap_results.height, bitmap_results.width)
+            assert_allclose(rle_results.to_ndarray(), bitmap_results.masks)
+
+        for masks in (rle_masks, packed_masks):
+            check(masks[[2, 0]], bitmap_masks[[2, 0]])
+            check(masks[1], bitmap_masks[1])
+            check(masks[np.array([True, False, True, False])],
+                  bitmap_masks[np.array([True, False, True, False])])
+            for direction in ('horizontal', 'vertical', 'diagonal'):
+                check(masks.flip(direction), bitmap_masks.flip(direction))
+            check(masks.pad((25, 32)), bitmap_masks.pad((25, 32)))
+            bbox = np.array([3, 4, 21, 15])
+            check(masks.crop(bbox), bitmap_masks.crop(bbox))
+            check(
+                masks.expand(30, 40, 5, 6), bitmap_masks.expand(30, 40, 5, 6))
+            for out_shape in ((20, 30), (13, 17), (41, 65)):
+                check(masks.resize(out_shape), bitmap_masks.resize(out_shape))
+            check(masks.rescale(1.5), bitmap_masks.rescale(1.5))
+            for out_shape, offset in (((20, 30), 4), ((15, 35), -6)):
+                for direction in ('horizontal', 'vertical'):
+                    check(
+                        masks.translate(out_shape, offset, direction),
+                        bitmap_masks.translate(out_shape, offset, direction))
+            check(masks.rotate((20, 30), 30), bitmap_masks.rotate((20, 30),
+                                                                  30))
+            check(RLEMasks.cat([masks, masks[[1]]]),
+                  BitmapMasks.cat([bitmap_masks, bitmap_masks[[1]]]))
+
+            bboxes = np.array([[0, 0, 10, 10], [5, 5, 25, 18]],
+                              dtype=np.float32)
+            inds = np.array([2, 0])
+            assert_allclose(
+                masks.crop_and_resize(bboxes, (7, 7), inds).masks,
+                bitmap_masks.crop_and_resize(bboxes, (7, 7), inds).masks)
+
+        # box-local masks
+        box_masks = bitmaps[:, 3:15, 5:25]
+        offsets = np.array([[5, 3], [-2, 10], [15, 12], [0, 0]])
+        expected = np.zeros_like(bitmaps)
+        for i, (x, y) in enumerate(offsets):
+            ys, xs = np.nonzero(box_masks[i])
+            valid = (xs + x >= 0) & (xs + x < 30) & (ys + y < 20)
+            expected[i, ys[valid] + y, xs[valid] + x] = 1
+        assert_allclose(
+            RLEMasks.from_box_masks(box_masks, offsets, 20,
+                                    30).to_ndarray(), expected)
+
+        # empty masks
+        empty_masks = RLEMasks([], 20, 30)
+        assert len(empty_masks) == 0
+        assert empty_masks.to_ndarray().shape == (0, 20, 30)
+        assert len(empty_masks.resize((10, 10))) == 0
+        # the empty packed masks have no compressed RLE either
+        assert empty_masks.flip().masks == []
+        assert RLEMasks.from_packed(
+            np.zeros((0, 2), dtype=np.int64), np.zeros(1, dtype=np.int64), 20,
+            30).masks == []
+
+        # concatenate the packed masks with the empty inputs first and in
+        # the middle
+        flipped_masks = packed_masks.flip()
+        flipped_bitmaps = bitmap_masks.flip()
+        empty_bitmaps = BitmapMasks(np.zeros((0, 20, 30)), 20, 30)
+        for empty in (empty_masks, empty_masks.flip()):
+            check(
+                RLEMasks.cat([empty, flipped_masks]),
+                BitmapMasks.cat([empty_bitmaps, flipped_bitmaps]))
+            check(
+                RLEMasks.cat([flipped_masks, empty, flipped_masks]),
+                BitmapMasks.cat(
+                    [flipped_bitmaps, empty_bitmaps, flipped_bitmaps]))
+            check(
+                RLEMasks.cat([empty, empty.flip()]),
+                BitmapMasks.cat([empty_bitmaps, empty_bitmaps]))
+
+    def test_batch_bitmap_to_polygon(self):
+        rng = np.random.RandomState(0)
+        bitmaps = np.zeros((4, 20, 30), dtype=np.uint8)
+        bitmaps[0, 3:12, 5:20] = 1
+        bitmaps[0, 6:9, 8:12] = 0
+        bitmaps[1, 10:, 20:] = 1
+        bitmaps[2][rng.rand(20, 30) > 0.7] = 1
+        expected = [bitmap_to_polygon(bitmap) for bitmap in bitmaps]
+        for masks in (bitmaps, BitmapMasks(bitmaps, 20, 30),
+                      RLEMasks.from_ndarray(bitmaps)):
+            for num_workers in (0, 2):
+                results = batch_bitmap_to_polygon(
+                    masks, num_workers=num_workers)
+                assert len(results) == 4
+                for result, expected_result in zip(results, expected):
+                    assert result[1] == expected_result[1]
+                    assert len(result[0]) == len(expected_result[0])
+                    for c, expected_c in zip(result[0], expected_result[0]):
+                        assert_allclose(c, expected_c)
+        assert results[0][1] and len(results[3][0]) == 0
+
+        # simplified polygons
+        results = batch_bitmap_to_polygon(bitmaps, tolerance=1.)
+        assert sorted(results[1][0][0].tolist()) == [[20, 10], [20, 19],
+                                                      [29, 10], [29, 19]]
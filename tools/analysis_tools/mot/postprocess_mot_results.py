@@ -0,0 +1,111 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import os
+import os.path as osp
+import time
+
+import numpy as np
+from mmengine import Config, DictAction
+from mmengine.logging import print_log
+from mmengine.registry import init_default_scope
+
+from mmdet.registry import TASK_UTILS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='post-process the tracking results in the MOTChallenge '
+        'format offline, one video at a time')
+    parser.add_argument('config', help='path of the config file')
+    parser.add_argument(
+        'result_dir', help='directory of the results, a txt file per video')
+    parser.add_argument(
+        'output_dir', help='directory where the results will be saved')
+    parser.add_argument(
+        '--no-aflink',
+        action='store_true',
+        help='whether to skip the `postprocess_model` of the model, e.g. '
+        'AppearanceFreeLink')
+    parser.add_argument(
+        '--no-interpolation',
+        action='store_true',
+        help='whether to skip the `postprocess_tracklet_cfg` of the test '
+        'evaluator, e.g. InterpolateTracklets')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file.')
+    args = parser.parse_args()
+    return args
+
+
+def build_postprocessors(cfg, args):
+    """Build the post-processors in the order of the online pipeline: the
+    linking of the model and then the ones of the evaluator."""
+    postprocessors = []
+    if not args.no_aflink and cfg.model.get('postprocess_model'):
+        postprocessors.append(TASK_UTILS.build(cfg.model.postprocess_model))
+    evaluator = cfg.get('test_evaluator', dict())
+    if isinstance(evaluator, (list, tuple)):
+        evaluator = evaluator[0]
+    if not args.no_interpolation:
+        for postprocess_cfg in evaluator.get('postprocess_tracklet_cfg', []):
+            postprocessors.append(TASK_UTILS.build(postprocess_cfg))
+    return postprocessors
+
+
+def load_results(result_file):
+    """Load the results of a video as rows of (frame_id, track_id, x1, y1,
+    x2, y2, score)."""
+    results = np.loadtxt(result_file, delimiter=',', ndmin=2)
+    pred_tracks = np.zeros((len(results), 7))
+    if len(results) > 0:
+        pred_tracks[:, :7] = results[:, :7]
+        pred_tracks[:, 4:6] += pred_tracks[:, 2:4]
+    return pred_tracks
+
+
+def save_results(pred_tracks, out_file):
+    """Save the results of a video in the MOTChallenge format."""
+    results = pred_tracks.copy()
+    results[:, 4:6] -= results[:, 2:4]
+    with open(out_file, 'wt') as f:
+        for result in results:
+            f.write('%d,%d,%.3f,%.3f,%.3f,%.3f,%.3f,-1,-1,-1\n' %
+                    tuple(result))
+
+
+def main():
+    args = parse_args()
+
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    init_default_scope(cfg.get('default_scope', 'mmdet'))
+
+    postprocessors = build_postprocessors(cfg, args)
+    if not postprocessors:
+        print_log('No post-processor is configured, the results are copied.')
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # stream the videos so that only the results of a video are in memory
+    result_files = sorted(
+        f for f in os.listdir(args.result_dir) if f.endswith('.txt'))
+    for result_file in result_files:
+        pred_tracks = load_results(osp.join(args.result_dir, result_file))
+        num_rows = len(pred_tracks)
+        start = time.perf_counter()
+        for postprocessor in postprocessors:
+            if len(pred_tracks) == 0:
+                break
+            pred_tracks = postprocessor.forward(pred_tracks)
+        elapsed = time.perf_counter() - start
+        save_results(pred_tracks, osp.join(args.output_dir, result_file))
+        print_log(f'{result_file}: {num_rows} -> {len(pred_tracks)} rows '
+                  f'in {elapsed * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()